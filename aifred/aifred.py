@@ -6,6 +6,8 @@ Full Gradio-Style UI with Single Column Layout
 
 import reflex as rx
 from .state import AIState
+from .backends import backend_lifespan
+from .lib.vector_cache import vector_cache_lifespan
 from .theme import COLORS
 
 
@@ -29,6 +31,7 @@ def t(key: str) -> rx.Var:
         "choose_research_mode": "Wähle, wie der Assistant Fragen beantwortet",
         "send_text": "💬 Text senden",
         "clear_chat": "🗑️ Chat löschen",
+        "stop_generation": "⏹️ Stopp",
         "llm_parameters": "⚙️ LLM-Parameter (Erweitert)",
         "temperature": "🌡️ Temperature",
         "current": "Aktuell:",
@@ -85,6 +88,7 @@ def t(key: str) -> rx.Var:
         "choose_research_mode": "Choose how the assistant answers questions",
         "send_text": "💬 Send Text",
         "clear_chat": "🗑️ Clear Chat",
+        "stop_generation": "⏹️ Stop",
         "llm_parameters": "⚙️ LLM Parameters (Advanced)",
         "temperature": "🌡️ Temperature",
         "current": "Current:",
@@ -247,6 +251,18 @@ def text_input_section() -> rx.Component:
                     },
                 },
             ),
+            # Stop: bricht laufende Generierung/Recherche ab (nur während Inferenz sichtbar)
+            rx.cond(
+                AIState.is_generating,
+                rx.button(
+                    t("stop_generation"),
+                    on_click=AIState.stop_generation,
+                    size="2",
+                    variant="outline",
+                    color_scheme="red",
+                    style={"min_width": "100px"},
+                ),
+            ),
             rx.button(
                 t("clear_chat"),
                 on_click=AIState.clear_chat,
@@ -1228,6 +1244,35 @@ def settings_accordion() -> rx.Component:
                         color="#999",
                         line_height="1.3",
                     ),
+                    # Thinking Budget (nur sichtbar wenn Thinking Mode aktiv)
+                    rx.cond(
+                        AIState.enable_thinking,
+                        rx.hstack(
+                            rx.text("Budget:", font_size="11px", font_weight="500"),
+                            rx.input(
+                                value=AIState.thinking_budget,
+                                on_change=AIState.set_thinking_budget,
+                                type="number",
+                                step="256",
+                                min="0",
+                                max="32768",
+                                size="1",
+                                width="80px",
+                            ),
+                            rx.text(
+                                rx.cond(
+                                    AIState.thinking_budget > 0,
+                                    "Reasoning-Tokens, danach direkt zur Antwort",
+                                    "Tokens (0 = unbegrenzt)"
+                                ),
+                                font_size="10px",
+                                color="#999",
+                            ),
+                            spacing="2",
+                            align="center",
+                        ),
+                        rx.box(),
+                    ),
                     spacing="2",
                     width="100%",
                 ),
@@ -1494,3 +1539,9 @@ def index() -> rx.Component:
 app = rx.App(
     stylesheets=["/custom.css"],  # Load custom CSS
 )
+
+# Close pooled backend connections (httpx/AsyncOpenAI) on server shutdown
+app.register_lifespan_task(backend_lifespan)
+
+# Vector Cache: abgelaufene Einträge löschen, Größenlimit durchsetzen (Hintergrund-Task)
+app.register_lifespan_task(vector_cache_lifespan)
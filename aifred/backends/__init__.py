@@ -4,11 +4,20 @@ LLM Backend Factory
 Easy switching between different LLM backends (Ollama, vLLM, llama.cpp, etc.)
 """
 
-from typing import Optional
+import asyncio
+import contextlib
+import logging
+from typing import Dict, Optional, Tuple, Type
 from .base import LLMBackend, LLMMessage, LLMOptions, LLMResponse
+from .metadata_cache import ModelMetadata, get_model_metadata_cache, invalidate_model_metadata
+from .scheduler import AdmissionScheduler, PRIORITY_HIGH, PRIORITY_LOW
 from .ollama import OllamaBackend
 from .vllm import vLLMBackend
 from .tabbyapi import TabbyAPIBackend
+from .llamacpp import LlamaCppBackend
+from .pooled import PooledBackend
+
+logger = logging.getLogger(__name__)
 
 
 class BackendFactory:
@@ -19,15 +28,33 @@ class BackendFactory:
         backend = BackendFactory.create("ollama")
         backend = BackendFactory.create("vllm", base_url="http://localhost:8000/v1")
         backend = BackendFactory.create("tabbyapi", base_url="http://localhost:5000/v1")
+        backend = BackendFactory.create("llamacpp", base_url="http://localhost:8080")
+        backend = BackendFactory.create("ollama", base_url="http://box1:11434,http://box2:11434")  # Pool
     """
 
-    _backends = {
+    _backends: Dict[str, Type[LLMBackend]] = {
         "ollama": OllamaBackend,
         "vllm": vLLMBackend,
         "tabbyapi": TabbyAPIBackend,  # ExLlamaV2 (V3 noch experimentell)
+        "llamacpp": LlamaCppBackend,  # llama-server (GGUF, Slot-Prompt-Caching)
         # "openai": OpenAIBackend,      # TODO
     }
 
+    # Default URLs per backend
+    _default_urls = {
+        "ollama": "http://localhost:11434",
+        "vllm": "http://localhost:8000/v1",
+        "tabbyapi": "http://localhost:5000/v1",
+        "llamacpp": "http://localhost:8080",
+    }
+
+    @classmethod
+    def resolve_url(cls, backend_type: str, base_url: Optional[str] = None) -> str:
+        """Return base_url or the default URL for the given backend type"""
+        if base_url:
+            return base_url
+        return cls._default_urls.get(backend_type.lower(), "http://localhost:8000")
+
     @classmethod
     def create(
         cls,
@@ -39,12 +66,13 @@ class BackendFactory:
         Create a backend instance
 
         Args:
-            backend_type: "ollama", "vllm", "tabbyapi", "openai"
-            base_url: Override default base URL
+            backend_type: "ollama", "vllm", "tabbyapi", "llamacpp", "openai"
+            base_url: Override default base URL (comma-separated → PooledBackend)
             api_key: API key (for cloud backends)
 
         Returns:
-            LLMBackend instance
+            LLMBackend instance (PooledBackend if more than one endpoint is
+            configured via base_url or BACKEND_POOL_EXTRA_ENDPOINTS)
 
         Raises:
             ValueError: If backend_type is unknown
@@ -58,17 +86,23 @@ class BackendFactory:
                 f"Available backends: {available}"
             )
 
-        backend_class = cls._backends[backend_type]
+        base_url = cls.resolve_url(backend_type, base_url)
 
-        # Default URLs per backend
-        default_urls = {
-            "ollama": "http://localhost:11434",
-            "vllm": "http://localhost:8000/v1",
-            "tabbyapi": "http://localhost:5000/v1",
-        }
+        # Multi-Endpoint: base_url list + configured extra endpoints → Pool
+        from ..lib.config import BACKEND_POOL_EXTRA_ENDPOINTS
+        urls = [u.strip() for u in base_url.split(",") if u.strip()]
+        for url in BACKEND_POOL_EXTRA_ENDPOINTS.get(backend_type, []):
+            if url not in urls:
+                urls.append(url)
+        if len(urls) > 1:
+            return PooledBackend([cls._create_single(backend_type, url, api_key) for url in urls])
 
-        if base_url is None:
-            base_url = default_urls.get(backend_type, "http://localhost:8000")
+        return cls._create_single(backend_type, urls[0], api_key)
+
+    @classmethod
+    def _create_single(cls, backend_type: str, base_url: str, api_key: Optional[str]) -> LLMBackend:
+        """Create one backend instance for exactly one endpoint"""
+        backend_class = cls._backends[backend_type]
 
         # Create instance
         if backend_type in ["vllm", "tabbyapi", "openai"]:
@@ -76,7 +110,9 @@ class BackendFactory:
             api_key = api_key or "dummy"
             return backend_class(base_url=base_url, api_key=api_key)
         else:
-            # Ollama doesn't need api_key
+            # Ollama/llama.cpp: api_key optional (llama-server --api-key)
+            if api_key and backend_type == "llamacpp":
+                return backend_class(base_url=base_url, api_key=api_key)
             return backend_class(base_url=base_url)
 
     @classmethod
@@ -85,13 +121,145 @@ class BackendFactory:
         return list(cls._backends.keys())
 
 
+class BackendRegistry:
+    """
+    Process-wide registry of long-lived backend instances
+
+    Every backend owns a keep-alive connection pool (httpx.AsyncClient for
+    Ollama, AsyncOpenAI for vLLM/TabbyAPI). Creating one per request means
+    TCP setup and pool warm-up land on every request's TTFT. The registry
+    hands out ONE shared instance per (backend_type, base_url), reused across
+    all Reflex sessions and LLMClient instances.
+
+    Instances are bound to the event loop they were created in (httpx pools
+    cannot be shared across loops). If a different loop asks for the same
+    key, a fresh instance is created for it.
+
+    Usage:
+        backend = BackendRegistry.get("ollama", "http://localhost:11434")
+        ...
+        await BackendRegistry.close_all()  # On app shutdown
+    """
+
+    _instances: Dict[Tuple[str, str], Tuple[LLMBackend, Optional[asyncio.AbstractEventLoop]]] = {}
+
+    @staticmethod
+    def _current_loop() -> Optional[asyncio.AbstractEventLoop]:
+        try:
+            return asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+
+    @classmethod
+    def get(
+        cls,
+        backend_type: str,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None
+    ) -> LLMBackend:
+        """
+        Get the shared backend instance for (backend_type, base_url)
+
+        Args:
+            backend_type: "ollama", "vllm", "tabbyapi"
+            base_url: Backend URL (None = default URL of backend type)
+            api_key: API key (only used when the instance is created)
+
+        Returns:
+            Shared LLMBackend instance (do NOT close it yourself)
+        """
+        backend_type = backend_type.lower()
+        key = (backend_type, BackendFactory.resolve_url(backend_type, base_url))
+        loop = cls._current_loop()
+
+        entry = cls._instances.get(key)
+        if entry is not None:
+            backend, owner_loop = entry
+            if owner_loop is None or owner_loop is loop:
+                return backend
+            # Pool belongs to another (possibly closed) loop - don't touch it
+            logger.debug(f"Backend pool {key} belongs to another event loop, creating new one")
+
+        backend = BackendFactory.create(backend_type, base_url=key[1], api_key=api_key)
+        cls._instances[key] = (backend, loop)
+        logger.info(f"🔌 Backend pool created: {backend_type} @ {key[1]}")
+        return backend
+
+    @classmethod
+    async def close_backend(cls, backend_type: str, base_url: Optional[str] = None) -> int:
+        """
+        Close and remove pooled backends
+
+        Args:
+            backend_type: Backend type to close
+            base_url: Only close this URL (None = all URLs of this backend type)
+
+        Returns:
+            Number of closed backend instances
+        """
+        backend_type = backend_type.lower()
+        if base_url is None:
+            keys = [k for k in cls._instances if k[0] == backend_type]
+        else:
+            keys = [(backend_type, BackendFactory.resolve_url(backend_type, base_url))]
+
+        closed = 0
+        for key in keys:
+            entry = cls._instances.pop(key, None)
+            if entry is None:
+                continue
+            backend, owner_loop = entry
+            if owner_loop is not None and owner_loop is not cls._current_loop():
+                continue  # Cannot close a pool from a foreign loop
+            try:
+                await backend.close()
+                closed += 1
+            except Exception as e:
+                logger.warning(f"⚠️ Failed to close backend {key}: {e}")
+        return closed
+
+    @classmethod
+    async def close_all(cls) -> int:
+        """Close all pooled backends (shutdown hook)"""
+        closed = 0
+        for backend_type in {k[0] for k in list(cls._instances)}:
+            closed += await cls.close_backend(backend_type)
+        if closed:
+            logger.info(f"🔌 Closed {closed} backend pool(s)")
+        return closed
+
+
+@contextlib.asynccontextmanager
+async def backend_lifespan():
+    """
+    App lifespan task: closes all pooled backend connections on shutdown
+
+    Usage (Reflex):
+        app.register_lifespan_task(backend_lifespan)
+    """
+    try:
+        yield
+    finally:
+        await BackendRegistry.close_all()
+
+
 __all__ = [
     "BackendFactory",
+    "BackendRegistry",
+    "backend_lifespan",
     "LLMBackend",
     "LLMMessage",
     "LLMOptions",
     "LLMResponse",
+    "ModelMetadata",
+    "get_model_metadata_cache",
+    "invalidate_model_metadata",
+    "AdmissionScheduler",
+    "PRIORITY_HIGH",
+    "PRIORITY_LOW",
     "OllamaBackend",
     "vLLMBackend",
     "TabbyAPIBackend",
+    "LlamaCppBackend",
+    "PooledBackend",
 ]
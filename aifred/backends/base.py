@@ -4,9 +4,18 @@ Abstract Base Class for LLM Backends
 Supports: Ollama, vLLM, llama.cpp, OpenAI, etc.
 """
 
+import asyncio
+import logging
+import math
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, AsyncIterator
+from typing import Dict, List, Optional, AsyncGenerator, AsyncIterator
 from dataclasses import dataclass
+from .metadata_cache import ModelMetadata, get_model_metadata_cache
+from .scheduler import AdmissionScheduler, PRIORITY_HIGH, PRIORITY_LOW, create_scheduler
+from .thinking_budget import budgeted_chat_stream
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -27,6 +36,12 @@ class LLMOptions:
     top_k: int = 40
     seed: Optional[int] = None
     enable_thinking: Optional[bool] = None  # Qwen3 Thinking Mode (Chain-of-Thought)
+    thinking_budget: Optional[int] = None  # Max reasoning tokens (streaming), None/0 = unlimited
+    assistant_prefix: Optional[str] = None  # Prefill: answer continues this text (thinking budget)
+    stop: Optional[List[str]] = None  # Stop sequences (generation ends before these)
+    choices: Optional[List[str]] = None  # Constrained output: answer must be exactly one of these
+    json_schema: Optional[Dict] = None  # Structured output: answer must be JSON matching this schema
+    affinity_key: Optional[str] = None  # Sticky routing key (session_id) for pooled backends
 
 
 @dataclass
@@ -38,6 +53,110 @@ class LLMResponse:
     tokens_per_second: float = 0.0
     inference_time: float = 0.0
     model: str = ""
+    tokens_prompt_total: Optional[int] = None  # Full prompt incl. KV-cache hits (None = backend can't tell)
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list (0.0 if empty)"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class StreamMetrics:
+    """
+    Streaming metrics collector - identical semantics for all backends
+
+    Timings are measured client-side on chunk arrival (same clock for every
+    backend), token counts come from the server (usage / eval_count) when it
+    reports them:
+
+    - ttft / prefill_time: request start → first generated chunk (reasoning or
+      answer) - queueing + prompt processing + first token
+    - decode_time: first → last generated chunk
+    - tokens_per_second: decode rate, (tokens_generated - 1) / decode_time
+      (prefill excluded - it's not generation speed)
+    - itl_p50/p90/p99: inter-token latency in seconds; a chunk carrying n
+      tokens contributes its gap / n, n times
+    - tokens_generated: server count, else number of received tokens
+      (tokens_estimated = True)
+
+    Usage:
+        collector = StreamMetrics(model)
+        ... collector.on_tokens(n) per received chunk with generated text
+        ... collector.set_usage(prompt_tokens=..., completion_tokens=...)
+        yield {"type": "done", "metrics": collector.finish()}
+    """
+
+    def __init__(self, model: str):
+        self.model = model
+        self.start = time.perf_counter()
+        self.first_at: Optional[float] = None
+        self.last_at: Optional[float] = None
+        self.received_tokens = 0
+        self.prompt_tokens: Optional[int] = None
+        self.completion_tokens: Optional[int] = None
+        self.prompt_tokens_total: Optional[int] = None
+        self._itl: List[float] = []
+
+    def on_tokens(self, count: int = 1):
+        """Record arrival of a chunk with `count` generated tokens (reasoning or answer)"""
+        if count <= 0:
+            return
+        now = time.perf_counter()
+        if self.first_at is None:
+            self.first_at = now
+            count -= 1  # First token belongs to prefill (TTFT)
+            self.received_tokens += 1
+        elif count and self.last_at is not None:
+            per_token = (now - self.last_at) / count
+            self._itl.extend([per_token] * count)
+        self.received_tokens += count
+        self.last_at = now
+
+    def set_usage(self, prompt_tokens: Optional[int] = None, completion_tokens: Optional[int] = None):
+        """Server-reported token counts (OpenAI usage, Ollama eval counts)"""
+        if prompt_tokens is not None:
+            self.prompt_tokens = prompt_tokens
+        if completion_tokens is not None:
+            self.completion_tokens = completion_tokens
+
+    def set_prompt_total(self, tokens: Optional[int]):
+        """
+        Full prompt size incl. tokens reused from the KV/prefix cache
+
+        Only for backends whose count is known to cover the whole prompt -
+        token calibration learns exclusively from this value.
+        """
+        if tokens:
+            self.prompt_tokens_total = tokens
+
+    def finish(self) -> Dict:
+        """Final metrics dict for the "done" event"""
+        end = time.perf_counter()
+        if self.first_at is not None and self.last_at is not None:
+            ttft = self.first_at - self.start
+            decode_time = self.last_at - self.first_at
+        else:
+            ttft = decode_time = 0.0
+        tokens_generated = self.completion_tokens if self.completion_tokens is not None else self.received_tokens
+        itl = sorted(self._itl)
+        return {
+            "tokens_prompt": self.prompt_tokens or 0,
+            "tokens_prompt_total": self.prompt_tokens_total,
+            "tokens_generated": tokens_generated,
+            "tokens_estimated": self.completion_tokens is None,
+            "tokens_per_second": ((tokens_generated - 1) / decode_time) if decode_time > 0 and tokens_generated > 1 else 0.0,
+            "inference_time": end - self.start,
+            "ttft": ttft,
+            "prefill_time": ttft,
+            "decode_time": decode_time,
+            "itl_p50": _percentile(itl, 0.50),
+            "itl_p90": _percentile(itl, 0.90),
+            "itl_p99": _percentile(itl, 0.99),
+            "model": self.model
+        }
 
 
 class LLMBackend(ABC):
@@ -48,9 +167,57 @@ class LLMBackend(ABC):
     """
 
     def __init__(self, base_url: str = "http://localhost:11434", api_key: Optional[str] = None):
-        self.base_url = base_url
+        self.base_url = base_url  # Identity (registry, metadata cache, scheduler)
+        self.http_url = base_url  # Request prefix (differs for unix:// sockets, see transport.py)
         self.api_key = api_key
         self._available_models: List[str] = []
+        self._scheduler: Optional[AdmissionScheduler] = None
+        self._tokenize_supported = True  # False after the endpoint answered 404
+
+    @property
+    def scheduler(self) -> AdmissionScheduler:
+        """Admission scheduler of this backend (created lazily with configured limits)"""
+        if self._scheduler is None:
+            self._scheduler = create_scheduler(self.get_backend_name(), self.base_url)
+        return self._scheduler
+
+    def get_scheduler_stats(self) -> Dict:
+        """Admission scheduler metrics (see AdmissionScheduler.get_stats)"""
+        return self.scheduler.get_stats()
+
+    async def scheduled_chat(
+        self,
+        model: str,
+        messages: List[LLMMessage],
+        options: Optional[LLMOptions] = None,
+        priority: str = PRIORITY_HIGH
+    ) -> LLMResponse:
+        """chat() behind the admission scheduler (default: high-priority lane)"""
+        async with self.scheduler.admit(priority):
+            return await self.chat(model, messages, options)
+
+    async def scheduled_chat_stream(
+        self,
+        model: str,
+        messages: List[LLMMessage],
+        options: Optional[LLMOptions] = None,
+        priority: str = PRIORITY_LOW
+    ) -> AsyncGenerator[Dict, None]:
+        """
+        chat_stream() behind the admission scheduler (default: low-priority lane)
+
+        The slot is held until the stream is exhausted or closed; closing this
+        generator early also closes the backend stream (releases the HTTP response).
+        options.thinking_budget is enforced here (see thinking_budget.py) - the
+        continuation request runs in the same admission slot.
+        """
+        async with self.scheduler.admit(priority):
+            stream = budgeted_chat_stream(self, model, messages, options)
+            try:
+                async for chunk in stream:
+                    yield chunk
+            finally:
+                await stream.aclose()
 
     @abstractmethod
     async def list_models(self) -> List[str]:
@@ -131,13 +298,53 @@ class LLMBackend(ABC):
         """
         pass
 
-    @abstractmethod
     async def get_model_context_limit(self, model: str) -> int:
         """
         Get the context window size (in tokens) for a specific model.
 
-        This method queries the backend for model metadata and extracts
-        the maximum context length. Implementation is backend-specific:
+        Served from the global ModelMetadataCache (TTL) - the backend is
+        only queried on the first call per model (see get_model_metadata).
+
+        Args:
+            model: Model name/ID
+
+        Returns:
+            int: Context limit in tokens (e.g., 4096, 8192, 40960)
+
+        Raises:
+            RuntimeError: If model not found or context limit cannot be determined
+        """
+        metadata = await self.get_model_metadata(model)
+        return metadata.context_limit
+
+    async def get_model_metadata(self, model: str) -> ModelMetadata:
+        """
+        Get cached model metadata (context limit, thinking support, quantization)
+
+        Args:
+            model: Model name/ID
+
+        Returns:
+            ModelMetadata (cached per backend/url/model with TTL)
+
+        Raises:
+            RuntimeError: If model not found or metadata cannot be determined
+        """
+        cache = get_model_metadata_cache()
+        backend_name = self.get_backend_name()
+
+        metadata = cache.get(backend_name, self.base_url, model)
+        if metadata is None:
+            metadata = await self._fetch_model_metadata(model)
+            cache.set(backend_name, self.base_url, model, metadata)
+        return metadata
+
+    @abstractmethod
+    async def _fetch_model_metadata(self, model: str) -> ModelMetadata:
+        """
+        Query the backend for model metadata (uncached).
+
+        Implementation is backend-specific:
         - Ollama: Use /api/show endpoint
         - vLLM: Use /v1/models endpoint
         - llama.cpp: Parse model metadata
@@ -146,13 +353,52 @@ class LLMBackend(ABC):
             model: Model name/ID
 
         Returns:
-            int: Context limit in tokens (e.g., 4096, 8192, 40960)
+            ModelMetadata with at least context_limit set
 
         Raises:
             RuntimeError: If model not found or context limit cannot be determined
         """
         pass
 
+    async def count_tokens(self, model: str, text: str) -> Optional[int]:
+        """
+        Exact token count: backend tokenize endpoint → loaded local tokenizer
+
+        Never waits long: the endpoint gets TOKENIZER_ENDPOINT_TIMEOUT, a local
+        tokenizer is only used if already loaded (tokenizer_service).
+
+        Args:
+            model: Model name
+            text: Text to count
+
+        Returns:
+            Token count or None (caller falls back to the calibrated estimate)
+        """
+        from ..lib.config import TOKENIZER_ENDPOINT_TIMEOUT
+        from ..lib.tokenizer_service import get_tokenizer_service
+
+        if self._tokenize_supported:
+            try:
+                count = await asyncio.wait_for(self._tokenize(model, text), TOKENIZER_ENDPOINT_TIMEOUT)
+                if count is not None:
+                    return count
+            except asyncio.TimeoutError:
+                logger.debug(f"{self.get_backend_name()}: tokenize timeout ({TOKENIZER_ENDPOINT_TIMEOUT}s)")
+            except Exception as e:
+                logger.debug(f"{self.get_backend_name()}: tokenize failed: {e}")
+        return get_tokenizer_service().count_tokens(text, model)
+
+    async def _tokenize(self, model: str, text: str) -> Optional[int]:
+        """
+        Token count from the backend's tokenize endpoint (override where available)
+
+        Returns:
+            Token count or None if the backend has no endpoint
+            (set self._tokenize_supported = False to stop asking)
+        """
+        self._tokenize_supported = False
+        return None
+
     @abstractmethod
     async def preload_model(self, model: str) -> tuple[bool, float]:
         """
@@ -167,6 +413,29 @@ class LLMBackend(ABC):
         """
         pass
 
+    async def get_loaded_models(self) -> Optional[List[str]]:
+        """
+        Models currently resident in (V)RAM
+
+        Returns:
+            List of model names, or None if the backend can't report it
+            (override where supported, e.g. Ollama /api/ps)
+        """
+        return None
+
+    def get_num_ctx_stats(self) -> Optional[Dict]:
+        """
+        num_ctx policy counters (reloads avoided/forced, loaded context per model)
+
+        Returns:
+            Dict or None if the backend has no per-request context size (override: Ollama)
+        """
+        return None
+
+    async def close(self):
+        """Close HTTP client / connection pool (override if backend holds one)"""
+        pass
+
 
 class BackendError(Exception):
     """Base exception for backend errors"""
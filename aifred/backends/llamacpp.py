@@ -0,0 +1,596 @@
+"""
+llama.cpp Backend Adapter (llama-server)
+
+Talks to llama-server's HTTP API directly via httpx:
+- /v1/chat/completions (OpenAI-compatible, chat template applied server-side)
+- /completion (native, raw prompt - used for preload/warm-up)
+- /props, /v1/models, /health (slots, context size, model info)
+
+Prompt caching: llama-server keeps one KV cache per slot (--parallel N).
+Every request sends cache_prompt=true and pins the AIfred session
+(LLMOptions.affinity_key) to a fixed id_slot, so multi-turn chats only
+prefill the new tokens instead of the whole history every turn.
+
+Slot layout (total_slots = N):
+- Slots 0..N-2: session slots for main-LLM generations (LRU assignment)
+- Slot N-1: scratch slot for short utility calls (Automatik, classify),
+  so they never evict a session's cached history
+- N == 1: everything uses slot 0
+
+Trade-off: all utility calls share the one scratch slot, so llama-server
+runs them strictly one after another (a request for a busy id_slot waits
+in the server queue). Concurrent Automatik/classify calls of several
+sessions therefore serialize - acceptable for short calls, but start
+llama-server with more slots if many sessions are active at once.
+"""
+
+import httpx
+import json
+import time
+import logging
+from collections import OrderedDict
+from typing import List, Optional, AsyncIterator, Dict, Any
+from .base import (
+    LLMBackend,
+    LLMMessage,
+    LLMOptions,
+    LLMResponse,
+    StreamMetrics,
+    BackendConnectionError,
+    BackendModelNotFoundError,
+    BackendInferenceError
+)
+from .metadata_cache import ModelMetadata
+from .transport import create_async_client
+
+logger = logging.getLogger(__name__)
+
+# Slot ID for "let llama-server choose" (no pinning)
+AUTO_SLOT = -1
+
+# /props retry backoff (llama-server answers 503 while it is still loading the model)
+PROPS_RETRY_INITIAL_S = 2.0
+PROPS_RETRY_MAX_S = 60.0
+
+
+class SlotPinner:
+    """
+    Maps sessions to llama-server slots (LRU, one slot per session)
+
+    Sessions beyond the number of session slots evict the least recently
+    used session - its history is simply re-prefilled on its next turn.
+    """
+
+    def __init__(self, total_slots: int):
+        self.total_slots = max(1, total_slots)
+        # Last slot is reserved as scratch slot (if there is more than one).
+        # All utility calls share it → they are serialized by llama-server.
+        self.session_slots = self.total_slots - 1 if self.total_slots > 1 else 1
+        self.scratch_slot = self.total_slots - 1
+        self._assignments: "OrderedDict[str, int]" = OrderedDict()
+
+    def slot_for_session(self, session_key: str) -> int:
+        """Return the slot pinned to this session (assigns/evicts if needed)"""
+        slot = self._assignments.get(session_key)
+        if slot is not None:
+            self._assignments.move_to_end(session_key)
+            return slot
+
+        used = set(self._assignments.values())
+        free = [s for s in range(self.session_slots) if s not in used]
+        if free:
+            slot = free[0]
+        else:
+            # Evict least recently used session
+            evicted_key, slot = self._assignments.popitem(last=False)
+            logger.debug(f"llama.cpp: slot {slot} reassigned ({evicted_key} → {session_key})")
+
+        self._assignments[session_key] = slot
+        return slot
+
+
+class LlamaCppBackend(LLMBackend):
+    """llama.cpp (llama-server) backend implementation"""
+
+    def __init__(self, base_url: str = "http://localhost:8080", api_key: Optional[str] = None):
+        # Accept both "http://host:8080" and OpenAI-style "http://host:8080/v1"
+        base_url = base_url.rstrip("/")
+        if base_url.endswith("/v1"):
+            base_url = base_url[:-3]
+        super().__init__(base_url=base_url, api_key=api_key)
+
+        limits = httpx.Limits(max_keepalive_connections=10, max_connections=20, keepalive_expiry=300.0)
+        timeout = httpx.Timeout(None)  # UNLIMITED - let Reflex/asyncio handle timeouts
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else None
+        self.client, self.http_url = create_async_client(base_url, timeout=timeout, limits=limits, headers=headers)
+
+        # Slot table (created lazily from /props total_slots)
+        self._slots: Optional[SlotPinner] = None
+        self._slots_checked = False  # True after a definitive /props answer
+        self._props_retry_at = 0.0
+        self._props_backoff = PROPS_RETRY_INITIAL_S
+
+    # ============================================================
+    # Slot pinning / payload
+    # ============================================================
+
+    async def _get_props(self) -> Dict:
+        response = await self.client.get(f"{self.http_url}/props")
+        response.raise_for_status()
+        props: Dict = response.json()
+        return props
+
+    async def _get_slot_pinner(self) -> Optional[SlotPinner]:
+        """
+        Slot table from /props (None if the server doesn't report total_slots)
+
+        Only a definitive answer (200, 404, unusable total_slots) is final.
+        Transient errors (503 while the model loads, connection errors) are
+        retried on a later request with exponential backoff - requests in
+        between run unpinned (AUTO_SLOT).
+        """
+        if self._slots_checked or time.monotonic() < self._props_retry_at:
+            return self._slots
+        try:
+            total_slots = (await self._get_props()).get("total_slots")
+            if total_slots and self._slots is None:
+                self._slots = SlotPinner(int(total_slots))
+                logger.info(
+                    f"🎰 llama.cpp: {self._slots.total_slots} slot(s), "
+                    f"{self._slots.session_slots} for session pinning"
+                )
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code != 404:
+                self._retry_props_later(e)
+                return self._slots
+            logger.warning(f"⚠️ llama.cpp: /props not available, no slot pinning: {e}")
+        except httpx.HTTPError as e:
+            self._retry_props_later(e)
+            return self._slots
+        except ValueError as e:
+            logger.warning(f"⚠️ llama.cpp: /props unusable, no slot pinning: {e}")
+        self._slots_checked = True
+        return self._slots
+
+    def _retry_props_later(self, error: Exception):
+        """Schedule the next /props attempt (exponential backoff up to PROPS_RETRY_MAX_S)"""
+        self._props_retry_at = time.monotonic() + self._props_backoff
+        logger.warning(
+            f"⚠️ llama.cpp: /props failed ({error}), slot pinning retry in {self._props_backoff:.0f}s"
+        )
+        self._props_backoff = min(self._props_backoff * 2, PROPS_RETRY_MAX_S)
+
+    async def _select_slot(self, options: LLMOptions, pin_session: bool) -> int:
+        """
+        Slot for a request
+
+        Args:
+            options: Generation options (affinity_key = session)
+            pin_session: True for main-LLM generations (long, growing history)
+
+        Returns:
+            Slot ID (AUTO_SLOT if pinning is not possible)
+        """
+        slots = await self._get_slot_pinner()
+        if slots is None:
+            return AUTO_SLOT
+        if pin_session and options.affinity_key:
+            return slots.slot_for_session(options.affinity_key)
+        # Utility call: single scratch slot, queued behind any running utility call
+        return slots.scratch_slot
+
+    def _build_payload(
+        self,
+        model: str,
+        messages: List[LLMMessage],
+        options: LLMOptions,
+        stream: bool,
+        slot: int
+    ) -> Dict[str, Any]:
+        """Build a /v1/chat/completions payload incl. llama-server extensions"""
+        payload: Dict[str, Any] = {
+            "model": model,
+            "messages": [{"role": msg.role, "content": msg.content} for msg in messages],
+            "temperature": options.temperature,
+            "top_p": options.top_p,
+            "top_k": options.top_k,
+            "repeat_penalty": options.repeat_penalty,
+            "stream": stream,
+            # Prompt caching: reuse the slot's KV cache for the common prefix
+            "cache_prompt": True,
+            "id_slot": slot,
+        }
+        if stream:
+            payload["stream_options"] = {"include_usage": True}
+        if options.num_predict:
+            payload["max_tokens"] = options.num_predict
+        if options.seed:
+            payload["seed"] = options.seed
+        if options.stop:
+            payload["stop"] = options.stop
+        if options.choices:
+            # GBNF grammar: output is forced to exactly one of the choices
+            payload["grammar"] = "root ::= " + " | ".join(json.dumps(c) for c in options.choices)
+        elif options.json_schema:
+            payload["json_schema"] = options.json_schema
+
+        # Thinking Mode (requires llama-server --jinja) - Always send (true or false)
+        payload["chat_template_kwargs"] = {"enable_thinking": bool(options.enable_thinking)}
+        if options.assistant_prefix:
+            # Prefill: llama-server continues a trailing assistant message
+            payload["messages"].append({"role": "assistant", "content": options.assistant_prefix})
+
+        # num_ctx is fixed at server start (--ctx-size) - not settable per request
+        return payload
+
+    @staticmethod
+    def _join_thinking(reasoning: str, content: str) -> str:
+        """Wrap reasoning_content in <think> tags like the other backends"""
+        if reasoning and content:
+            return f"<think>{reasoning}</think>\n\n{content}"
+        if reasoning:
+            return f"<think>{reasoning}</think>"
+        return content
+
+    @staticmethod
+    def _prompt_total(timings: Dict) -> Optional[int]:
+        """Full prompt size = prefilled (prompt_n) + reused from the slot KV cache (cache_n)"""
+        if "prompt_n" not in timings or "cache_n" not in timings:
+            return None
+        return int(timings["prompt_n"]) + int(timings["cache_n"])
+
+    @staticmethod
+    def _raise_for_status(response: httpx.Response, model: str):
+        if response.status_code == 404:
+            raise BackendModelNotFoundError(f"Model '{model}' not found in llama.cpp")
+        if response.status_code == 503:
+            raise BackendConnectionError("llama.cpp server is still loading the model")
+        response.raise_for_status()
+
+    # ============================================================
+    # Inference
+    # ============================================================
+
+    async def list_models(self) -> List[str]:
+        """Get the model served by llama-server (one model per server)"""
+        try:
+            response = await self.client.get(f"{self.http_url}/v1/models")
+            response.raise_for_status()
+            self._available_models = [m["id"] for m in response.json().get("data", [])]
+            return self._available_models
+        except Exception as e:
+            raise BackendConnectionError(f"Failed to list llama.cpp models: {e}")
+
+    async def chat(
+        self,
+        model: str,
+        messages: List[LLMMessage],
+        options: Optional[LLMOptions] = None,
+        stream: bool = False
+    ) -> LLMResponse:
+        """
+        Non-streaming chat with llama-server (utility calls → scratch slot)
+
+        Args:
+            model: Model name (llama-server serves one model, used for logging)
+            messages: List of LLMMessage
+            options: Generation options
+            stream: Ignored
+
+        Returns:
+            LLMResponse
+        """
+        if options is None:
+            options = LLMOptions()
+
+        slot = await self._select_slot(options, pin_session=False)
+        payload = self._build_payload(model, messages, options, stream=False, slot=slot)
+
+        try:
+            start_time = time.time()
+            response = await self.client.post(f"{self.http_url}/v1/chat/completions", json=payload)
+            self._raise_for_status(response, model)
+            inference_time = time.time() - start_time
+
+            data = response.json()
+            message = data["choices"][0].get("message", {})
+            text = self._join_thinking(message.get("reasoning_content") or "", message.get("content") or "")
+
+            usage = data.get("usage") or {}
+            tokens_prompt = usage.get("prompt_tokens", 0)
+            tokens_generated = usage.get("completion_tokens", 0)
+            timings = data.get("timings") or {}
+            tokens_per_second = timings.get("predicted_per_second") or (
+                (tokens_generated / inference_time) if inference_time > 0 else 0
+            )
+
+            return LLMResponse(
+                text=text,
+                tokens_prompt=tokens_prompt,
+                tokens_generated=tokens_generated,
+                tokens_per_second=tokens_per_second,
+                inference_time=inference_time,
+                model=model,
+                tokens_prompt_total=self._prompt_total(timings)
+            )
+
+        except (BackendModelNotFoundError, BackendConnectionError):
+            raise
+        except httpx.HTTPStatusError as e:
+            raise BackendInferenceError(f"llama.cpp inference error: {e.response.text}")
+        except Exception as e:
+            raise BackendInferenceError(f"llama.cpp chat failed: {e}")
+
+    async def chat_stream(
+        self,
+        model: str,
+        messages: List[LLMMessage],
+        options: Optional[LLMOptions] = None
+    ) -> AsyncIterator[Dict]:
+        """
+        Streaming chat with llama-server (SSE)
+
+        Main-LLM generations are pinned to the session's slot; constrained
+        calls (choices/json_schema, e.g. classify) use the scratch slot.
+
+        Args:
+            model: Model name
+            messages: List of LLMMessage
+            options: Generation options
+
+        Yields:
+            Dict with either:
+            - {"type": "content", "text": str} for content chunks
+            - {"type": "done", "metrics": {...}} for final metrics
+        """
+        if options is None:
+            options = LLMOptions()
+
+        pin_session = not (options.choices or options.json_schema)
+        slot = await self._select_slot(options, pin_session=pin_session)
+        payload = self._build_payload(model, messages, options, stream=True, slot=slot)
+
+        try:
+            collector = StreamMetrics(model)
+            thinking_started = False
+            cached_tokens = 0
+
+            async with self.client.stream("POST", f"{self.http_url}/v1/chat/completions", json=payload) as response:
+                if response.status_code >= 400:
+                    await response.aread()
+                    self._raise_for_status(response, model)
+
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data_str = line[5:].strip()
+                    if data_str == "[DONE]":
+                        break
+                    chunk = json.loads(data_str)
+
+                    choices = chunk.get("choices") or []
+                    if choices:
+                        delta = choices[0].get("delta") or {}
+                        reasoning = delta.get("reasoning_content")
+                        content = delta.get("content")
+                        parts: List[str] = []
+                        if reasoning:
+                            if not thinking_started:
+                                parts.append("<think>")
+                                thinking_started = True
+                            parts.append(reasoning)
+                        if content:
+                            if thinking_started:
+                                parts.append("</think>\n\n")
+                                thinking_started = False
+                            parts.append(content)
+                        if parts:
+                            yield {"type": "content", "text": "".join(parts)}
+                            collector.on_tokens(1)  # One token per delta (true count from usage)
+
+                    usage = chunk.get("usage")
+                    if usage:
+                        collector.set_usage(usage.get("prompt_tokens"), usage.get("completion_tokens"))
+                    timings = chunk.get("timings")
+                    if timings:
+                        # prompt_n = actually prefilled tokens, cache_n = reused from slot KV cache
+                        cached_tokens = timings.get("cache_n", cached_tokens)
+                        collector.set_prompt_total(self._prompt_total(timings))
+
+            if thinking_started:
+                yield {"type": "content", "text": "</think>\n\n"}
+
+            metrics = collector.finish()
+            if cached_tokens:
+                logger.debug(f"llama.cpp: slot {slot} reused {cached_tokens}/{metrics['tokens_prompt']} prompt tokens")
+
+            yield {"type": "done", "metrics": metrics}
+
+        except (BackendModelNotFoundError, BackendConnectionError):
+            raise
+        except httpx.HTTPStatusError as e:
+            raise BackendInferenceError(f"llama.cpp streaming error: {e.response.text}")
+        except httpx.HTTPError as e:
+            raise BackendInferenceError(f"llama.cpp streaming failed: {e}")
+
+    async def complete(
+        self,
+        prompt: str,
+        options: Optional[LLMOptions] = None,
+        slot: Optional[int] = None
+    ) -> LLMResponse:
+        """
+        Raw prompt completion via the native /completion endpoint
+
+        No chat template is applied - the prompt is sent as-is.
+
+        Args:
+            prompt: Complete prompt text
+            options: Generation options
+            slot: Slot ID (None = scratch slot)
+
+        Returns:
+            LLMResponse
+        """
+        if options is None:
+            options = LLMOptions()
+        if slot is None:
+            slot = await self._select_slot(options, pin_session=False)
+
+        payload: Dict[str, Any] = {
+            "prompt": prompt,
+            "n_predict": options.num_predict if options.num_predict is not None else -1,
+            "temperature": options.temperature,
+            "top_p": options.top_p,
+            "top_k": options.top_k,
+            "repeat_penalty": options.repeat_penalty,
+            "cache_prompt": True,
+            "id_slot": slot,
+            "stream": False
+        }
+        if options.seed:
+            payload["seed"] = options.seed
+        if options.stop:
+            payload["stop"] = options.stop
+
+        try:
+            start_time = time.time()
+            response = await self.client.post(f"{self.http_url}/completion", json=payload)
+            self._raise_for_status(response, "")
+            inference_time = time.time() - start_time
+            data = response.json()
+        except (BackendModelNotFoundError, BackendConnectionError):
+            raise
+        except httpx.HTTPError as e:
+            raise BackendInferenceError(f"llama.cpp completion failed: {e}")
+
+        timings = data.get("timings") or {}
+        tokens_generated = data.get("tokens_predicted", 0)
+        return LLMResponse(
+            text=data.get("content", ""),
+            tokens_prompt=data.get("tokens_evaluated", 0),
+            tokens_generated=tokens_generated,
+            tokens_per_second=timings.get("predicted_per_second") or (
+                (tokens_generated / inference_time) if inference_time > 0 else 0
+            ),
+            inference_time=inference_time,
+            model=data.get("model", "")
+        )
+
+    async def preload_model(self, model: str) -> tuple[bool, float]:
+        """
+        Warm up llama-server with a 1-token completion on the scratch slot.
+
+        llama-server loads its model at startup; this only verifies that the
+        server is ready (503 while loading) and warms the compute graph.
+
+        Args:
+            model: Model name (informational)
+
+        Returns:
+            Tuple of (success: bool, load_time: float in seconds)
+        """
+        start_time = time.time()
+        try:
+            await self.complete("hi", LLMOptions(temperature=0.0, num_predict=1))
+            return (True, time.time() - start_time)
+        except Exception as e:
+            logger.warning(f"Preload failed for {model}: {e}")
+            return (False, time.time() - start_time)
+
+    # ============================================================
+    # Metadata / Info
+    # ============================================================
+
+    async def health_check(self) -> bool:
+        """Check if llama-server is reachable and has finished loading"""
+        try:
+            response = await self.client.get(f"{self.http_url}/health")
+            return response.status_code == 200
+        except Exception:
+            return False
+
+    def get_backend_name(self) -> str:
+        return "llama.cpp"
+
+    async def get_backend_info(self) -> Dict:
+        """Get llama-server information"""
+        try:
+            props = await self._get_props()
+            models = await self.list_models()
+            return {
+                "backend": "llama.cpp",
+                "version": props.get("build_info", "unknown"),
+                "base_url": self.base_url,
+                "available_models": len(models),
+                "models": models,
+                "total_slots": props.get("total_slots"),
+                "healthy": True
+            }
+        except Exception as e:
+            return {
+                "backend": "llama.cpp",
+                "version": "unknown",
+                "base_url": self.base_url,
+                "available_models": 0,
+                "models": [],
+                "healthy": False,
+                "error": str(e)
+            }
+
+    async def get_loaded_models(self) -> Optional[List[str]]:
+        """llama-server keeps exactly its one model loaded"""
+        try:
+            return await self.list_models()
+        except BackendConnectionError:
+            return None
+
+    async def _fetch_model_metadata(self, model: str) -> ModelMetadata:
+        """
+        Query model metadata from llama-server (uncached).
+
+        Context limit = per-slot context (/props default_generation_settings.n_ctx),
+        native context = training context (/v1/models meta.n_ctx_train).
+
+        Args:
+            model: Model name/ID
+
+        Returns:
+            ModelMetadata
+
+        Raises:
+            RuntimeError: If the server can't be queried or reports no context size
+        """
+        try:
+            props = await self._get_props()
+            response = await self.client.get(f"{self.http_url}/v1/models")
+            response.raise_for_status()
+            models = response.json().get("data", [])
+        except httpx.HTTPError as e:
+            raise RuntimeError(f"Failed to query llama.cpp for model '{model}': {e}") from e
+
+        n_ctx = (props.get("default_generation_settings") or {}).get("n_ctx")
+        if not n_ctx:
+            raise RuntimeError(
+                f"Context limit not found for llama.cpp model '{model}'. "
+                f"Available keys: {list(props.keys())[:10]}"
+            )
+
+        meta = (models[0].get("meta") or {}) if models else {}
+        return ModelMetadata(
+            context_limit=int(n_ctx),
+            native_context=meta.get("n_ctx_train")
+        )
+
+    async def _tokenize(self, model: str, text: str) -> Optional[int]:
+        """Token count via llama-server /tokenize (the loaded model's tokenizer)"""
+        response = await self.client.post(f"{self.http_url}/tokenize", json={"content": text})
+        if response.status_code == 404:
+            self._tokenize_supported = False
+            return None
+        response.raise_for_status()
+        return len(response.json().get("tokens", []))
+
+    async def close(self):
+        """Close HTTP client"""
+        await self.client.aclose()
@@ -0,0 +1,133 @@
+"""
+Model Metadata Cache - TTL cache for per-model backend metadata
+
+A single research turn asks for the same model's context limit several times
+(decision, query optimization, num_ctx calculation, compact display). Each
+lookup is an /api/show POST (Ollama) or a full /v1/models listing
+(vLLM/TabbyAPI). This cache stores the result per (backend, url, model) so
+every turn pays for these lookups at most once.
+
+Invalidated explicitly on model switch, model preload and backend restart.
+"""
+
+import time
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+
+@dataclass
+class ModelMetadata:
+    """Backend-reported metadata for one model"""
+    context_limit: int  # Usable context window (what num_ctx is clipped to)
+    native_context: Optional[int] = None  # Trained context (before RoPE/YaRN scaling)
+    supports_thinking: Optional[bool] = None  # None = unknown (backend doesn't report it)
+    quantization: Optional[str] = None  # e.g. "Q4_K_M", "AWQ", "4.0bpw"
+    kv_elements_per_token: Optional[int] = None  # K+V cache elements per token (all layers)
+    fetched_at: float = field(default_factory=time.time)
+
+
+# Key: (backend_name, base_url, model)
+CacheKey = Tuple[str, str, str]
+
+
+class ModelMetadataCache:
+    """
+    Thread-safe TTL cache for ModelMetadata
+
+    Usage:
+        cache = get_model_metadata_cache()
+        meta = cache.get("Ollama", "http://localhost:11434", "qwen3:8b")
+        if meta is None:
+            meta = await backend._fetch_model_metadata("qwen3:8b")
+            cache.set("Ollama", "http://localhost:11434", "qwen3:8b", meta)
+    """
+
+    def __init__(self, ttl_seconds: float = 600.0):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[CacheKey, ModelMetadata] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, backend: str, base_url: str, model: str) -> Optional[ModelMetadata]:
+        """Return cached metadata or None if missing/expired"""
+        key = (backend, base_url, model)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if time.time() - entry.fetched_at > self.ttl_seconds:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry
+
+    def set(self, backend: str, base_url: str, model: str, metadata: ModelMetadata):
+        """Store metadata for a model"""
+        with self._lock:
+            self._entries[(backend, base_url, model)] = metadata
+
+    def invalidate(
+        self,
+        backend: Optional[str] = None,
+        base_url: Optional[str] = None,
+        model: Optional[str] = None
+    ) -> int:
+        """
+        Remove entries matching all given filters (None = wildcard)
+
+        Examples:
+            invalidate(model="qwen3:8b")                     # Model switch / preload
+            invalidate(base_url="http://localhost:8001/v1")  # Backend restart
+            invalidate()                                     # Everything
+
+        Returns:
+            Number of removed entries
+        """
+        with self._lock:
+            keys = [
+                k for k in self._entries
+                if (backend is None or k[0] == backend)
+                and (base_url is None or k[1] == base_url)
+                and (model is None or k[2] == model)
+            ]
+            for k in keys:
+                del self._entries[k]
+            return len(keys)
+
+    def get_stats(self) -> Dict:
+        """Return hit/miss counters and entry count"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'ttl_seconds': self.ttl_seconds
+            }
+
+
+# Global cache instance (singleton, shared by all backends)
+_metadata_cache: Optional[ModelMetadataCache] = None
+
+
+def get_model_metadata_cache() -> ModelMetadataCache:
+    """Get or create the global model metadata cache"""
+    global _metadata_cache
+
+    if _metadata_cache is None:
+        from ..lib.config import MODEL_METADATA_CACHE_TTL
+        _metadata_cache = ModelMetadataCache(ttl_seconds=MODEL_METADATA_CACHE_TTL)
+
+    return _metadata_cache
+
+
+def invalidate_model_metadata(
+    backend: Optional[str] = None,
+    base_url: Optional[str] = None,
+    model: Optional[str] = None
+) -> int:
+    """Convenience wrapper around get_model_metadata_cache().invalidate()"""
+    return get_model_metadata_cache().invalidate(backend=backend, base_url=base_url, model=model)
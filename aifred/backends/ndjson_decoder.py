@@ -0,0 +1,126 @@
+"""
+NDJSON Stream Decoder - Incremental newline-delimited JSON parsing
+
+Used by OllamaBackend.chat_stream() to decode /api/chat streams directly
+from raw byte chunks (httpx aiter_raw) instead of aiter_lines() + json.loads
+per line:
+- Splits lines with bytes.find() on the received chunk (no str decoding,
+  no per-line copies when orjson is available - parses memoryview slices)
+- Only a line split across two chunks is buffered and copied once
+- Uses orjson if installed (optional dependency), stdlib json otherwise
+
+Usage:
+    async for frames in aiter_frame_batches(response.aiter_raw()):
+        for frame in frames:  # All frames of one network chunk
+            ...
+"""
+
+import json
+import logging
+from typing import Any, AsyncIterator, Callable, List
+
+logger = logging.getLogger(__name__)
+
+_loads: Callable[[Any], Any]
+
+try:
+    import orjson
+
+    _loads = orjson.loads
+    # orjson parses memoryview slices directly → zero-copy line splitting
+    ZERO_COPY = True
+    JSON_LIBRARY = "orjson"
+except ImportError:  # pragma: no cover - depends on environment
+    _loads = json.loads
+    ZERO_COPY = False
+    JSON_LIBRARY = "json"
+
+
+class NDJSONDecoder:
+    """
+    Incremental decoder for newline-delimited JSON byte streams
+
+    Invalid lines are skipped (counted in `errors`), mirroring the previous
+    aiter_lines() loop which logged and continued on JSONDecodeError.
+    """
+
+    __slots__ = ("_buffer", "errors")
+
+    def __init__(self):
+        self._buffer = bytearray()  # Incomplete trailing line from previous chunk
+        self.errors = 0
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """
+        Decode all complete lines in chunk (plus buffered remainder)
+
+        Args:
+            chunk: Raw bytes as received from the HTTP stream
+
+        Returns:
+            List of decoded JSON objects (may be empty)
+        """
+        if self._buffer:
+            # Rare path: previous chunk ended mid-line
+            self._buffer += chunk
+            data = bytes(self._buffer)
+            self._buffer.clear()
+        else:
+            data = chunk
+
+        objects: List[Any] = []
+        start = 0
+        find = data.find
+        append = objects.append
+
+        with memoryview(data) as view:
+            source = view if ZERO_COPY else data
+            while True:
+                end = find(b"\n", start)
+                if end < 0:
+                    break
+                if end > start:
+                    self._decode_into(source[start:end], append)
+                start = end + 1
+
+        if start < len(data):
+            self._buffer += data[start:]
+
+        return objects
+
+    def flush(self) -> List[Any]:
+        """Decode a final line that was not newline-terminated"""
+        if not self._buffer:
+            return []
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        objects: List[Any] = []
+        self._decode_into(data, objects.append)
+        return objects
+
+    def _decode_into(self, line, append) -> None:
+        try:
+            append(_loads(line))
+        except ValueError as e:  # json/orjson JSONDecodeError are ValueError subclasses
+            # Whitespace-only lines (e.g. "\r") are not errors
+            if bytes(line).strip():
+                self.errors += 1
+                logger.warning(f"Invalid JSON in NDJSON stream: {bytes(line[:100])!r}... Error: {e}")
+
+
+async def aiter_frame_batches(byte_chunks: AsyncIterator[bytes]) -> AsyncIterator[List[Any]]:
+    """
+    Yield one list of decoded frames per received network chunk
+
+    Batching per chunk lets the caller coalesce all tokens that arrived
+    together into a single downstream event. A final unterminated line is
+    flushed as its own batch.
+    """
+    decoder = NDJSONDecoder()
+    async for chunk in byte_chunks:
+        frames = decoder.feed(chunk)
+        if frames:
+            yield frames
+    tail = decoder.flush()
+    if tail:
+        yield tail
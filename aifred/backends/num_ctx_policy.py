@@ -0,0 +1,176 @@
+"""
+num_ctx Policy - Sticky context sizes to avoid Ollama model reloads
+
+Ollama reloads the model runner whenever a request's num_ctx differs from
+the context the model is currently loaded with. AIfred computes num_ctx per
+request (calculate_dynamic_num_ctx: 2K…64K buckets, Automatik calls with
+2048/4096), so Automatik and main model would flip sizes - and every flip
+costs seconds of reload that look like slow TTFT.
+
+Policy per model (one instance per Ollama server):
+- Loaded context is tracked by own bookkeeping and refreshed via /api/ps
+  (detects evicted models, uses context_length if Ollama reports it)
+- Requests that fit into the loaded context reuse it ("reload avoided")
+- Growing is done with hysteresis: at least NUM_CTX_GROWTH_FACTOR × loaded,
+  rounded up to NUM_CTX_GROWTH_STEP, clipped to the model limit
+  ("reload forced") - so the next slightly larger request doesn't reload again
+- Never shrinks within a session: after an eviction the model is reloaded
+  with the session's high-water mark, not with the (smaller) request
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class NumCtxStats:
+    """Counters of the num_ctx policy"""
+    reloads_avoided: int = 0  # Request size differed, loaded context reused
+    reloads_forced: int = 0  # Loaded model had to grow
+    cold_loads: int = 0  # Model was not loaded (load cost unavoidable)
+
+
+class NumCtxPolicy:
+    """
+    Decides the num_ctx actually sent to Ollama
+
+    Usage:
+        num_ctx = await policy.resolve(model, requested_num_ctx, session_key)
+    """
+
+    def __init__(
+        self,
+        fetch_loaded: Callable[[], Awaitable[Optional[List[Dict]]]],
+        fetch_limit: Callable[[str], Awaitable[Optional[int]]],
+        growth_factor: float = 1.25,
+        growth_step: int = 2048,
+        ps_ttl: float = 10.0,
+        max_sessions: int = 500
+    ):
+        """
+        Args:
+            fetch_loaded: Coroutine returning /api/ps model entries (None if unavailable)
+            fetch_limit: Coroutine returning the model's context limit (None if unknown)
+            growth_factor: Min. growth relative to the loaded context (hysteresis)
+            growth_step: Grown sizes are rounded up to multiples of this
+            ps_ttl: Seconds between /api/ps refreshes
+            max_sessions: Remembered session high-water marks (LRU)
+        """
+        self._fetch_loaded = fetch_loaded
+        self._fetch_limit = fetch_limit
+        self.growth_factor = growth_factor
+        self.growth_step = growth_step
+        self.ps_ttl = ps_ttl
+        self.max_sessions = max_sessions
+
+        self._loaded: Dict[str, int] = {}  # model → context it is loaded with
+        self._last_ctx: Dict[str, int] = {}  # model → last context sent (survives eviction)
+        self._session_max: "OrderedDict[Tuple[str, str], int]" = OrderedDict()
+        self._ps_checked_at = 0.0
+        self.stats = NumCtxStats()
+
+    async def _refresh_loaded(self):
+        """Sync bookkeeping with /api/ps (drop evicted models, take reported context)"""
+        now = time.monotonic()
+        if now - self._ps_checked_at < self.ps_ttl:
+            return
+        self._ps_checked_at = now
+
+        entries = await self._fetch_loaded()
+        if entries is None:
+            return  # Keep own bookkeeping
+
+        resident = {}
+        for entry in entries:
+            name = entry.get("name") or entry.get("model")
+            if name:
+                resident[name] = entry.get("context_length")
+
+        for model in list(self._loaded):
+            if model not in resident:
+                del self._loaded[model]  # Evicted (keep_alive / LRU)
+        for model, context_length in resident.items():
+            if context_length:
+                self._loaded[model] = int(context_length)
+
+    def _grow(self, loaded: int, requested: int, limit: Optional[int]) -> int:
+        target = max(requested, int(loaded * self.growth_factor))
+        target = -(-target // self.growth_step) * self.growth_step  # Round up
+        return min(target, limit) if limit else target
+
+    async def resolve(self, model: str, requested: Optional[int], session_key: Optional[str] = None) -> Optional[int]:
+        """
+        num_ctx to send for a request
+
+        Args:
+            model: Model name
+            requested: num_ctx computed by the caller (None = not set)
+            session_key: Session (affinity key) for the never-shrink rule
+
+        Returns:
+            num_ctx to send (None = leave unset)
+        """
+        await self._refresh_loaded()
+        limit = await self._fetch_limit(model) if requested else None
+
+        # --- From here on no awaits: decide + book atomically ---
+        loaded = self._loaded.get(model)
+
+        session_floor = None
+        if session_key and requested:
+            key = (session_key, model)
+            session_floor = max(self._session_max.get(key, 0), requested)
+            self._session_max[key] = session_floor
+            self._session_max.move_to_end(key)
+            while len(self._session_max) > self.max_sessions:
+                self._session_max.popitem(last=False)
+
+        if loaded is not None:
+            if requested is None or requested <= loaded:
+                if requested is not None and requested != loaded:
+                    self.stats.reloads_avoided += 1
+                    logger.debug(f"num_ctx {model}: {requested} → {loaded} (loaded, reload avoided)")
+                return loaded
+
+            num_ctx = self._grow(loaded, requested, limit)
+            if num_ctx == loaded:
+                return loaded  # Already at model limit
+            self.stats.reloads_forced += 1
+            logger.info(f"📦 num_ctx {model}: {loaded} → {num_ctx} (requested {requested}, reload forced)")
+        else:
+            if requested is None:
+                return self._last_ctx.get(model)  # e.g. preload: warm up with the last used size
+            num_ctx = max(requested, session_floor or 0)
+            if limit:
+                num_ctx = min(num_ctx, limit)
+            self.stats.cold_loads += 1
+
+        self._loaded[model] = num_ctx
+        self._last_ctx[model] = num_ctx
+        return num_ctx
+
+    def expected_ctx(self, model: str) -> Optional[int]:
+        """Context the model is (or was last) loaded with - None if never used"""
+        return self._loaded.get(model) or self._last_ctx.get(model)
+
+    def forget(self, model: Optional[str] = None):
+        """Forget loaded state (model unloaded/restarted; None = all models)"""
+        if model is None:
+            self._loaded.clear()
+        else:
+            self._loaded.pop(model, None)
+        self._ps_checked_at = 0.0
+
+    def get_stats(self) -> Dict:
+        """Counters + currently loaded context per model"""
+        return {
+            "reloads_avoided": self.stats.reloads_avoided,
+            "reloads_forced": self.stats.reloads_forced,
+            "cold_loads": self.stats.cold_loads,
+            "loaded": dict(self._loaded)
+        }
@@ -5,18 +5,24 @@ Wraps Ollama API into unified LLMBackend interface
 """
 
 import httpx
+import json
 import time
 import logging
-from typing import List, Optional, AsyncIterator, Dict
+from typing import Any, List, Optional, AsyncIterator, Dict
 from .base import (
     LLMBackend,
     LLMMessage,
     LLMOptions,
     LLMResponse,
+    StreamMetrics,
     BackendConnectionError,
     BackendModelNotFoundError,
     BackendInferenceError
 )
+from .metadata_cache import ModelMetadata
+from .ndjson_decoder import aiter_frame_batches
+from .num_ctx_policy import NumCtxPolicy
+from .transport import create_async_client
 from ..lib.logging_utils import log_message
 
 logger = logging.getLogger(__name__)
@@ -30,14 +36,81 @@ class OllamaBackend(LLMBackend):
         # Timeout: None = UNLIMITED (Reflex will handle timeouts, not httpx)
         # Limits: Erhöhe Connection-Limits um Pooling-Probleme zu vermeiden
         # History: Was 300s fixed, jetzt unlimited für bessere Flexibilität
+        # Transport: TCP, Unix socket (unix:///run/ollama.sock) or HTTP/2 - see transport.py
         limits = httpx.Limits(max_keepalive_connections=10, max_connections=20, keepalive_expiry=300.0)
         timeout = httpx.Timeout(None)  # UNLIMITED - let Reflex/asyncio handle timeouts
-        self.client = httpx.AsyncClient(timeout=timeout, limits=limits)
+        self.client, self.http_url = create_async_client(base_url, timeout=timeout, limits=limits)
+        # Models that rejected think=true (learned from 400 responses, kept for process lifetime)
+        self._no_thinking_models: set[str] = set()
+
+        # num_ctx stickiness: avoid model reloads caused by changing context sizes
+        from ..lib.config import (
+            NUM_CTX_STICKY,
+            NUM_CTX_GROWTH_FACTOR,
+            NUM_CTX_GROWTH_STEP,
+            NUM_CTX_PS_TTL
+        )
+        self.num_ctx_policy: Optional[NumCtxPolicy] = NumCtxPolicy(
+            fetch_loaded=self.get_running_models,
+            fetch_limit=self._fetch_context_limit,
+            growth_factor=NUM_CTX_GROWTH_FACTOR,
+            growth_step=NUM_CTX_GROWTH_STEP,
+            ps_ttl=NUM_CTX_PS_TTL
+        ) if NUM_CTX_STICKY else None
+
+        # keep_alive per model (set by the residency planner, None = Ollama default)
+        self._keep_alive: Dict[str, str] = {}
+
+    def set_keep_alive(self, model: str, keep_alive: Optional[str]):
+        """Set keep_alive sent with every request for this model (e.g. "30m", "0", "-1")"""
+        if keep_alive is None:
+            self._keep_alive.pop(model, None)
+        else:
+            self._keep_alive[model] = keep_alive
+
+    def replace_keep_alive(self, keep_alive: Dict[str, str]):
+        """Replace all keep_alive values (models of an older plan fall back to the Ollama default)"""
+        self._keep_alive = dict(keep_alive)
+
+    async def get_model_sizes(self) -> Dict[str, int]:
+        """Model file sizes in bytes (via /api/tags)"""
+        try:
+            response = await self.client.get(f"{self.http_url}/api/tags")
+            response.raise_for_status()
+            return {m["name"]: m.get("size", 0) for m in response.json().get("models", [])}
+        except httpx.HTTPError as e:
+            raise BackendConnectionError(f"Failed to list Ollama models: {e}")
+
+    async def get_running_models(self) -> Optional[List[Dict]]:
+        """Model entries of /api/ps incl. size, size_vram, context_length (None if not reachable)"""
+        try:
+            response = await self.client.get(f"{self.http_url}/api/ps")
+            response.raise_for_status()
+            models: List[Dict] = response.json().get("models", [])
+            return models
+        except httpx.HTTPError:
+            return None
+
+    async def _fetch_context_limit(self, model: str) -> Optional[int]:
+        try:
+            return await self.get_model_context_limit(model)
+        except Exception:
+            return None
+
+    async def _resolve_num_ctx(self, model: str, options: LLMOptions) -> Optional[int]:
+        """num_ctx to send (sticky per loaded model, see NumCtxPolicy)"""
+        if self.num_ctx_policy is None:
+            return options.num_ctx
+        return await self.num_ctx_policy.resolve(model, options.num_ctx, options.affinity_key)
+
+    def get_num_ctx_stats(self) -> Optional[Dict]:
+        """Reload avoided/forced counters of the num_ctx policy"""
+        return self.num_ctx_policy.get_stats() if self.num_ctx_policy else None
 
     async def list_models(self) -> List[str]:
         """Get list of available Ollama models"""
         try:
-            response = await self.client.get(f"{self.base_url}/api/tags")
+            response = await self.client.get(f"{self.http_url}/api/tags")
             response.raise_for_status()
             data = response.json()
             self._available_models = [m["name"] for m in data.get("models", [])]
@@ -71,18 +144,21 @@ class OllamaBackend(LLMBackend):
         ollama_messages = [{"role": msg.role, "content": msg.content} for msg in messages]
 
         # Build options dict
-        ollama_options = {
+        ollama_options: Dict[str, Any] = {
             "temperature": options.temperature,
             "repeat_penalty": options.repeat_penalty,
             "top_p": options.top_p,
             "top_k": options.top_k,
         }
-        if options.num_ctx:
-            ollama_options["num_ctx"] = options.num_ctx
+        num_ctx = await self._resolve_num_ctx(model, options)
+        if num_ctx:
+            ollama_options["num_ctx"] = num_ctx
         if options.num_predict:
             ollama_options["num_predict"] = options.num_predict
         if options.seed:
             ollama_options["seed"] = options.seed
+        if options.stop:
+            ollama_options["stop"] = options.stop
 
         payload = {
             "model": model,
@@ -90,6 +166,13 @@ class OllamaBackend(LLMBackend):
             "options": ollama_options,
             "stream": False
         }
+        if model in self._keep_alive:
+            payload["keep_alive"] = self._keep_alive[model]
+        if options.choices:
+            # Structured output: JSON schema restricts the answer to one of the labels
+            payload["format"] = {"type": "string", "enum": options.choices}
+        elif options.json_schema:
+            payload["format"] = options.json_schema
 
         # Thinking Mode: ALWAYS False for non-streaming chat (used by Automatik-LLM)
         # Automatik-LLM should never do reasoning - only fast decisions
@@ -99,7 +182,7 @@ class OllamaBackend(LLMBackend):
             start_time = time.time()
             # Use client's default timeout (unlimited) - Reflex handles timeouts
             response = await self.client.post(
-                f"{self.base_url}/api/chat",
+                f"{self.http_url}/api/chat",
                 json=payload
                 # No explicit timeout - uses client default (unlimited from __init__)
             )
@@ -143,53 +226,6 @@ class OllamaBackend(LLMBackend):
         except httpx.HTTPStatusError as e:
             if e.response.status_code == 404:
                 raise BackendModelNotFoundError(f"Model '{model}' not found in Ollama")
-            elif e.response.status_code == 400 and options.enable_thinking == True:
-                # Check if error is about thinking mode not supported
-                try:
-                    error_data = e.response.json()
-                    error_msg = error_data.get("error", "")
-                    if "does not support thinking" in error_msg:
-                        # Retry without thinking mode
-                        logger.warning(f"⚠️ Model '{model}' does not support thinking mode, retrying with think=false")
-                        payload["think"] = False
-
-                        # Retry request
-                        start_time = time.time()
-                        response = await self.client.post(
-                            f"{self.base_url}/api/chat",
-                            json=payload
-                        )
-                        response.raise_for_status()
-                        inference_time = time.time() - start_time
-
-                        data = response.json()
-                        message = data.get("message", {})
-                        content = message.get("content", "")
-                        thinking = message.get("thinking", "")
-
-                        if thinking and content:
-                            text = f"<think>{thinking}</think>\n\n{content}"
-                        elif thinking and not content:
-                            text = f"<think>{thinking}</think>"
-                        else:
-                            text = content
-
-                        eval_count = data.get("eval_count", 0)
-                        eval_duration = data.get("eval_duration", 1)
-                        prompt_eval_count = data.get("prompt_eval_count", 0)
-                        tokens_per_second = (eval_count / (eval_duration / 1e9)) if eval_duration > 0 else 0
-
-                        return LLMResponse(
-                            text=text,
-                            tokens_prompt=prompt_eval_count,
-                            tokens_generated=eval_count,
-                            tokens_per_second=tokens_per_second,
-                            inference_time=inference_time,
-                            model=model
-                        )
-                except:
-                    pass  # If JSON parsing fails, fall through to normal error handling
-                raise BackendInferenceError(f"Ollama HTTP error: {e}")
             elif e.response.status_code == 500:
                 error_msg = e.response.text
                 raise BackendInferenceError(f"Ollama inference error: {error_msg}")
@@ -198,6 +234,28 @@ class OllamaBackend(LLMBackend):
         except Exception as e:
             raise BackendInferenceError(f"Ollama chat failed: {e}")
 
+    async def supports_thinking(self, model: str) -> Optional[bool]:
+        """
+        Check whether a model supports thinking mode (cached capability probe)
+
+        Uses the capabilities list from /api/show (via the model metadata
+        cache) and remembers models that rejected think=true at runtime.
+
+        Args:
+            model: Ollama model name
+
+        Returns:
+            True/False, or None if unknown (older Ollama without capabilities)
+        """
+        if model in self._no_thinking_models:
+            return False
+        try:
+            metadata = await self.get_model_metadata(model)
+        except Exception as e:
+            logger.debug(f"Capability probe failed for {model}: {e}")
+            return None
+        return metadata.supports_thinking
+
     async def chat_stream(
         self,
         model: str,
@@ -222,20 +280,26 @@ class OllamaBackend(LLMBackend):
         
         # Convert LLMMessage to Ollama format
         ollama_messages = [{"role": msg.role, "content": msg.content} for msg in messages]
+        if options.assistant_prefix:
+            # Prefill: trailing assistant message is continued, not closed (thinking budget)
+            ollama_messages.append({"role": "assistant", "content": options.assistant_prefix})
         
         # Build options
-        ollama_options = {
+        ollama_options: Dict[str, Any] = {
             "temperature": options.temperature,
             "repeat_penalty": options.repeat_penalty,
             "top_p": options.top_p,
             "top_k": options.top_k,
         }
-        if options.num_ctx:
-            ollama_options["num_ctx"] = options.num_ctx
+        num_ctx = await self._resolve_num_ctx(model, options)
+        if num_ctx:
+            ollama_options["num_ctx"] = num_ctx
         if options.num_predict:
             ollama_options["num_predict"] = options.num_predict
         if options.seed:
             ollama_options["seed"] = options.seed
+        if options.stop:
+            ollama_options["stop"] = options.stop
         
         payload = {
             "model": model,
@@ -243,34 +307,43 @@ class OllamaBackend(LLMBackend):
             "options": ollama_options,
             "stream": True
         }
+        if model in self._keep_alive:
+            payload["keep_alive"] = self._keep_alive[model]
+        if options.choices:
+            # Structured output: JSON schema restricts the answer to one of the labels
+            payload["format"] = {"type": "string", "enum": options.choices}
+        elif options.json_schema:
+            payload["format"] = options.json_schema
 
         # Thinking Mode: Always send "think" parameter (true or false)
-        # Treat None as False (disabled)
-        payload["think"] = options.enable_thinking if options.enable_thinking is not None else False
-
-        # Retry loop: try once, retry with think=false if needed
-        retry_message_shown = False
-        first_content_sent = False
+        # Treat None as False (disabled). Models known to lack thinking support
+        # (cached capability) get think=false up front - no failed 400 round-trip.
+        thinking_requested = options.enable_thinking is True
+        thinking_unsupported = thinking_requested and (await self.supports_thinking(model)) is False
+        payload["think"] = thinking_requested and not thinking_unsupported
+
+        # Retry loop: only needed if capability is unknown and the model rejects think=true
+        warning_pending = thinking_unsupported
         for attempt in range(2):
 
             try:
-                start_time = time.time()
+                collector = StreamMetrics(model)
                 thinking_started = False
-                thinking_buffer = ""
 
-                async with self.client.stream("POST", f"{self.base_url}/api/chat", json=payload) as response:
+                async with self.client.stream("POST", f"{self.http_url}/api/chat", json=payload) as response:
                     # Check for 400 error with thinking mode BEFORE raise_for_status
-                    if response.status_code == 400 and options.enable_thinking == True and attempt == 0:
+                    if response.status_code == 400 and payload["think"] and attempt == 0:
                         # Read error body while stream is still open
-                        import json
                         error_body = await response.aread()
                         error_data = json.loads(error_body.decode('utf-8'))
                         error_msg = error_data.get("error", "")
-                        
+
                         if "does not support thinking" in error_msg:
                             log_message(f"⚠️ Model '{model}' does not support thinking mode, retrying with think=false")
-                            # Set payload for retry
+                            # Remember capability - next request builds the right payload directly
+                            self._no_thinking_models.add(model)
                             payload["think"] = False
+                            warning_pending = True
                             continue  # Retry with attempt=1 (warning will be shown with first content)
                         else:
                             # Different 400 error
@@ -279,67 +352,65 @@ class OllamaBackend(LLMBackend):
                         raise BackendModelNotFoundError(f"Model '{model}' not found")
                     elif response.status_code >= 400:
                         response.raise_for_status()
-                    
-                    # Process stream
-                    async for line in response.aiter_lines():
-                        if line.strip():
-                            import json
-                            try:
-                                data = json.loads(line)
-                                message = data.get("message", {})
-                                content = message.get("content", "")
-                                thinking = message.get("thinking", "")
-                                
+
+                    # Process stream: decode NDJSON frames straight from raw bytes.
+                    # All frames of one network chunk are coalesced into ONE content
+                    # event (fewer yields/dicts per token under concurrent sessions).
+                    raw_chunks = response.aiter_bytes() if "content-encoding" in response.headers else response.aiter_raw()
+                    done_frame = None
+
+                    async for frames in aiter_frame_batches(raw_chunks):
+                        parts: List[str] = []
+                        batch_tokens = 0
+                        for data in frames:
+                            message = data.get("message")
+                            if message:
+                                thinking = message.get("thinking")
+                                content = message.get("content")
+                                if thinking or content:
+                                    batch_tokens += 1  # One frame per generated token
+
                                 # Handle thinking chunks
                                 if thinking:
                                     if not thinking_started:
-                                        yield {"type": "content", "text": "<think>"}
+                                        parts.append("<think>")
                                         thinking_started = True
-                                    thinking_buffer += thinking
-                                    yield {"type": "content", "text": thinking}
-                                
+                                    parts.append(thinking)
+
                                 # Handle content chunks
                                 if content:
-                                    # Show retry message and warning before first content (only on attempt 1)
-                                    if not first_content_sent and attempt == 1 and not retry_message_shown:
+                                    # Show warning before first content (cached capability or retry)
+                                    if warning_pending:
+                                        if parts:
+                                            yield {"type": "content", "text": "".join(parts)}
+                                            parts = []
                                         yield {"type": "thinking_warning", "model": model}
                                         yield {"type": "debug", "message": f"⚠️ Modell '{model}' unterstützt kein Reasoning - läuft ohne Think-Modus"}
-                                        retry_message_shown = True
-                                        first_content_sent = True
+                                        warning_pending = False
 
-                                    if thinking_started and thinking_buffer:
-                                        yield {"type": "content", "text": "</think>\n\n"}
+                                    if thinking_started:
+                                        parts.append("</think>\n\n")
                                         thinking_started = False
-                                        thinking_buffer = ""
-                                    yield {"type": "content", "text": content}
-                                
-                                # Check if done - extract metrics
-                                if data.get("done", False):
-                                    inference_time = time.time() - start_time
-                                    eval_count = data.get("eval_count", 0)
-                                    eval_duration = data.get("eval_duration", 1)
-                                    prompt_eval_count = data.get("prompt_eval_count", 0)
-                                    tokens_per_second = (eval_count / (eval_duration / 1e9)) if eval_duration > 0 else 0
-                                    
-                                    yield {
-                                        "type": "done",
-                                        "metrics": {
-                                            "tokens_prompt": prompt_eval_count,
-                                            "tokens_generated": eval_count,
-                                            "tokens_per_second": tokens_per_second,
-                                            "inference_time": inference_time,
-                                            "model": model
-                                        }
-                                    }
-                                    return  # Success, exit function
-                            except json.JSONDecodeError as e:
-                                logger.warning(f"Invalid JSON in Ollama stream: {line[:100]}... Error: {e}")
-                                continue
-            
+                                    parts.append(content)
+
+                            if data.get("done", False):
+                                done_frame = data
+                                break
+
+                        collector.on_tokens(batch_tokens)
+                        if parts:
+                            yield {"type": "content", "text": "".join(parts)}
+
+                        # Check if done - extract metrics
+                        if done_frame is not None:
+                            collector.set_usage(done_frame.get("prompt_eval_count"), done_frame.get("eval_count"))
+                            yield {"type": "done", "metrics": collector.finish()}
+                            return  # Success, exit function
+
             except httpx.HTTPStatusError as e:
                 # If this is attempt 0 and might be thinking-related, loop will retry
                 # If this is attempt 1 or not thinking-related, raise the error
-                if attempt == 1 or not (e.response.status_code == 400 and options.enable_thinking == True):
+                if attempt == 1 or not (e.response.status_code == 400 and thinking_requested):
                     if e.response.status_code == 404:
                         raise BackendModelNotFoundError(f"Model '{model}' not found")
                     else:
@@ -350,6 +421,7 @@ class OllamaBackend(LLMBackend):
         """
         Preload a model into VRAM by sending a minimal chat request.
         This warms up the model so future requests are faster.
+        Skipped if the model is already resident with a large enough context.
 
         Args:
             model: Model name to preload (e.g., 'qwen3:8b')
@@ -360,10 +432,22 @@ class OllamaBackend(LLMBackend):
         try:
             start_time = time.time()
 
+            # Load with the context the next requests will use (no reload right after preload)
+            num_ctx = await self._resolve_num_ctx(model, LLMOptions())
+
+            # Already resident (and large enough)? → nothing to do
+            running = await self.get_running_models() or []
+            for entry in running:
+                if entry.get("name") == model:
+                    loaded_ctx = entry.get("context_length")
+                    if not (num_ctx and loaded_ctx and loaded_ctx < num_ctx):
+                        logger.debug(f"Preload skipped for {model} (already resident)")
+                        return (True, 0.0)
+
             # Send minimal request to trigger model loading
-            # Note: No keep_alive set - let Ollama manage memory automatically
-            # Ollama will unload models when needed (LRU strategy)
-            payload = {
+            # keep_alive: only if set by the residency planner, otherwise
+            # Ollama manages memory automatically (LRU strategy)
+            payload: Dict[str, Any] = {
                 "model": model,
                 "messages": [{"role": "user", "content": "hi"}],
                 "stream": False,
@@ -372,9 +456,13 @@ class OllamaBackend(LLMBackend):
                     "temperature": 0.0
                 }
             }
+            if num_ctx:
+                payload["options"]["num_ctx"] = num_ctx
+            if model in self._keep_alive:
+                payload["keep_alive"] = self._keep_alive[model]
 
             response = await self.client.post(
-                f"{self.base_url}/api/chat",
+                f"{self.http_url}/api/chat",
                 json=payload
                 # Kein Timeout: Ollama queued Requests automatisch, auch während Modell lädt
             )
@@ -390,7 +478,7 @@ class OllamaBackend(LLMBackend):
     async def health_check(self) -> bool:
         """Check if Ollama is reachable"""
         try:
-            response = await self.client.get(f"{self.base_url}/api/tags")
+            response = await self.client.get(f"{self.http_url}/api/tags")
             return response.status_code == 200
         except Exception:
             return False
@@ -402,7 +490,7 @@ class OllamaBackend(LLMBackend):
         """Get Ollama backend information"""
         try:
             # Try to get version
-            response = await self.client.get(f"{self.base_url}/api/version")
+            response = await self.client.get(f"{self.http_url}/api/version")
             version = response.json().get("version", "unknown") if response.status_code == 200 else "unknown"
 
             # Get models
@@ -427,45 +515,60 @@ class OllamaBackend(LLMBackend):
                 "error": str(e)
             }
 
-    async def get_model_context_limit(self, model: str) -> int:
+    async def get_loaded_models(self) -> Optional[List[str]]:
+        """Models currently loaded in VRAM (via /api/ps)"""
+        entries = await self.get_running_models()
+        if entries is None:
+            return None
+        return [m.get("name", "") for m in entries]
+
+    async def _fetch_model_metadata(self, model: str) -> ModelMetadata:
         """
-        Get context limit for an Ollama model.
+        Query model metadata for an Ollama model (uncached).
 
-        Queries /api/show endpoint and extracts context_length from modelinfo.
+        Queries /api/show endpoint and extracts context_length from modelinfo,
+        thinking support from capabilities and quantization from details.
         Very fast (~30ms) and does NOT load the model into memory.
 
         Args:
             model: Model name (e.g., "qwen3:8b", "phi3:mini")
 
         Returns:
-            int: Context limit in tokens
+            ModelMetadata
 
         Raises:
             RuntimeError: If model not found or context limit not extractable
         """
         try:
             response = await self.client.post(
-                f"{self.base_url}/api/show",
+                f"{self.http_url}/api/show",
                 json={"name": model}
             )
             response.raise_for_status()
             data = response.json()
+        except httpx.HTTPError as e:
+            raise RuntimeError(f"Failed to query Ollama for model '{model}': {e}") from e
 
-            # HTTP API uses 'model_info' (underscore), Python SDK uses 'modelinfo' (no underscore)
-            model_details = data.get('model_info') or data.get('modelinfo', {})
-
-            # PRIORITÄT 1: Suche nach original_context_length (für RoPE-Scaling Modelle)
-            for key, value in model_details.items():
-                if 'original_context' in key.lower():
-                    limit = int(value)
-                    return limit
-
-            # PRIORITÄT 2: Suche nach .context_length (Standard)
-            for key, value in model_details.items():
-                if key.endswith('.context_length'):
-                    limit = int(value)
-                    return limit
-
+        # HTTP API uses 'model_info' (underscore), Python SDK uses 'modelinfo' (no underscore)
+        model_details = data.get('model_info') or data.get('modelinfo', {})
+
+        native_context = None
+        context_length = None
+        arch_values: Dict[str, int] = {}
+        for key, value in model_details.items():
+            if 'original_context' in key.lower():
+                native_context = int(value)
+            elif key.endswith('.context_length'):
+                context_length = int(value)
+            for suffix in ('.block_count', '.attention.head_count_kv', '.attention.head_count',
+                           '.attention.key_length', '.attention.value_length', '.embedding_length'):
+                if key.endswith(suffix) and isinstance(value, int):
+                    arch_values[suffix] = value
+
+        # PRIORITÄT 1: original_context_length (für RoPE-Scaling Modelle)
+        # PRIORITÄT 2: .context_length (Standard)
+        limit = native_context or context_length
+        if limit is None:
             # Kein Context-Limit gefunden
             available_keys = list(model_details.keys())[:10]
             raise RuntimeError(
@@ -473,8 +576,34 @@ class OllamaBackend(LLMBackend):
                 f"Available keys: {available_keys}"
             )
 
-        except httpx.HTTPError as e:
-            raise RuntimeError(f"Failed to query Ollama for model '{model}': {e}") from e
+        # Capabilities (Ollama >= 0.9): ["completion", "tools", "thinking", ...]
+        capabilities = data.get('capabilities')
+        supports_thinking = ('thinking' in capabilities) if isinstance(capabilities, list) else None
+
+        return ModelMetadata(
+            context_limit=limit,
+            native_context=native_context or context_length,
+            supports_thinking=supports_thinking,
+            quantization=data.get('details', {}).get('quantization_level'),
+            kv_elements_per_token=self._kv_elements_per_token(arch_values)
+        )
+
+    @staticmethod
+    def _kv_elements_per_token(arch_values: Dict[str, int]) -> Optional[int]:
+        """K+V cache elements per token from GGUF architecture keys (None if incomplete)"""
+        layers = arch_values.get('.block_count')
+        heads = arch_values.get('.attention.head_count')
+        kv_heads = arch_values.get('.attention.head_count_kv') or heads
+        if not layers or not kv_heads:
+            return None
+        key_length = arch_values.get('.attention.key_length')
+        value_length = arch_values.get('.attention.value_length')
+        if not key_length:
+            embedding = arch_values.get('.embedding_length')
+            if not embedding or not heads:
+                return None
+            key_length = embedding // heads
+        return layers * kv_heads * (key_length + (value_length or key_length))
 
     async def unload_all_models(self) -> int:
         """
@@ -530,6 +659,8 @@ class OllamaBackend(LLMBackend):
 
             if unloaded_count > 0:
                 logger.info(f"✅ Unloaded {unloaded_count} Ollama model(s)")
+                if self.num_ctx_policy:
+                    self.num_ctx_policy.forget()
 
             return unloaded_count
 
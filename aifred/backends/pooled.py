@@ -0,0 +1,372 @@
+"""
+Pooled Backend - Load balancing over N endpoints of one backend type
+
+Wraps several Ollama/vLLM/TabbyAPI/llama.cpp servers behind the LLMBackend interface,
+so LLMClient/BackendRegistry use it like a single backend. Per request:
+
+1. Sticky routing: same session + model → same endpoint (KV-cache/prefix reuse)
+2. Model-aware placement: prefer endpoints that already have the model
+   resident (get_loaded_models(), e.g. Ollama /api/ps - cached briefly)
+3. Least outstanding requests among the remaining candidates
+4. Passive health ejection: endpoints failing BACKEND_POOL_EJECT_FAILURES
+   times in a row are skipped for BACKEND_POOL_EJECT_SECONDS
+
+Failed requests are retried on the next endpoint (streams only if nothing
+was yielded yet).
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, List, Optional, Tuple
+
+from .base import (
+    LLMBackend,
+    LLMMessage,
+    LLMOptions,
+    LLMResponse,
+    BackendModelNotFoundError,
+    BackendConnectionError
+)
+from .metadata_cache import ModelMetadata
+from .scheduler import PRIORITY_HIGH, PRIORITY_LOW
+
+logger = logging.getLogger(__name__)
+
+# Max remembered session → endpoint assignments
+MAX_STICKY_ENTRIES = 1000
+
+
+@dataclass
+class PoolEndpoint:
+    """Routing state of one endpoint"""
+    backend: LLMBackend
+    outstanding: int = 0
+    failures: int = 0  # Consecutive failures
+    ejected_until: float = 0.0
+    loaded_models: Optional[List[str]] = None
+    loaded_checked_at: float = 0.0
+
+    @property
+    def url(self) -> str:
+        return self.backend.base_url
+
+    def is_healthy(self) -> bool:
+        return time.monotonic() >= self.ejected_until
+
+
+class PooledBackend(LLMBackend):
+    """LLMBackend that routes every request to one of several endpoints"""
+
+    def __init__(self, backends: List[LLMBackend]):
+        if not backends:
+            raise ValueError("PooledBackend needs at least one endpoint")
+        # base_url = primary endpoint, so metadata cache keys and invalidation
+        # by the UI's backend_url keep working
+        super().__init__(base_url=backends[0].base_url, api_key=backends[0].api_key)
+        self.endpoints = [PoolEndpoint(backend=b) for b in backends]
+        self._sticky: "OrderedDict[Tuple[str, str], PoolEndpoint]" = OrderedDict()
+
+        from ..lib.config import (
+            BACKEND_POOL_EJECT_FAILURES,
+            BACKEND_POOL_EJECT_SECONDS,
+            BACKEND_POOL_PLACEMENT_TTL
+        )
+        self.eject_failures = BACKEND_POOL_EJECT_FAILURES
+        self.eject_seconds = BACKEND_POOL_EJECT_SECONDS
+        self.placement_ttl = BACKEND_POOL_PLACEMENT_TTL
+
+    # ============================================================
+    # Routing
+    # ============================================================
+
+    async def _refresh_placement(self, endpoints: List[PoolEndpoint]):
+        """Update loaded-model info of endpoints whose cache expired"""
+        now = time.monotonic()
+        stale = [ep for ep in endpoints if now - ep.loaded_checked_at > self.placement_ttl]
+        if not stale:
+            return
+        results = await asyncio.gather(
+            *(ep.backend.get_loaded_models() for ep in stale),
+            return_exceptions=True
+        )
+        for ep, loaded in zip(stale, results):
+            ep.loaded_models = None if isinstance(loaded, BaseException) else loaded
+            ep.loaded_checked_at = now
+
+    async def _route(self, model: str, affinity_key: Optional[str]) -> List[PoolEndpoint]:
+        """
+        Return endpoints in preference order (first = target, rest = retry order)
+        """
+        healthy = [ep for ep in self.endpoints if ep.is_healthy()]
+        if not healthy:
+            # All ejected → fail open (maybe they recovered)
+            healthy = list(self.endpoints)
+
+        sticky_key = (affinity_key, model) if affinity_key else None
+        if sticky_key is not None:
+            sticky = self._sticky.get(sticky_key)
+            if sticky is not None and sticky in healthy:
+                self._sticky.move_to_end(sticky_key)
+                return [sticky] + [ep for ep in healthy if ep is not sticky]
+
+        await self._refresh_placement(healthy)
+        resident = [ep for ep in healthy if ep.loaded_models and model in ep.loaded_models]
+        others = [ep for ep in healthy if ep not in resident]
+
+        ordered = (
+            sorted(resident, key=lambda ep: ep.outstanding)
+            + sorted(others, key=lambda ep: ep.outstanding)
+        )
+
+        if sticky_key is not None:
+            self._sticky[sticky_key] = ordered[0]
+            while len(self._sticky) > MAX_STICKY_ENTRIES:
+                self._sticky.popitem(last=False)
+
+        return ordered
+
+    def _record_success(self, endpoint: PoolEndpoint):
+        endpoint.failures = 0
+
+    def _record_failure(self, endpoint: PoolEndpoint, error: Exception):
+        if isinstance(error, BackendModelNotFoundError):
+            return  # Endpoint is fine, just doesn't have the model
+        endpoint.failures += 1
+        if endpoint.failures >= self.eject_failures:
+            endpoint.ejected_until = time.monotonic() + self.eject_seconds
+            # Drop sticky assignments to this endpoint
+            for key in [k for k, ep in self._sticky.items() if ep is endpoint]:
+                del self._sticky[key]
+            logger.warning(
+                f"⛔ Pool: endpoint {endpoint.url} ejected for {self.eject_seconds}s "
+                f"({endpoint.failures} consecutive failures, last: {error})"
+            )
+
+    # ============================================================
+    # Inference
+    # ============================================================
+
+    async def _pooled_chat(
+        self,
+        model: str,
+        messages: List[LLMMessage],
+        options: Optional[LLMOptions],
+        priority: Optional[str]
+    ) -> LLMResponse:
+        affinity_key = options.affinity_key if options else None
+        last_error: Optional[Exception] = None
+
+        for endpoint in await self._route(model, affinity_key):
+            endpoint.outstanding += 1
+            try:
+                if priority is None:
+                    response = await endpoint.backend.chat(model, messages, options)
+                else:
+                    response = await endpoint.backend.scheduled_chat(model, messages, options, priority=priority)
+                self._record_success(endpoint)
+                return response
+            except Exception as e:
+                self._record_failure(endpoint, e)
+                last_error = e
+                logger.warning(f"⚠️ Pool: {endpoint.url} failed ({e}), trying next endpoint")
+            finally:
+                endpoint.outstanding -= 1
+
+        raise last_error or BackendConnectionError("No pool endpoint available")
+
+    async def _pooled_chat_stream(
+        self,
+        model: str,
+        messages: List[LLMMessage],
+        options: Optional[LLMOptions],
+        priority: Optional[str]
+    ) -> AsyncGenerator[Dict, None]:
+        affinity_key = options.affinity_key if options else None
+        last_error: Optional[Exception] = None
+
+        for endpoint in await self._route(model, affinity_key):
+            if priority is None:
+                stream = endpoint.backend.chat_stream(model, messages, options)
+            else:
+                stream = endpoint.backend.scheduled_chat_stream(model, messages, options, priority=priority)
+
+            endpoint.outstanding += 1
+            yielded = False
+            try:
+                async for chunk in stream:
+                    yielded = True
+                    yield chunk
+                self._record_success(endpoint)
+                return
+            except Exception as e:
+                self._record_failure(endpoint, e)
+                if yielded:
+                    raise  # Partial answer already streamed - can't retry transparently
+                last_error = e
+                logger.warning(f"⚠️ Pool: {endpoint.url} failed ({e}), trying next endpoint")
+            finally:
+                endpoint.outstanding -= 1
+                aclose = getattr(stream, "aclose", None)
+                if aclose is not None:
+                    await aclose()
+
+        raise last_error or BackendConnectionError("No pool endpoint available")
+
+    async def chat(
+        self,
+        model: str,
+        messages: List[LLMMessage],
+        options: Optional[LLMOptions] = None,
+        stream: bool = False
+    ) -> LLMResponse:
+        return await self._pooled_chat(model, messages, options, priority=None)
+
+    async def chat_stream(
+        self,
+        model: str,
+        messages: List[LLMMessage],
+        options: Optional[LLMOptions] = None
+    ) -> AsyncIterator[Dict]:
+        async for chunk in self._pooled_chat_stream(model, messages, options, priority=None):
+            yield chunk
+
+    async def scheduled_chat(
+        self,
+        model: str,
+        messages: List[LLMMessage],
+        options: Optional[LLMOptions] = None,
+        priority: str = PRIORITY_HIGH
+    ) -> LLMResponse:
+        """Admission happens per endpoint (each endpoint has its own scheduler)"""
+        return await self._pooled_chat(model, messages, options, priority=priority)
+
+    async def scheduled_chat_stream(
+        self,
+        model: str,
+        messages: List[LLMMessage],
+        options: Optional[LLMOptions] = None,
+        priority: str = PRIORITY_LOW
+    ) -> AsyncGenerator[Dict, None]:
+        """Admission happens per endpoint (each endpoint has its own scheduler)"""
+        stream = self._pooled_chat_stream(model, messages, options, priority=priority)
+        try:
+            async for chunk in stream:
+                yield chunk
+        finally:
+            await stream.aclose()
+
+    async def preload_model(self, model: str) -> Tuple[bool, float]:
+        """Preload on the preferred endpoint (model-aware → usually already resident)"""
+        endpoint = (await self._route(model, None))[0]
+        success, load_time = await endpoint.backend.preload_model(model)
+        if success:
+            if endpoint.loaded_models is None:
+                endpoint.loaded_models = []
+            if model not in endpoint.loaded_models:
+                endpoint.loaded_models.append(model)
+        return success, load_time
+
+    # ============================================================
+    # Metadata / Info
+    # ============================================================
+
+    async def list_models(self) -> List[str]:
+        """Union of all endpoints' models (order of first appearance)"""
+        results = await asyncio.gather(
+            *(ep.backend.list_models() for ep in self.endpoints),
+            return_exceptions=True
+        )
+        models: List[str] = []
+        for result in results:
+            if isinstance(result, BaseException):
+                continue
+            for model in result:
+                if model not in models:
+                    models.append(model)
+        self._available_models = models
+        return models
+
+    async def get_loaded_models(self) -> Optional[List[str]]:
+        await self._refresh_placement(self.endpoints)
+        loaded: List[str] = []
+        for ep in self.endpoints:
+            for model in ep.loaded_models or []:
+                if model not in loaded:
+                    loaded.append(model)
+        return loaded
+
+    async def health_check(self) -> bool:
+        """Healthy if at least one endpoint is"""
+        results = await asyncio.gather(
+            *(ep.backend.health_check() for ep in self.endpoints),
+            return_exceptions=True
+        )
+        return any(result is True for result in results)
+
+    def get_backend_name(self) -> str:
+        return self.endpoints[0].backend.get_backend_name()
+
+    async def get_backend_info(self) -> Dict:
+        return {
+            "backend": self.get_backend_name(),
+            "pooled": True,
+            "endpoints": [
+                {
+                    "url": ep.url,
+                    "outstanding": ep.outstanding,
+                    "healthy": ep.is_healthy(),
+                    "failures": ep.failures,
+                    "loaded_models": ep.loaded_models
+                }
+                for ep in self.endpoints
+            ]
+        }
+
+    async def count_tokens(self, model: str, text: str) -> Optional[int]:
+        """Tokenize on the preferred endpoint for the model"""
+        endpoint = (await self._route(model, None))[0]
+        return await endpoint.backend.count_tokens(model, text)
+
+    def get_scheduler_stats(self) -> Dict:
+        """Admission metrics per endpoint"""
+        return {ep.url: ep.backend.get_scheduler_stats() for ep in self.endpoints}
+
+    def get_num_ctx_stats(self) -> Optional[Dict]:
+        """num_ctx policy counters summed over all endpoints"""
+        per_endpoint = {ep.url: ep.backend.get_num_ctx_stats() for ep in self.endpoints}
+        if not any(per_endpoint.values()):
+            return None
+        totals: Dict[str, Any] = {"reloads_avoided": 0, "reloads_forced": 0, "cold_loads": 0}
+        for stats in per_endpoint.values():
+            for key in totals:
+                totals[key] += (stats or {}).get(key, 0)
+        totals["endpoints"] = per_endpoint
+        return totals
+
+    async def _fetch_model_metadata(self, model: str) -> ModelMetadata:
+        """Ask the first healthy endpoint that knows the model"""
+        last_error: Optional[Exception] = None
+        for endpoint in await self._route(model, None):
+            try:
+                return await endpoint.backend._fetch_model_metadata(model)
+            except Exception as e:
+                last_error = e
+        raise RuntimeError(f"No pool endpoint could provide metadata for '{model}': {last_error}")
+
+    async def unload_all_models(self) -> int:
+        """Unload models on the primary (local) endpoint - uses the local ollama CLI"""
+        primary = self.endpoints[0].backend
+        if hasattr(primary, 'unload_all_models'):
+            return int(await primary.unload_all_models())
+        return 0
+
+    async def close(self):
+        """Close all endpoint connection pools"""
+        for ep in self.endpoints:
+            try:
+                await ep.backend.close()
+            except Exception as e:
+                logger.warning(f"⚠️ Pool: closing {ep.url} failed: {e}")
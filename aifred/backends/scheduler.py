@@ -0,0 +1,176 @@
+"""
+Admission Scheduler - Per-backend request admission with priority lanes
+
+Coordinates concurrent requests to ONE backend across all Reflex sessions
+(backends are shared via BackendRegistry, so one scheduler per backend URL):
+- max_in_flight: Max concurrent requests sent to the backend
+- reserved_high: Slots only the high-priority lane may use, so a short
+  Automatik decision never waits behind long main-LLM generations
+- HIGH lane (Automatik/classification calls) is always admitted before
+  the LOW lane (main generations)
+- Metrics: queue depth per lane, wait times (avg/max), admitted counts
+
+Usage:
+    async with backend.scheduler.admit(PRIORITY_HIGH):
+        response = await backend.chat(...)
+"""
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import AsyncIterator, Deque, Dict
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_HIGH = "high"  # Automatik, classification, short utility calls
+PRIORITY_LOW = "low"  # Main LLM generations (streaming)
+
+# Waits above this are logged (seconds)
+SLOW_ADMISSION_LOG_THRESHOLD = 0.5
+
+
+@dataclass
+class LaneStats:
+    """Admission statistics of one priority lane"""
+    admitted: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+
+class AdmissionScheduler:
+    """
+    Async admission control with two priority lanes
+
+    Not thread-safe - used from the event loop the owning backend is bound
+    to (see BackendRegistry).
+    """
+
+    def __init__(self, name: str, max_in_flight: int, reserved_high: int = 0):
+        self.name = name
+        self.max_in_flight = max(1, max_in_flight)
+        # LOW lane may use all slots except the reserved ones (at least one)
+        self.low_limit = max(1, self.max_in_flight - reserved_high)
+        self._in_flight = 0
+        self._in_flight_low = 0
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {
+            PRIORITY_HIGH: deque(),
+            PRIORITY_LOW: deque()
+        }
+        self._stats: Dict[str, LaneStats] = {
+            PRIORITY_HIGH: LaneStats(),
+            PRIORITY_LOW: LaneStats()
+        }
+
+    def _can_admit(self, priority: str) -> bool:
+        if self._in_flight >= self.max_in_flight:
+            return False
+        if priority == PRIORITY_LOW and self._in_flight_low >= self.low_limit:
+            return False
+        return True
+
+    def _acquire(self, priority: str):
+        self._in_flight += 1
+        if priority == PRIORITY_LOW:
+            self._in_flight_low += 1
+
+    def _release(self, priority: str):
+        self._in_flight -= 1
+        if priority == PRIORITY_LOW:
+            self._in_flight_low -= 1
+        self._wake_waiters()
+
+    def _wake_waiters(self):
+        """Hand free slots to waiters, HIGH lane first"""
+        for priority in (PRIORITY_HIGH, PRIORITY_LOW):
+            queue = self._waiters[priority]
+            while queue and self._can_admit(priority):
+                future = queue.popleft()
+                if future.done():  # Cancelled while waiting
+                    continue
+                self._acquire(priority)
+                future.set_result(None)
+
+    @contextlib.asynccontextmanager
+    async def admit(self, priority: str = PRIORITY_LOW) -> AsyncIterator[None]:
+        """Wait for a free slot in the given lane, hold it for the block"""
+        if priority not in self._waiters:
+            priority = PRIORITY_LOW
+
+        start = time.monotonic()
+        queue = self._waiters[priority]
+        # FIFO within a lane; LOW also yields to queued HIGH requests
+        must_wait = (
+            not self._can_admit(priority)
+            or bool(queue)
+            or (priority == PRIORITY_LOW and bool(self._waiters[PRIORITY_HIGH]))
+        )
+
+        if must_wait:
+            future = asyncio.get_running_loop().create_future()
+            queue.append(future)
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # Slot was granted right before cancellation → give it back
+                    self._release(priority)
+                else:
+                    with contextlib.suppress(ValueError):
+                        queue.remove(future)
+                raise
+        else:
+            self._acquire(priority)
+
+        wait = time.monotonic() - start
+        stats = self._stats[priority]
+        stats.admitted += 1
+        stats.total_wait += wait
+        stats.max_wait = max(stats.max_wait, wait)
+        if wait > SLOW_ADMISSION_LOG_THRESHOLD:
+            logger.info(
+                f"⏳ {self.name}: {priority}-priority request waited {wait:.1f}s "
+                f"(in flight: {self._in_flight}/{self.max_in_flight}, "
+                f"queued: {self.queue_depth(PRIORITY_HIGH)} high / {self.queue_depth(PRIORITY_LOW)} low)"
+            )
+
+        try:
+            yield
+        finally:
+            self._release(priority)
+
+    def queue_depth(self, priority: str) -> int:
+        """Number of requests currently waiting in a lane"""
+        return sum(1 for f in self._waiters[priority] if not f.done())
+
+    def get_stats(self) -> Dict:
+        """Return in-flight count, queue depths and wait-time metrics per lane"""
+        lanes = {}
+        for priority, stats in self._stats.items():
+            lanes[priority] = {
+                'queued': self.queue_depth(priority),
+                'admitted': stats.admitted,
+                'avg_wait': (stats.total_wait / stats.admitted) if stats.admitted else 0.0,
+                'max_wait': stats.max_wait
+            }
+        return {
+            'in_flight': self._in_flight,
+            'max_in_flight': self.max_in_flight,
+            'low_limit': self.low_limit,
+            'lanes': lanes
+        }
+
+
+def create_scheduler(backend_name: str, base_url: str) -> AdmissionScheduler:
+    """Create a scheduler with the configured limits for a backend type"""
+    from ..lib.config import BACKEND_ADMISSION_LIMITS
+
+    key = backend_name.lower().replace(".", "")  # "llama.cpp" → "llamacpp"
+    limits = BACKEND_ADMISSION_LIMITS.get(key, BACKEND_ADMISSION_LIMITS["default"])
+    return AdmissionScheduler(
+        name=f"{backend_name}@{base_url}",
+        max_in_flight=limits["max_in_flight"],
+        reserved_high=limits.get("reserved_high", 0)
+    )
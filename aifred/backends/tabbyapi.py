@@ -5,19 +5,23 @@ TabbyAPI is the official API server for ExLlamaV2/V3 inference.
 It provides an OpenAI-compatible API endpoint.
 """
 
+import re
 import time
 import logging
-from typing import List, Optional, AsyncIterator, Dict
+from typing import Any, List, Optional, AsyncIterator, Dict
 from openai import AsyncOpenAI
 from .base import (
     LLMBackend,
     LLMMessage,
     LLMOptions,
     LLMResponse,
+    StreamMetrics,
     BackendConnectionError,
     BackendModelNotFoundError,
     BackendInferenceError
 )
+from .metadata_cache import ModelMetadata
+from .transport import create_async_client, needs_custom_transport
 
 logger = logging.getLogger(__name__)
 
@@ -27,10 +31,14 @@ class TabbyAPIBackend(LLMBackend):
 
     def __init__(self, base_url: str = "http://localhost:5000/v1", api_key: str = "dummy"):
         super().__init__(base_url=base_url, api_key=api_key)
+        # Shared httpx pool for direct API calls (/models/{model}); also used by the
+        # OpenAI client for Unix sockets (unix:///run/tabby.sock:/v1) / HTTP/2
+        self._http, self.http_url = create_async_client(base_url, timeout=120.0)
         self.client = AsyncOpenAI(
-            base_url=base_url,
+            base_url=self.http_url,
             api_key=api_key,  # TabbyAPI doesn't need real API key by default
-            timeout=120.0  # TabbyAPI may need more time for model loading (ExLlama quantization)
+            timeout=120.0,  # TabbyAPI may need more time for model loading (ExLlama quantization)
+            http_client=self._http if needs_custom_transport(base_url) else None
         )
 
     async def list_models(self) -> List[str]:
@@ -78,13 +86,20 @@ class TabbyAPIBackend(LLMBackend):
 
         # TabbyAPI-specific parameters (via extra_body)
         # ExLlamaV2/V3 supports advanced sampling parameters
-        extra_body = {}
+        extra_body: Dict[str, Any] = {}
         if options.repeat_penalty and options.repeat_penalty != 1.0:
             extra_body["repetition_penalty"] = options.repeat_penalty
         if options.top_k and options.top_k != 40:
             extra_body["top_k"] = options.top_k
         if options.num_predict:
             kwargs["max_tokens"] = options.num_predict
+        if options.stop:
+            kwargs["stop"] = options.stop
+        if options.choices:
+            # Constrained sampling: regex grammar allows exactly one of the choices
+            extra_body["regex_pattern"] = "(" + "|".join(re.escape(c) for c in options.choices) + ")"
+        elif options.json_schema:
+            extra_body["json_schema"] = options.json_schema
 
         if extra_body:
             kwargs["extra_body"] = extra_body
@@ -156,51 +171,46 @@ class TabbyAPIBackend(LLMBackend):
         }
 
         # TabbyAPI-specific parameters
-        extra_body = {}
+        extra_body: Dict[str, Any] = {}
         if options.repeat_penalty and options.repeat_penalty != 1.0:
             extra_body["repetition_penalty"] = options.repeat_penalty
         if options.top_k and options.top_k != 40:
             extra_body["top_k"] = options.top_k
         if options.num_predict:
             kwargs["max_tokens"] = options.num_predict
+        if options.stop:
+            kwargs["stop"] = options.stop
+        if options.choices:
+            # Constrained sampling: regex grammar allows exactly one of the choices
+            extra_body["regex_pattern"] = "(" + "|".join(re.escape(c) for c in options.choices) + ")"
+        elif options.json_schema:
+            extra_body["json_schema"] = options.json_schema
+
+        if options.assistant_prefix:
+            # Prefill: appended after the generation prompt, the answer continues it
+            extra_body["response_prefix"] = options.assistant_prefix
 
         if extra_body:
             kwargs["extra_body"] = extra_body
 
         try:
-            start_time = time.time()
+            collector = StreamMetrics(model)
             stream = await self.client.chat.completions.create(**kwargs)
 
-            total_tokens = 0
-            prompt_tokens = 0
-
-            async for chunk in stream:
-                if chunk.choices:
-                    delta = chunk.choices[0].delta
-                    if delta.content:
-                        yield {"type": "content", "text": delta.content}
-                        total_tokens += 1  # Rough estimate
+            # async with: closes the HTTP response if the consumer aborts early
+            async with stream:
+                async for chunk in stream:
+                    if chunk.choices:
+                        delta = chunk.choices[0].delta
+                        if delta.content:
+                            yield {"type": "content", "text": delta.content}
+                            collector.on_tokens(1)  # One token per delta (true count from usage)
 
-                # Check for usage info (sent at the end by OpenAI-compatible APIs)
-                if hasattr(chunk, 'usage') and chunk.usage:
-                    prompt_tokens = chunk.usage.prompt_tokens
-                    completion_tokens = chunk.usage.completion_tokens
-                    total_tokens = completion_tokens
+                    # Usage info (sent at the end via stream_options.include_usage)
+                    if getattr(chunk, 'usage', None):
+                        collector.set_usage(chunk.usage.prompt_tokens, chunk.usage.completion_tokens)
 
-            # Send final metrics
-            inference_time = time.time() - start_time
-            tokens_per_second = (total_tokens / inference_time) if inference_time > 0 else 0
-
-            yield {
-                "type": "done",
-                "metrics": {
-                    "tokens_prompt": prompt_tokens,
-                    "tokens_generated": total_tokens,
-                    "tokens_per_second": tokens_per_second,
-                    "inference_time": inference_time,
-                    "model": model
-                }
-            }
+            yield {"type": "done", "metrics": collector.finish()}
 
         except Exception as e:
             error_str = str(e)
@@ -263,52 +273,60 @@ class TabbyAPIBackend(LLMBackend):
                 "error": str(e)
             }
 
-    async def get_model_context_limit(self, model: str) -> int:
+    async def _fetch_model_metadata(self, model: str) -> ModelMetadata:
         """
-        Get context limit for a TabbyAPI model.
+        Query model metadata for a TabbyAPI model (uncached).
 
-        Queries /v1/models endpoint (OpenAI-compatible) and extracts max_model_len.
+        Queries /v1/models/{model} endpoint (OpenAI-compatible) and extracts max_model_len.
 
         Args:
             model: Model name/ID
 
         Returns:
-            int: Context limit in tokens
+            ModelMetadata
 
         Raises:
             RuntimeError: If model not found or context limit not available
         """
         try:
             # TabbyAPI follows OpenAI-compatible /v1/models/{model} endpoint
-            import httpx
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(f"{self.base_url}/models/{model}")
-                response.raise_for_status()
-                data = response.json()
-
-                # Check for max_model_len (common in ExLlama-based APIs)
-                if "max_model_len" in data:
-                    return int(data["max_model_len"])
-
-                # Fallback: check in nested metadata
-                if "metadata" in data:
-                    if "max_model_len" in data["metadata"]:
-                        return int(data["metadata"]["max_model_len"])
-                    if "max_position_embeddings" in data["metadata"]:
-                        return int(data["metadata"]["max_position_embeddings"])
-
-                # Fallback: check for max_position_embeddings
-                if "max_position_embeddings" in data:
-                    return int(data["max_position_embeddings"])
-
-                raise RuntimeError(
-                    f"Context limit not found for TabbyAPI model '{model}'. "
-                    f"Available keys: {list(data.keys())}"
-                )
-
+            response = await self._http.get(f"{self.http_url}/models/{model}", timeout=10.0)
+            response.raise_for_status()
+            data = response.json()
         except Exception as e:
             raise RuntimeError(f"Failed to query TabbyAPI for model '{model}': {e}") from e
 
+        metadata = data.get("metadata") or {}
+        parameters = data.get("parameters") or {}
+
+        # Check for max_model_len (common in ExLlama-based APIs),
+        # then nested metadata, then max_position_embeddings
+        limit = (
+            data.get("max_model_len")
+            or metadata.get("max_model_len")
+            or metadata.get("max_position_embeddings")
+            or data.get("max_position_embeddings")
+            or parameters.get("max_seq_len")
+        )
+        if limit is None:
+            raise RuntimeError(
+                f"Context limit not found for TabbyAPI model '{model}'. "
+                f"Available keys: {list(data.keys())}"
+            )
+
+        native = metadata.get("max_position_embeddings") or data.get("max_position_embeddings")
+        # ExLlama quants carry bits-per-weight in the model name (e.g. "...-4.0bpw-exl2")
+        bpw_match = re.search(r'(\d+(?:\.\d+)?bpw)', model)
+        quantization = bpw_match.group(1) if bpw_match else None
+
+        return ModelMetadata(
+            context_limit=int(limit),
+            native_context=int(native) if native else None,
+            quantization=quantization
+        )
+
     async def close(self):
-        """Close HTTP client"""
+        """Close HTTP clients"""
         await self.client.close()
+        if not self._http.is_closed:
+            await self._http.aclose()
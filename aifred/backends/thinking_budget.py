@@ -0,0 +1,183 @@
+"""
+Thinking Budget - Cap reasoning tokens of thinking models (Qwen3 & Co.)
+
+With enable_thinking=True a model can spend thousands of tokens inside
+<think> before the first visible answer token. The backends only offer
+on/off, so the budget is enforced on the stream (all backends emit
+reasoning wrapped in <think>...</think>):
+
+1. Count reasoning tokens while the <think> block is open
+   (estimated via the calibrated chars/token ratio - chunk sizes differ per backend)
+2. Budget reached → close the stream (aborts generation on the server)
+3. Re-issue the request with thinking disabled and the partial reasoning
+   as assistant prefill "<think>…</think>\\n\\n" (LLMOptions.assistant_prefix)
+   → the model continues directly with the answer
+
+ThinkingTracker also measures thinking vs. answer time, reported in the
+"done" metrics (thinking_time, answer_time, thinking_tokens, thinking_truncated).
+"""
+
+import logging
+import time
+from dataclasses import replace
+from typing import AsyncGenerator, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+THINK_OPEN = "<think>"
+THINK_CLOSE = "</think>"
+
+
+class ThinkingTracker:
+    """Follows the <think> block of a content stream"""
+
+    def __init__(self, chars_per_token: float):
+        self.chars_per_token = chars_per_token
+        self.state = "pending"  # pending → thinking → answer
+        self.reasoning = ""
+        self.started_at = time.time()
+        self.thinking_started_at: Optional[float] = None
+        self.thinking_ended_at: Optional[float] = None
+        self._buffer = ""  # Text before the block is decided (tag may be split over chunks)
+
+    @property
+    def thinking_tokens(self) -> int:
+        return int(len(self.reasoning) / self.chars_per_token)
+
+    def end_thinking(self) -> float:
+        """Switch to answer state, returns the end time of the reasoning phase"""
+        self.state = "answer"
+        self.thinking_ended_at = time.time()
+        return self.thinking_ended_at
+
+    def feed(self, text: str):
+        """Process one content chunk"""
+        if self.state == "answer":
+            return
+
+        if self.state == "pending":
+            self._buffer += text
+            stripped = self._buffer.lstrip()
+            if stripped.startswith(THINK_OPEN):
+                self.state = "thinking"
+                self.thinking_started_at = time.time()
+                text = stripped[len(THINK_OPEN):]
+                self._buffer = ""
+            elif THINK_OPEN.startswith(stripped):
+                return  # Could still become "<think>"
+            else:
+                self.state = "answer"  # No reasoning block
+                return
+
+        # state == "thinking"
+        self.reasoning += text
+        close_at = self.reasoning.find(THINK_CLOSE, max(0, len(self.reasoning) - len(text) - len(THINK_CLOSE)))
+        if close_at >= 0:
+            self.reasoning = self.reasoning[:close_at]
+            self.end_thinking()
+
+    def timing(self) -> Dict:
+        """Thinking vs. answer time (seconds, measured from stream start)"""
+        now = time.time()
+        if self.thinking_started_at is None:
+            return {"thinking_time": 0.0, "answer_time": now - self.started_at}
+        thinking_end = self.thinking_ended_at or now
+        return {
+            "thinking_time": thinking_end - self.started_at,
+            "answer_time": now - thinking_end,
+            "thinking_tokens": self.thinking_tokens
+        }
+
+
+def _merge_metrics(first: Dict, second: Dict) -> Dict:
+    """
+    Combine the metrics of the cut-off reasoning stream and the continuation
+
+    TTFT/prefill come from the first stream, decode time and tokens are summed
+    (reasoning tokens estimated → tokens_estimated), ITL percentiles are the
+    continuation's.
+    """
+    merged = dict(second)
+    merged["tokens_generated"] = first.get("tokens_generated", 0) + second.get("tokens_generated", 0)
+    merged["tokens_estimated"] = True
+    merged["inference_time"] = first.get("inference_time", 0.0) + second.get("inference_time", 0.0)
+    merged["tokens_prompt"] = max(first.get("tokens_prompt", 0), second.get("tokens_prompt", 0))
+    merged["tokens_prompt_total"] = None  # Two different prompts - no calibration sample
+    merged["ttft"] = merged["prefill_time"] = first.get("ttft", 0.0)
+    merged["decode_time"] = first.get("decode_time", 0.0) + second.get("decode_time", 0.0)
+    if merged["decode_time"] > 0 and merged["tokens_generated"] > 1:
+        merged["tokens_per_second"] = (merged["tokens_generated"] - 1) / merged["decode_time"]
+    return merged
+
+
+async def budgeted_chat_stream(backend, model: str, messages, options) -> AsyncGenerator[Dict, None]:
+    """
+    backend.chat_stream() with thinking budget + thinking/answer timing
+
+    Args:
+        backend: LLMBackend
+        model: Model name
+        messages: List of LLMMessage
+        options: LLMOptions (thinking_budget = max. reasoning tokens, None/0 = unlimited)
+
+    Yields:
+        Stream chunks of backend.chat_stream(); "done" metrics extended by
+        thinking_time / answer_time / thinking_tokens / thinking_truncated
+    """
+    from ..lib.token_calibration import chars_per_token
+
+    budget = options.thinking_budget if options and options.enable_thinking else None
+    tracker = ThinkingTracker(chars_per_token(model))
+    stream = backend.chat_stream(model, messages, options)
+
+    try:
+        async for chunk in stream:
+            if chunk["type"] == "content":
+                tracker.feed(chunk["text"])
+                yield chunk
+                if budget and tracker.state == "thinking" and tracker.thinking_tokens >= budget:
+                    break
+            elif chunk["type"] == "done":
+                metrics = dict(chunk["metrics"])
+                metrics.update(tracker.timing())
+                metrics["thinking_truncated"] = False
+                yield {"type": "done", "metrics": metrics}
+                return
+            else:
+                yield chunk
+        else:
+            return  # Stream ended without "done" (backend error handling upstream)
+    finally:
+        await stream.aclose()
+
+    # --- Budget reached: close reasoning, continue without thinking ---
+    elapsed = tracker.end_thinking() - tracker.started_at
+    first_ttft = (tracker.thinking_started_at or tracker.started_at) - tracker.started_at
+    first_metrics = {
+        "tokens_generated": tracker.thinking_tokens,
+        "inference_time": elapsed,
+        "ttft": first_ttft,
+        "decode_time": elapsed - first_ttft
+    }
+    logger.info(f"🧠 Thinking budget reached ({budget} tokens, {elapsed:.1f}s) → continuing without thinking")
+    yield {"type": "debug", "message": f"🧠 Thinking-Budget erreicht ({budget} Tokens) → Antwort ohne weiteres Denken"}
+    yield {"type": "content", "text": f"\n{THINK_CLOSE}\n\n"}
+
+    continuation = replace(
+        options,
+        enable_thinking=False,
+        thinking_budget=None,
+        assistant_prefix=f"{THINK_OPEN}{tracker.reasoning}\n{THINK_CLOSE}\n\n"
+    )
+    stream = backend.chat_stream(model, messages, continuation)
+    try:
+        async for chunk in stream:
+            if chunk["type"] == "done":
+                metrics = _merge_metrics(first_metrics, chunk["metrics"])
+                metrics.update(tracker.timing())
+                metrics["thinking_truncated"] = True
+                yield {"type": "done", "metrics": metrics}
+            else:
+                yield chunk
+    finally:
+        await stream.aclose()
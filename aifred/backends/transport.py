@@ -0,0 +1,164 @@
+"""
+Backend Transport - Unix domain sockets + HTTP/2 for the httpx clients
+
+Ollama, vLLM, llama-server and ChromaDB usually run on the same host as
+AIfred. Loopback TCP costs a connect + TCP stack per request; a Unix socket
+skips both, which is noticeable on the many small Automatik calls.
+
+Backend URLs:
+    http://localhost:11434          → TCP (unchanged)
+    unix:///run/ollama/ollama.sock  → Unix socket, HTTP path "/"
+    unix:///run/vllm.sock:/v1       → Unix socket, HTTP path prefix "/v1"
+
+The original URL stays the backend identity (BackendRegistry, metadata cache,
+scheduler); requests go to `http_url` (http://localhost + path prefix) over
+the socket.
+
+HTTP/2 (BACKEND_HTTP2) multiplexes parallel requests over one connection.
+Needs the optional `h2` package (pip install httpx[http2]) and a server that
+negotiates h2 via TLS/ALPN (e.g. Caddy/nginx in front of the backend) -
+plain http:// servers keep speaking HTTP/1.1. Without `h2` it falls back to
+HTTP/1.1 with a warning.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+UNIX_SCHEME = "unix://"
+_SOCKET_HOST = "http://localhost"  # Host part is ignored on Unix sockets
+
+_http2_warned = False
+
+
+@dataclass(frozen=True)
+class TransportTarget:
+    """Where requests for a backend URL actually go"""
+    http_url: str  # URL prefix for requests
+    uds: Optional[str] = None  # Unix socket path (None = TCP)
+
+
+def parse_backend_url(url: str) -> TransportTarget:
+    """
+    Split a backend URL into request URL + optional Unix socket
+
+    Args:
+        url: http(s)://host:port[/path] or unix:///socket/path[:/http/path]
+
+    Returns:
+        TransportTarget
+    """
+    if not url.startswith(UNIX_SCHEME):
+        return TransportTarget(http_url=url)
+
+    socket_path, _, http_path = url[len(UNIX_SCHEME):].partition(":")
+    if not socket_path:
+        raise ValueError(f"Unix socket URL without path: {url}")
+    return TransportTarget(http_url=f"{_SOCKET_HOST}{http_path.rstrip('/')}", uds=socket_path)
+
+
+def is_unix_url(url: Optional[str]) -> bool:
+    return url is not None and url.startswith(UNIX_SCHEME)
+
+
+def resolve_http2(enabled: Optional[bool] = None) -> bool:
+    """
+    HTTP/2 setting (None = BACKEND_HTTP2), False if the h2 package is missing
+
+    Args:
+        enabled: Explicit override
+
+    Returns:
+        True if HTTP/2 can be used
+    """
+    global _http2_warned
+    if enabled is None:
+        from ..lib.config import BACKEND_HTTP2
+        enabled = BACKEND_HTTP2
+    if not enabled:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        if not _http2_warned:
+            logger.warning("⚠️ BACKEND_HTTP2 aktiv, aber Paket 'h2' fehlt (pip install httpx[http2]) → HTTP/1.1")
+            _http2_warned = True
+        return False
+    return True
+
+
+def needs_custom_transport(url: str, http2: Optional[bool] = None) -> bool:
+    """True if the URL needs a non-default httpx transport (socket or HTTP/2)"""
+    return is_unix_url(url) or resolve_http2(http2)
+
+
+def create_async_client(
+    url: str,
+    timeout,
+    limits: Optional[httpx.Limits] = None,
+    headers: Optional[Dict[str, str]] = None,
+    http2: Optional[bool] = None
+) -> Tuple[httpx.AsyncClient, str]:
+    """
+    httpx.AsyncClient for a backend URL (TCP, Unix socket, optional HTTP/2)
+
+    Args:
+        url: Backend URL (see module docstring)
+        timeout: httpx timeout
+        limits: Connection pool limits (applied to the transport)
+        headers: Default headers
+        http2: Override BACKEND_HTTP2
+
+    Returns:
+        (client, http_url) - use http_url as request prefix
+    """
+    target = parse_backend_url(url)
+    transport = httpx.AsyncHTTPTransport(
+        uds=target.uds,
+        http2=resolve_http2(http2),
+        limits=limits or httpx.Limits(max_keepalive_connections=10, max_connections=20, keepalive_expiry=300.0)
+    )
+    client = httpx.AsyncClient(transport=transport, timeout=timeout, headers=headers)
+    if target.uds:
+        logger.info(f"🔌 {url}: Unix-Socket {target.uds}")
+    return client, target.http_url
+
+
+def create_sync_client(
+    url: str,
+    timeout,
+    limits: Optional[httpx.Limits] = None,
+    headers: Optional[Dict[str, str]] = None,
+    http2: Optional[bool] = None
+) -> Tuple[httpx.Client, str]:
+    """Synchronous variant of create_async_client (ChromaDB HttpClient runs in threads)"""
+    target = parse_backend_url(url)
+    transport = httpx.HTTPTransport(
+        uds=target.uds,
+        http2=resolve_http2(http2),
+        limits=limits or httpx.Limits(max_keepalive_connections=10, max_connections=20, keepalive_expiry=300.0)
+    )
+    client = httpx.Client(transport=transport, timeout=timeout, headers=headers)
+    return client, target.http_url
+
+
+def curl_command(url: str, path: str) -> List[str]:
+    """
+    curl argv for a backend endpoint (adds --unix-socket for unix:// URLs)
+
+    Args:
+        url: Backend URL
+        path: Endpoint path, e.g. "/api/tags"
+
+    Returns:
+        ['curl', '-s', ..., full URL]
+    """
+    target = parse_backend_url(url)
+    args = ['curl', '-s']
+    if target.uds:
+        args += ['--unix-socket', target.uds]
+    return args + [f"{target.http_url}{path}"]
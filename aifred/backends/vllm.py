@@ -6,6 +6,7 @@ vLLM uses OpenAI-compatible API, so we use the openai Python client
 
 import time
 import logging
+import httpx
 from typing import List, Optional, AsyncIterator, Dict, Any
 from openai import AsyncOpenAI
 from .base import (
@@ -13,10 +14,13 @@ from .base import (
     LLMMessage,
     LLMOptions,
     LLMResponse,
+    StreamMetrics,
     BackendConnectionError,
     BackendModelNotFoundError,
     BackendInferenceError
 )
+from .metadata_cache import ModelMetadata, get_model_metadata_cache
+from .transport import create_async_client, needs_custom_transport
 
 logger = logging.getLogger(__name__)
 
@@ -26,11 +30,19 @@ class vLLMBackend(LLMBackend):
 
     def __init__(self, base_url: str = "http://localhost:8000/v1", api_key: str = "dummy"):
         super().__init__(base_url=base_url, api_key=api_key)
+        # Unix socket (unix:///run/vllm.sock:/v1) / HTTP/2: own httpx client, else OpenAI default
+        http_client = None
+        if needs_custom_transport(base_url):
+            http_client, self.http_url = create_async_client(base_url, timeout=60.0)
         self.client = AsyncOpenAI(
-            base_url=base_url,
+            base_url=self.http_url,
             api_key=api_key,  # vLLM doesn't need real API key
-            timeout=60.0  # 60s Timeout - ausreichend für parallele Anfragen
+            timeout=60.0,  # 60s Timeout - ausreichend für parallele Anfragen
+            http_client=http_client
         )
+        # /tokenize lives next to /v1 (server root), raw httpx client created lazily
+        self._http: Optional[httpx.AsyncClient] = None
+        self._root_url = ""
 
     async def list_models(self) -> List[str]:
         """Get list of available models from vLLM"""
@@ -83,6 +95,13 @@ class vLLMBackend(LLMBackend):
             extra_body["top_k"] = options.top_k
         if options.num_predict:
             kwargs["max_tokens"] = options.num_predict
+        if options.stop:
+            kwargs["stop"] = options.stop
+        if options.choices:
+            # Guided decoding: output is forced to exactly one of the choices
+            extra_body["guided_choice"] = options.choices
+        elif options.json_schema:
+            extra_body["guided_json"] = options.json_schema
 
         # Thinking Mode - Always send (true or false)
         extra_body["chat_template_kwargs"] = {"enable_thinking": options.enable_thinking}
@@ -113,7 +132,9 @@ class vLLMBackend(LLMBackend):
                 tokens_generated=tokens_generated,
                 tokens_per_second=tokens_per_second,
                 inference_time=inference_time,
-                model=model
+                model=model,
+                # usage counts the whole prompt, prefix-cache hits included
+                tokens_prompt_total=tokens_prompt or None
             )
 
         except Exception as e:
@@ -147,6 +168,8 @@ class vLLMBackend(LLMBackend):
 
         # Convert messages
         openai_messages = [{"role": msg.role, "content": msg.content} for msg in messages]
+        if options.assistant_prefix:
+            openai_messages.append({"role": "assistant", "content": options.assistant_prefix})
 
         # Build kwargs
         kwargs = {
@@ -166,50 +189,62 @@ class vLLMBackend(LLMBackend):
             extra_body["top_k"] = options.top_k
         if options.num_predict:
             kwargs["max_tokens"] = options.num_predict
+        if options.stop:
+            kwargs["stop"] = options.stop
+        if options.choices:
+            # Guided decoding: output is forced to exactly one of the choices
+            extra_body["guided_choice"] = options.choices
+        elif options.json_schema:
+            extra_body["guided_json"] = options.json_schema
 
         # Thinking Mode - Always send (true or false)
         extra_body["chat_template_kwargs"] = {"enable_thinking": options.enable_thinking}
         logger.info(f"🧠 enable_thinking set to: {options.enable_thinking}")
+        if options.assistant_prefix:
+            # Prefill: continue the trailing assistant message instead of opening a new turn
+            extra_body["add_generation_prompt"] = False
+            extra_body["continue_final_message"] = True
 
         if extra_body:
             kwargs["extra_body"] = extra_body
             logger.info(f"📦 extra_body: {extra_body}")
 
         try:
-            import time
-            start_time = time.time()
+            collector = StreamMetrics(model)
             stream = await self.client.chat.completions.create(**kwargs)
 
-            total_tokens = 0
-            prompt_tokens = 0
-
-            async for chunk in stream:
-                if chunk.choices:
-                    delta = chunk.choices[0].delta
-                    if delta.content:
-                        yield {"type": "content", "text": delta.content}
-                        total_tokens += 1  # Rough estimate
-
-                # Check for usage info (sent at the end by OpenAI-compatible APIs)
-                if hasattr(chunk, 'usage') and chunk.usage:
-                    prompt_tokens = chunk.usage.prompt_tokens
-                    completion_tokens = chunk.usage.completion_tokens
-                    total_tokens = completion_tokens
-
-            # Send final metrics
-            inference_time = time.time() - start_time
-            tokens_per_second = (total_tokens / inference_time) if inference_time > 0 else 0
-
-            yield {
-                "type": "done",
-                "metrics": {
-                    "tokens_prompt": prompt_tokens,
-                    "tokens_generated": total_tokens,
-                    "tokens_per_second": tokens_per_second,
-                    "inference_time": inference_time,
-                    "model": model
-                }
-            }
+            thinking_started = False
+
+            # async with: closes the HTTP response if the consumer aborts early
+            # (e.g. LLMClient.classify() stops reading once a label is decided)
+            async with stream:
+                async for chunk in stream:
+                    if chunk.choices:
+                        delta = chunk.choices[0].delta
+                        # --reasoning-parser: reasoning arrives separately → wrap in <think> like Ollama
+                        reasoning = getattr(delta, "reasoning_content", None)
+                        if reasoning:
+                            if not thinking_started:
+                                yield {"type": "content", "text": "<think>"}
+                                thinking_started = True
+                            yield {"type": "content", "text": reasoning}
+                        if delta.content:
+                            if thinking_started:
+                                yield {"type": "content", "text": "</think>\n\n"}
+                                thinking_started = False
+                            yield {"type": "content", "text": delta.content}
+                        if reasoning or delta.content:
+                            collector.on_tokens(1)  # One token per delta (true count from usage)
+
+                    # Usage info (sent at the end via stream_options.include_usage)
+                    if getattr(chunk, 'usage', None):
+                        collector.set_usage(chunk.usage.prompt_tokens, chunk.usage.completion_tokens)
+                        collector.set_prompt_total(chunk.usage.prompt_tokens)  # Incl. prefix-cache hits
+
+            if thinking_started:
+                yield {"type": "content", "text": "</think>\n\n"}
+
+            yield {"type": "done", "metrics": collector.finish()}
 
         except Exception as e:
             error_str = str(e)
@@ -271,56 +306,87 @@ class vLLMBackend(LLMBackend):
                 "error": str(e)
             }
 
-    async def get_model_context_limit(self, model: str) -> int:
+    async def _fetch_model_metadata(self, model: str) -> ModelMetadata:
         """
-        Get context limit for a vLLM model.
+        Query model metadata for a vLLM model (uncached).
 
         vLLM doesn't support /v1/models/{id} endpoint (returns 404).
         Instead, we query /v1/models (list) and find the model's max_model_len.
+        Since the full list is fetched anyway, all other listed models are
+        stored in the metadata cache as well.
 
         Args:
             model: Model name/ID
 
         Returns:
-            int: Context limit in tokens
+            ModelMetadata
 
         Raises:
-            RuntimeError: If query fails or model not found
+            RuntimeError: If query fails or context limit field missing
         """
         try:
             # Query /v1/models endpoint (list all models)
             models_response = await self.client.models.list()
+        except Exception as e:
+            logger.error(f"❌ Failed to query vLLM for model '{model}': {e}")
+            raise RuntimeError(f"Failed to query vLLM for model '{model}': {e}") from e
 
-            # Find the requested model in the list
-            for model_obj in models_response.data:
-                if model_obj.id == model:
-                    # Extract max_model_len from model object
-                    if hasattr(model_obj, 'max_model_len'):
-                        return int(model_obj.max_model_len)
-
-                    # Try as dict if object doesn't have attribute
-                    model_dict = model_obj.model_dump() if hasattr(model_obj, 'model_dump') else dict(model_obj)
+        cache = get_model_metadata_cache()
+        requested: Optional[ModelMetadata] = None
 
-                    if "max_model_len" in model_dict:
-                        return int(model_dict["max_model_len"])
+        for model_obj in models_response.data:
+            # Extract max_model_len (attribute or via model_dump for extra fields)
+            model_dict = model_obj.model_dump() if hasattr(model_obj, 'model_dump') else dict(model_obj)
+            max_len = getattr(model_obj, 'max_model_len', None) or model_dict.get("max_model_len")
 
+            if max_len is None:
+                if model_obj.id == model:
                     raise RuntimeError(
                         f"Context limit field 'max_model_len' not found for vLLM model '{model}'. "
                         f"Available keys: {list(model_dict.keys())}"
                     )
+                continue
 
-            # Model not found in list - return reasonable default
-            logger.warning(
-                f"⚠️ Model '{model}' not found in vLLM models list. "
-                f"Using default context limit: 16384 tokens"
+            metadata = ModelMetadata(
+                context_limit=int(max_len),
+                quantization="AWQ" if "awq" in model_obj.id.lower() else None
             )
-            return 16384  # Reasonable default for Qwen3 models
+            if model_obj.id == model:
+                requested = metadata
+            else:
+                cache.set(self.get_backend_name(), self.base_url, model_obj.id, metadata)
 
-        except Exception as e:
-            # Other errors are unexpected
-            logger.error(f"❌ Failed to query vLLM for model '{model}': {e}")
-            raise RuntimeError(f"Failed to query vLLM for model '{model}': {e}") from e
+        if requested is not None:
+            return requested
+
+        # Model not found in list - return reasonable default
+        logger.warning(
+            f"⚠️ Model '{model}' not found in vLLM models list. "
+            f"Using default context limit: 16384 tokens"
+        )
+        return ModelMetadata(context_limit=16384)  # Reasonable default for Qwen3 models
+
+    async def _tokenize(self, model: str, text: str) -> Optional[int]:
+        """Token count via vLLM /tokenize (server-side tokenizer of the model)"""
+        if self._http is None:
+            root = self.base_url.rstrip("/")
+            root = root[:-3] if root.endswith("/v1") else root
+            headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else None
+            self._http, self._root_url = create_async_client(root, timeout=10.0, headers=headers)
+
+        response = await self._http.post(
+            f"{self._root_url}/tokenize",
+            json={"model": model, "prompt": text, "add_special_tokens": True}
+        )
+        if response.status_code == 404:
+            self._tokenize_supported = False
+            return None
+        response.raise_for_status()
+        data = response.json()
+        return int(data.get("count", len(data.get("tokens", []))))
 
     async def close(self):
-        """Close HTTP client"""
+        """Close HTTP clients"""
         await self.client.close()
+        if self._http is not None:
+            await self._http.aclose()
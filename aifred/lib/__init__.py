@@ -15,6 +15,8 @@ from .logging_utils import (
 
 from .prompt_loader import (
     load_prompt,
+    load_system_prompt,
+    get_timestamp_block,
     set_language,
     get_language,
     detect_language,
@@ -58,6 +60,8 @@ __all__ = [
     "clear_console",
     # Prompts
     "load_prompt",
+    "load_system_prompt",
+    "get_timestamp_block",
     "set_language",
     "get_language",
     "detect_language",
@@ -0,0 +1,216 @@
+"""
+Answer Store - Compressed answers + source lists of the Vector Cache
+
+The answer used to live in the Chroma metadata, so every similarity search
+returned the full answer text of all n_results entries - query_for_rag()
+pulled five complete answers just to compare distances. Now:
+
+- Vector collection: query document (embedded) + small metadata only
+  (id, timestamp, num_sources, source_urls, mode)
+- Answer Store:      answer + source list per entry id, zlib-compressed,
+  in one SQLite file (VECTOR_CACHE_ANSWER_STORE)
+
+VectorCache fetches answers lazily: only for a direct hit and for the RAG
+candidates inside the distance range, in one batched lookup.
+Entries written before the store existed still carry metadata['answer'];
+VectorCache falls back to it.
+
+The table also holds the per-entry bookkeeping for expiry and eviction:
+created, expires_at (volatility TTL), last_hit / hit_count (recorded on
+reads) and the compressed size - VectorCache.compact() selects expired
+entries and LRU-by-last-hit victims with plain SQL.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .logging_utils import log_message
+
+_COMPRESS_LEVEL = 6
+
+# Columns added after the first schema (ALTER TABLE on existing files)
+_BOOKKEEPING_COLUMNS = {
+    "created": "REAL",
+    "expires_at": "REAL",
+    "last_hit": "REAL",
+    "hit_count": "INTEGER NOT NULL DEFAULT 0",
+    "size": "INTEGER NOT NULL DEFAULT 0",
+}
+
+
+def _pack(value) -> bytes:
+    return zlib.compress(json.dumps(value, ensure_ascii=False).encode("utf-8"), _COMPRESS_LEVEL)
+
+
+def _unpack(blob: bytes):
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+def _slim_sources(sources: List[Dict]) -> List[Dict]:
+    """Keep url + title of each source (scraped content is not cached)"""
+    return [
+        {key: source[key] for key in ("url", "title") if source.get(key)}
+        for source in sources
+    ]
+
+
+class AnswerStore:
+    """SQLite table id → (compressed answer, compressed source list)"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # One connection for all threads (VectorCache runs in the thread pool), serialized by _lock
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS answers ("
+            "id TEXT PRIMARY KEY, answer BLOB NOT NULL, sources BLOB NOT NULL)"
+        )
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(answers)")}
+        for column, definition in _BOOKKEEPING_COLUMNS.items():
+            if column not in existing:
+                self._conn.execute(f"ALTER TABLE answers ADD COLUMN {column} {definition}")
+        if "size" not in existing:
+            self._conn.execute("UPDATE answers SET size = length(answer) + length(sources)")
+        self._conn.commit()
+
+    def put(
+        self,
+        entry_id: str,
+        answer: str,
+        sources: List[Dict],
+        expires_at: Optional[float] = None,
+        created: Optional[float] = None
+    ):
+        """
+        Store (or replace) the answer of a cache entry
+
+        Args:
+            entry_id: Vector Cache entry id
+            answer: Full answer text
+            sources: Scraped sources (only url/title are kept)
+            expires_at: Unix time after which the entry is stale (None = never)
+            created: Unix time of the entry (None = now)
+        """
+        answer_blob = _pack(answer)
+        sources_blob = _pack(_slim_sources(sources))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO answers (id, answer, sources, created, expires_at, size) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (entry_id, answer_blob, sources_blob, created or time.time(), expires_at,
+                 len(answer_blob) + len(sources_blob))
+            )
+            self._conn.commit()
+
+    def get_many(self, entry_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Answers of several entries with one lookup
+
+        Args:
+            entry_ids: Vector Cache entry ids
+
+        Returns:
+            {entry_id: {'answer': str, 'sources': [{'url', 'title'}]}} - unknown ids are missing
+        """
+        if not entry_ids:
+            return {}
+        placeholders = ",".join("?" * len(entry_ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, answer, sources FROM answers WHERE id IN ({placeholders})",
+                list(entry_ids)
+            ).fetchall()
+
+        result = {}
+        for entry_id, answer, sources in rows:
+            try:
+                result[entry_id] = {"answer": _unpack(answer), "sources": _unpack(sources)}
+            except (zlib.error, ValueError) as e:
+                log_message(f"⚠️ Answer Store: Eintrag {entry_id} nicht lesbar: {e}")
+        return result
+
+    def get(self, entry_id: str) -> Optional[Dict]:
+        """Answer of one entry ({'answer', 'sources'}) or None"""
+        return self.get_many([entry_id]).get(entry_id)
+
+    def delete(self, entry_ids: List[str]):
+        if not entry_ids:
+            return
+        placeholders = ",".join("?" * len(entry_ids))
+        with self._lock:
+            self._conn.execute(f"DELETE FROM answers WHERE id IN ({placeholders})", list(entry_ids))
+            self._conn.commit()
+
+    def record_hits(self, entry_ids: List[str], now: Optional[float] = None):
+        """Mark entries as read (last_hit = now, hit_count + 1) for LRU eviction"""
+        if not entry_ids:
+            return
+        placeholders = ",".join("?" * len(entry_ids))
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE answers SET last_hit = ?, hit_count = hit_count + 1 WHERE id IN ({placeholders})",
+                [now or time.time(), *entry_ids]
+            )
+            self._conn.commit()
+
+    def expired_ids(self, now: Optional[float] = None) -> List[str]:
+        """Entries whose expires_at has passed"""
+        with self._lock:
+            return [row[0] for row in self._conn.execute(
+                "SELECT id FROM answers WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (now or time.time(),)
+            )]
+
+    def lru_victims(self, excess_entries: int, max_bytes: int) -> List[str]:
+        """
+        Least recently hit entries to evict until both limits hold
+
+        Args:
+            excess_entries: Entries above the entry limit (<= 0 = within limit)
+            max_bytes: Budget for the compressed answers (0 = no byte limit)
+
+        Returns:
+            Entry ids, least recently hit (or created, if never hit) first
+        """
+        with self._lock:
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM answers").fetchone()[0]
+            victims = []
+            rows = self._conn.execute(
+                "SELECT id, size FROM answers ORDER BY COALESCE(last_hit, created, 0) ASC"
+            )
+            for entry_id, size in rows:
+                if excess_entries <= 0 and (not max_bytes or total <= max_bytes):
+                    break
+                victims.append(entry_id)
+                excess_entries -= 1
+                total -= size
+        return victims
+
+    def total_bytes(self) -> int:
+        """Compressed size of all answers + source lists"""
+        with self._lock:
+            return int(self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM answers").fetchone()[0])
+
+    def ids(self) -> List[str]:
+        """All stored entry ids (orphan cleanup)"""
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT id FROM answers")]
+
+    def count(self) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0])
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM answers")
+            self._conn.commit()
+            self._conn.execute("VACUUM")
@@ -0,0 +1,160 @@
+"""
+Automatik Pre-Pass - Fused decision + intent + query optimization
+
+Replaces the three sequential Automatik calls of a research turn
+(decision_making → optimize_search_query → detect_query_intent) with ONE
+structured-output call returning validated JSON:
+
+    {"needs_search": bool, "intent": "FAKTISCH|KREATIV|GEMISCHT", "search_query": str}
+
+Enabled via AUTOMATIK_FUSED_PREPASS. Returns None on any parse/validation
+failure - callers then fall back to the existing three-step path.
+"""
+
+import json
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from .logging_utils import log_message
+from .prompt_loader import get_automatik_prepass_prompt, detect_language
+from .message_builder import build_messages_from_history
+from .intent_detector import INTENT_LABELS
+from .query_optimizer import THINK_TAG_PATTERN, add_temporal_context
+
+
+@dataclass
+class AutomatikPrepass:
+    """Validated result of the fused Automatik pre-pass"""
+    needs_search: bool
+    intent: str  # Canonical: "FAKTISCH", "KREATIV" or "GEMISCHT"
+    search_query: str  # Optimized query ("" if needs_search is False)
+    inference_time: float = 0.0
+
+
+def build_prepass_schema(lang: str) -> Dict:
+    """JSON schema for the pre-pass answer (intent labels in prompt language)"""
+    label_map = INTENT_LABELS.get(lang, INTENT_LABELS["de"])
+    return {
+        "type": "object",
+        "properties": {
+            "needs_search": {"type": "boolean"},
+            "intent": {"type": "string", "enum": list(label_map)},
+            "search_query": {"type": "string"}
+        },
+        "required": ["needs_search", "intent", "search_query"]
+    }
+
+
+def parse_prepass_response(raw: str) -> Optional[AutomatikPrepass]:
+    """
+    Parse and validate the pre-pass JSON answer
+
+    Tolerates <think> blocks and text around the JSON object (backends
+    without structured output support).
+
+    Args:
+        raw: Raw LLM answer
+
+    Returns:
+        AutomatikPrepass or None if invalid
+    """
+    text = THINK_TAG_PATTERN.sub('', raw)
+    start = text.find('{')
+    end = text.rfind('}')
+    if start < 0 or end < start:
+        return None
+
+    try:
+        data = json.loads(text[start:end + 1])
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+
+    needs_search = data.get("needs_search")
+    intent_raw = data.get("intent")
+    search_query = data.get("search_query", "")
+    if not isinstance(needs_search, bool) or not isinstance(intent_raw, str) or not isinstance(search_query, str):
+        return None
+
+    # Intent-Label (de oder en) → kanonischer Intent
+    intent = None
+    for label_map in INTENT_LABELS.values():
+        intent = label_map.get(intent_raw.strip().upper())
+        if intent:
+            break
+    if intent is None:
+        return None
+
+    # Query säubern wie optimize_search_query()
+    search_query = re.sub(r'["\'\n\r]', '', search_query)
+    search_query = ' '.join(search_query.split())
+    if needs_search:
+        if not search_query:
+            return None  # Recherche ohne Query → Fallback auf Einzel-Calls
+        search_query = add_temporal_context(search_query)
+
+    return AutomatikPrepass(needs_search=needs_search, intent=intent, search_query=search_query)
+
+
+async def run_fused_prepass(
+    user_text: str,
+    automatik_model: str,
+    history: Optional[List],
+    llm_client,
+    automatik_llm_context_limit: int
+) -> Optional[AutomatikPrepass]:
+    """
+    Decision + Intent + Query-Optimierung in EINEM Automatik-Call
+
+    Uses the last 3 turns of history (like optimize_search_query) so that
+    follow-up questions get a self-contained search query.
+
+    Args:
+        user_text: User-Frage
+        automatik_model: Automatik-LLM
+        history: Chat History (für Kontext bei Nachfragen)
+        llm_client: LLMClient instance
+        automatik_llm_context_limit: Context limit for automatik LLM
+
+    Returns:
+        AutomatikPrepass or None on failure (→ Fallback auf drei Einzel-Calls)
+    """
+    lang = detect_language(user_text)
+    prompt = get_automatik_prepass_prompt(user_text=user_text, lang=lang)
+    messages = build_messages_from_history(history or [], prompt, max_turns=3)
+
+    # Wie Query-Optimierung: History braucht Platz
+    prepass_num_ctx = min(8192, automatik_llm_context_limit)
+
+    start = time.time()
+    try:
+        log_message(f"🧩 Fused Automatik Pre-Pass mit {automatik_model} (num_ctx: {prepass_num_ctx})")
+        response = await llm_client.chat(
+            model=automatik_model,
+            messages=messages,
+            options={
+                'temperature': 0.2,  # Niedrig für konsistente Entscheidungen
+                'num_ctx': prepass_num_ctx,
+                'num_predict': 128,  # JSON mit max. 8 Keywords
+                'enable_thinking': False,
+                'json_schema': build_prepass_schema(lang)
+            }
+        )
+    except Exception as e:
+        log_message(f"⚠️ Fused Pre-Pass fehlgeschlagen: {e} → Fallback auf Einzel-Calls")
+        return None
+
+    result = parse_prepass_response(response.text)
+    if result is None:
+        log_message(f"⚠️ Fused Pre-Pass: ungültiges JSON '{response.text[:100]}' → Fallback auf Einzel-Calls")
+        return None
+
+    result.inference_time = time.time() - start
+    log_message(
+        f"✅ Fused Pre-Pass ({result.inference_time:.1f}s): needs_search={result.needs_search}, "
+        f"intent={result.intent}, query='{result.search_query}'"
+    )
+    return result
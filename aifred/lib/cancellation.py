@@ -0,0 +1,255 @@
+"""
+Cancellation - Request-scoped cancel/deadline token for the whole pipeline
+
+One CancelToken per user request (created in AIState.send_message), passed
+through chat_interactive_mode → perform_agent_research → LLMClient /
+search_web / orchestrate_scraping. Cancelling it (Stop button or deadline):
+
+- aborts the awaited step immediately (RequestCancelled is raised)
+- closes in-flight LLM streams (stream generator closed → HTTP response
+  released → generation stops on the server, GPU slot free again)
+- drops pending thread-pool futures (search APIs, scrapes) via on_cancel
+  callbacks; threads already running finish in the background, their
+  results are discarded
+
+RequestCancelled derives from BaseException on purpose: the pipeline has
+many "except Exception: continue without X" fallbacks that must not
+swallow a cancel.
+
+Usage:
+    cancel = start_request(session_id, timeout=REQUEST_DEADLINE_SECONDS)
+    try:
+        async for chunk in cancel.iterate(backend.chat_stream(...)):
+            ...
+        result = await cancel.run(some_coroutine())
+    except RequestCancelled as e:
+        ... e.reason ("stop" / "deadline")
+    finally:
+        finish_request(session_id, cancel)
+
+    # Stop button (other event handler):
+    cancel_request(session_id)
+"""
+
+import asyncio
+import contextlib
+import threading
+import time
+from typing import Any, AsyncGenerator, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from .logging_utils import log_message
+
+
+_STREAM_END = object()
+
+
+class RequestCancelled(BaseException):
+    """Request was cancelled (Stop button) or its deadline expired"""
+
+    def __init__(self, reason: str = "stop"):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class CancelToken:
+    """Cancellation + deadline of one request"""
+
+    def __init__(self, timeout: Optional[float] = None):
+        """
+        Args:
+            timeout: Deadline in seconds from now (None = no deadline)
+        """
+        self.reason: Optional[str] = None
+        self.deadline = (time.monotonic() + timeout) if timeout else None
+        self._event = asyncio.Event()
+        self._callbacks: List[Callable[[], Any]] = []
+        # on_cancel() may be called from worker threads (search/scrape executors)
+        # while cancel() runs on the event loop → check+append / swap under one lock
+        self._callbacks_lock = threading.Lock()
+        self._deadline_handle = None
+        if timeout:
+            loop = asyncio.get_running_loop()
+            self._deadline_handle = loop.call_later(timeout, self.cancel, "deadline")
+
+    @property
+    def cancelled(self) -> bool:
+        return self.reason is not None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds until the deadline (None = no deadline)"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def cancel(self, reason: str = "stop"):
+        """Cancel the request (idempotent) and run the on_cancel callbacks"""
+        with self._callbacks_lock:
+            if self.cancelled:
+                return
+            self.reason = reason
+            callbacks, self._callbacks = self._callbacks, []
+        self._event.set()
+        if self._deadline_handle is not None:
+            self._deadline_handle.cancel()
+        log_message(f"⏹️ Request abgebrochen ({reason}), {len(callbacks)} Cleanup-Callbacks")
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                log_message(f"⚠️ Cancel-Callback fehlgeschlagen: {e}")
+
+    def check(self):
+        """Raise RequestCancelled if cancelled (call between pipeline steps)"""
+        if self.cancelled:
+            raise RequestCancelled(self.reason or "stop")
+
+    def on_cancel(self, callback: Callable[[], Any]) -> Callable[[], None]:
+        """
+        Register a cleanup callback (e.g. executor.shutdown) - runs at once if already cancelled
+
+        Thread-safe: may be called from a worker thread while cancel() runs on the loop.
+
+        Returns:
+            Function that unregisters the callback (call when the resource is done)
+        """
+        with self._callbacks_lock:
+            already_cancelled = self.cancelled
+            if not already_cancelled:
+                self._callbacks.append(callback)
+        if already_cancelled:
+            callback()
+            return lambda: None
+
+        def unregister():
+            with self._callbacks_lock, contextlib.suppress(ValueError):
+                self._callbacks.remove(callback)
+        return unregister
+
+    async def run(self, awaitable: Awaitable):
+        """
+        Await `awaitable`, abort it as soon as the token is cancelled
+
+        Raises:
+            RequestCancelled: Token cancelled before the awaitable finished
+        """
+        self.check()
+        task = asyncio.ensure_future(awaitable)
+        waiter = asyncio.ensure_future(self._event.wait())
+        try:
+            await asyncio.wait({task, waiter}, return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        finally:
+            waiter.cancel()
+
+        if not task.done():
+            task.cancel()
+            # Let the task unwind (closes HTTP streams) before the caller continues
+            with contextlib.suppress(asyncio.CancelledError, Exception):
+                await task
+            raise RequestCancelled(self.reason or "stop")
+        return task.result()
+
+    async def iterate(self, stream: AsyncIterator) -> AsyncGenerator:
+        """
+        Iterate an async generator, close it as soon as the token is cancelled
+
+        The generator runs in ONE pump task (httpx/anyio locks and cancel
+        scopes must be entered and left by the same task); cancelling the
+        pump task unwinds it at its current await → HTTP stream closed.
+
+        Raises:
+            RequestCancelled: Token cancelled while streaming
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+
+        async def pump():
+            try:
+                async for item in stream:
+                    await queue.put((item, None))
+                await queue.put((_STREAM_END, None))
+            except asyncio.CancelledError:
+                raise
+            except BaseException as e:
+                await queue.put((_STREAM_END, e))
+            finally:
+                aclose = getattr(stream, "aclose", None)
+                if aclose is not None:
+                    with contextlib.suppress(Exception):
+                        await aclose()
+
+        producer = asyncio.create_task(pump())
+        try:
+            while True:
+                item, error = await self.run(queue.get())
+                if item is _STREAM_END:
+                    if error is not None:
+                        raise error
+                    return
+                yield item
+        finally:
+            if not producer.done():
+                producer.cancel()
+                with contextlib.suppress(asyncio.CancelledError, Exception):
+                    await producer
+
+    async def to_thread(self, func: Callable, *args, **kwargs):
+        """
+        Run a blocking function in a worker thread; abandon it on cancel
+
+        The thread itself can't be interrupted - it finishes in the background
+        and its result is dropped (functions taking `cancel` stop early).
+        """
+        return await self.run(asyncio.to_thread(func, *args, **kwargs))
+
+    def release(self):
+        """Drop deadline timer + callbacks (request finished normally)"""
+        if self._deadline_handle is not None:
+            self._deadline_handle.cancel()
+        self._callbacks.clear()
+
+
+async def maybe_run(cancel: Optional[CancelToken], awaitable: Awaitable):
+    """cancel.run(awaitable) - or plain await if no token is given"""
+    if cancel is None:
+        return await awaitable
+    return await cancel.run(awaitable)
+
+
+# ============================================================
+# Active requests per session (Stop button runs in another event handler)
+# ============================================================
+
+_active_requests: Dict[str, CancelToken] = {}
+
+
+def start_request(session_id: str, timeout: Optional[float] = None) -> CancelToken:
+    """Create the token of a new request (a still running one of the session is cancelled)"""
+    previous = _active_requests.get(session_id)
+    if previous is not None:
+        previous.cancel("superseded")
+    token = CancelToken(timeout=timeout)
+    _active_requests[session_id] = token
+    return token
+
+
+def cancel_request(session_id: str, reason: str = "stop") -> bool:
+    """
+    Cancel the running request of a session
+
+    Returns:
+        True if a request was running
+    """
+    token = _active_requests.get(session_id)
+    if token is None or token.cancelled:
+        return False
+    token.cancel(reason)
+    return True
+
+
+def finish_request(session_id: str, token: CancelToken):
+    """Unregister the token (only if it's still the session's current one)"""
+    token.release()
+    if _active_requests.get(session_id) is token:
+        del _active_requests[session_id]
@@ -0,0 +1,239 @@
+"""
+Cascade Router - Small vs. large model for "Eigenes Wissen" answers
+
+Without research every answer went to the Haupt-LLM, even trivial facts the
+already resident Automatik-LLM answers in a fraction of the time. The router:
+
+1. Routes by the Automatik result + query features (choose_route):
+   - intent not in CASCADE_SMALL_INTENTS (KREATIV/GEMISCHT) → large
+   - long query, large input (history/RAG), complexity markers → large
+   - otherwise → small (Automatik-LLM, thinking off)
+2. Escalates low-confidence small answers (probe_small_answer): the first
+   CASCADE_PROBE_CHARS of the answer are held back and checked for hedging
+   phrases; an empty/too short answer escalates as well. Nothing of the small
+   answer reaches the UI before the probe passed.
+3. Records latency per route (small / large / escalated) and the escalation
+   rate (get_cascade_stats) to tune the thresholds.
+
+Enabled via CASCADE_ROUTING_ENABLED.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from .logging_utils import log_message
+
+ROUTE_SMALL = "small"
+ROUTE_LARGE = "large"
+ROUTE_ESCALATED = "escalated"
+
+_THINK_BLOCK = re.compile(r'<think>.*?(</think>|$)', re.DOTALL)
+
+
+@dataclass
+class QueryFeatures:
+    """Complexity features of one query"""
+    words: int
+    input_tokens: int
+    history_turns: int
+    has_rag: bool
+    complex_markers: List[str] = field(default_factory=list)
+
+
+@dataclass
+class CascadeDecision:
+    """Route chosen for one answer"""
+    route: str  # ROUTE_SMALL or ROUTE_LARGE
+    reason: str
+    features: QueryFeatures
+
+
+def extract_features(user_text: str, input_tokens: int, history_turns: int = 0, has_rag: bool = False) -> QueryFeatures:
+    """
+    Complexity features of a query
+
+    Args:
+        user_text: User-Frage
+        input_tokens: Tokens of the complete answer prompt (system + history + RAG + query)
+        history_turns: Number of previous turns
+        has_rag: RAG context injected
+
+    Returns:
+        QueryFeatures
+    """
+    from .config import CASCADE_COMPLEX_MARKERS
+
+    text = user_text.lower()
+    return QueryFeatures(
+        words=len(user_text.split()),
+        input_tokens=input_tokens,
+        history_turns=history_turns,
+        has_rag=has_rag,
+        complex_markers=[marker for marker in CASCADE_COMPLEX_MARKERS if marker in text]
+    )
+
+
+def choose_route(features: QueryFeatures, intent: Optional[str]) -> CascadeDecision:
+    """
+    Pick small or large model
+
+    Args:
+        features: QueryFeatures of the query
+        intent: "FAKTISCH", "KREATIV", "GEMISCHT" or None (manual temperature → unknown)
+
+    Returns:
+        CascadeDecision
+    """
+    from .config import CASCADE_SMALL_INTENTS, CASCADE_MAX_QUERY_WORDS, CASCADE_MAX_INPUT_TOKENS
+
+    if intent is not None and intent not in CASCADE_SMALL_INTENTS:
+        return CascadeDecision(ROUTE_LARGE, f"Intent {intent}", features)
+    if features.complex_markers:
+        return CascadeDecision(ROUTE_LARGE, f"komplex: '{features.complex_markers[0]}'", features)
+    if features.words > CASCADE_MAX_QUERY_WORDS:
+        return CascadeDecision(ROUTE_LARGE, f"{features.words} Wörter", features)
+    if features.input_tokens > CASCADE_MAX_INPUT_TOKENS:
+        return CascadeDecision(ROUTE_LARGE, f"{features.input_tokens} Input-Tokens", features)
+    return CascadeDecision(ROUTE_SMALL, f"einfach ({intent or 'Intent unbekannt'}, {features.words} Wörter)", features)
+
+
+def _visible_text(text: str) -> str:
+    """Answer text without <think> blocks (an open block hides everything after it)"""
+    return _THINK_BLOCK.sub('', text).strip()
+
+
+def find_low_confidence(text: str, finished: bool) -> Optional[str]:
+    """
+    Low-confidence signal in (the beginning of) a small-model answer
+
+    Args:
+        text: Answer text so far
+        finished: Stream ended (enables the minimum length check)
+
+    Returns:
+        Reason string or None if the answer looks confident
+    """
+    from .config import CASCADE_HEDGE_PHRASES, CASCADE_MIN_ANSWER_CHARS
+
+    visible = _visible_text(text)
+    lowered = visible.lower()
+    for phrase in CASCADE_HEDGE_PHRASES:
+        if phrase in lowered:
+            return f"Unsicherheit: '{phrase}'"
+    if finished and len(visible) < CASCADE_MIN_ANSWER_CHARS:
+        return f"Antwort zu kurz ({len(visible)} Zeichen)"
+    return None
+
+
+async def probe_small_answer(stream: AsyncIterator[Dict]) -> AsyncIterator[Dict]:
+    """
+    Hold back the start of a small-model stream until it passed the confidence probe
+
+    Args:
+        stream: LLMClient.chat_stream() of the small model
+
+    Yields:
+        Stream chunks unchanged (content delayed until CASCADE_PROBE_CHARS visible
+        answer chars passed the probe) - or one {"type": "escalate", "reason": str}
+        chunk, after which the small stream is closed
+    """
+    from .config import CASCADE_PROBE_CHARS
+
+    buffered: List[Dict] = []
+    text = ""
+    probing = True
+
+    try:
+        async for chunk in stream:
+            if chunk["type"] == "content" and probing:
+                buffered.append(chunk)
+                text += chunk["text"]
+                reason = find_low_confidence(text, finished=False)
+                if reason:
+                    yield {"type": "escalate", "reason": reason}
+                    return
+                if len(_visible_text(text)) >= CASCADE_PROBE_CHARS:
+                    probing = False
+                    for held in buffered:
+                        yield held
+                    buffered = []
+            elif chunk["type"] == "done" and probing:
+                reason = find_low_confidence(text, finished=True)
+                if reason:
+                    yield {"type": "escalate", "reason": reason}
+                    return
+                for held in buffered:
+                    yield held
+                yield chunk
+            else:
+                yield chunk
+    finally:
+        aclose = getattr(stream, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+# ============================================================
+# Route statistics (process-wide, for threshold tuning)
+# ============================================================
+
+@dataclass
+class RouteStats:
+    """Latency counters of one route"""
+    count: int = 0
+    total_time: float = 0.0
+    total_ttft: float = 0.0
+
+    def record(self, latency: float, ttft: Optional[float]):
+        self.count += 1
+        self.total_time += latency
+        self.total_ttft += ttft or 0.0
+
+    def as_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "avg_time": self.total_time / self.count if self.count else 0.0,
+            "avg_ttft": self.total_ttft / self.count if self.count else 0.0
+        }
+
+
+_route_stats: Dict[str, RouteStats] = {
+    ROUTE_SMALL: RouteStats(),
+    ROUTE_LARGE: RouteStats(),
+    ROUTE_ESCALATED: RouteStats(),
+}
+
+
+def record_route(route: str, latency: float, ttft: Optional[float] = None):
+    """
+    Record the final route of one answer
+
+    Args:
+        route: ROUTE_SMALL, ROUTE_LARGE or ROUTE_ESCALATED (small tried, large answered)
+        latency: Answer time in seconds (escalated: incl. the discarded small attempt)
+        ttft: User-visible time to first token
+    """
+    _route_stats[route].record(latency, ttft)
+    stats = get_cascade_stats()
+    log_message(
+        f"🪜 Kaskade: Route {route} ({latency:.1f}s) | "
+        f"klein {stats[ROUTE_SMALL]['count']}× Ø{stats[ROUTE_SMALL]['avg_time']:.1f}s, "
+        f"groß {stats[ROUTE_LARGE]['count']}× Ø{stats[ROUTE_LARGE]['avg_time']:.1f}s, "
+        f"eskaliert {stats[ROUTE_ESCALATED]['count']}× Ø{stats[ROUTE_ESCALATED]['avg_time']:.1f}s "
+        f"(Rate {stats['escalation_rate']:.0%})"
+    )
+
+
+def get_cascade_stats() -> Dict:
+    """
+    Per-route latency + escalation rate
+
+    Returns:
+        Dict with "small"/"large"/"escalated" → {count, avg_time, avg_ttft}
+        and escalation_rate (escalated / all small attempts)
+    """
+    stats: Dict[str, Any] = {route: route_stats.as_dict() for route, route_stats in _route_stats.items()}
+    small_attempts = _route_stats[ROUTE_SMALL].count + _route_stats[ROUTE_ESCALATED].count
+    stats["escalation_rate"] = _route_stats[ROUTE_ESCALATED].count / small_attempts if small_attempts else 0.0
+    return stats
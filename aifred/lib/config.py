@@ -6,6 +6,7 @@ the AIfred Intelligence application.
 """
 
 from pathlib import Path
+from typing import Dict, List
 
 # ============================================================
 # PROJECT PATHS
@@ -134,6 +135,259 @@ MAX_WORDS_PER_SOURCE = 2000
 # Deutsch/Englisch Mix: ~3 Zeichen pro Token
 CHARS_PER_TOKEN = 3
 
+# ============================================================
+# TOKEN CALIBRATION (Zeichen pro Token lernen)
+# ============================================================
+# Lernt Zeichen/Token pro Modell + Sprache aus den echten Prompt-Token-Zahlen
+# der Backends, die den GANZEN Prompt melden (vLLM usage.prompt_tokens,
+# llama.cpp prompt_n + cache_n). Ollama zählt bei KV-Cache-Treffern nur den
+# neu berechneten Teil → keine Samples von Ollama. Alle Schätzungen
+# (num_ctx, History-Kompression, RAG-Context, Thinking-Budget) nutzen den
+# gelernten Wert, CHARS_PER_TOKEN bleibt Fallback bis genug Samples da sind.
+TOKEN_CALIBRATION_ENABLED = True
+TOKEN_CALIBRATION_FILE = Path.home() / ".config" / "aifred" / "token_calibration.json"
+
+# Chat-Template-Overhead pro Message (Rollen-Marker, Trennzeichen) in Tokens
+TOKEN_CALIBRATION_MESSAGE_OVERHEAD = 5
+
+# Samples mit weniger Zeichen ignorieren (Template-Overhead dominiert)
+TOKEN_CALIBRATION_MIN_CHARS = 200
+
+# Plausible Ratio-Grenzen (außerhalb → Sample verworfen)
+TOKEN_CALIBRATION_MIN_RATIO = 1.0
+TOKEN_CALIBRATION_MAX_RATIO = 5.0
+
+# Ab so vielen Samples wird der gelernte Wert verwendet
+TOKEN_CALIBRATION_MIN_SAMPLES = 3
+
+# Kalibriert: Samples mit > 50% HÖHERER Ratio verwerfen (einseitig - ein zu
+# klein gemeldeter Prompt ergibt immer eine zu hohe Ratio, niedrigere sind echt)
+TOKEN_CALIBRATION_OUTLIER_TOLERANCE = 0.5
+
+# EWMA-Gewicht neuer Samples
+TOKEN_CALIBRATION_ALPHA = 0.1
+
+# Sicherheitsabschlag auf die gelernte Ratio (schätzt ~10% mehr Tokens)
+TOKEN_CALIBRATION_SAFETY_MARGIN = 0.1
+
+# Speichern höchstens alle N Sekunden
+TOKEN_CALIBRATION_SAVE_INTERVAL = 30.0
+
+# ============================================================
+# TOKENIZER SERVICE (exakte Token-Zahlen)
+# ============================================================
+# Reihenfolge: Backend-Endpoint (vLLM/llama.cpp /tokenize) → lokaler HF-Tokenizer
+# (nur aus dem lokalen HF-Cache, im Hintergrund bei Modellwahl geladen) →
+# kalibrierte Schätzung. Nichts davon blockiert einen laufenden Turn.
+
+# Maximal gleichzeitig geladene lokale Tokenizer (LRU)
+TOKENIZER_CACHE_SIZE = 4
+
+# Timeout für Backend-Tokenize-Aufrufe (danach Fallback)
+TOKENIZER_ENDPOINT_TIMEOUT = 0.5
+
+# ============================================================
+# PROMPT LAYOUT (Prefix-Caching)
+# ============================================================
+# Prefix-stabiles Layout: Statische Instruktionen + History zuerst, volatile
+# Daten (Datum/Uhrzeit, RAG-Kontext) als System-Message direkt vor der aktuellen
+# Frage. Damit bleibt der Token-Prefix über Turns gleich → vLLM Automatic
+# Prefix Caching / Ollama + llama.cpp KV-Reuse müssen nur den neuen Turn prefillen.
+# Aus: Zeitstempel steht am Anfang jedes Prompts (bisheriges Verhalten).
+PROMPT_PREFIX_STABLE = False
+
+# Genauigkeit des Zeitstempels in Prompts: "second", "minute", "hour", "day"
+# Gröber = Automatik-Prompts bleiben länger identisch (Prefix-Cache-Treffer)
+PROMPT_TIMESTAMP_GRANULARITY = "second"
+
+# ============================================================
+# NUM_CTX STICKINESS (Ollama)
+# ============================================================
+# Ollama lädt das Modell neu, sobald sich num_ctx ändert. Sticky: Requests, die
+# in den geladenen Context passen, nutzen ihn weiter; Wachsen nur mit Hysterese,
+# innerhalb einer Session wird nie verkleinert.
+NUM_CTX_STICKY = True
+
+# Beim Wachsen mindestens Faktor × geladener Context (verhindert Reload-Kaskaden)
+NUM_CTX_GROWTH_FACTOR = 1.25
+
+# Gewachsene Größen werden auf Vielfache hiervon aufgerundet
+NUM_CTX_GROWTH_STEP = 2048
+
+# Abgleich mit /api/ps (entladene Modelle erkennen), Sekunden
+NUM_CTX_PS_TTL = 10
+
+# ============================================================
+# MODEL RESIDENCY PLANNER (Ollama)
+# ============================================================
+# Plant, ob Automatik- und Haupt-LLM gemeinsam in den VRAM passen (Gewichte +
+# KV-Cache beim erwarteten num_ctx) und setzt keep_alive + Lade-Reihenfolge.
+RESIDENCY_PLANNER_ENABLED = True
+
+# Erwartetes num_ctx, solange die num_ctx-Policy noch keinen Wert kennt
+RESIDENCY_EXPECTED_NUM_CTX = {
+    "main": 16384,
+    "automatik": 8192,  # Query-Optimierung/Pre-Pass nutzen bis 8K
+}
+
+# keep_alive für Modelle, die gemeinsam resident bleiben können
+RESIDENCY_KEEP_ALIVE = "30m"
+
+# keep_alive für das Automatik-LLM, wenn beide Modelle NICHT zusammen passen:
+# kurz genug, dass es nach der Automatik-Phase den VRAM freigibt, lang genug,
+# dass mehrere Entscheidungs-Calls einer Anfrage es nicht jedes Mal neu laden
+RESIDENCY_SWAP_KEEP_ALIVE = "30s"
+
+# Bytes pro KV-Cache-Element (f16 = 2, OLLAMA_KV_CACHE_TYPE=q8_0 → 1)
+RESIDENCY_KV_BYTES_PER_ELEMENT = 2
+
+# OLLAMA_NUM_PARALLEL des Servers (KV-Cache wird pro paralleler Anfrage reserviert)
+RESIDENCY_NUM_PARALLEL = 1
+
+# Pro Modell: Compute-Graph/CUDA-Overhead; global: Reserve für Desktop/andere Prozesse
+RESIDENCY_MODEL_OVERHEAD_MB = 600
+RESIDENCY_VRAM_RESERVE_MB = 512
+
+# ============================================================
+# REQUEST CANCELLATION (Stop-Button, Deadline)
+# ============================================================
+# Max. Dauer eines Requests (Recherche + Antwort) in Sekunden. Danach wird er
+# wie mit dem Stop-Button abgebrochen: LLM-Streams geschlossen, Such-/Scrape-
+# Threads verworfen. Fängt auch verlassene Sessions (Tab geschlossen) ab.
+# None = keine Deadline
+REQUEST_DEADLINE_SECONDS = 600
+
+# ============================================================
+# THINKING BUDGET (Reasoning-Tokens im Thinking Mode)
+# ============================================================
+# Max. Reasoning-Tokens im <think> Block, danach wird das Denken geschlossen und
+# die Antwort ohne Thinking fortgesetzt (Prefill mit dem bisherigen Denkprozess).
+# Default für die UI-Einstellung; 0 = unbegrenzt
+THINKING_BUDGET_DEFAULT = 0
+THINKING_BUDGET_MAX = 32768
+
+# ============================================================
+# CASCADE ROUTING (Eigenes Wissen: kleines vs. großes Modell)
+# ============================================================
+# Einfache "Eigenes Wissen"-Fragen beantwortet das bereits geladene
+# Automatik-LLM, komplexe/kreative das Haupt-LLM. Zeigt die kleine Antwort
+# Unsicherheit (Hedging, leer/zu kurz), wird zum Haupt-LLM eskaliert.
+CASCADE_ROUTING_ENABLED = False
+
+# Route "klein" nur für Intents aus dieser Liste (KREATIV/GEMISCHT → Haupt-LLM)
+CASCADE_SMALL_INTENTS = ["FAKTISCH"]
+
+# Komplexitäts-Grenzen für die kleine Route
+CASCADE_MAX_QUERY_WORDS = 30
+CASCADE_MAX_INPUT_TOKENS = 3000  # Inkl. History + RAG-Kontext
+
+# Hinweise auf mehrstufige/anspruchsvolle Aufgaben → Haupt-LLM (Kleinbuchstaben, Teilstring)
+CASCADE_COMPLEX_MARKERS = [
+    "```", "erkläre ausführlich", "schritt für schritt", "vergleiche", "analysiere",
+    "begründe", "beweise", "programmier", "schreibe ein", "schreib mir", "berechne",
+    "explain in detail", "step by step", "compare", "analyze", "analyse", "prove",
+    "write a", "implement", "calculate", "pros and cons", "vor- und nachteile",
+]
+
+# Eskalation: die ersten N Zeichen der kleinen Antwort werden zurückgehalten und
+# auf Unsicherheit geprüft, erst danach wird gestreamt
+CASCADE_PROBE_CHARS = 240
+CASCADE_MIN_ANSWER_CHARS = 15  # Kürzere (fertige) Antwort → Eskalation
+
+# Unsicherheits-Signale in der kleinen Antwort (Kleinbuchstaben, Teilstring)
+CASCADE_HEDGE_PHRASES = [
+    "ich weiß nicht", "ich bin mir nicht sicher", "ich bin nicht sicher", "keine informationen",
+    "kann ich nicht beantworten", "habe keinen zugriff", "nicht genau sagen",
+    "i don't know", "i do not know", "i'm not sure", "i am not sure", "not certain",
+    "i don't have information", "i cannot answer", "i can't answer", "as an ai",
+]
+
+# ============================================================
+# BACKEND TRANSPORT (Unix-Socket, HTTP/2)
+# ============================================================
+# Backend-URLs dürfen Unix-Sockets sein: unix:///run/ollama/ollama.sock oder
+# mit HTTP-Pfad unix:///run/vllm.sock:/v1 (spart TCP-Loopback pro Request).
+# HTTP/2 multiplext parallele Requests über eine Verbindung - braucht das Paket
+# 'h2' (pip install httpx[http2]) und einen Server/Proxy mit h2 via TLS (https://)
+BACKEND_HTTP2 = False
+
+# ChromaDB-Server (Vector Cache): http://host:port oder unix:///pfad/chroma.sock
+VECTOR_CACHE_URL = "http://localhost:8000"
+
+# ============================================================
+# MODEL METADATA CACHE (Context-Limits, Capabilities)
+# ============================================================
+# TTL in Sekunden für gecachte Modell-Metadaten (/api/show, /v1/models)
+# Wird zusätzlich bei Modell-Wechsel, Preload und Backend-Restart invalidiert
+MODEL_METADATA_CACHE_TTL = 600  # 10 Minuten
+
+# ============================================================
+# AUTOMATIK PRE-PASS
+# ============================================================
+# Fused Mode: EIN Structured-Output-Call liefert {needs_search, intent, search_query}
+# statt drei Automatik-Calls (Decision → Query-Optimierung → Intent-Detection).
+# Spart zwei Modell-Roundtrips pro Web-Recherche. Bei ungültigem JSON → Fallback
+# auf die drei Einzel-Calls.
+AUTOMATIK_FUSED_PREPASS = False
+
+# Spekulative Ausführung: Query-Optimierung + Intent-Detection starten PARALLEL
+# zur Entscheidung. Bei "search" werden die Ergebnisse übernommen, sonst wird
+# die Query-Optimierung abgebrochen (Intent wird auch ohne Recherche gebraucht).
+AUTOMATIK_SPECULATIVE_EXECUTION = True
+
+# Parallele Slots des Ollama-Servers - muss zu OLLAMA_NUM_PARALLEL im Environment
+# des Ollama-Dienstes passen (z.B. systemd-Unit: Environment="OLLAMA_NUM_PARALLEL=2").
+# Ollama-Default: 1. Steuert Spekulation, Admission-Slots und KV-Schätzung der Residency.
+OLLAMA_NUM_PARALLEL = 1
+
+# Max. gleichzeitige spekulative Automatik-Calls pro Backend (0 = aus)
+# vLLM/TabbyAPI: Continuous Batching → parallele Requests fast gratis
+# Ollama: nur mit OLLAMA_NUM_PARALLEL > 1 - sonst warten Entscheidungs-Call und
+# spekulative Calls (anderer num_ctx → Reload) aufeinander statt parallel zu laufen
+SPECULATIVE_MAX_CONCURRENCY = {
+    "ollama": 1 if OLLAMA_NUM_PARALLEL > 1 else 0,
+    "vllm": 4,
+    "tabbyapi": 2,
+    "llamacpp": 1,  # Spekulative Calls teilen sich den Scratch-Slot
+}
+
+# ============================================================
+# BACKEND ADMISSION CONTROL (Priority Lanes)
+# ============================================================
+# Pro Backend-URL (über alle Sessions): max. gleichzeitige Requests ans Backend.
+# reserved_high: Slots nur für High-Priority (Automatik/Klassifikation), damit
+# kurze Entscheidungs-Calls nicht hinter langen Haupt-LLM-Generierungen warten.
+# Ollama: OLLAMA_NUM_PARALLEL Slots für Haupt-Generierungen (alle Sessions)
+# + 1 reservierter High-Priority-Slot.
+BACKEND_ADMISSION_LIMITS = {
+    "ollama": {"max_in_flight": OLLAMA_NUM_PARALLEL + 1, "reserved_high": 1},
+    "vllm": {"max_in_flight": 32, "reserved_high": 4},
+    "tabbyapi": {"max_in_flight": 8, "reserved_high": 2},
+    "llamacpp": {"max_in_flight": 4, "reserved_high": 1},  # = llama-server --parallel
+    "default": {"max_in_flight": 4, "reserved_high": 1},
+}
+
+# ============================================================
+# MULTI-ENDPOINT LOAD BALANCING (PooledBackend)
+# ============================================================
+# Zusätzliche Server pro Backend-Typ. Ist die Liste nicht leer, wird die
+# Standard-URL zusammen mit diesen Endpoints als Pool betrieben (transparent
+# hinter LLMClient). Alternativ: base_url mit Komma getrennt angeben.
+# Beispiel: "ollama": ["http://gpu-box-2:11434"]
+BACKEND_POOL_EXTRA_ENDPOINTS: Dict[str, List[str]] = {
+    "ollama": [],
+    "vllm": [],
+    "tabbyapi": [],
+    "llamacpp": [],
+}
+
+# Passive Health-Ejection: Endpoint nach N Fehlern in Folge für X Sekunden aussetzen
+BACKEND_POOL_EJECT_FAILURES = 2
+BACKEND_POOL_EJECT_SECONDS = 30
+
+# Wie lange die Modell-Platzierung (/api/ps) pro Endpoint gecacht wird (Sekunden)
+BACKEND_POOL_PLACEMENT_TTL = 5
+
 # ============================================================
 # HISTORY SUMMARIZATION CONFIGURATION
 # ============================================================
@@ -186,6 +440,40 @@ CACHE_DISTANCE_DUPLICATE = 0.3  # < 0.3 = Sehr ähnlich (semantisches Duplikat,
 # RAG-Mode Distance Threshold
 CACHE_DISTANCE_RAG = 1.2  # < 1.2 = Ähnlich genug für RAG-Kontext (später implementiert)
 
+# Speicher-Backend des Vector Cache:
+# "chroma" = ChromaDB-Server (Docker, VECTOR_CACHE_URL)
+# "local"  = eingebetteter Index im Prozess (memory-mapped float32 + Log auf Disk,
+#            kein Server/Netzwerk). Migration: scripts/migrate_vector_cache.py
+VECTOR_CACHE_BACKEND = "chroma"
+VECTOR_CACHE_LOCAL_PATH = PROJECT_ROOT / "aifred_vector_index"
+
+# Antworten + Quellenlisten liegen komprimiert in einer SQLite-Datei (id → Antwort),
+# nicht in den Vektor-Metadaten: Similarity-Suchen liefern nur ids/Distanzen/kleine Metadaten
+VECTOR_CACHE_ANSWER_STORE = PROJECT_ROOT / "aifred_answer_store.db"
+
+# Embeddings der letzten N Texte merken (ein Turn: Cache-Check, RAG, add → 1× embedden)
+VECTOR_CACHE_EMBEDDING_MEMO = 16
+
+# Lokaler Eintrags-Zähler statt count()-Round-Trip pro Operation;
+# Abgleich mit dem Server höchstens alle N Sekunden (andere Prozesse, Maintenance-Tool)
+VECTOR_CACHE_COUNT_RECONCILE_INTERVAL = 300
+
+# Volatilitätsklasse der Cache-Entscheidung → Lebensdauer in Sekunden (None = unbegrenzt)
+# "daily": News/laufende Ereignisse (24h wiederverwendbar), "hourly": schnell veraltend
+CACHE_VOLATILITY_TTL = {
+    "permanent": None,
+    "daily": 24 * 3600,
+    "hourly": 3600,
+}
+
+# Größenlimit des Vector Cache: darüber werden die am längsten nicht getroffenen
+# Einträge verdrängt (LRU nach last_hit). 0 = kein Limit
+VECTOR_CACHE_MAX_ENTRIES = 5000
+VECTOR_CACHE_MAX_BYTES = 200 * 1024 * 1024  # Komprimierte Antworten im Answer Store
+
+# Hintergrund-Kompaktierung (abgelaufene Einträge löschen, Limits durchsetzen) alle N Sekunden
+VECTOR_CACHE_COMPACTION_INTERVAL = 3600
+
 # Volatile Keywords - Loaded from prompts/cache_volatile_keywords.txt
 # Diese Keywords triggern eine LLM-Entscheidung, ob trotzdem gecacht werden soll
 def _load_volatile_keywords():
@@ -2,9 +2,9 @@
 Context Manager - Token and Context Window Management
 
 Handles context limits and token estimation for LLMs:
-- Query model context limits from backends (on-demand, no caching)
+- Query model context limits from backends (cached in backend layer, TTL)
 - Calculate optimal num_ctx for requests
-- Token estimation for messages (using HuggingFace tokenizers)
+- Token estimation for messages (tokenizer service, calibrated chars/token fallback)
 - History compression (summarize_history_if_needed)
 """
 
@@ -13,6 +13,8 @@ import asyncio
 from typing import Dict, List, Optional, AsyncIterator
 from .logging_utils import log_message, console_separator
 from .prompt_loader import load_prompt
+from .token_calibration import estimate_text_tokens
+from .tokenizer_service import get_tokenizer_service
 from .config import (
     HISTORY_COMPRESSION_THRESHOLD,
     HISTORY_MESSAGES_TO_COMPRESS,
@@ -24,86 +26,46 @@ from .config import (
     HISTORY_SUMMARY_CONTEXT_LIMIT
 )
 
-# Global tokenizer cache (model_name -> tokenizer)
-_tokenizer_cache = {}
-
-
-def count_tokens_with_tokenizer(text: str, model_name: str) -> int:
-    """
-    Count tokens using HuggingFace AutoTokenizer (cached, fast after first load)
-
-    Args:
-        text: Text to tokenize
-        model_name: HuggingFace model name (e.g., "Qwen/Qwen3-8B-AWQ")
-
-    Returns:
-        int: Exact token count
-    """
-    global _tokenizer_cache
-
-    # Check cache first
-    if model_name not in _tokenizer_cache:
-        try:
-            from transformers import AutoTokenizer
-            # Load tokenizer (cached by HuggingFace after first download)
-            _tokenizer_cache[model_name] = AutoTokenizer.from_pretrained(
-                model_name,
-                trust_remote_code=True,
-                local_files_only=False  # Allow download if not cached
-            )
-            log_message(f"✅ Loaded tokenizer for {model_name}")
-        except Exception as e:
-            log_message(f"⚠️ Could not load tokenizer for {model_name}: {e}")
-            return None
-
-    try:
-        tokenizer = _tokenizer_cache[model_name]
-        tokens = tokenizer.encode(text, add_special_tokens=True)
-        return len(tokens)
-    except Exception as e:
-        log_message(f"⚠️ Tokenization failed: {e}")
-        return None
-
-
 def estimate_tokens(messages: List[Dict], model_name: Optional[str] = None) -> int:
     """
     Count tokens in messages using real tokenizer (with fallback)
 
+    Never blocks: a tokenizer that isn't loaded yet is loaded in the background
+    (tokenizer_service) and this call uses the calibrated estimate.
+
     Args:
         messages: Liste von Message-Dicts mit 'content' Key
         model_name: Optional model name for accurate tokenization
 
     Returns:
-        int: Token count (exact with tokenizer, estimated with fallback)
+        int: Token count (exact with loaded tokenizer, estimated with fallback)
     """
     # Combine all message content
     total_text = "\n".join(m['content'] for m in messages)
-    total_chars = len(total_text)
 
-    # Try real tokenizer first (if model_name provided)
+    # Try real tokenizer first (if model_name provided and already loaded)
     if model_name:
-        token_count = count_tokens_with_tokenizer(total_text, model_name)
+        token_count = get_tokenizer_service().count_tokens(total_text, model_name)
         if token_count is not None:
             return token_count
 
-    # Fallback: Conservative estimation (2.5 chars/token)
-    # This overestimates tokens by ~20% to prevent context overflow
-    return int(total_chars / 2.5)
+    # Fallback: Calibrated chars/token (learned from backend counts, with safety margin)
+    return estimate_text_tokens(total_text, model_name)
 
 
-def estimate_tokens_from_history(history: List[tuple]) -> int:
+def estimate_tokens_from_history(history: List[tuple], model_name: Optional[str] = None) -> int:
     """
     Schätzt Token-Anzahl aus Chat History (Tuple-Format)
 
     Args:
         history: Liste von (user_msg, ai_msg) Tuples
+        model_name: Optional, Modell für kalibrierte Zeichen/Token-Ratio
 
     Returns:
-        int: Geschätzte Anzahl Tokens (Faustregel: 1 Token ≈ 3.5 Zeichen für Deutsch/gemischte Texte)
+        int: Geschätzte Anzahl Tokens (kalibrierte Ratio, Fallback CHARS_PER_TOKEN)
     """
-    total_size = sum(len(user_msg) + len(ai_msg) for user_msg, ai_msg in history)
-    # 3.5 Zeichen pro Token (besser für deutsche Texte als 4)
-    return int(total_size / 3.5)
+    total_text = "\n".join(user_msg + ai_msg for user_msg, ai_msg in history)
+    return estimate_text_tokens(total_text, model_name)
 
 
 async def calculate_dynamic_num_ctx(
@@ -116,7 +78,7 @@ async def calculate_dynamic_num_ctx(
     Berechnet optimales num_ctx basierend auf Message-Größe und Model-Limit.
 
     Diese Funktion ist ZENTRAL für alle Context-Berechnungen!
-    Sie fragt das Modell-Limit direkt ab (~30ms) und berechnet optimales num_ctx.
+    Das Modell-Limit kommt aus dem Metadata-Cache (nur erster Aufruf fragt Backend ab).
 
     Die Berechnung berücksichtigt:
     1. Message-Größe × 2 (50/50 Regel: 50% Input, 50% Output)
@@ -142,7 +104,11 @@ async def calculate_dynamic_num_ctx(
         return user_num_ctx
 
     # Berechne Tokens aus Message-Größe
-    estimated_tokens = estimate_tokens(messages)  # 1 Token ≈ 3.5 Zeichen
+    # Exakt via Backend-/lokalem Tokenizer, sonst kalibrierte Schätzung (blockiert nie)
+    total_text = "\n".join(m['content'] for m in messages)
+    estimated_tokens = await llm_client.count_tokens(model_name, total_text)
+    if estimated_tokens is None:
+        estimated_tokens = estimate_text_tokens(total_text, model_name)
 
     # GENERÖSE Reserve für lange Antworten:
     # Input + 8K-16K Reserve (je nach Input-Größe)
@@ -185,7 +151,7 @@ async def calculate_dynamic_num_ctx(
     else:
         calculated_ctx = 65536  # 64K (Maximum)
 
-    # Query Model-Limit direkt vom Backend (~30ms, lädt Modell NICHT!)
+    # Model-Limit aus Metadata-Cache (erster Aufruf: Backend-Query ~30ms, lädt Modell NICHT!)
     model_limit = await llm_client.get_model_context_limit(model_name)
 
     # Clippe auf Model-Limit
@@ -242,7 +208,7 @@ async def summarize_history_if_needed(
         return
 
     # 2. Token-Estimation
-    estimated_tokens = estimate_tokens_from_history(history)
+    estimated_tokens = estimate_tokens_from_history(history, model_name)
     yield {"type": "debug", "message": f"📊 Token-Schätzung: {estimated_tokens} Tokens bei {len(history)} Messages"}
 
     # 3. Nur summarizen wenn > konfigurierten Threshold vom Context-Limit
@@ -307,7 +273,7 @@ async def summarize_history_if_needed(
     summary_start = time.time()
 
     # Token-Anzahl vor Kompression
-    tokens_before = estimate_tokens_from_history(messages_to_summarize)
+    tokens_before = estimate_tokens_from_history(messages_to_summarize, model_name)
 
     summary_text = ""
     tokens_generated = 0
@@ -388,7 +354,7 @@ async def summarize_history_if_needed(
         return  # Beende hier ohne Änderung
 
     # Berechne neue Token-Anzahl nach Kompression
-    new_tokens = estimate_tokens_from_history(new_history)
+    new_tokens = estimate_tokens_from_history(new_history, model_name)
     compression_ratio = estimated_tokens / new_tokens if new_tokens > 0 else 0
 
     log_message("✅ History erfolgreich komprimiert:")
@@ -15,14 +15,23 @@ import time
 from typing import Dict, List, Optional, AsyncIterator
 
 from .llm_client import LLMClient
+from .cancellation import CancelToken
 from .logging_utils import log_message, CONSOLE_SEPARATOR
 from .prompt_loader import get_decision_making_prompt
 from .message_builder import build_messages_from_history
-from .formatting import format_thinking_process, format_metadata
+from .formatting import format_thinking_process, format_thinking_timing, format_metadata
 # Cache system removed - will be replaced with Vector DB
 from .context_manager import estimate_tokens, calculate_dynamic_num_ctx
 from .intent_detector import detect_query_intent, get_temperature_for_intent, get_temperature_label
 from .research import perform_agent_research
+from .automatik_prepass import run_fused_prepass
+from .query_optimizer import optimize_search_query
+from .speculative import SpeculativeTasks
+from .cascade_router import (
+    ROUTE_SMALL, ROUTE_LARGE, ROUTE_ESCALATED,
+    extract_features, choose_route, probe_small_answer, record_route
+)
+from .config import AUTOMATIK_FUSED_PREPASS, CASCADE_ROUTING_ENABLED
 
 
 def format_age(seconds: float) -> str:
@@ -58,6 +67,23 @@ def format_age(seconds: float) -> str:
     return " ".join(parts)
 
 
+async def _optimize_query_for_speculation(
+    user_text: str,
+    automatik_model: str,
+    history: List,
+    automatik_llm_client
+):
+    """Query-Optimierung als eigenständige Coroutine (für SpeculativeTasks)"""
+    automatik_limit = await automatik_llm_client.get_model_context_limit(automatik_model)
+    return await optimize_search_query(
+        user_text=user_text,
+        automatik_model=automatik_model,
+        history=history,
+        llm_client=automatik_llm_client,
+        automatik_llm_context_limit=automatik_limit
+    )
+
+
 async def chat_interactive_mode(
     user_text: str,
     stt_time: float,
@@ -69,7 +95,8 @@ async def chat_interactive_mode(
     temperature: float = 0.2,
     llm_options: Optional[Dict] = None,
     backend_type: str = "ollama",
-    backend_url: Optional[str] = None
+    backend_url: Optional[str] = None,
+    cancel: Optional[CancelToken] = None
 ) -> AsyncIterator[Dict]:
     """
     Automatik-Modus: KI entscheidet selbst, ob Web-Recherche nötig ist
@@ -86,14 +113,19 @@ async def chat_interactive_mode(
         llm_options: Dict mit Ollama-Optionen (num_ctx, etc.) - Optional
         backend_type: LLM Backend ("ollama", "vllm", "tabbyapi")
         backend_url: Backend URL (optional, uses default if not provided)
+        cancel: CancelToken des Requests (optional) - Stop/Deadline bricht alle
+                LLM-Calls, Web-Suche und Scraping ab (RequestCancelled)
 
     Yields:
         Dict with: {"type": "debug"|"content"|"metrics"|"separator"|"result", ...}
     """
 
     # Initialize LLM clients with correct backend
-    llm_client = LLMClient(backend_type=backend_type, base_url=backend_url)
-    automatik_llm_client = LLMClient(backend_type=backend_type, base_url=backend_url)
+    llm_client = LLMClient(backend_type=backend_type, base_url=backend_url, session_id=session_id, cancel=cancel)
+    automatik_llm_client = LLMClient(backend_type=backend_type, base_url=backend_url, session_id=session_id, cancel=cancel)
+
+    # Speculative Automatik-Phasen (Query-Optimierung, Intent) dieses Turns
+    speculative = SpeculativeTasks(backend_type, backend_url)
 
     try:
         log_message("🤖 Automatik-Modus: KI prüft, ob Recherche nötig...")
@@ -125,7 +157,8 @@ async def chat_interactive_mode(
 
                 log_message("🔍 Checking cache for exact duplicates before web research...")
                 cache = get_cache()
-                cache_result = await cache.query(user_text, n_results=1)
+                turn_embedding = await cache.embed(user_text)  # Reused by add() after research
+                cache_result = await cache.query(user_text, n_results=1, embedding=turn_embedding)
 
                 distance = cache_result.get('distance', 1.0)
 
@@ -166,13 +199,15 @@ async def chat_interactive_mode(
 
             # Proceed with fresh web research (no exact match or error)
             yield {"type": "debug", "message": "🌐 Starting fresh web research..."}
-            async for item in perform_agent_research(user_text, stt_time, "deep", model_choice, automatik_model, history, session_id, temperature_mode, temperature, llm_options, backend_type, backend_url):
+            async for item in perform_agent_research(user_text, stt_time, "deep", model_choice, automatik_model, history, session_id, temperature_mode, temperature, llm_options, backend_type, backend_url, cancel=cancel):
                 yield item
             return  # Generator ends after forwarding all items
 
         # ============================================================
         # Phase 1: Vector Cache Check (Semantic Similarity Search)
         # ============================================================
+        # Ein Embedding + eine Suche für Direct-Hit UND RAG-Kandidaten (Phase 1b)
+        rag_candidates = None
         try:
             from .vector_cache import get_cache
 
@@ -180,7 +215,10 @@ async def chat_interactive_mode(
             yield {"type": "debug", "message": "🔍 Checking Vector Cache..."}
 
             cache = get_cache()
-            cache_result = await cache.query(user_text, n_results=1)
+            turn_embedding = await cache.embed(user_text)
+            combined = await cache.query_combined(user_text, n_rag=5, embedding=turn_embedding)
+            cache_result = combined['direct']
+            rag_candidates = combined['rag_candidates']
 
             if cache_result['source'] == 'CACHE':
                 # Cache HIT! Return cached answer
@@ -219,6 +257,20 @@ async def chat_interactive_mode(
             log_message(f"⚠️ Vector Cache error (continuing without cache): {e}")
             yield {"type": "debug", "message": f"⚠️ Cache unavailable: {e}"}
 
+        # ============================================================
+        # Speculative: Query-Optimierung + Intent parallel zu RAG-Check + Entscheidung
+        # ============================================================
+        # (nicht im Fused Mode - dort liefert der Pre-Pass beides)
+        if not AUTOMATIK_FUSED_PREPASS and speculative.enabled:
+            speculative.start("query", _optimize_query_for_speculation(user_text, automatik_model, history, automatik_llm_client))
+            if temperature_mode != 'manual':
+                speculative.start("intent", detect_query_intent(
+                    user_query=user_text,
+                    automatik_model=automatik_model,
+                    llm_client=automatik_llm_client
+                ))
+            yield {"type": "debug", "message": "⚡ Query-Optimierung + Intent spekulativ gestartet"}
+
         # ============================================================
         # Phase 1b: RAG Context Check (if direct cache miss)
         # ============================================================
@@ -233,7 +285,8 @@ async def chat_interactive_mode(
                 cache=cache,
                 automatik_llm_client=automatik_llm_client,
                 automatik_model=automatik_model,
-                max_candidates=5
+                max_candidates=5,
+                candidates=rag_candidates
             )
 
             if rag_result:
@@ -288,9 +341,7 @@ async def chat_interactive_mode(
             # ⚠️ WICHTIG: KEINE History für Decision-Making!
             messages = [{'role': 'user', 'content': decision_prompt}]
 
-            # Get model context limit (use cached value if available, otherwise query)
-            # NOTE: Cache is populated when user changes Automatik-LLM in settings
-            # TODO: Pass state._automatik_model_context_limit from caller to avoid re-querying
+            # Get model context limit (served from backend metadata cache after first query)
             automatik_limit = await automatik_llm_client.get_model_context_limit(automatik_model)
             decision_num_ctx = min(2048, automatik_limit // 2)  # Max 2048 oder 50% des Limits
 
@@ -302,35 +353,58 @@ async def chat_interactive_mode(
             log_message(f"📊 Automatik-LLM ({automatik_model}): Input ~{input_tokens} Tokens, num_ctx: {decision_num_ctx}, max: {automatik_limit}")
 
             decision_start = time.time()
-            try:
-                # Build automatik options (ALWAYS disable thinking for fast decisions!)
-                automatik_options = {
-                    'temperature': 0.2,  # Niedrig für konsistente yes/no Entscheidungen
-                    'num_ctx': decision_num_ctx,  # Dynamisch basierend auf Model
-                    'enable_thinking': False  # IMMER aus für schnelle Entscheidungen!
-                }
 
-                response = await automatik_llm_client.chat(
-                    model=automatik_model,
-                    messages=messages,
-                    options=automatik_options
+            # Optional: Fused Pre-Pass (Decision + Intent + Query in EINEM Call)
+            prepass = None
+            if AUTOMATIK_FUSED_PREPASS:
+                prepass = await run_fused_prepass(
+                    user_text=user_text,
+                    automatik_model=automatik_model,
+                    history=history,
+                    llm_client=automatik_llm_client,
+                    automatik_llm_context_limit=automatik_limit
                 )
+                if prepass is None:
+                    yield {"type": "debug", "message": "⚠️ Fused Pre-Pass ungültig → Fallback auf Einzel-Calls"}
 
-                decision = response.text.strip().lower()
-                decision_time = response.inference_time
+            if prepass is not None:
+                decision = "<search>yes</search>" if prepass.needs_search else "<search>no</search>"
+                decision_time = prepass.inference_time
+                decision_label = "Web-Recherche JA" if prepass.needs_search else "Web-Recherche NEIN"
 
-                # Parse decision result for user-friendly display
-                decision_label = "Web-Recherche JA" if ('<search>yes</search>' in decision or ('yes' in decision and '<search>context</search>' not in decision)) else "Web-Recherche NEIN"
+                yield {"type": "debug", "message": f"🧩 Decision (fused): {decision_label}, Intent: {prepass.intent} ({decision_time:.1f}s)"}
+                log_message(f"🤖 KI-Entscheidung (fused): {decision_label} ({decision_time:.1f}s)")
+            else:
+                try:
+                    # Build automatik options (classify() ALWAYS disables thinking for fast decisions!)
+                    automatik_options = {
+                        'temperature': 0.2,  # Niedrig für konsistente yes/no Entscheidungen
+                        'num_ctx': decision_num_ctx  # Dynamisch basierend auf Model
+                    }
 
-                yield {"type": "debug", "message": f"🤖 Decision: {decision_label} ({decision_time:.1f}s)"}
-                log_message(f"🤖 KI-Entscheidung: {decision_label} ({decision_time:.1f}s, raw: {decision[:50]}...)")
-            except Exception as e:
-                decision_time = time.time() - decision_start
-                log_message(f"⚠️ Automatik-Entscheidung fehlgeschlagen: {e}")
-                log_message("   Fallback: Direkte Antwort ohne Recherche")
-                yield {"type": "debug", "message": "⚠️ Decision failed, using fallback (direct answer)"}
-                # Fallback: Assume no research needed, proceed with direct LLM answer
-                decision = "no"
+                    # Constrained output: genau eine der XML-Markierungen, Stream endet sobald entschieden
+                    search_label = await automatik_llm_client.classify(
+                        model=automatik_model,
+                        prompt=decision_prompt,
+                        labels=["<search>yes</search>", "<search>no</search>"],
+                        options=automatik_options
+                    )
+
+                    decision = (search_label or "no").lower()
+                    decision_time = time.time() - decision_start
+
+                    # Parse decision result for user-friendly display
+                    decision_label = "Web-Recherche JA" if ('<search>yes</search>' in decision or ('yes' in decision and '<search>context</search>' not in decision)) else "Web-Recherche NEIN"
+
+                    yield {"type": "debug", "message": f"🤖 Decision: {decision_label} ({decision_time:.1f}s)"}
+                    log_message(f"🤖 KI-Entscheidung: {decision_label} ({decision_time:.1f}s, raw: {decision[:50]}...)")
+                except Exception as e:
+                    decision_time = time.time() - decision_start
+                    log_message(f"⚠️ Automatik-Entscheidung fehlgeschlagen: {e}")
+                    log_message("   Fallback: Direkte Antwort ohne Recherche")
+                    yield {"type": "debug", "message": "⚠️ Decision failed, using fallback (direct answer)"}
+                    # Fallback: Assume no research needed, proceed with direct LLM answer
+                    decision = "no"
 
             # ============================================================
             # Parse Entscheidung UND respektiere sie!
@@ -340,14 +414,20 @@ async def chat_interactive_mode(
                 # Debug message already yielded above (line 153)
 
                 # Start web research - Forward all yields
-                async for item in perform_agent_research(user_text, stt_time, "deep", model_choice, automatik_model, history, session_id, temperature_mode, temperature, llm_options, backend_type, backend_url):
+                async for item in perform_agent_research(user_text, stt_time, "deep", model_choice, automatik_model, history, session_id, temperature_mode, temperature, llm_options, backend_type, backend_url, prepass=prepass, speculative=speculative, cancel=cancel):
                     yield item
+
+                if speculative.saved_time > 0:
+                    yield {"type": "debug", "message": f"⚡ Spekulative Ausführung: {speculative.saved_time:.1f}s gespart"}
                 return
 
             # Note: 'context' decision removed - cache system will be replaced with Vector DB
 
             else:
                 log_message("❌ KI entscheidet: Eigenes Wissen ausreichend → Kein Agent")
+
+                # Spekulative Query-Optimierung wird nicht gebraucht
+                speculative.cancel("query")
                 # Debug message already yielded above (line 153)
 
                 # Clear progress - keine Web-Recherche nötig, zeige LLM-Phase
@@ -357,13 +437,17 @@ async def chat_interactive_mode(
                 preload_start = time.time()
 
                 # Jetzt normale Inferenz MIT Zeitmessung
-                # Build messages from history (all turns)
-                messages = build_messages_from_history(history, user_text)
+                # Minimal system prompt with timestamp (prefix-stable mode: timestamp behind the history)
+                from .prompt_loader import load_system_prompt
+                system_prompt_minimal, volatile_context = load_system_prompt('system_minimal', lang=detected_user_language)
 
-                # Inject minimal system prompt with timestamp (from load_prompt - automatically includes date/time)
-                from .prompt_loader import load_prompt
-                system_prompt_minimal = load_prompt('system_minimal', lang=detected_user_language)
-                messages.insert(0, {"role": "system", "content": system_prompt_minimal})
+                # Build messages from history (all turns)
+                messages = build_messages_from_history(
+                    history,
+                    user_text,
+                    system_prompt=system_prompt_minimal,
+                    volatile_context=volatile_context
+                )
 
                 # If RAG context available, inject as additional system message
                 if rag_context:
@@ -388,116 +472,180 @@ Nutze diese Informationen ZUSÄTZLICH zu deinem Trainingswissen, wenn sie für d
                 # Count actual input tokens (using real tokenizer)
                 input_tokens = estimate_tokens(messages, model_name=model_choice)
 
-                # Dynamische num_ctx Berechnung für Eigenes Wissen (Haupt-LLM)
-                final_num_ctx = await calculate_dynamic_num_ctx(llm_client, model_choice, messages, llm_options)
-
-                # Get model max context for compact display
-                model_limit = await llm_client.get_model_context_limit(model_choice)
-
-                # Actual model preloading (only for Ollama - vLLM/TabbyAPI keep models in VRAM)
-                if backend_type == "ollama":
-                    yield {"type": "debug", "message": f"🚀 Haupt-LLM ({model_choice}) wird vorgeladen..."}
-
-                    # Preload via backend (measures actual model loading time)
-                    success, load_time = await llm_client._get_backend().preload_model(model_choice)
-
-                    if success:
-                        yield {"type": "debug", "message": f"✅ Haupt-LLM vorgeladen ({load_time:.1f}s)"}
-                        log_message(f"✅ Haupt-LLM vorgeladen ({load_time:.1f}s)")
-                    else:
-                        yield {"type": "debug", "message": f"⚠️ Haupt-LLM Preload fehlgeschlagen ({load_time:.1f}s)"}
-                        log_message(f"⚠️ Haupt-LLM Preload fehlgeschlagen ({load_time:.1f}s)")
-                else:
-                    # vLLM/TabbyAPI: Model bereits in VRAM, zeige nur Vorbereitungszeit
-                    prep_time = time.time() - preload_start
-                    yield {"type": "debug", "message": f"🚀 Haupt-LLM ({model_choice}) wird vorgeladen..."}
-                    yield {"type": "debug", "message": f"✅ Haupt-LLM vorgeladen ({prep_time:.1f}s)"}
-                    log_message(f"✅ Haupt-LLM vorgeladen ({prep_time:.1f}s - vorbereitung)")
-
-                yield {"type": "debug", "message": "✅ System-Prompt erstellt"}
-
-                # Show compact context info (like Automatik-LLM and Web-Recherche)
-                yield {"type": "debug", "message": f"📊 Haupt-LLM: {input_tokens} / {final_num_ctx} Tokens (max: {model_limit})"}
-                log_message(f"📊 Haupt-LLM ({model_choice}): Input ~{input_tokens} Tokens, num_ctx: {final_num_ctx}, max: {model_limit}")
-
                 # Temperature entscheiden: Manual Override oder Auto (Intent-Detection)
+                answer_intent = None
                 if temperature_mode == 'manual':
                     final_temperature = temperature
                     log_message(f"🌡️ Eigenes Wissen Temperature: {final_temperature} (MANUAL OVERRIDE)")
                     yield {"type": "debug", "message": f"🌡️ Temperature: {final_temperature} (manual)"}
+                elif prepass is not None:
+                    # Auto: Intent bereits aus Fused Pre-Pass bekannt
+                    answer_intent = prepass.intent
+                    final_temperature = get_temperature_for_intent(prepass.intent)
+                    temp_label = get_temperature_label(prepass.intent)
+                    log_message(f"🌡️ Eigenes Wissen Temperature: {final_temperature} (Intent: {prepass.intent}, fused)")
+                    yield {"type": "debug", "message": f"🌡️ Temperature: {final_temperature} (auto, {temp_label}, fused)"}
                 else:
                     # Auto: Intent-Detection für Eigenes Wissen
                     intent_start = time.time()
                     log_message("🎯 Starting Intent-Detection...")
                     yield {"type": "debug", "message": "🎯 Intent-Detection läuft..."}
 
-                    own_knowledge_intent = await detect_query_intent(
-                        user_query=user_text,
-                        automatik_model=automatik_model,
-                        llm_client=automatik_llm_client
-                    )
+                    if speculative.has("intent"):
+                        own_knowledge_intent = await speculative.take("intent")
+                    else:
+                        own_knowledge_intent = await detect_query_intent(
+                            user_query=user_text,
+                            automatik_model=automatik_model,
+                            llm_client=automatik_llm_client
+                        )
                     intent_time = time.time() - intent_start
+                    answer_intent = own_knowledge_intent
 
                     final_temperature = get_temperature_for_intent(own_knowledge_intent)
                     temp_label = get_temperature_label(own_knowledge_intent)
                     log_message(f"🌡️ Eigenes Wissen Temperature: {final_temperature} (Intent: {own_knowledge_intent}, {intent_time:.1f}s)")
                     yield {"type": "debug", "message": f"🌡️ Temperature: {final_temperature} (auto, {temp_label}, {intent_time:.1f}s)"}
 
-                # Console: LLM starts
-                yield {"type": "debug", "message": f"🤖 Haupt-LLM startet: {model_choice}"}
+                # Kaskade: einfache Fragen beantwortet das (bereits geladene) Automatik-LLM
+                route = ROUTE_LARGE
+                cascade_active = CASCADE_ROUTING_ENABLED and bool(automatik_model) and automatik_model != model_choice
+                if cascade_active:
+                    features = extract_features(user_text, input_tokens, history_turns=len(history), has_rag=bool(rag_context))
+                    cascade = choose_route(features, answer_intent)
+                    route = cascade.route
+                    route_label = "Automatik-LLM" if route == ROUTE_SMALL else "Haupt-LLM"
+                    log_message(f"🪜 Kaskade: {route_label} ({cascade.reason})")
+                    yield {"type": "debug", "message": f"🪜 Kaskade: {route_label} ({cascade.reason})"}
+
+                if route == ROUTE_SMALL:
+                    answer_model, answer_client, llm_label = automatik_model, automatik_llm_client, "Automatik-LLM"
+                else:
+                    answer_model, answer_client, llm_label = model_choice, llm_client, "Haupt-LLM"
+                answer_start = time.time()
 
-                # Build main LLM options (include enable_thinking from user settings)
-                main_llm_options = {
-                    'temperature': final_temperature,  # Adaptive oder Manual Temperature!
-                    'num_ctx': final_num_ctx  # Dynamisch berechnet oder User-Vorgabe
-                }
+                while True:
+                    input_tokens = estimate_tokens(messages, model_name=answer_model)
+
+                    # Dynamische num_ctx Berechnung für Eigenes Wissen
+                    final_num_ctx = await calculate_dynamic_num_ctx(answer_client, answer_model, messages, llm_options)
+
+                    # Get model max context for compact display
+                    model_limit = await answer_client.get_model_context_limit(answer_model)
 
-                # Add enable_thinking if provided in llm_options (user toggle)
-                if llm_options and 'enable_thinking' in llm_options:
-                    main_llm_options['enable_thinking'] = llm_options['enable_thinking']
-
-                # Zeit messen für finale Inferenz - STREAM response
-                inference_start = time.time()
-                ai_text = ""
-                metrics = {}
-                ttft = None
-                first_token_received = False
-
-                async for chunk in llm_client.chat_stream(
-                    model=model_choice,
-                    messages=messages,
-                    options=main_llm_options
-                ):
-                    if chunk["type"] == "content":
-                        # Measure TTFT
-                        if not first_token_received:
-                            ttft = time.time() - inference_start
-                            first_token_received = True
-                            log_message(f"⚡ TTFT (Time-to-First-Token): {ttft:.2f}s")
-                            yield {"type": "debug", "message": f"⚡ TTFT: {ttft:.2f}s"}
-
-                        ai_text += chunk["text"]
-                        yield {"type": "content", "text": chunk["text"]}
-                    elif chunk["type"] == "debug":
-                        # Forward debug messages from backend (e.g., thinking mode retry warning)
-                        yield chunk
-                    elif chunk["type"] == "thinking_warning":
-                        # Forward thinking mode warning (model doesn't support reasoning)
-                        yield chunk
-                    elif chunk["type"] == "done":
-                        metrics = chunk["metrics"]
-
-                inference_time = time.time() - inference_start
+                    # Actual model preloading (only for Ollama - vLLM/TabbyAPI keep models in VRAM)
+                    if backend_type == "ollama":
+                        yield {"type": "debug", "message": f"🚀 {llm_label} ({answer_model}) wird vorgeladen..."}
+
+                        # Preload via backend (measures actual model loading time)
+                        success, load_time = await answer_client.preload_model(answer_model)
+
+                        if success:
+                            yield {"type": "debug", "message": f"✅ {llm_label} vorgeladen ({load_time:.1f}s)"}
+                            log_message(f"✅ {llm_label} vorgeladen ({load_time:.1f}s)")
+                        else:
+                            yield {"type": "debug", "message": f"⚠️ {llm_label} Preload fehlgeschlagen ({load_time:.1f}s)"}
+                            log_message(f"⚠️ {llm_label} Preload fehlgeschlagen ({load_time:.1f}s)")
+                    else:
+                        # vLLM/TabbyAPI: Model bereits in VRAM, zeige nur Vorbereitungszeit
+                        prep_time = time.time() - preload_start
+                        yield {"type": "debug", "message": f"🚀 {llm_label} ({answer_model}) wird vorgeladen..."}
+                        yield {"type": "debug", "message": f"✅ {llm_label} vorgeladen ({prep_time:.1f}s)"}
+                        log_message(f"✅ {llm_label} vorgeladen ({prep_time:.1f}s - vorbereitung)")
+
+                    yield {"type": "debug", "message": "✅ System-Prompt erstellt"}
+
+                    # Show compact context info (like Automatik-LLM and Web-Recherche)
+                    yield {"type": "debug", "message": f"📊 {llm_label}: {input_tokens} / {final_num_ctx} Tokens (max: {model_limit})"}
+                    num_ctx_stats = answer_client.get_num_ctx_stats()
+                    if num_ctx_stats:
+                        yield {"type": "debug", "message": f"📦 num_ctx Reloads: {num_ctx_stats['reloads_avoided']} vermieden / {num_ctx_stats['reloads_forced']} erzwungen"}
+                    log_message(f"📊 {llm_label} ({answer_model}): Input ~{input_tokens} Tokens, num_ctx: {final_num_ctx}, max: {model_limit}")
+
+                    # Console: LLM starts
+                    yield {"type": "debug", "message": f"🤖 {llm_label} startet: {answer_model}"}
+
+                    # Build main LLM options (include enable_thinking from user settings)
+                    main_llm_options = {
+                        'temperature': final_temperature,  # Adaptive oder Manual Temperature!
+                        'num_ctx': final_num_ctx  # Dynamisch berechnet oder User-Vorgabe
+                    }
+
+                    # Add enable_thinking if provided in llm_options (user toggle)
+                    # Kaskade klein: kein Thinking - die schnelle Antwort ist der Sinn der Route
+                    if route == ROUTE_SMALL:
+                        main_llm_options['enable_thinking'] = False
+                    else:
+                        if llm_options and 'enable_thinking' in llm_options:
+                            main_llm_options['enable_thinking'] = llm_options['enable_thinking']
+                        if llm_options and llm_options.get('thinking_budget'):
+                            main_llm_options['thinking_budget'] = llm_options['thinking_budget']
+
+                    # Zeit messen für finale Inferenz - STREAM response
+                    inference_start = time.time()
+                    ai_text = ""
+                    metrics = {}
+                    ttft = None
+                    first_token_received = False
+                    escalation = None
+
+                    stream = answer_client.chat_stream(
+                        model=answer_model,
+                        messages=messages,
+                        options=main_llm_options
+                    )
+                    if route == ROUTE_SMALL:
+                        # Antwort-Anfang zurückhalten bis die Unsicherheits-Prüfung bestanden ist
+                        stream = probe_small_answer(stream)
+
+                    async for chunk in stream:
+                        if chunk["type"] == "content":
+                            # Measure TTFT
+                            if not first_token_received:
+                                ttft = time.time() - inference_start
+                                first_token_received = True
+                                log_message(f"⚡ TTFT (Time-to-First-Token): {ttft:.2f}s")
+                                yield {"type": "debug", "message": f"⚡ TTFT: {ttft:.2f}s"}
+
+                            ai_text += chunk["text"]
+                            yield {"type": "content", "text": chunk["text"]}
+                        elif chunk["type"] == "debug":
+                            # Forward debug messages from backend (e.g., thinking mode retry warning)
+                            yield chunk
+                        elif chunk["type"] == "thinking_warning":
+                            # Forward thinking mode warning (model doesn't support reasoning)
+                            yield chunk
+                        elif chunk["type"] == "escalate":
+                            escalation = chunk["reason"]
+                        elif chunk["type"] == "done":
+                            metrics = chunk["metrics"]
+
+                    inference_time = time.time() - inference_start
+
+                    if escalation is None:
+                        break
+
+                    # Kleine Antwort unsicher → verwerfen (wurde nicht angezeigt), Haupt-LLM antwortet
+                    log_message(f"⬆️ Kaskade: Eskalation zu {model_choice} ({escalation}, {inference_time:.1f}s verworfen)")
+                    yield {"type": "debug", "message": f"⬆️ Kaskade: Eskalation zum Haupt-LLM ({escalation})"}
+                    route = ROUTE_ESCALATED
+                    answer_model, answer_client, llm_label = model_choice, llm_client, "Haupt-LLM"
+                    preload_start = time.time()
+
+                if cascade_active:
+                    # Latenz inkl. verworfenem Kleinversuch, TTFT wie vom User erlebt
+                    visible_ttft = (inference_start - answer_start + ttft) if ttft is not None else None
+                    record_route(route, time.time() - answer_start, visible_ttft)
 
                 # Console: LLM finished
                 tokens_generated = metrics.get("tokens_generated", 0)
                 tokens_per_sec = metrics.get("tokens_per_second", 0)
-                yield {"type": "debug", "message": f"✅ Haupt-LLM fertig ({inference_time:.1f}s, {tokens_generated} tokens, {tokens_per_sec:.1f} tok/s)"}
+                yield {"type": "debug", "message": f"✅ {llm_label} fertig ({inference_time:.1f}s, {tokens_generated} tokens, {tokens_per_sec:.1f} tok/s{format_thinking_timing(metrics)})"}
 
                 # Separator als letztes Element in der Debug Console
 
                 # Formatiere <think> Tags als Collapsible für Chat History (sichtbar als Collapsible!)
-                thinking_html = format_thinking_process(ai_text, model_name=model_choice, inference_time=inference_time)
+                thinking_html = format_thinking_process(ai_text, model_name=answer_model, inference_time=inference_time)
 
                 # User-Text mit Timing (Entscheidungszeit + Inferenzzeit)
                 if stt_time > 0:
@@ -514,6 +662,10 @@ Nutze diese Informationen ZUSÄTZLICH zu deinem Trainingswissen, wenn sie für d
                     source_label = "LLM (mit History)"
                 else:
                     source_label = "LLM"
+                if route == ROUTE_SMALL:
+                    source_label += f", Kaskade: {answer_model}"
+                elif route == ROUTE_ESCALATED:
+                    source_label += ", Kaskade: eskaliert"
 
                 metadata = format_metadata(f"(Inferenz: {inference_time:.1f}s, Quelle: {source_label})")
                 ai_with_source = f"{thinking_html} {metadata}"
@@ -532,6 +684,9 @@ Nutze diese Informationen ZUSÄTZLICH zu deinem Trainingswissen, wenn sie für d
                 # Yield final result: ai_with_source für AI-Antwort + History (mit Quelle!)
                 yield {"type": "result", "data": (ai_with_source, history, inference_time)}
 
+                if speculative.saved_time > 0:
+                    yield {"type": "debug", "message": f"⚡ Spekulative Ausführung: {speculative.saved_time:.1f}s gespart"}
+
         except Exception as e:
             log_message(f"⚠️ Fehler bei Automatik-Modus Entscheidung: {e}")
             log_message("   Fallback zu Eigenes Wissen")
@@ -544,6 +699,7 @@ Nutze diese Informationen ZUSÄTZLICH zu deinem Trainingswissen, wenn sie für d
         # Fallback: Verwende standard chat function (muss importiert werden in main)
         raise  # Re-raise to be handled by caller
     finally:
-        # Cleanup: Close LLM clients to free resources
+        # Cleanup: Cancel unused speculative tasks, close LLM clients
+        speculative.cancel_all()
         await llm_client.close()
         await automatik_llm_client.close()
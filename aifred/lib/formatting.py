@@ -37,6 +37,43 @@ def format_metadata(metadata_text: str) -> str:
     return f'<span style="font-size: 0.85em; color: #bbb;">{text}</span>'
 
 
+def format_thinking_timing(metrics: dict) -> str:
+    """
+    Formatiert Denk- vs. Antwortzeit für die "Haupt-LLM fertig" Debug-Zeile.
+
+    Args:
+        metrics: "done" Metrics eines Streams (thinking_time, answer_time, thinking_truncated)
+
+    Returns:
+        z.B. ", 🧠 Denken 12.3s / Antwort 4.1s" oder "" (kein Denkprozess)
+    """
+    thinking_time = metrics.get("thinking_time")
+    if not thinking_time:
+        return ""
+    budget_note = " (Budget erreicht)" if metrics.get("thinking_truncated") else ""
+    return f", 🧠 Denken {thinking_time:.1f}s{budget_note} / Antwort {metrics.get('answer_time', 0.0):.1f}s"
+
+
+def format_stream_metrics(metrics: dict) -> str:
+    """
+    Formatiert die Streaming-Metriken (StreamMetrics) für das Log.
+
+    Args:
+        metrics: "done" Metrics eines Streams
+
+    Returns:
+        z.B. "📈 qwen3:8b: 812 → 256 Tokens, TTFT/Prefill 0.41s, Decode 6.20s (41.1 tok/s), ITL p50/p90/p99 23/31/58 ms"
+    """
+    estimated = " (geschätzt)" if metrics.get("tokens_estimated") else ""
+    return (
+        f"📈 {metrics.get('model', '?')}: {metrics.get('tokens_prompt', 0)} → {metrics.get('tokens_generated', 0)} Tokens{estimated}, "
+        f"TTFT/Prefill {metrics.get('ttft', 0.0):.2f}s, Decode {metrics.get('decode_time', 0.0):.2f}s "
+        f"({metrics.get('tokens_per_second', 0.0):.1f} tok/s), "
+        f"ITL p50/p90/p99 {metrics.get('itl_p50', 0.0) * 1000:.0f}/{metrics.get('itl_p90', 0.0) * 1000:.0f}/"
+        f"{metrics.get('itl_p99', 0.0) * 1000:.0f} ms"
+    )
+
+
 def get_timestamp() -> str:
     """
     Gibt aktuellen Timestamp im Format HH:MM:SS zurück (wie Legacy-Version).
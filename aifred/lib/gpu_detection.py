@@ -291,6 +291,11 @@ def detect_gpu() -> Optional[GPUInfo]:
     return _detector.detect()
 
 
+def get_gpu_info() -> Optional[GPUInfo]:
+    """Cached GPU info (detects on first call)"""
+    return _detector.gpu_info or _detector.detect()
+
+
 def is_backend_compatible(backend: str) -> bool:
     """Convenience function to check backend compatibility"""
     return _detector.is_backend_compatible(backend)
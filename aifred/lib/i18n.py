@@ -29,6 +29,7 @@ class TranslationManager:
             "choose_research_mode": "Wähle, wie der Assistant Fragen beantwortet",
             "send_text": "💬 Text senden",
             "clear_chat": "🗑️ Chat löschen",
+            "stop_generation": "⏹️ Stopp",
             "llm_parameters": "⚙️ LLM-Parameter (Erweitert)",
             "temperature": "🌡️ Temperature",
             "current": "Aktuell:",
@@ -112,6 +113,7 @@ class TranslationManager:
             "choose_research_mode": "Choose how the assistant answers questions",
             "send_text": "💬 Send Text",
             "clear_chat": "🗑️ Clear Chat",
+            "stop_generation": "⏹️ Stop",
             "llm_parameters": "⚙️ LLM Parameters (Advanced)",
             "temperature": "🌡️ Temperature",
             "current": "Current:",
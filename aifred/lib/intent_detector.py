@@ -11,6 +11,30 @@ from .logging_utils import log_message
 from .prompt_loader import get_intent_detection_prompt, get_followup_intent_prompt
 
 
+# Antwort-Labels der Intent-Prompts pro Sprache → kanonischer Intent
+INTENT_LABELS = {
+    "de": {"FAKTISCH": "FAKTISCH", "KREATIV": "KREATIV", "GEMISCHT": "GEMISCHT"},
+    "en": {"FACTUAL": "FAKTISCH", "CREATIVE": "KREATIV", "MIXED": "GEMISCHT"},
+}
+
+
+async def _classify_intent(prompt: str, lang: str, automatik_model: str, llm_client, context: str) -> str:
+    """Constrained Intent-Klassifikation (Label-Set passend zur Prompt-Sprache)"""
+    label_map = INTENT_LABELS.get(lang, INTENT_LABELS["de"])
+    label = await llm_client.classify(
+        model=automatik_model,
+        prompt=prompt,
+        labels=list(label_map),
+        options={
+            'temperature': 0.2,  # Niedrig für konsistente Intent-Detection
+            'num_ctx': 4096  # Standard Context für Intent-Detection
+        }
+    )
+    if label is None:
+        return parse_intent_from_response("", context=context)
+    return label_map[label]
+
+
 def parse_intent_from_response(intent_raw: str, context: str = "general") -> str:
     """
     Extrahiert Intent aus LLM-Antwort (auch wenn LLM mehr Text schreibt)
@@ -64,18 +88,7 @@ async def detect_query_intent(
     try:
         log_message(f"🎯 Intent-Detection für Query: {user_query[:60]}...")
 
-        response = await llm_client.chat(
-            model=automatik_model,
-            messages=[{'role': 'user', 'content': prompt}],
-            options={
-                'temperature': 0.2,  # Niedrig für konsistente Intent-Detection
-                'num_ctx': 4096,  # Standard Context für Intent-Detection
-                'enable_thinking': False  # Fast decisions, no reasoning needed
-            }
-        )
-        intent_raw = response.text
-
-        intent = parse_intent_from_response(intent_raw, context="general")
+        intent = await _classify_intent(prompt, detected_user_language, automatik_model, llm_client, context="general")
         log_message(f"✅ Intent erkannt: {intent}")
         return intent
 
@@ -116,18 +129,7 @@ async def detect_cache_followup_intent(
     try:
         log_message(f"🎯 Cache-Followup Intent-Detection mit {automatik_model}: {followup_query[:60]}...")
 
-        response = await llm_client.chat(
-            model=automatik_model,
-            messages=[{'role': 'user', 'content': prompt}],
-            options={
-                'temperature': 0.2,
-                'num_ctx': 4096,
-                'enable_thinking': False  # Fast decisions, no reasoning needed
-            }
-        )
-        intent_raw = response.text
-
-        intent = parse_intent_from_response(intent_raw, context="cache_followup")
+        intent = await _classify_intent(prompt, detected_user_language, automatik_model, llm_client, context="cache_followup")
         log_message(f"✅ Cache-Followup Intent ({automatik_model}): {intent}")
         return intent
 
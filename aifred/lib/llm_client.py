@@ -5,9 +5,15 @@ Provides async chat completions (streaming and non-streaming)
 with proper integration into the existing Backend system.
 """
 
-from typing import Dict, List, Optional, AsyncIterator, Union, Any, cast
-from ..backends import BackendFactory
-from ..backends.base import LLMMessage, LLMOptions, LLMResponse
+from typing import Dict, List, Optional, AsyncGenerator, AsyncIterator, Union, Any, cast
+from ..backends import BackendRegistry
+from ..backends.base import LLMBackend, LLMMessage, LLMOptions, LLMResponse
+from ..backends.metadata_cache import ModelMetadata
+from ..backends.scheduler import PRIORITY_HIGH, PRIORITY_LOW
+from .cancellation import CancelToken, maybe_run
+from .formatting import format_stream_metrics
+from .logging_utils import log_message
+from .token_calibration import observe_prompt
 
 
 class LLMClient:
@@ -30,7 +36,9 @@ class LLMClient:
     def __init__(
         self,
         backend_type: str = "ollama",
-        base_url: Optional[str] = None
+        base_url: Optional[str] = None,
+        session_id: Optional[str] = None,
+        cancel: Optional[CancelToken] = None
     ):
         """
         Initialize LLM client
@@ -38,21 +46,56 @@ class LLMClient:
         Args:
             backend_type: "ollama", "vllm", etc.
             base_url: Override default backend URL
+            session_id: Sticky routing key for pooled (multi-endpoint) backends
+            cancel: Request cancel/deadline token - cancelling it aborts running
+                    calls and closes open streams (RequestCancelled is raised)
         """
         self.backend_type = backend_type
         self.base_url = base_url
+        self.session_id = session_id
+        self.cancel = cancel
         # Cache backend instance to prevent premature GC during async operations
-        self._backend = None
+        self._backend: Optional[LLMBackend] = None
+
+    def _get_backend(self) -> LLMBackend:
+        """
+        Get shared backend instance from the process-wide BackendRegistry
 
-    def _get_backend(self):
-        """Get or create backend instance (cached to prevent GC during async ops)"""
+        The backend (and its keep-alive connection pool) is shared across all
+        LLMClient instances and sessions with the same backend_type/base_url.
+        """
         if self._backend is None:
-            self._backend = BackendFactory.create(
+            self._backend = BackendRegistry.get(
                 self.backend_type,
                 base_url=self.base_url
             )
         return self._backend
 
+    @staticmethod
+    def _build_options(options: Optional[Dict], affinity_key: Optional[str] = None) -> LLMOptions:
+        """Convert options dict to LLMOptions (defaults for missing keys)"""
+        if options and isinstance(options, dict):
+            return LLMOptions(
+                affinity_key=affinity_key,
+                temperature=options.get("temperature", 0.2),
+                num_ctx=options.get("num_ctx"),
+                num_predict=options.get("num_predict"),
+                repeat_penalty=options.get("repeat_penalty", 1.1),
+                top_p=options.get("top_p", 0.9),
+                top_k=options.get("top_k", 40),
+                seed=options.get("seed"),
+                enable_thinking=options.get("enable_thinking"),
+                thinking_budget=options.get("thinking_budget"),
+                stop=options.get("stop"),
+                choices=options.get("choices"),
+                json_schema=options.get("json_schema")
+            )
+        return LLMOptions(affinity_key=affinity_key)
+
+    def _cancellable(self, stream: AsyncGenerator[Dict, None]) -> AsyncGenerator[Dict, None]:
+        """Bind a backend stream to the cancel token (closed on cancel)"""
+        return self.cancel.iterate(stream) if self.cancel is not None else stream
+
     async def __aenter__(self):
         """Async context manager entry - enables 'async with LLMClient() as client:' usage"""
         return self
@@ -75,6 +118,7 @@ class LLMClient:
             model: Model name
             messages: List of messages (dict or LLMMessage)
             options: Generation options (dict or LLMOptions)
+                     'priority': "high" (default, Automatik/utility calls) or "low"
 
         Returns:
             LLMResponse with complete text and metrics
@@ -90,23 +134,15 @@ class LLMClient:
             converted_messages = cast(List[LLMMessage], messages)
 
         # Convert dict to LLMOptions if needed
-        llm_options: LLMOptions
-        if options and isinstance(options, dict):
-            llm_options = LLMOptions(
-                temperature=options.get("temperature", 0.2),
-                num_ctx=options.get("num_ctx"),
-                num_predict=options.get("num_predict"),
-                repeat_penalty=options.get("repeat_penalty", 1.1),
-                top_p=options.get("top_p", 0.9),
-                top_k=options.get("top_k", 40),
-                seed=options.get("seed"),
-                enable_thinking=options.get("enable_thinking")
-            )
-        else:
-            llm_options = LLMOptions()
+        llm_options = self._build_options(options, affinity_key=self.session_id)
 
         # NOTE: Backend is cached in self._backend to prevent GC during async operations
-        response = await backend.chat(model, converted_messages, llm_options)
+        priority = (options or {}).get("priority", PRIORITY_HIGH)
+        response = await maybe_run(
+            self.cancel,
+            backend.scheduled_chat(model, converted_messages, llm_options, priority=priority)
+        )
+        await observe_prompt(model, converted_messages, response.tokens_prompt_total)
         return response
 
 
@@ -123,6 +159,7 @@ class LLMClient:
             model: Model name
             messages: List of messages (dict or LLMMessage)
             options: Generation options (dict)
+                     'priority': "low" (default, main generations) or "high"
 
         Yields:
             Dict with either:
@@ -140,31 +177,99 @@ class LLMClient:
             converted_messages = cast(List[LLMMessage], messages)
 
         # Convert dict to LLMOptions if needed
-        llm_options: LLMOptions
-        if options and isinstance(options, dict):
-            llm_options = LLMOptions(
-                temperature=options.get("temperature", 0.2),
-                num_ctx=options.get("num_ctx"),
-                num_predict=options.get("num_predict"),
-                repeat_penalty=options.get("repeat_penalty", 1.1),
-                top_p=options.get("top_p", 0.9),
-                top_k=options.get("top_k", 40),
-                seed=options.get("seed"),
-                enable_thinking=options.get("enable_thinking")
-            )
-        else:
-            llm_options = LLMOptions()
+        llm_options = self._build_options(options, affinity_key=self.session_id)
 
         # NOTE: Backend is cached in self._backend to prevent GC during async operations
-        async for chunk in backend.chat_stream(model, converted_messages, llm_options):
-            yield chunk
+        priority = (options or {}).get("priority", PRIORITY_LOW)
+        stream = self._cancellable(
+            backend.scheduled_chat_stream(model, converted_messages, llm_options, priority=priority)
+        )
+        try:
+            async for chunk in stream:
+                if chunk["type"] == "done":
+                    log_message(format_stream_metrics(chunk["metrics"]))
+                    # Thinking-budget restarts send a longer prompt (prefill) → no sample
+                    if not chunk["metrics"].get("thinking_truncated"):
+                        await observe_prompt(model, converted_messages, chunk["metrics"].get("tokens_prompt_total"))
+                yield chunk
+        finally:
+            await stream.aclose()  # Frees the admission slot immediately on early close
+
+    async def classify(
+        self,
+        model: str,
+        prompt: str,
+        labels: List[str],
+        options: Optional[Dict] = None
+    ) -> Optional[str]:
+        """
+        Constrained classification: answer must be exactly one of `labels`
+
+        Used for the Automatik decision calls (search decision, intent, cache
+        decision, RAG relevance). Instead of free-form generation + substring
+        matching, the backend's constrained output is used (Ollama `format`
+        enum, vLLM `guided_choice`, TabbyAPI regex grammar), output tokens are
+        capped, and the stream is aborted as soon as the label is unambiguous.
+
+        Args:
+            model: Model name
+            prompt: Classification prompt (sent as single user message)
+            labels: Allowed answers (e.g. ["relevant", "not_relevant"])
+            options: Generation options (dict) - thinking is always disabled,
+                     num_predict defaults to a cap derived from the label length
+
+        Returns:
+            Matching label (original spelling) or None if no label was produced
+        """
+        classify_options = dict(options or {})
+        classify_options["enable_thinking"] = False
+        classify_options["choices"] = labels
+        # Tokens <= characters; +4 for JSON quotes / whitespace (Ollama format output)
+        classify_options.setdefault("num_predict", max(len(label) for label in labels) + 4)
+
+        backend = self._get_backend()
+        stream = self._cancellable(backend.scheduled_chat_stream(
+            model,
+            [LLMMessage(role="user", content=prompt)],
+            self._build_options(classify_options, affinity_key=self.session_id),
+            priority=PRIORITY_HIGH
+        ))
+
+        text = ""
+        try:
+            async for chunk in stream:
+                if chunk["type"] != "content":
+                    continue
+                text += chunk["text"]
+                label = match_label(text, labels, final=False)
+                if label is not None:
+                    return label  # Decided - abort stream (closes HTTP response)
+        finally:
+            await stream.aclose()
+
+        return match_label(text, labels, final=True)
+
+    async def count_tokens(self, model: str, text: str) -> Optional[int]:
+        """
+        Exact token count (backend tokenize endpoint or already loaded local tokenizer)
+
+        Args:
+            model: Model name
+            text: Text to count
+
+        Returns:
+            Token count or None → use the calibrated estimate
+        """
+        backend = self._get_backend()
+        count: Optional[int] = await maybe_run(self.cancel, backend.count_tokens(model, text))
+        return count
 
     async def get_model_context_limit(self, model: str) -> int:
         """
         Get context window size for a model.
 
-        Queries the backend for model metadata and extracts the context limit.
-        Very fast (~30ms for Ollama) and does NOT load the model into memory.
+        Served from the model metadata cache; only the first call per model
+        queries the backend (~30ms for Ollama, does NOT load the model).
 
         Args:
             model: Model name (e.g., "qwen3:8b", "phi3:mini")
@@ -178,6 +283,37 @@ class LLMClient:
         backend = self._get_backend()
         return await backend.get_model_context_limit(model)
 
+    async def get_model_metadata(self, model: str) -> ModelMetadata:
+        """
+        Get cached model metadata (context limit, native context, thinking support, quantization)
+
+        Args:
+            model: Model name
+
+        Returns:
+            ModelMetadata (served from the backend-layer TTL cache)
+        """
+        backend = self._get_backend()
+        return await backend.get_model_metadata(model)
+
+    def get_scheduler_stats(self) -> Dict:
+        """
+        Admission scheduler metrics of the shared backend
+
+        Returns:
+            Dict with in_flight, max_in_flight and per-lane queued/admitted/avg_wait/max_wait
+        """
+        return self._get_backend().get_scheduler_stats()
+
+    def get_num_ctx_stats(self) -> Optional[Dict]:
+        """
+        num_ctx stickiness counters of the shared backend (Ollama only)
+
+        Returns:
+            Dict with reloads_avoided, reloads_forced, cold_loads, loaded - or None
+        """
+        return self._get_backend().get_num_ctx_stats()
+
     async def preload_model(self, model: str) -> tuple[bool, float]:
         """
         Preload a model into VRAM by sending a minimal request.
@@ -191,10 +327,56 @@ class LLMClient:
         """
         backend = self._get_backend()
         # NOTE: Backend is cached in self._backend to prevent GC during async operations
-        return await backend.preload_model(model)
+        return await maybe_run(self.cancel, backend.preload_model(model))
 
     async def close(self):
-        """Cleanup resources (close cached backend if exists)"""
-        if self._backend is not None:
-            await self._backend.close()
-            self._backend = None
+        """
+        Release backend reference
+
+        The pooled backend itself stays open (owned by BackendRegistry and
+        closed on app shutdown via backend_lifespan).
+        """
+        self._backend = None
+
+
+def match_label(text: str, labels: List[str], final: bool = False) -> Optional[str]:
+    """
+    Match (partial) LLM output against a fixed label set
+
+    While streaming (final=False), a label is returned as soon as it is the
+    only one consistent with the text so far (e.g. "not_" → "not_relevant").
+    At stream end (final=True), an exact match wins, otherwise the longest
+    label contained in the text (so "not_relevant" beats "relevant").
+
+    Args:
+        text: Generated text so far (may contain JSON quotes / <think> block)
+        labels: Allowed labels
+        final: True if no more text will follow
+
+    Returns:
+        Matching label or None
+    """
+    # Ignore reasoning block (models that think despite enable_thinking=False)
+    if text.lstrip().startswith("<think>"):
+        if "</think>" not in text:
+            return None
+        text = text.split("</think>", 1)[1]
+
+    normalized = text.strip().strip("\"'`*-.").strip().lower()
+    if not normalized:
+        return None
+
+    candidates = [
+        label for label in labels
+        if label.lower().startswith(normalized) or normalized.startswith(label.lower())
+    ]
+    if not final:
+        return candidates[0] if len(candidates) == 1 else None
+
+    for label in candidates:
+        if label.lower() == normalized:
+            return label
+    for label in sorted(labels, key=len, reverse=True):
+        if label.lower() in normalized:
+            return label
+    return None
@@ -0,0 +1,298 @@
+"""
+Local Vector Index - Embedded, in-process storage for the Vector Cache
+
+Alternative to the ChromaDB server for single-node installs
+(VECTOR_CACHE_BACKEND = "local"): no Docker container, no HTTP hop,
+no thread pool per lookup.
+
+STORAGE (VECTOR_CACHE_LOCAL_PATH):
+- vectors.f32: float32 matrix, memory-mapped, one row per entry
+  (capacity doubles when full)
+- log.jsonl:   append-only log of add/delete operations with document +
+  metadata; replayed on start, rewritten by compact()
+
+SEARCH:
+    Brute-force NumPy over all live rows. Distance = squared L2, the same
+    metric as a default Chroma collection, so the CACHE_DISTANCE_*
+    thresholds keep their meaning. A few thousand 384-dim rows take well
+    below a millisecond.
+
+The class implements the subset of the Chroma Collection API VectorCache
+uses (add / query / delete / count / get), plus clear() and compact().
+"""
+
+import json
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .logging_utils import log_message
+
+_VECTORS_FILE = "vectors.f32"
+_LOG_FILE = "log.jsonl"
+_INITIAL_CAPACITY = 1024
+
+
+class LocalVectorIndex:
+    """Memory-mapped float32 vectors + append-only metadata log"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._dim: Optional[int] = None
+        self._vectors: Optional[np.memmap] = None
+        self._norms = np.zeros(0, dtype=np.float32)  # Squared norms per row
+        self._live = np.zeros(0, dtype=bool)
+        self._rows = 0  # Rows in use (live + deleted)
+        self._row_ids: List[Optional[str]] = []
+        self._entries: Dict[str, int] = {}  # id → row
+        self._documents: Dict[int, str] = {}
+        self._metadatas: Dict[int, Dict] = {}
+        self._load()
+
+    # ============================================================
+    # Persistence
+    # ============================================================
+
+    @property
+    def _vectors_path(self) -> Path:
+        return self.path / _VECTORS_FILE
+
+    @property
+    def _log_path(self) -> Path:
+        return self.path / _LOG_FILE
+
+    @property
+    def _matrix(self) -> np.memmap:
+        """Mapped vector file (exists once the dimension is known)"""
+        if self._vectors is None:
+            raise RuntimeError("Local Vector Index: no vector file mapped")
+        return self._vectors
+
+    def _open_vectors(self, capacity: int):
+        """(Re-)map the vector file with room for `capacity` rows"""
+        dim = self._dim
+        if dim is None:
+            raise RuntimeError("Local Vector Index: embedding dimension unknown")
+        size = capacity * dim * 4
+        with open(self._vectors_path, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, dim))
+        if len(self._live) < capacity:
+            self._live = np.concatenate([self._live, np.zeros(capacity - len(self._live), dtype=bool)])
+            self._norms = np.concatenate([self._norms, np.zeros(capacity - len(self._norms), dtype=np.float32)])
+
+    def _load(self):
+        """Replay the log (a torn last line from a crash is skipped)"""
+        if not self._log_path.exists():
+            return
+
+        with open(self._log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record["op"] == "init":
+                    self._dim = record["dim"]
+                elif record["op"] == "add":
+                    row = record["row"]
+                    self._entries[record["id"]] = row
+                    self._documents[row] = record["document"]
+                    self._metadatas[row] = record["metadata"]
+                    self._rows = max(self._rows, row + 1)
+                elif record["op"] == "delete":
+                    row = self._entries.pop(record["id"], None)
+                    if row is not None:
+                        self._documents.pop(row, None)
+                        self._metadatas.pop(row, None)
+
+        if self._dim is None:
+            return
+        capacity = max(_INITIAL_CAPACITY, self._vectors_path.stat().st_size // (self._dim * 4) if self._vectors_path.exists() else 0)
+        self._open_vectors(max(capacity, self._rows))
+        self._row_ids = [None] * self._rows
+        for entry_id, row in self._entries.items():
+            self._row_ids[row] = entry_id
+            self._live[row] = True
+        self._norms[:self._rows] = np.einsum("ij,ij->i", self._matrix[:self._rows], self._matrix[:self._rows])
+
+        if self.dead_rows() > len(self._entries):
+            self.compact()
+
+    def _append_log(self, records: List[Dict]):
+        with open(self._log_path, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+
+    def compact(self):
+        """Rewrite vectors + log with live entries only (drops deleted rows)"""
+        with self._lock:
+            if self._dim is None:
+                return
+            live_rows = sorted(self._entries.values())
+            vectors = np.array(self._matrix[live_rows], dtype=np.float32) if live_rows else np.zeros((0, self._dim), dtype=np.float32)
+
+            tmp_vectors = self._vectors_path.with_suffix(".tmp")
+            vectors.tofile(tmp_vectors)
+            tmp_log = self._log_path.with_suffix(".tmp")
+            with open(tmp_log, "w", encoding="utf-8") as f:
+                f.write(json.dumps({"op": "init", "dim": self._dim}) + "\n")
+                for new_row, old_row in enumerate(live_rows):
+                    f.write(json.dumps({
+                        "op": "add",
+                        "id": self._row_ids[old_row],
+                        "row": new_row,
+                        "document": self._documents[old_row],
+                        "metadata": self._metadatas[old_row]
+                    }, ensure_ascii=False) + "\n")
+
+            removed = self._rows - len(live_rows)
+            self._vectors = None
+            tmp_vectors.replace(self._vectors_path)
+            tmp_log.replace(self._log_path)
+
+            self._row_ids = [self._row_ids[row] for row in live_rows]
+            self._entries = {entry_id: row for row, entry_id in enumerate(self._row_ids) if entry_id is not None}
+            self._documents = {new: self._documents[old] for new, old in enumerate(live_rows)}
+            self._metadatas = {new: self._metadatas[old] for new, old in enumerate(live_rows)}
+            self._rows = len(live_rows)
+            self._live = np.zeros(0, dtype=bool)
+            self._norms = np.zeros(0, dtype=np.float32)
+            self._open_vectors(max(_INITIAL_CAPACITY, self._rows))
+            self._live[:self._rows] = True
+            self._norms[:self._rows] = np.einsum("ij,ij->i", self._matrix[:self._rows], self._matrix[:self._rows])
+            log_message(f"🗜️ Local Vector Index kompaktiert: {removed} gelöschte Zeilen entfernt, {self._rows} Einträge")
+
+    # ============================================================
+    # Collection API (subset used by VectorCache)
+    # ============================================================
+
+    def count(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def dead_rows(self) -> int:
+        """Rows of deleted entries still in the files (removed by compact())"""
+        with self._lock:
+            return self._rows - len(self._entries)
+
+    def add(self, documents: List[str], embeddings: List[List[float]], metadatas: List[Dict], ids: List[str]):
+        """Append entries (vectors first, then the log line that makes them visible)"""
+        with self._lock:
+            matrix = np.asarray(embeddings, dtype=np.float32)
+            records = []
+            if self._dim is None:
+                self._dim = matrix.shape[1]
+                self._open_vectors(_INITIAL_CAPACITY)
+                records.append({"op": "init", "dim": self._dim})
+            elif matrix.shape[1] != self._dim:
+                raise ValueError(f"Embedding dimension {matrix.shape[1]} != index dimension {self._dim}")
+
+            for entry_id in ids:
+                if entry_id in self._entries:
+                    self._delete_row(entry_id)
+                    records.append({"op": "delete", "id": entry_id})
+
+            needed = self._rows + len(ids)
+            if needed > len(self._live):
+                self._matrix.flush()
+                self._open_vectors(max(needed, len(self._live) * 2))
+
+            first = self._rows
+            vectors = self._matrix
+            vectors[first:needed] = matrix
+            vectors.flush()
+
+            for offset, (entry_id, document, metadata) in enumerate(zip(ids, documents, metadatas)):
+                row = first + offset
+                self._entries[entry_id] = row
+                self._documents[row] = document
+                self._metadatas[row] = metadata
+                self._row_ids.append(entry_id)
+                self._live[row] = True
+                self._norms[row] = float(matrix[offset] @ matrix[offset])
+                records.append({"op": "add", "id": entry_id, "row": row, "document": document, "metadata": metadata})
+            self._rows = needed
+            self._append_log(records)
+
+    def _delete_row(self, entry_id: str):
+        row = self._entries.pop(entry_id)
+        self._live[row] = False
+        self._documents.pop(row, None)
+        self._metadatas.pop(row, None)
+
+    def delete(self, ids: List[str]):
+        with self._lock:
+            records = []
+            for entry_id in ids:
+                if entry_id in self._entries:
+                    self._delete_row(entry_id)
+                    records.append({"op": "delete", "id": entry_id})
+            if records:
+                self._append_log(records)
+
+    def query(self, query_embeddings: List[List[float]], n_results: int = 10, include: Optional[List[str]] = None) -> Dict:
+        """
+        Nearest entries by squared L2 distance (Chroma result layout)
+
+        Args:
+            query_embeddings: Query vectors
+            n_results: Results per query
+            include: Ignored - ids, distances, documents and metadatas are always returned
+
+        Returns:
+            {'ids': [[...]], 'distances': [[...]], 'documents': [[...]], 'metadatas': [[...]]}
+        """
+        result: Dict[str, List] = {'ids': [], 'distances': [], 'documents': [], 'metadatas': []}
+        with self._lock:
+            for embedding in query_embeddings:
+                k = min(n_results, len(self._entries))
+                if k <= 0:
+                    for key in result:
+                        result[key].append([])
+                    continue
+
+                q = np.asarray(embedding, dtype=np.float32)
+                distances = self._norms[:self._rows] + float(q @ q) - 2.0 * (self._matrix[:self._rows] @ q)
+                distances[~self._live[:self._rows]] = np.inf
+                top = np.argpartition(distances, k - 1)[:k]
+                top = top[np.argsort(distances[top])]
+
+                result['ids'].append([self._row_ids[row] for row in top])
+                result['distances'].append([max(0.0, float(distances[row])) for row in top])
+                result['documents'].append([self._documents[row] for row in top])
+                result['metadatas'].append([self._metadatas[row] for row in top])
+        return result
+
+    def get(self, limit: Optional[int] = None, offset: int = 0, include: Optional[List[str]] = None) -> Dict:
+        """All entries in insertion order (Chroma get() layout, incl. embeddings)"""
+        with self._lock:
+            rows = sorted(self._entries.values())[offset:None if limit is None else offset + limit]
+            return {
+                'ids': [self._row_ids[row] for row in rows],
+                'documents': [self._documents[row] for row in rows],
+                'metadatas': [self._metadatas[row] for row in rows],
+                'embeddings': [self._matrix[row].tolist() for row in rows]
+            }
+
+    def clear(self):
+        """Delete all entries and files"""
+        with self._lock:
+            self._vectors = None
+            for file in (self._vectors_path, self._log_path):
+                if file.exists():
+                    file.unlink()
+            self._dim = None
+            self._norms = np.zeros(0, dtype=np.float32)
+            self._live = np.zeros(0, dtype=bool)
+            self._rows = 0
+            self._row_ids = []
+            self._entries = {}
+            self._documents = {}
+            self._metadatas = {}
@@ -17,7 +17,9 @@ def build_messages_from_history(
     history: List[Tuple[str, str]],
     current_user_text: str,
     max_turns: Optional[int] = None,
-    include_summaries: bool = True
+    include_summaries: bool = True,
+    system_prompt: Optional[str] = None,
+    volatile_context: Optional[str] = None
 ) -> List[Dict[str, str]]:
     """
     Konvertiert Gradio-History zu Ollama-Messages Format
@@ -31,11 +33,17 @@ def build_messages_from_history(
     - Summary-Format: ("", "[📊 Komprimiert: X Messages]\\n{summary}")
     - Wird zu: {'role': 'system', 'content': summary}
 
+    Reihenfolge (stabil über Turns → Prefix-Caching im Backend):
+    [System-Prompt] + History + [Volatiler Kontext] + aktuelle User-Nachricht
+
     Args:
         history: Gradio Chat History [[user_msg, ai_msg], ...]
         current_user_text: Aktuelle User-Nachricht
         max_turns: Optional - Nur letzte N Turns verwenden (None = alle)
         include_summaries: Summaries als System-Messages einbinden (default: True)
+        system_prompt: Optional - statischer System-Prompt (erste Message)
+        volatile_context: Optional - Datum/Uhrzeit, RAG-Kontext etc. als System-Message
+            direkt vor der aktuellen User-Nachricht (siehe load_system_prompt)
 
     Returns:
         list: Ollama Messages Format [{'role': 'user', 'content': '...'}, ...]
@@ -52,6 +60,9 @@ def build_messages_from_history(
     """
     messages = []
 
+    if system_prompt:
+        messages.append({'role': 'system', 'content': system_prompt})
+
     # Liste aller bekannten Timing-Patterns (robust gegen neue Patterns)
     timing_patterns = [
         " (STT:",          # Speech-to-Text Zeit
@@ -108,6 +119,10 @@ def build_messages_from_history(
             {'role': 'assistant', 'content': clean_ai}
         ])
 
+    # Volatile Daten NACH der History → System-Prompt + History bleiben gleicher Prefix
+    if volatile_context:
+        messages.append({'role': 'system', 'content': volatile_context})
+
     # Füge aktuelle User-Nachricht hinzu
     messages.append({'role': 'user', 'content': current_user_text})
 
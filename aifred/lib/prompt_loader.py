@@ -6,8 +6,9 @@ Supports automatic language detection.
 No fallbacks - prompts must exist in both languages.
 """
 
+from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
 import re
 
 # Base directory for prompts (relative to project root)
@@ -71,28 +72,31 @@ def get_language() -> str:
     return _current_language
 
 
-def load_prompt(prompt_name: str, lang: Optional[str] = None, user_text: str = None, **kwargs) -> str:
-    """
-    Load a prompt from a file with language support
-
-    Automatically injects current date/time at the beginning of every prompt.
-
-    Args:
-        prompt_name: Name of the prompt file (without .txt extension)
-        lang: Language override ("de", "en", or None for current setting)
-        user_text: User text for auto-detection (if lang="auto")
-        **kwargs: Keyword arguments for string formatting
-
-    Returns:
-        Formatted prompt string with timestamp prefix
-
-    Raises:
-        FileNotFoundError: If prompt file doesn't exist
-        KeyError: If required placeholders are missing
-    """
-    from datetime import datetime
-
-    # Determine language
+# Timestamp granularity → time format (None = no time line, date only)
+_TIME_FORMATS = {
+    "second": "%H:%M:%S",
+    "minute": "%H:%M",
+    "hour": "%H:00",
+    "day": None,
+}
+
+# Labels for volatile placeholders (prefix-stable mode: moved to the end)
+_VOLATILE_LABELS = {
+    "de": {
+        "context": "AKTUELLE RECHERCHE-ERGEBNISSE",
+        "original_question": "Ursprüngliche Frage",
+        "current_question": "Aktuelle Nachfrage",
+    },
+    "en": {
+        "context": "CURRENT RESEARCH RESULTS",
+        "original_question": "Original question",
+        "current_question": "Current follow-up",
+    },
+}
+
+
+def _resolve_language(lang: Optional[str], user_text: Optional[str], kwargs: dict) -> str:
+    """Resolve None/"auto" to "de" or "en" """
     if lang is None:
         lang = _current_language
 
@@ -105,8 +109,11 @@ def load_prompt(prompt_name: str, lang: Optional[str] = None, user_text: str = N
         else:
             # Default to German if no text to analyze
             lang = "de"
+    return lang
+
 
-    # Load from language-specific directory only (no fallback)
+def _read_prompt_template(prompt_name: str, lang: str) -> str:
+    """Read prompt file from language-specific directory only (no fallback)"""
     prompt_file = PROMPTS_DIR / lang / f"{prompt_name}.txt"
 
     if not prompt_file.exists():
@@ -116,14 +123,50 @@ def load_prompt(prompt_name: str, lang: Optional[str] = None, user_text: str = N
             f"Available prompts: {list_available_prompts()}"
         )
 
-    # Load prompt file
     with open(prompt_file, 'r', encoding='utf-8') as f:
-        prompt_template = f.read()
+        return f.read()
 
-    # ============================================================
-    # INJECT CURRENT DATE/TIME (always, for all prompts)
-    # ============================================================
+
+def _format_prompt(prompt_name: str, template: str, user_text: Optional[str], kwargs: dict) -> str:
+    """Fill placeholders (only if kwargs/user_text given, like before)"""
+    if kwargs or user_text:
+        try:
+            # Merge user_text into kwargs if not already there
+            if user_text and 'user_text' not in kwargs:
+                kwargs['user_text'] = user_text
+            return template.format(**kwargs)
+        except KeyError as e:
+            raise KeyError(
+                f"Missing placeholder in prompt '{prompt_name}': {e}\n"
+                f"Provided kwargs: {list(kwargs.keys())}"
+            )
+    return template
+
+
+def _prompt_layout(prefix_stable: Optional[bool], granularity: Optional[str]) -> Tuple[bool, str]:
+    """Fill unset layout options from config (PROMPT_PREFIX_STABLE, PROMPT_TIMESTAMP_GRANULARITY)"""
+    if prefix_stable is None or granularity is None:
+        from .config import PROMPT_PREFIX_STABLE, PROMPT_TIMESTAMP_GRANULARITY
+        if prefix_stable is None:
+            prefix_stable = PROMPT_PREFIX_STABLE
+        if granularity is None:
+            granularity = PROMPT_TIMESTAMP_GRANULARITY
+    return prefix_stable, granularity
+
+
+def get_timestamp_block(lang: str, granularity: str = "second") -> str:
+    """
+    Current date/time block for prompts
+
+    Args:
+        lang: "de" or "en"
+        granularity: "second", "minute", "hour" or "day" (no time line)
+
+    Returns:
+        Timestamp block (ends with a blank line)
+    """
     now = datetime.now()
+    time_format = _TIME_FORMATS.get(granularity, _TIME_FORMATS["second"])
 
     if lang == "de":
         # German weekday translation
@@ -134,37 +177,122 @@ def load_prompt(prompt_name: str, lang: Optional[str] = None, user_text: str = N
         }
         weekday_de = weekday_map.get(now.strftime("%A"), now.strftime("%A"))
 
-        timestamp_prefix = f"""AKTUELLES DATUM UND UHRZEIT:
-- Datum: {weekday_de}, {now.strftime('%d.%m.%Y')}
-- Uhrzeit: {now.strftime('%H:%M:%S')} Uhr
-- Jahr: {now.year}
-
-"""
+        lines = ["AKTUELLES DATUM UND UHRZEIT:", f"- Datum: {weekday_de}, {now.strftime('%d.%m.%Y')}"]
+        if time_format:
+            lines.append(f"- Uhrzeit: {now.strftime(time_format)} Uhr")
+        lines.append(f"- Jahr: {now.year}")
     else:  # English
-        timestamp_prefix = f"""CURRENT DATE AND TIME:
-- Date: {now.strftime('%A')}, {now.strftime('%Y-%m-%d')}
-- Time: {now.strftime('%H:%M:%S')}
-- Year: {now.year}
+        lines = ["CURRENT DATE AND TIME:", f"- Date: {now.strftime('%A')}, {now.strftime('%Y-%m-%d')}"]
+        if time_format:
+            lines.append(f"- Time: {now.strftime(time_format)}")
+        lines.append(f"- Year: {now.year}")
+
+    return "\n".join(lines) + "\n\n"
+
+
+def load_prompt(
+    prompt_name: str,
+    lang: Optional[str] = None,
+    user_text: Optional[str] = None,
+    prefix_stable: Optional[bool] = None,
+    granularity: Optional[str] = None,
+    **kwargs
+) -> str:
+    """
+    Load a prompt from a file with language support
 
-"""
+    Automatically injects the current date/time into every prompt:
+    at the beginning (default) or, in prefix-stable mode, at the end -
+    so the static instructions form a cacheable token prefix.
 
-    # Prepend timestamp to prompt
-    prompt_template = timestamp_prefix + prompt_template
+    Args:
+        prompt_name: Name of the prompt file (without .txt extension)
+        lang: Language override ("de", "en", or None for current setting)
+        user_text: User text for auto-detection (if lang="auto")
+        prefix_stable: Timestamp at the end (None = PROMPT_PREFIX_STABLE)
+        granularity: Timestamp granularity (None = PROMPT_TIMESTAMP_GRANULARITY)
+        **kwargs: Keyword arguments for string formatting
 
-    # Format with kwargs if provided
-    if kwargs or user_text:
-        try:
-            # Merge user_text into kwargs if not already there
-            if user_text and 'user_text' not in kwargs:
-                kwargs['user_text'] = user_text
-            return prompt_template.format(**kwargs)
-        except KeyError as e:
-            raise KeyError(
-                f"Missing placeholder in prompt '{prompt_name}': {e}\n"
-                f"Provided kwargs: {list(kwargs.keys())}"
-            )
+    Returns:
+        Formatted prompt string with timestamp
 
-    return prompt_template
+    Raises:
+        FileNotFoundError: If prompt file doesn't exist
+        KeyError: If required placeholders are missing
+    """
+    lang = _resolve_language(lang, user_text, kwargs)
+    prefix_stable, granularity = _prompt_layout(prefix_stable, granularity)
+
+    prompt_template = _read_prompt_template(prompt_name, lang)
+
+    # ============================================================
+    # INJECT CURRENT DATE/TIME (always, for all prompts)
+    # ============================================================
+    timestamp = get_timestamp_block(lang, granularity)
+    if prefix_stable:
+        prompt_template = prompt_template.rstrip() + "\n\n" + timestamp
+    else:
+        prompt_template = timestamp + prompt_template
+
+    return _format_prompt(prompt_name, prompt_template, user_text, kwargs)
+
+
+def load_system_prompt(
+    prompt_name: str,
+    lang: Optional[str] = None,
+    user_text: Optional[str] = None,
+    volatile: Tuple[str, ...] = ("context",),
+    prefix_stable: Optional[bool] = None,
+    granularity: Optional[str] = None,
+    **kwargs
+) -> Tuple[str, str]:
+    """
+    Load a system prompt split into static and volatile part
+
+    Default layout: (load_prompt(...), "") - timestamp first, all placeholders inline.
+
+    Prefix-stable layout: the static part contains only the instructions
+    (volatile placeholders replaced by a reference), the volatile part
+    contains date/time and the values of the volatile placeholders. Callers
+    put the volatile part near the end of the conversation (see
+    build_messages_from_history(volatile_context=...)), so system prompt +
+    history stay a stable token prefix across turns (vLLM prefix caching,
+    Ollama/llama.cpp KV reuse).
+
+    Args:
+        prompt_name: Name of the prompt file (without .txt extension)
+        lang: Language override ("de", "en", or None for current setting)
+        user_text: User text for auto-detection (if lang="auto")
+        volatile: Placeholders that change per turn (e.g. RAG context)
+        prefix_stable: Layout (None = PROMPT_PREFIX_STABLE)
+        granularity: Timestamp granularity (None = PROMPT_TIMESTAMP_GRANULARITY)
+        **kwargs: Keyword arguments for string formatting
+
+    Returns:
+        Tuple of (static system prompt, volatile context - "" in default layout)
+    """
+    lang = _resolve_language(lang, user_text, kwargs)
+    prefix_stable, granularity = _prompt_layout(prefix_stable, granularity)
+
+    if not prefix_stable:
+        prompt = load_prompt(prompt_name, lang=lang, user_text=user_text,
+                             prefix_stable=False, granularity=granularity, **kwargs)
+        return prompt, ""
+
+    labels = _VOLATILE_LABELS.get(lang, _VOLATILE_LABELS["de"])
+    reference = "siehe Ende der Konversation" if lang == "de" else "see end of conversation"
+
+    volatile_parts = [get_timestamp_block(lang, granularity).rstrip()]
+    for key in volatile:
+        if key not in kwargs:
+            continue
+        label = labels.get(key, key)
+        volatile_parts.append(f"# {label}:\n\n{kwargs[key]}")
+        kwargs[key] = f"[→ {label}: {reference}]"
+
+    static_template = _read_prompt_template(prompt_name, lang)
+    static_prompt = _format_prompt(prompt_name, static_template, user_text, kwargs)
+    return static_prompt, "\n\n".join(volatile_parts)
 
 
 def list_available_prompts() -> list:
@@ -202,6 +330,11 @@ def get_decision_making_prompt(user_text: str, lang: Optional[str] = None) -> st
     return load_prompt('decision_making', lang=lang, user_text=user_text)
 
 
+def get_automatik_prepass_prompt(user_text: str, lang: Optional[str] = None) -> str:
+    """Load fused Automatik pre-pass prompt (decision + intent + query as JSON)"""
+    return load_prompt('automatik_prepass', lang=lang, user_text=user_text)
+
+
 # Cache decision addon removed - will be replaced with Vector DB semantic search
 
 
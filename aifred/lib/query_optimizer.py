@@ -19,6 +19,50 @@ from .message_builder import build_messages_from_history
 THINK_TAG_PATTERN = re.compile(r'<think>(.*?)</think>', re.DOTALL)
 
 
+def add_temporal_context(optimized_query: str) -> str:
+    """
+    Ergänzt das aktuelle Jahr bei zeitlich relevanten Queries
+
+    Garantiert aktuelles Jahr bei "beste/neueste X" und "X vs Y" Queries,
+    auch wenn das LLM es vergisst.
+
+    Args:
+        optimized_query: Bereinigte Such-Query
+
+    Returns:
+        str: Query (ggf. mit angehängtem Jahr)
+    """
+    # Dynamisches Jahr (nicht hardcoded!)
+    current_year = str(datetime.now().year)
+
+    temporal_keywords = [
+        'neu', 'neue', 'neuer', 'neues', 'neueste', 'neuester', 'neuestes',
+        'aktuell', 'aktuelle', 'aktueller', 'aktuelles',
+        'latest', 'recent', 'new', 'newest',
+        'beste', 'bester', 'bestes', 'best',
+        'top', 'current'
+    ]
+
+    comparison_keywords = [
+        'vs', 'versus', 'vergleich', 'compare', 'comparison',
+        'oder', 'or', 'vs.', 'gegen', 'statt', 'instead'
+    ]
+
+    query_lower = optimized_query.lower()
+
+    # Regel 1: "beste/neueste X" → + aktuelles Jahr (falls nicht schon vorhanden)
+    if any(kw in query_lower for kw in temporal_keywords) and current_year not in optimized_query:
+        optimized_query += f" {current_year}"
+        log_message(f"   ⏰ Temporaler Kontext ergänzt: {current_year}")
+
+    # Regel 2: "X vs Y" → + aktuelles Jahr (falls nicht schon vorhanden)
+    elif any(kw in query_lower for kw in comparison_keywords) and current_year not in optimized_query:
+        optimized_query += f" {current_year}"
+        log_message(f"   ⚖️ Vergleichs-Kontext ergänzt: {current_year}")
+
+    return optimized_query
+
+
 async def optimize_search_query(
     user_text: str,
     automatik_model: str,
@@ -106,38 +150,8 @@ async def optimize_search_query(
         optimized_query = re.sub(r'["\'\n\r]', '', optimized_query)
         optimized_query = ' '.join(optimized_query.split())  # Normalize whitespace
 
-        # ============================================================
         # POST-PROCESSING: Temporale Kontext-Erkennung
-        # ============================================================
-        # Garantiert aktuelles Jahr bei zeitlich relevanten Queries, auch wenn LLM es vergisst
-
-        # Dynamisches Jahr (nicht hardcoded!)
-        current_year = str(datetime.now().year)
-
-        temporal_keywords = [
-            'neu', 'neue', 'neuer', 'neues', 'neueste', 'neuester', 'neuestes',
-            'aktuell', 'aktuelle', 'aktueller', 'aktuelles',
-            'latest', 'recent', 'new', 'newest',
-            'beste', 'bester', 'bestes', 'best',
-            'top', 'current'
-        ]
-
-        comparison_keywords = [
-            'vs', 'versus', 'vergleich', 'compare', 'comparison',
-            'oder', 'or', 'vs.', 'gegen', 'statt', 'instead'
-        ]
-
-        query_lower = optimized_query.lower()
-
-        # Regel 1: "beste/neueste X" → + aktuelles Jahr (falls nicht schon vorhanden)
-        if any(kw in query_lower for kw in temporal_keywords) and current_year not in optimized_query:
-            optimized_query += f" {current_year}"
-            log_message(f"   ⏰ Temporaler Kontext ergänzt: {current_year}")
-
-        # Regel 2: "X vs Y" → + aktuelles Jahr (falls nicht schon vorhanden)
-        elif any(kw in query_lower for kw in comparison_keywords) and current_year not in optimized_query:
-            optimized_query += f" {current_year}"
-            log_message(f"   ⚖️ Vergleichs-Kontext ergänzt: {current_year}")
+        optimized_query = add_temporal_context(optimized_query)
 
         log_message("🔍 Query-Optimierung:")
         log_message(f"   Original: {user_text[:80]}{'...' if len(user_text) > 80 else ''}")
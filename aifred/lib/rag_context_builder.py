@@ -8,7 +8,7 @@ Handles:
 """
 
 import string
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from .logging_utils import log_message
 from .prompt_loader import load_prompt
 
@@ -18,7 +18,8 @@ async def build_rag_context(
     cache,
     automatik_llm_client,
     automatik_model: str,
-    max_candidates: int = 5
+    max_candidates: int = 5,
+    candidates: Optional[List[Dict]] = None
 ) -> Optional[Dict]:
     """
     Build RAG context from cache entries using LLM-based relevance filtering.
@@ -29,6 +30,8 @@ async def build_rag_context(
         automatik_llm_client: LLM client for relevance checking
         automatik_model: Model name for Automatik-LLM
         max_candidates: Max cache entries to check
+        candidates: RAG candidates from VectorCache.query_combined() of this turn
+                    (None = query the cache here)
 
     Returns:
         Dict with:
@@ -43,8 +46,12 @@ async def build_rag_context(
 
     log_message("🔍 Checking cache for RAG context...")
 
-    # Query cache for potential RAG candidates (distance 0.5-1.2)
-    rag_candidates = await cache.query_for_rag(user_query, n_results=max_candidates)
+    # Query cache for potential RAG candidates (distance 0.5-1.2) - unless the
+    # turn's combined cache query already returned them
+    if candidates is None:
+        rag_candidates = await cache.query_for_rag(user_query, n_results=max_candidates)
+    else:
+        rag_candidates = candidates[:max_candidates]
 
     if not rag_candidates:
         log_message("❌ No RAG candidates found in cache")
@@ -101,21 +108,19 @@ async def build_rag_context(
 
         # Ask Automatik-LLM: Is this relevant?
         try:
-            response = await automatik_llm_client.chat(
+            # Constrained output: Antwort ist genau eins der Labels (Stream bricht früh ab)
+            decision = await automatik_llm_client.classify(
                 model=automatik_model,
-                messages=[{'role': 'user', 'content': relevance_prompt}],
+                prompt=relevance_prompt,
+                labels=["relevant", "not_relevant"],
                 options={
                     'temperature': 0.1,  # Deterministic
-                    'num_ctx': 2048,
-                    'enable_thinking': False  # Fast decisions, no reasoning needed
+                    'num_ctx': 2048
                 }
             )
 
-            # LLMResponse object has .text attribute, not dict
-            decision = response.text.strip().lower()
-
             # Decision: LLM says relevant OR shared keyword heuristic triggered
-            is_relevant_llm = 'relevant' in decision and 'not_relevant' not in decision
+            is_relevant_llm = decision == "relevant"
             is_relevant = is_relevant_llm or has_shared_keyword
 
             if is_relevant:
@@ -146,6 +151,9 @@ async def build_rag_context(
 
     formatted_context = "\n".join(context_parts)
 
+    # Used entries count as hits (LRU eviction keeps them)
+    await cache.record_hits([entry['id'] for entry in relevant_entries if entry.get('id')])
+
     log_message(f"✅ RAG context built: {len(relevant_entries)} relevant entries (from {len(rag_candidates)} candidates)")
 
     return {
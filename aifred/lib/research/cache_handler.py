@@ -9,10 +9,10 @@ from typing import Dict, List, Optional, AsyncIterator
 
 from ..cache_manager import get_cached_research
 from ..agent_tools import build_context
-from ..prompt_loader import load_prompt
+from ..prompt_loader import load_system_prompt
 from ..context_manager import estimate_tokens, calculate_dynamic_num_ctx
 from ..intent_detector import detect_cache_followup_intent, get_temperature_for_intent, get_temperature_label
-from ..formatting import format_thinking_process
+from ..formatting import format_thinking_process, format_thinking_timing
 from ..logging_utils import log_message, console_separator, CONSOLE_SEPARATOR
 
 
@@ -71,16 +71,18 @@ async def handle_cache_hit(
     # Nutze ALLE Quellen aus dem Cache
     scraped_only = cached_sources
     # Intelligenter Context (Limit aus config.py: MAX_RAG_CONTEXT_TOKENS)
-    context = build_context(user_text, scraped_only)
+    context = build_context(user_text, scraped_only, model_name=model_choice)
 
     # Spracherkennung für User-Text
     from ..prompt_loader import detect_language
     detected_user_language = detect_language(user_text)
 
     # System-Prompt für Cache-Hit: Nutze separate Prompt-Datei
-    system_prompt = load_prompt(
+    # (prefix-stable mode: Fragen + Kontext + Zeitstempel hinter die History)
+    system_prompt, volatile_context = load_system_prompt(
         'system_rag_cache_hit',
         lang=detected_user_language,
+        volatile=("original_question", "current_question", "context"),
         original_question=cache_entry.get('user_text', 'N/A'),
         current_question=user_text,
         current_year=time.strftime("%Y"),
@@ -100,8 +102,10 @@ async def handle_cache_hit(
             {'role': 'assistant', 'content': ai_msg}
         ])
 
-    # System-Prompt + aktuelle User-Frage
+    # System-Prompt + (volatiler Kontext) + aktuelle User-Frage
     messages.insert(0, {'role': 'system', 'content': system_prompt})
+    if volatile_context:
+        messages.append({'role': 'system', 'content': volatile_context})
     messages.append({'role': 'user', 'content': user_text})
 
     # Query Haupt-Model Context Limit (falls nicht manuell gesetzt)
@@ -164,6 +168,8 @@ async def handle_cache_hit(
     # Add enable_thinking if provided in llm_options (user toggle)
     if llm_options and 'enable_thinking' in llm_options:
         cache_llm_options['enable_thinking'] = llm_options['enable_thinking']
+    if llm_options and llm_options.get('thinking_budget'):
+        cache_llm_options['thinking_budget'] = llm_options['thinking_budget']
 
     # Stream response from LLM
     async for chunk in llm_client.chat_stream(
@@ -196,7 +202,7 @@ async def handle_cache_hit(
     # Console: LLM finished
     tokens_generated = metrics.get("tokens_generated", 0)
     tokens_per_sec = metrics.get("tokens_per_second", 0)
-    yield {"type": "debug", "message": f"✅ Haupt-LLM fertig ({llm_time:.1f}s, {tokens_generated} tokens, {tokens_per_sec:.1f} tok/s, Cache-Total: {total_time:.1f}s)"}
+    yield {"type": "debug", "message": f"✅ Haupt-LLM fertig ({llm_time:.1f}s, {tokens_generated} tokens, {tokens_per_sec:.1f} tok/s{format_thinking_timing(metrics)}, Cache-Total: {total_time:.1f}s)"}
 
     # Formatiere <think> Tags als Collapsible (falls vorhanden)
     final_answer_formatted = format_thinking_process(final_answer, model_name=model_choice, inference_time=llm_time)
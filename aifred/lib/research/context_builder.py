@@ -14,15 +14,23 @@ from typing import Dict, List, Optional, AsyncIterator
 
 from ..agent_tools import build_context
 # Cache system removed - will be replaced with Vector DB
-from ..prompt_loader import load_prompt
+from ..prompt_loader import load_prompt, load_system_prompt, get_language
 from ..context_manager import calculate_dynamic_num_ctx, estimate_tokens
 from ..message_builder import build_messages_from_history
-from ..formatting import format_thinking_process, build_debug_accordion, format_metadata
+from ..formatting import format_thinking_process, format_thinking_timing, build_debug_accordion, format_metadata
 from ..logging_utils import log_message
-from ..config import CHARS_PER_TOKEN
+from ..token_calibration import estimate_text_tokens
 from ..intent_detector import detect_query_intent, get_temperature_for_intent, get_temperature_label
 
 
+# Antwort-Labels der cache_decision Prompts pro Sprache → Volatilitätsklasse
+# (Schlüssel von CACHE_VOLATILITY_TTL, None = nicht cachen)
+CACHE_DECISION_LABELS = {
+    "de": {"permanent": "permanent", "daily": "daily", "hourly": "hourly", "not_cacheable": None},
+    "en": {"CACHE": "permanent", "DAILY": "daily", "HOURLY": "hourly", "SKIP": None},
+}
+
+
 async def build_and_generate_response(
     user_text: str,
     scraped_results: List[Dict],
@@ -40,7 +48,9 @@ async def build_and_generate_response(
     temperature_mode: str,
     temperature: float,
     agent_start: float,
-    stt_time: float
+    stt_time: float,
+    intent: Optional[str] = None,
+    speculative=None
 ) -> AsyncIterator[Dict]:
     """
     Build context and generate LLM response
@@ -63,6 +73,10 @@ async def build_and_generate_response(
         temperature: Temperature value (if manual)
         agent_start: Start time for timing
         stt_time: STT processing time (if applicable)
+        intent: Already detected intent (e.g. from fused pre-pass) - skips
+                the intent detection call in auto temperature mode
+        speculative: SpeculativeTasks - takes over a speculatively started
+                     intent detection ("intent") instead of a new call
 
     Yields:
         Dict: Debug messages, content chunks, final result
@@ -84,10 +98,10 @@ async def build_and_generate_response(
     # Build context from current sources (old metadata system removed)
     # TODO: Replace with Vector DB semantic search in Phase 1
     # ============================================================
-    context = build_context(user_text, scraped_only)
+    context = build_context(user_text, scraped_only, model_name=model_choice)
 
     # Estimate tokens
-    est_tokens = len(context) // CHARS_PER_TOKEN
+    est_tokens = estimate_text_tokens(context, model_choice)
     log_message(f"📊 Context: ~{est_tokens} Tokens")
 
     # Show context preview
@@ -99,8 +113,9 @@ async def build_and_generate_response(
     from ..prompt_loader import detect_language
     detected_user_language = detect_language(user_text)
 
-    # System prompt (timestamp injected automatically by load_prompt)
-    system_prompt = load_prompt(
+    # System prompt (timestamp injected automatically; prefix-stable mode:
+    # timestamp + research context are moved behind the history)
+    system_prompt, volatile_context = load_system_prompt(
         'system_rag',
         lang=detected_user_language,
         user_text=user_text,
@@ -109,11 +124,13 @@ async def build_and_generate_response(
 
     yield {"type": "debug", "message": "✅ System-Prompt erstellt"}
 
-    # Build messages with history
-    messages = build_messages_from_history(history, user_text)
-
-    # Insert system prompt as first message
-    messages.insert(0, {"role": "system", "content": system_prompt})
+    # Build messages: system prompt + history (+ volatile context) + user text
+    messages = build_messages_from_history(
+        history,
+        user_text,
+        system_prompt=system_prompt,
+        volatile_context=volatile_context
+    )
 
     # DEBUG: Show message sizes
     for i, msg in enumerate(messages):
@@ -132,6 +149,9 @@ async def build_and_generate_response(
 
     # Show compact context info (like Automatik-LLM)
     yield {"type": "debug", "message": f"📊 Haupt-LLM: {input_tokens} / {final_num_ctx} Tokens (max: {model_limit})"}
+    num_ctx_stats = llm_client.get_num_ctx_stats()
+    if num_ctx_stats:
+        yield {"type": "debug", "message": f"📦 num_ctx Reloads: {num_ctx_stats['reloads_avoided']} vermieden / {num_ctx_stats['reloads_forced']} erzwungen"}
 
     # Temperature
     if temperature_mode == 'manual':
@@ -139,11 +159,17 @@ async def build_and_generate_response(
         yield {"type": "debug", "message": f"🌡️ Temperature: {final_temperature} (manual)"}
     else:
         # Auto: Intent-Detection für RAG-Recherche (faktisch/gemischt/kreativ)
-        rag_intent = await detect_query_intent(
-            user_query=user_text,
-            automatik_model=automatik_model,
-            llm_client=automatik_llm_client
-        )
+        # (übersprungen wenn Intent bereits bekannt, z.B. aus Fused Pre-Pass)
+        if intent:
+            rag_intent = intent
+        elif speculative is not None and speculative.has("intent"):
+            rag_intent = await speculative.take("intent")
+        else:
+            rag_intent = await detect_query_intent(
+                user_query=user_text,
+                automatik_model=automatik_model,
+                llm_client=automatik_llm_client
+            )
         final_temperature = get_temperature_for_intent(rag_intent)
         temp_label = get_temperature_label(rag_intent)
         log_message(f"🌡️ RAG Temperature: {final_temperature} (Intent: {rag_intent})")
@@ -162,6 +188,8 @@ async def build_and_generate_response(
     # Add enable_thinking if provided in llm_options (user toggle)
     if llm_options and 'enable_thinking' in llm_options:
         research_llm_options['enable_thinking'] = llm_options['enable_thinking']
+    if llm_options and llm_options.get('thinking_budget'):
+        research_llm_options['thinking_budget'] = llm_options['thinking_budget']
 
     inference_start = time.time()
     ai_text = ""
@@ -197,7 +225,7 @@ async def build_and_generate_response(
     # Log completion
     tokens_generated = metrics.get("tokens_generated", 0)
     tokens_per_sec = metrics.get("tokens_per_second", 0)
-    yield {"type": "debug", "message": f"✅ Haupt-LLM fertig ({inference_time:.1f}s, {tokens_generated} tokens, {tokens_per_sec:.1f} tok/s)"}
+    yield {"type": "debug", "message": f"✅ Haupt-LLM fertig ({inference_time:.1f}s, {tokens_generated} tokens, {tokens_per_sec:.1f} tok/s{format_thinking_timing(metrics)})"}
 
     # Separator nach LLM-Antwort-Block (Ende der Einheit)
     from ..logging_utils import console_separator, CONSOLE_SEPARATOR
@@ -244,6 +272,7 @@ async def build_and_generate_response(
         has_volatile_keyword = any(keyword in user_text_lower for keyword in CACHE_EXCLUDE_VOLATILE)
 
         should_cache = True  # Default: cache everything
+        volatility: Optional[str] = "permanent"  # Lebensdauer des Eintrags (CACHE_VOLATILITY_TTL)
 
         if has_volatile_keyword:
             # Volatile keyword found → Ask LLM for override decision
@@ -261,17 +290,19 @@ async def build_and_generate_response(
 
             # Ask Automatik-LLM for decision (use existing client to avoid deadlock)
             try:
-                response = await automatik_llm_client.chat(
+                label_map = CACHE_DECISION_LABELS.get(detected_user_language, CACHE_DECISION_LABELS["de"])
+                decision = await automatik_llm_client.classify(
                     model=automatik_model,
-                    messages=[{'role': 'user', 'content': cache_prompt}],
-                    options={'temperature': 0.1, 'num_ctx': 2048, 'enable_thinking': False}  # Very deterministic, no reasoning
+                    prompt=cache_prompt,
+                    labels=list(label_map),
+                    options={'temperature': 0.1, 'num_ctx': 2048}  # Very deterministic
                 )
-                decision = response.text.strip().lower()
 
-                if 'cacheable' in decision and 'not_cacheable' not in decision:
+                if decision is not None and label_map[decision]:
                     should_cache = True
-                    log_message("✅ LLM Override: Cacheable (concept question with volatile keyword)")
-                    yield {"type": "debug", "message": "✅ LLM: Cacheable (override)"}
+                    volatility = label_map[decision]
+                    log_message(f"✅ LLM Override: Cacheable ({volatility}, volatile keyword)")
+                    yield {"type": "debug", "message": f"✅ LLM: Cacheable ({volatility})"}
                 else:
                     should_cache = False
                     log_message("❌ LLM Decision: Not cacheable (volatile data)")
@@ -286,21 +317,25 @@ async def build_and_generate_response(
 
             answer_preview = ai_text[:300] + "..." if len(ai_text) > 300 else ai_text
             current_date = time.strftime("%d.%m.%Y")
-            cache_prompt = load_prompt("cache_decision", query=user_text, answer_preview=answer_preview, current_date=current_date)
+            # Prompt-Sprache wie load_prompt(lang=None): Einstellung, "auto" ohne user_text → de
+            cache_lang = get_language() if get_language() in CACHE_DECISION_LABELS else "de"
+            cache_prompt = load_prompt("cache_decision", lang=cache_lang, query=user_text, answer_preview=answer_preview, current_date=current_date)
 
             # Use existing client to avoid deadlock
             try:
-                response = await automatik_llm_client.chat(
+                label_map = CACHE_DECISION_LABELS[cache_lang]
+                decision = await automatik_llm_client.classify(
                     model=automatik_model,
-                    messages=[{'role': 'user', 'content': cache_prompt}],
-                    options={'temperature': 0.1, 'num_ctx': 2048, 'enable_thinking': False}  # Fast decision, no reasoning
+                    prompt=cache_prompt,
+                    labels=list(label_map),
+                    options={'temperature': 0.1, 'num_ctx': 2048}  # Fast decision
                 )
-                decision = response.text.strip().lower()
 
-                if 'cacheable' in decision and 'not_cacheable' not in decision:
+                if decision is not None and label_map[decision]:
                     should_cache = True
-                    log_message("✅ LLM Decision: Cacheable")
-                    yield {"type": "debug", "message": "✅ LLM: Cacheable"}
+                    volatility = label_map[decision]
+                    log_message(f"✅ LLM Decision: Cacheable ({volatility})")
+                    yield {"type": "debug", "message": f"✅ LLM: Cacheable ({volatility})"}
                 else:
                     should_cache = False
                     log_message("❌ LLM Decision: Not cacheable")
@@ -316,7 +351,8 @@ async def build_and_generate_response(
                 query=user_text,
                 answer=ai_text,
                 sources=scraped_only,
-                metadata={'mode': mode}
+                metadata={'mode': mode},
+                volatility=volatility
             )
 
             if result.get('success'):
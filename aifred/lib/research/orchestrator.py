@@ -9,6 +9,9 @@ import time
 from typing import Dict, List, Optional, AsyncIterator
 
 from ..llm_client import LLMClient
+from ..automatik_prepass import AutomatikPrepass
+from ..speculative import SpeculativeTasks
+from ..cancellation import CancelToken
 from .cache_handler import handle_cache_hit
 from .query_processor import process_query_and_search
 from .scraper_orchestrator import orchestrate_scraping
@@ -27,7 +30,10 @@ async def perform_agent_research(
     temperature: float = 0.2,
     llm_options: Optional[Dict] = None,
     backend_type: str = "ollama",
-    backend_url: Optional[str] = None
+    backend_url: Optional[str] = None,
+    prepass: Optional[AutomatikPrepass] = None,
+    speculative: Optional[SpeculativeTasks] = None,
+    cancel: Optional[CancelToken] = None
 ) -> AsyncIterator[Dict]:
     """
     Agent-Recherche mit Query-Optimierung und parallelemWeb-Scraping
@@ -52,6 +58,11 @@ async def perform_agent_research(
         temperature: Temperature-Wert (0.0-2.0) - nur bei mode='manual'
         backend_type: LLM Backend ("ollama", "vllm", "tabbyapi")
         backend_url: Backend URL (optional, uses default if not provided)
+        prepass: Ergebnis des Fused Automatik Pre-Pass (optional) - liefert
+                 optimierte Query + Intent, spart die beiden Einzel-Calls
+        speculative: Spekulativ gestartete Query-Optimierung/Intent-Detection (optional)
+        cancel: CancelToken des Requests (optional) - Stop/Deadline bricht LLM-Streams,
+                Web-Suche und Scraping ab (RequestCancelled)
 
     Yields:
         Dict with: {"type": "debug"|"content"|"result", ...}
@@ -60,8 +71,8 @@ async def perform_agent_research(
     agent_start = time.time()
 
     # Initialize LLM clients with correct backend
-    llm_client = LLMClient(backend_type=backend_type, base_url=backend_url)
-    automatik_llm_client = LLMClient(backend_type=backend_type, base_url=backend_url)
+    llm_client = LLMClient(backend_type=backend_type, base_url=backend_url, session_id=session_id, cancel=cancel)
+    automatik_llm_client = LLMClient(backend_type=backend_type, base_url=backend_url, session_id=session_id, cancel=cancel)
 
     # ==============================================================
     # PHASE 1: Cache-Hit Check
@@ -103,7 +114,10 @@ async def perform_agent_research(
         user_text=user_text,
         history=history,
         automatik_model=automatik_model,
-        automatik_llm_client=automatik_llm_client
+        automatik_llm_client=automatik_llm_client,
+        optimized_query=prepass.search_query if prepass else None,
+        speculative=speculative,
+        cancel=cancel
     ):
         if item["type"] == "query_result":
             optimized_query, query_reasoning, query_opt_time, related_urls, tool_results = item["data"]
@@ -119,7 +133,8 @@ async def perform_agent_research(
         related_urls=related_urls,
         mode=mode,
         llm_client=llm_client,
-        model_choice=model_choice
+        model_choice=model_choice,
+        cancel=cancel
     ):
         if item["type"] == "scraping_result":
             scraped_results, scraping_tool_results = item["data"]
@@ -147,7 +162,9 @@ async def perform_agent_research(
         temperature_mode=temperature_mode,
         temperature=temperature,
         agent_start=agent_start,
-        stt_time=stt_time
+        stt_time=stt_time,
+        intent=prepass.intent if prepass else None,
+        speculative=speculative
     ):
         yield item
 
@@ -7,19 +7,24 @@ Handles:
 - URL extraction from search results
 """
 
+import asyncio
 import time
-from typing import Dict, List, AsyncIterator
+from typing import Dict, List, AsyncIterator, Optional
 
 from ..query_optimizer import optimize_search_query
 from ..agent_tools import search_web
 from ..logging_utils import log_message
+from ..cancellation import maybe_run
 
 
 async def process_query_and_search(
     user_text: str,
     history: List[tuple],
     automatik_model: str,
-    automatik_llm_client
+    automatik_llm_client,
+    optimized_query: Optional[str] = None,
+    speculative=None,
+    cancel=None
 ) -> AsyncIterator[Dict]:
     """
     Process query optimization and perform web search
@@ -29,6 +34,11 @@ async def process_query_and_search(
         history: Chat history for context
         automatik_model: Automatik LLM model name
         automatik_llm_client: Automatik LLM client
+        optimized_query: Already optimized query (e.g. from fused pre-pass) -
+                         skips the query optimization call
+        speculative: SpeculativeTasks - takes over a speculatively started
+                     query optimization ("query") instead of a new call
+        cancel: CancelToken of the request (optional) - aborts search/optimization
 
     Yields:
         Dict: Debug messages and search results
@@ -40,32 +50,43 @@ async def process_query_and_search(
     tool_results = []
 
     # 1. Query Optimization
-    yield {"type": "debug", "message": "🔍 Query-Optimierung läuft..."}
-
-    query_opt_start = time.time()
-
-    # Query Automatik-Model Context Limit (silent - already shown in decision phase)
-    automatik_limit = await automatik_llm_client.get_model_context_limit(automatik_model)
-
-    optimized_query, query_reasoning = await optimize_search_query(
-        user_text=user_text,
-        automatik_model=automatik_model,
-        history=history,
-        llm_client=automatik_llm_client,
-        automatik_llm_context_limit=automatik_limit
-    )
-    query_opt_time = time.time() - query_opt_start
-
-    # Show query optimization completion AND optimized query
-    yield {"type": "debug", "message": f"✅ Query-Optimierung fertig ({query_opt_time:.1f}s)"}
-    yield {"type": "debug", "message": f"🔎 Optimierte Query: {optimized_query}"}
+    if optimized_query:
+        # Query bereits vorhanden (Fused Pre-Pass) → kein zusätzlicher Automatik-Call
+        query_reasoning = None
+        query_opt_time = 0.0
+        yield {"type": "debug", "message": f"🔎 Optimierte Query (Pre-Pass): {optimized_query}"}
+    else:
+        yield {"type": "debug", "message": "🔍 Query-Optimierung läuft..."}
+
+        query_opt_start = time.time()
+
+        if speculative is not None and speculative.has("query"):
+            # Läuft bereits seit der Entscheidungsphase
+            optimized_query, query_reasoning = await maybe_run(cancel, speculative.take("query"))
+        else:
+            # Query Automatik-Model Context Limit (silent - already shown in decision phase)
+            automatik_limit = await automatik_llm_client.get_model_context_limit(automatik_model)
+
+            optimized_query, query_reasoning = await optimize_search_query(
+                user_text=user_text,
+                automatik_model=automatik_model,
+                history=history,
+                llm_client=automatik_llm_client,
+                automatik_llm_context_limit=automatik_limit
+            )
+        query_opt_time = time.time() - query_opt_start
+
+        # Show query optimization completion AND optimized query
+        yield {"type": "debug", "message": f"✅ Query-Optimierung fertig ({query_opt_time:.1f}s)"}
+        yield {"type": "debug", "message": f"🔎 Optimierte Query: {optimized_query}"}
 
     # 2. Web-Suche
     log_message("=" * 60)
     log_message("🔍 Web-Suche mit optimierter Query")
     log_message("=" * 60)
 
-    search_result = search_web(optimized_query)
+    # Worker thread: the blocking multi-API search must not stall the event loop (Stop button)
+    search_result = await maybe_run(cancel, asyncio.to_thread(search_web, optimized_query, cancel))
     tool_results.append(search_result)
 
     # Console Log: Welche API wurde benutzt?
@@ -3,24 +3,26 @@ Scraper Orchestrator - Parallel web scraping coordination
 
 Handles:
 - Scraping strategy based on mode (quick/deep)
-- Parallel scraping with ThreadPoolExecutor
+- Parallel scraping with ThreadPoolExecutor (awaited via asyncio, cancellable)
 - Progress reporting
 - LLM preloading during scraping
 """
 
 import asyncio
 from typing import Dict, List, AsyncIterator
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 
 from ..agent_tools import scrape_webpage
 from ..logging_utils import log_message
+from ..cancellation import maybe_run
 
 
 async def orchestrate_scraping(
     related_urls: List[str],
     mode: str,
     llm_client,
-    model_choice: str
+    model_choice: str,
+    cancel=None
 ) -> AsyncIterator[Dict]:
     """
     Orchestrate parallel web scraping
@@ -30,6 +32,8 @@ async def orchestrate_scraping(
         mode: Scraping mode ('quick' or 'deep')
         llm_client: Main LLM client (for preloading)
         model_choice: Main LLM model name
+        cancel: CancelToken of the request (optional) - drops pending scrapes
+                and the preload, raises RequestCancelled
 
     Yields:
         Dict: Progress updates, debug messages, scraping results
@@ -66,8 +70,8 @@ async def orchestrate_scraping(
     yield {"type": "debug", "message": "🌐 Web-Scraping startet (parallel)"}
 
     # PERFORMANCE: Preload Main LLM during scraping (only for backends that need it)
-    # vLLM and TabbyAPI keep models loaded in VRAM, so preloading is unnecessary
-    needs_preload = llm_client.backend_type not in ["vllm", "tabbyapi"]
+    # vLLM, TabbyAPI and llama.cpp keep models loaded in VRAM, so preloading is unnecessary
+    needs_preload = llm_client.backend_type not in ["vllm", "tabbyapi", "llamacpp"]
     preload_task = None
     preload_message_sent = False
 
@@ -86,20 +90,32 @@ async def orchestrate_scraping(
     # Start scraping progress
     yield {"type": "progress", "phase": "scraping", "current": 0, "total": len(urls_to_scrape), "failed": 0}
 
-    # Parallel execution
-    with ThreadPoolExecutor(max_workers=min(5, len(urls_to_scrape))) as executor:
+    # Parallel execution (threads awaited via asyncio → event loop stays responsive)
+    executor = ThreadPoolExecutor(max_workers=min(5, len(urls_to_scrape)))
+
+    def _drop_pending():
+        executor.shutdown(wait=False, cancel_futures=True)
+        if preload_task:
+            preload_task.cancel()
+
+    unregister = cancel.on_cancel(_drop_pending) if cancel is not None else None
+    try:
         future_to_url = {
-            executor.submit(scrape_webpage, url): url
+            asyncio.wrap_future(executor.submit(scrape_webpage, url)): url
             for url in urls_to_scrape
         }
+        pending = set(future_to_url)
 
         # Collect results as they complete
-        for future in as_completed(future_to_url):
+        while pending:
+            done, pending = await maybe_run(cancel, asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED))
+            future = done.pop()
+            pending |= done  # Handle one result per iteration (progress update per URL)
             url = future_to_url[future]
             url_short = url[:60] + '...' if len(url) > 60 else url
 
             try:
-                scrape_result = future.result(timeout=10)
+                scrape_result = future.result()
 
                 if scrape_result['success']:
                     tool_results.append(scrape_result)
@@ -130,13 +146,17 @@ async def orchestrate_scraping(
             completed = len([f for f in future_to_url if f.done()])
             failed = completed - len(scraped_results)
             yield {"type": "progress", "phase": "scraping", "current": len(scraped_results), "total": len(urls_to_scrape), "failed": failed}
+    finally:
+        if unregister is not None:
+            unregister()
+        executor.shutdown(wait=False, cancel_futures=True)
 
     log_message(f"✅ Parallel Scraping fertig: {len(scraped_results)}/{len(urls_to_scrape)} erfolgreich")
 
     # Wait for preload task to complete if not done yet
     if not preload_message_sent and preload_task:
         try:
-            success, load_time = await preload_task
+            success, load_time = await maybe_run(cancel, preload_task)
             if success:
                 log_message(f"✅ Haupt-LLM vorgeladen ({load_time:.1f}s)")
                 yield {"type": "debug", "message": f"✅ Haupt-LLM vorgeladen ({load_time:.1f}s)"}
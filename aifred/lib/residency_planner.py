@@ -0,0 +1,262 @@
+"""
+Model Residency Planner - Co-resident Automatik + main model on Ollama
+
+Plans whether the Automatik-LLM and the main LLM fit into VRAM together at
+their expected context sizes, so they don't evict each other mid-turn
+(decision → main answer → next decision ...).
+
+Footprint per model:
+- Resident with large enough context: measured size_vram from /api/ps
+- Otherwise: file size (/api/tags) + KV cache (architecture from /api/show
+  × expected num_ctx × RESIDENCY_NUM_PARALLEL) + RESIDENCY_MODEL_OVERHEAD_MB
+
+Plan:
+- Fits together → keep_alive = RESIDENCY_KEEP_ALIVE for both, load the
+  larger model first, then the smaller one
+- Doesn't fit → warning (swapping guaranteed), main model stays resident,
+  Automatik model gets the short RESIDENCY_SWAP_KEEP_ALIVE (stays loaded for
+  the decision calls of one request, frees VRAM soon after) and is not preloaded
+
+keep_alive values of a previous plan (e.g. the old main model after a model
+switch) are dropped - those models fall back to the Ollama default.
+
+Usage:
+    plan = await plan_residency(backend, main_model, automatik_model)
+    if plan:
+        for warning in plan.warnings: ...
+        schedule_preload(backend, plan)
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from .logging_utils import log_message
+
+MB = 1024 * 1024
+
+# Running background preloads (strong references - the event loop keeps only weak ones)
+_preload_tasks: Set["asyncio.Task"] = set()
+
+
+@dataclass
+class ModelFootprint:
+    """Expected VRAM usage of one model"""
+    model: str
+    role: str  # "main" or "automatik"
+    num_ctx: int
+    total_mb: int
+    weights_mb: int = 0
+    kv_cache_mb: int = 0
+    resident: bool = False
+    measured: bool = False  # total_mb from /api/ps instead of estimate
+
+
+@dataclass
+class ResidencyPlan:
+    """Residency decision for the current model pair"""
+    footprints: List[ModelFootprint]  # In load order
+    vram_mb: Optional[int]  # None = no GPU info → no capacity check
+    budget_mb: Optional[int]
+    co_resident: bool
+    keep_alive: Dict[str, str] = field(default_factory=dict)
+    preload: List[str] = field(default_factory=list)  # Models to preload, in order
+    warnings: List[str] = field(default_factory=list)
+
+    @property
+    def total_mb(self) -> int:
+        return sum(fp.total_mb for fp in self.footprints)
+
+    def summary(self) -> str:
+        parts = ", ".join(
+            f"{fp.model} ~{fp.total_mb / 1024:.1f} GB @ {fp.num_ctx}{' (geladen)' if fp.resident else ''}"
+            for fp in self.footprints
+        )
+        budget = f" / {self.budget_mb / 1024:.1f} GB" if self.budget_mb else ""
+        mode = "gemeinsam resident" if self.co_resident else "Swapping"
+        return f"🧮 VRAM-Plan: {parts} = {self.total_mb / 1024:.1f} GB{budget} → {mode}"
+
+
+async def _estimate_footprint(
+    backend,
+    model: str,
+    role: str,
+    num_ctx: int,
+    file_sizes: Dict[str, int],
+    running: Dict[str, Dict]
+) -> ModelFootprint:
+    from .config import (
+        RESIDENCY_KV_BYTES_PER_ELEMENT,
+        RESIDENCY_NUM_PARALLEL,
+        RESIDENCY_MODEL_OVERHEAD_MB
+    )
+
+    entry = running.get(model)
+    if entry is not None:
+        loaded_ctx = entry.get("context_length")
+        size_vram = entry.get("size_vram") or entry.get("size")
+        if size_vram and (not loaded_ctx or loaded_ctx >= num_ctx):
+            return ModelFootprint(
+                model=model, role=role, num_ctx=loaded_ctx or num_ctx,
+                total_mb=int(size_vram / MB), resident=True, measured=True
+            )
+
+    weights_mb = int(file_sizes.get(model, 0) / MB)
+    kv_cache_mb = 0
+    try:
+        metadata = await backend.get_model_metadata(model)
+        num_ctx = min(num_ctx, metadata.context_limit)
+        if metadata.kv_elements_per_token:
+            kv_bytes = (metadata.kv_elements_per_token * RESIDENCY_KV_BYTES_PER_ELEMENT
+                        * num_ctx * RESIDENCY_NUM_PARALLEL)
+            kv_cache_mb = int(kv_bytes / MB)
+    except Exception as e:
+        log_message(f"⚠️ Residency: Metadaten für {model} nicht abrufbar: {e}")
+
+    return ModelFootprint(
+        model=model, role=role, num_ctx=num_ctx,
+        total_mb=weights_mb + kv_cache_mb + RESIDENCY_MODEL_OVERHEAD_MB,
+        weights_mb=weights_mb, kv_cache_mb=kv_cache_mb,
+        resident=entry is not None
+    )
+
+
+def _expected_num_ctx(backend, model: str, role: str) -> int:
+    """Expected context: what the num_ctx policy knows, else the configured default"""
+    from .config import RESIDENCY_EXPECTED_NUM_CTX
+
+    default = RESIDENCY_EXPECTED_NUM_CTX[role]
+    policy = getattr(backend, "num_ctx_policy", None)
+    known = policy.expected_ctx(model) if policy else None
+    return max(known or 0, default)
+
+
+async def plan_residency(
+    backend,
+    main_model: str,
+    automatik_model: Optional[str] = None
+) -> Optional[ResidencyPlan]:
+    """
+    Plan VRAM residency of main + Automatik model and apply keep_alive values
+
+    Args:
+        backend: OllamaBackend (other backends: None - they manage VRAM themselves)
+        main_model: Haupt-LLM
+        automatik_model: Automatik-LLM (None or same as main = single model)
+
+    Returns:
+        ResidencyPlan or None if the backend doesn't support planning
+    """
+    from .config import (
+        RESIDENCY_PLANNER_ENABLED,
+        RESIDENCY_KEEP_ALIVE,
+        RESIDENCY_SWAP_KEEP_ALIVE,
+        RESIDENCY_VRAM_RESERVE_MB
+    )
+    from .gpu_detection import get_gpu_info
+
+    if not RESIDENCY_PLANNER_ENABLED or not hasattr(backend, "get_running_models"):
+        return None
+
+    roles: List[Tuple[str, str]] = [(main_model, "main")]
+    if automatik_model and automatik_model != main_model:
+        roles.append((automatik_model, "automatik"))
+
+    try:
+        file_sizes = await backend.get_model_sizes()
+    except Exception as e:
+        log_message(f"⚠️ Residency: Modellgrößen nicht abrufbar: {e}")
+        file_sizes = {}
+    running = {entry.get("name"): entry for entry in (await backend.get_running_models() or [])}
+
+    footprints = [
+        await _estimate_footprint(backend, model, role, _expected_num_ctx(backend, model, role), file_sizes, running)
+        for model, role in roles
+    ]
+    # Larger model first: it gets the VRAM, the small one fills the rest
+    footprints.sort(key=lambda fp: fp.total_mb, reverse=True)
+
+    gpu_info = get_gpu_info()
+    vram_mb = gpu_info.vram_mb if gpu_info else None
+    budget_mb = (vram_mb - RESIDENCY_VRAM_RESERVE_MB) if vram_mb else None
+
+    plan = ResidencyPlan(
+        footprints=footprints,
+        vram_mb=vram_mb,
+        budget_mb=budget_mb,
+        co_resident=budget_mb is None or sum(fp.total_mb for fp in footprints) <= budget_mb
+    )
+
+    main_fp = next(fp for fp in footprints if fp.role == "main")
+    if budget_mb is not None and main_fp.total_mb > budget_mb:
+        plan.warnings.append(
+            f"⚠️ Haupt-LLM {main_model} (~{main_fp.total_mb / 1024:.1f} GB @ {main_fp.num_ctx} Tokens) "
+            f"passt nicht komplett in {budget_mb / 1024:.1f} GB VRAM → CPU-Offload, langsame Inferenz"
+        )
+
+    if plan.co_resident:
+        for fp in footprints:
+            plan.keep_alive[fp.model] = RESIDENCY_KEEP_ALIVE
+            plan.preload.append(fp.model)
+    else:
+        plan.keep_alive[main_model] = RESIDENCY_KEEP_ALIVE
+        plan.preload.append(main_model)
+        automatik_fp = next((fp for fp in footprints if fp.role == "automatik"), None)
+        if automatik_fp is not None:
+            # Automatik-LLM nach der Automatik-Phase bald entladen → Haupt-LLM muss nicht
+            # warten/verdrängen; kurzes keep_alive statt "0", damit die Entscheidungs-Calls
+            # derselben Anfrage es nicht jedes Mal neu laden
+            plan.keep_alive[automatik_fp.model] = RESIDENCY_SWAP_KEEP_ALIVE
+            plan.warnings.append(
+                f"⚠️ Automatik-LLM + Haupt-LLM passen nicht gemeinsam in den VRAM "
+                f"({plan.total_mb / 1024:.1f} GB > {(budget_mb or 0) / 1024:.1f} GB) → Modelle werden bei "
+                f"jeder Anfrage getauscht. Tipp: kleineres num_ctx, kleineres Automatik-LLM "
+                f"oder Haupt-LLM auch als Automatik-LLM nutzen"
+            )
+
+    # Whole table replaced: models of the previous plan don't keep their old keep_alive
+    backend.replace_keep_alive(plan.keep_alive)
+
+    log_message(plan.summary())
+    for warning in plan.warnings:
+        log_message(warning)
+    return plan
+
+
+async def ensure_resident(backend, plan: ResidencyPlan) -> List[Tuple[str, bool, float]]:
+    """
+    Preload the planned models in load order (resident models are skipped by preload_model)
+
+    Returns:
+        List of (model, success, load_time)
+    """
+    results = []
+    for model in plan.preload:
+        success, load_time = await backend.preload_model(model)
+        if load_time > 0:
+            log_message(f"🚀 Residency: {model} geladen ({load_time:.1f}s)" if success
+                        else f"⚠️ Residency: {model} Preload fehlgeschlagen")
+        results.append((model, success, load_time))
+    return results
+
+
+def _log_preload_result(task: "asyncio.Task"):
+    _preload_tasks.discard(task)
+    if task.cancelled():
+        return
+    error = task.exception()
+    if error is not None:
+        log_message(f"⚠️ Residency: Preload fehlgeschlagen: {error}")
+
+
+def schedule_preload(backend, plan: ResidencyPlan) -> "asyncio.Task":
+    """
+    Run ensure_resident() in the background (fire-and-forget from the UI)
+
+    The task is referenced until it finishes, so it can't be garbage-collected
+    mid-preload; failures are logged instead of vanishing with the task.
+    """
+    task = asyncio.create_task(ensure_resident(backend, plan))
+    _preload_tasks.add(task)
+    task.add_done_callback(_log_preload_result)
+    return task
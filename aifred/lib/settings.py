@@ -65,13 +65,14 @@ def get_default_settings() -> Dict[str, Any]:
     Returns:
         Dict with default settings
     """
-    from ..lib.config import BACKEND_DEFAULT_MODELS
+    from ..lib.config import BACKEND_DEFAULT_MODELS, THINKING_BUDGET_DEFAULT
 
     return {
         "backend_type": "ollama",
         "research_mode": "automatik",
         "temperature": 0.2,
         "enable_thinking": True,
+        "thinking_budget": THINKING_BUDGET_DEFAULT,  # 0 = unbegrenzt
         "backend_models": BACKEND_DEFAULT_MODELS,  # Backend-spezifische Modelle
         # vLLM YaRN & Context Settings (0 = auto-detect on first run)
         "enable_yarn": False,
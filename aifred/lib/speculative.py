@@ -0,0 +1,123 @@
+"""
+Speculative Execution - Automatik phases concurrent to the decision call
+
+Query optimization and intent detection are started as background tasks
+while the vector cache/RAG check and the decision call are still running.
+If the decision is "search", the results are taken over; otherwise the
+speculative query optimization is cancelled.
+
+Concurrency is capped per backend (SPECULATIVE_MAX_CONCURRENCY) so vLLM's
+continuous batching absorbs the extra requests without starving the
+decision call on backends with few parallel slots.
+
+Usage:
+    speculative = SpeculativeTasks(backend_type, backend_url)
+    speculative.start("intent", detect_query_intent(...))
+    ...
+    if speculative.has("intent"):
+        intent = await speculative.take("intent")
+    speculative.cancel_all()
+    log_message(f"saved {speculative.saved_time:.1f}s")
+"""
+
+import asyncio
+import time
+from typing import Any, Coroutine, Dict, Optional, Tuple
+
+from .logging_utils import log_message
+
+
+# Per-backend semaphores (key: backend_type, base_url) - shared by all sessions
+_backend_semaphores: Dict[Tuple[str, str], asyncio.Semaphore] = {}
+
+
+def get_speculative_limit(backend_type: str) -> int:
+    """Max concurrent speculative calls for a backend type (0 = disabled)"""
+    from .config import AUTOMATIK_SPECULATIVE_EXECUTION, SPECULATIVE_MAX_CONCURRENCY
+
+    if not AUTOMATIK_SPECULATIVE_EXECUTION:
+        return 0
+    return SPECULATIVE_MAX_CONCURRENCY.get(backend_type, 0)
+
+
+def _get_backend_semaphore(backend_type: str, backend_url: Optional[str]) -> asyncio.Semaphore:
+    key = (backend_type, backend_url or "")
+    semaphore = _backend_semaphores.get(key)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(get_speculative_limit(backend_type))
+        _backend_semaphores[key] = semaphore
+    return semaphore
+
+
+class SpeculativeTasks:
+    """
+    Named speculative background tasks of ONE turn
+
+    saved_time: Wall-clock seconds saved compared to running each taken
+    task sequentially at the point where its result was needed.
+    """
+
+    def __init__(self, backend_type: str, backend_url: Optional[str] = None):
+        self.backend_type = backend_type
+        self.backend_url = backend_url
+        self.enabled = get_speculative_limit(backend_type) > 0
+        self.saved_time = 0.0
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._durations: Dict[str, float] = {}
+
+    def start(self, name: str, coro: Coroutine[Any, Any, Any]) -> bool:
+        """
+        Start a speculative task (runs once a backend slot is free)
+
+        Returns:
+            False if speculation is disabled for this backend (coro is closed)
+        """
+        if not self.enabled:
+            coro.close()
+            return False
+
+        semaphore = _get_backend_semaphore(self.backend_type, self.backend_url)
+
+        async def run():
+            async with semaphore:
+                start = time.time()
+                try:
+                    return await coro
+                finally:
+                    self._durations[name] = time.time() - start
+
+        self._tasks[name] = asyncio.create_task(run())
+        log_message(f"⚡ Spekulativ gestartet: {name}")
+        return True
+
+    def has(self, name: str) -> bool:
+        return name in self._tasks
+
+    async def take(self, name: str) -> Any:
+        """Await a speculative result (re-raises the task's exception)"""
+        task = self._tasks.pop(name)
+        wait_start = time.time()
+        try:
+            return await task
+        finally:
+            waited = time.time() - wait_start
+            saved = max(0.0, self._durations.get(name, 0.0) - waited)
+            self.saved_time += saved
+            log_message(f"⚡ Spekulativ übernommen: {name} (gewartet {waited:.1f}s, gespart {saved:.1f}s)")
+
+    def cancel(self, name: str):
+        """Cancel a speculative task whose result is not needed"""
+        task = self._tasks.pop(name, None)
+        if task is None:
+            return
+        if task.done():
+            if not task.cancelled():
+                task.exception()  # Mark as retrieved (no "never retrieved" warning)
+        else:
+            task.cancel()
+            log_message(f"⚡ Spekulativ abgebrochen: {name}")
+
+    def cancel_all(self):
+        """Cancel all remaining tasks (end of turn / error path)"""
+        for name in list(self._tasks):
+            self.cancel(name)
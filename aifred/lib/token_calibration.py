@@ -0,0 +1,268 @@
+"""
+Token Calibration - Learned chars/token ratios from real backend counts
+
+Without a local tokenizer every estimator guessed with a fixed ratio
+(estimate_tokens 2.5, estimate_tokens_from_history 3.5, context builders
+CHARS_PER_TOKEN=3). The real ratio differs per tokenizer and language
+(German needs more tokens per char than English), so num_ctx and RAG
+budgets were either wasted or overflowed.
+
+Samples come only from backends that report the FULL prompt size
+(tokens_prompt_total in the metrics / LLMResponse): vLLM usage.prompt_tokens
+(prefix-cache hits included) and llama.cpp prompt_n + cache_n. Ollama's
+prompt_eval_count covers only the part not reused from the KV cache - a
+multi-turn chat would report a few tokens for a long prompt and lock in a
+ratio far too high - so Ollama requests are not used. The calibrator learns
+chars/token per (model, language) from these counts:
+
+- Template overhead (TOKEN_CALIBRATION_MESSAGE_OVERHEAD tokens per message)
+  is subtracted before the ratio is computed
+- Samples outside TOKEN_CALIBRATION_MIN/MAX_RATIO are rejected; once
+  calibrated, samples more than TOKEN_CALIBRATION_OUTLIER_TOLERANCE ABOVE the
+  current value too (one-sided: an undercounted prompt only ever makes the
+  ratio too high, lower samples are real and pull a bad value back down)
+- EWMA per key, lookup falls back model+lang → model → lang → CHARS_PER_TOKEN
+- Persisted as JSON (TOKEN_CALIBRATION_FILE), saves are debounced and run in
+  a worker thread (observe_prompt is called from the event loop)
+"""
+
+import asyncio
+import json
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from .logging_utils import log_message
+
+if TYPE_CHECKING:
+    from ..backends.base import LLMMessage
+
+ANY = "*"  # Wildcard for model or language
+
+
+@dataclass
+class RatioEstimate:
+    """Learned chars/token ratio of one (model, language) key"""
+    ratio: float
+    samples: int = 1
+
+
+def _key(model: str, lang: str) -> str:
+    return f"{model}|{lang}"
+
+
+class TokenCalibrator:
+    """Online chars/token calibration per model and language"""
+
+    def __init__(self, path=None):
+        from .config import TOKEN_CALIBRATION_FILE
+        self.path = path or TOKEN_CALIBRATION_FILE
+        self._ratios: Dict[str, RatioEstimate] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._last_save = 0.0
+        self._load()
+
+    def _load(self):
+        """Load persisted ratios (missing/corrupt file → start empty)"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._ratios = {
+                key: RatioEstimate(ratio=float(entry["ratio"]), samples=int(entry["samples"]))
+                for key, entry in data.get("ratios", {}).items()
+            }
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            log_message(f"⚠️ Token-Kalibrierung nicht lesbar ({self.path}): {e}")
+
+    def save_due(self) -> bool:
+        """True if there are unsaved samples and the save interval has passed"""
+        from .config import TOKEN_CALIBRATION_SAVE_INTERVAL
+
+        with self._lock:
+            return self._dirty and time.time() - self._last_save >= TOKEN_CALIBRATION_SAVE_INTERVAL
+
+    def save(self, force: bool = False):
+        """
+        Write ratios to disk (debounced)
+
+        Args:
+            force: Ignore TOKEN_CALIBRATION_SAVE_INTERVAL
+        """
+        from .config import TOKEN_CALIBRATION_SAVE_INTERVAL
+
+        with self._lock:
+            if not self._dirty or (not force and time.time() - self._last_save < TOKEN_CALIBRATION_SAVE_INTERVAL):
+                return
+            data = {"ratios": {
+                key: {"ratio": round(entry.ratio, 4), "samples": entry.samples}
+                for key, entry in self._ratios.items()
+            }}
+            self._dirty = False
+            self._last_save = time.time()
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            tmp_path.replace(self.path)
+        except Exception as e:
+            log_message(f"⚠️ Token-Kalibrierung nicht gespeichert: {e}")
+
+    def observe(self, model: str, chars: int, prompt_tokens: int, message_count: int, lang: str) -> Optional[float]:
+        """
+        Learn from one request with a known real prompt token count (in memory, see save())
+
+        Args:
+            model: Model name
+            chars: Characters of all message contents
+            prompt_tokens: Full prompt tokens reported by the backend (incl. cache hits)
+            message_count: Number of messages (template overhead)
+            lang: "de" or "en"
+
+        Returns:
+            Observed ratio if accepted, None if rejected
+        """
+        from .config import (
+            TOKEN_CALIBRATION_MESSAGE_OVERHEAD, TOKEN_CALIBRATION_MIN_CHARS,
+            TOKEN_CALIBRATION_MIN_RATIO, TOKEN_CALIBRATION_MAX_RATIO,
+            TOKEN_CALIBRATION_MIN_SAMPLES, TOKEN_CALIBRATION_OUTLIER_TOLERANCE,
+            TOKEN_CALIBRATION_ALPHA
+        )
+
+        content_tokens = prompt_tokens - message_count * TOKEN_CALIBRATION_MESSAGE_OVERHEAD
+        if chars < TOKEN_CALIBRATION_MIN_CHARS or content_tokens <= 0:
+            return None
+        ratio = chars / content_tokens
+        if not TOKEN_CALIBRATION_MIN_RATIO <= ratio <= TOKEN_CALIBRATION_MAX_RATIO:
+            return None
+
+        with self._lock:
+            current = self._ratios.get(_key(model, lang))
+            if current and current.samples >= TOKEN_CALIBRATION_MIN_SAMPLES:
+                # Only too-high ratios are suspicious (uncounted cached prefix)
+                if ratio > current.ratio * (1 + TOKEN_CALIBRATION_OUTLIER_TOLERANCE):
+                    return None
+
+            for key in (_key(model, lang), _key(model, ANY), _key(ANY, lang)):
+                entry = self._ratios.get(key)
+                if entry is None:
+                    self._ratios[key] = RatioEstimate(ratio=ratio)
+                else:
+                    # Plain mean until calibrated, then EWMA (follows model updates)
+                    alpha = max(TOKEN_CALIBRATION_ALPHA, 1 / (entry.samples + 1))
+                    entry.ratio += alpha * (ratio - entry.ratio)
+                    entry.samples += 1
+            self._dirty = True
+        return ratio
+
+    def ratio(self, model: Optional[str] = None, lang: Optional[str] = None) -> float:
+        """
+        chars/token for estimation (learned ratio minus safety margin)
+
+        Args:
+            model: Model name (None = language-wide value only)
+            lang: "de"/"en" (None = any language)
+
+        Returns:
+            Calibrated ratio or CHARS_PER_TOKEN if not calibrated yet
+        """
+        from .config import CHARS_PER_TOKEN, TOKEN_CALIBRATION_MIN_SAMPLES, TOKEN_CALIBRATION_SAFETY_MARGIN
+
+        candidates: List[str] = []
+        if model:
+            if lang:
+                candidates.append(_key(model, lang))
+            candidates.append(_key(model, ANY))
+        if lang:
+            candidates.append(_key(ANY, lang))
+
+        with self._lock:
+            for key in candidates:
+                entry = self._ratios.get(key)
+                if entry and entry.samples >= TOKEN_CALIBRATION_MIN_SAMPLES:
+                    return entry.ratio * (1 - TOKEN_CALIBRATION_SAFETY_MARGIN)
+        return float(CHARS_PER_TOKEN)
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """Learned ratios (key "model|lang" → {ratio, samples})"""
+        with self._lock:
+            return {key: {"ratio": entry.ratio, "samples": entry.samples} for key, entry in self._ratios.items()}
+
+
+# Global calibrator (process-wide, shared by all sessions)
+_calibrator: Optional[TokenCalibrator] = None
+
+
+def get_calibrator() -> TokenCalibrator:
+    """Get or create the global TokenCalibrator"""
+    global _calibrator
+    if _calibrator is None:
+        _calibrator = TokenCalibrator()
+    return _calibrator
+
+
+def _text_language(text: str) -> str:
+    """Language of a text sample (start is enough for the keyword heuristic)"""
+    from .prompt_loader import detect_language
+    return detect_language(text[:2000])
+
+
+async def observe_prompt(model: str, messages: List["LLMMessage"], prompt_tokens_total: Optional[int]):
+    """
+    Feed a finished request into the calibration
+
+    Args:
+        model: Model name
+        messages: Sent messages
+        prompt_tokens_total: Full prompt token count incl. KV-cache hits
+            (tokens_prompt_total; None = backend can't tell → no sample)
+    """
+    from .config import TOKEN_CALIBRATION_ENABLED
+
+    if not TOKEN_CALIBRATION_ENABLED or not prompt_tokens_total or not messages:
+        return
+    # Prompt language follows the user (system prompts are loaded per language)
+    user_texts = [m.content for m in messages if m.role == "user"]
+    lang = _text_language(user_texts[-1] if user_texts else messages[-1].content)
+    chars = sum(len(m.content) for m in messages)
+    calibrator = get_calibrator()
+    calibrator.observe(model, chars, prompt_tokens_total, len(messages), lang)
+    if calibrator.save_due():
+        await asyncio.to_thread(calibrator.save)
+
+
+def chars_per_token(model: Optional[str] = None, text: Optional[str] = None) -> float:
+    """
+    chars/token ratio for estimations
+
+    Args:
+        model: Model name (None = language-wide calibration)
+        text: Text to estimate (language detection), None = any language
+
+    Returns:
+        Calibrated ratio or CHARS_PER_TOKEN
+    """
+    from .config import CHARS_PER_TOKEN, TOKEN_CALIBRATION_ENABLED
+
+    if not TOKEN_CALIBRATION_ENABLED:
+        return float(CHARS_PER_TOKEN)
+    return get_calibrator().ratio(model, _text_language(text) if text else None)
+
+
+def estimate_text_tokens(text: str, model: Optional[str] = None) -> int:
+    """
+    Token estimate of a text with the calibrated ratio
+
+    Args:
+        text: Text
+        model: Model name (None = language-wide calibration)
+
+    Returns:
+        Estimated token count
+    """
+    return int(len(text) / chars_per_token(model, text))
@@ -0,0 +1,128 @@
+"""
+Tokenizer Service - Exact token counts without blocking the event loop
+
+count_tokens_with_tokenizer loaded HuggingFace tokenizers synchronously
+on first use of a model - inside a streaming turn, possibly downloading
+from the hub - and kept every tokenizer forever. The service:
+
+- Loads tokenizers in a background thread (preload() at model selection)
+- Offline only (local_files_only=True): uses the HF cache, never the hub
+- Keeps at most TOKENIZER_CACHE_SIZE tokenizers (LRU)
+- count_tokens() never waits: tokenizer not loaded (yet) → None, the
+  caller falls back to the calibrated estimate (token_calibration)
+- Failed loads are remembered (no retry per request)
+
+Backends with a tokenize endpoint (vLLM /tokenize, llama.cpp /tokenize)
+are preferred over local tokenizers: LLMClient.count_tokens().
+"""
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional, Set
+
+from .logging_utils import log_message
+
+
+def is_hf_model_id(model_name: str) -> bool:
+    """True for HuggingFace repo ids ("Qwen/Qwen3-8B-AWQ"), False for Ollama tags ("qwen3:8b")"""
+    return "/" in model_name and ":" not in model_name
+
+
+class TokenizerService:
+    """Background-loaded, LRU-bounded HuggingFace tokenizers"""
+
+    def __init__(self, max_size: Optional[int] = None):
+        from .config import TOKENIZER_CACHE_SIZE
+        self.max_size = max_size or TOKENIZER_CACHE_SIZE
+        self._tokenizers: "OrderedDict[str, Any]" = OrderedDict()
+        self._loading: Set[str] = set()
+        self._failed: Set[str] = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tokenizer")
+
+    def preload(self, model_name: str):
+        """
+        Start loading a tokenizer in the background (no-op if loaded/loading/failed)
+
+        Args:
+            model_name: HuggingFace model id (Ollama tags are ignored)
+        """
+        if not model_name or not is_hf_model_id(model_name):
+            return
+        with self._lock:
+            if model_name in self._tokenizers or model_name in self._loading or model_name in self._failed:
+                return
+            self._loading.add(model_name)
+        self._executor.submit(self._load, model_name)
+
+    def _load(self, model_name: str):
+        """Worker thread: load from the local HF cache"""
+        try:
+            from transformers import AutoTokenizer
+            tokenizer = AutoTokenizer.from_pretrained(
+                model_name,
+                trust_remote_code=True,
+                local_files_only=True  # Never hit the hub
+            )
+        except Exception as e:
+            with self._lock:
+                self._loading.discard(model_name)
+                self._failed.add(model_name)
+            log_message(f"⚠️ Kein lokaler Tokenizer für {model_name}: {e}")
+            return
+
+        with self._lock:
+            self._loading.discard(model_name)
+            self._tokenizers[model_name] = tokenizer
+            self._tokenizers.move_to_end(model_name)
+            while len(self._tokenizers) > self.max_size:
+                evicted, _ = self._tokenizers.popitem(last=False)
+                log_message(f"🗑️ Tokenizer entladen (LRU): {evicted}")
+        log_message(f"✅ Loaded tokenizer for {model_name}")
+
+    def count_tokens(self, text: str, model_name: str) -> Optional[int]:
+        """
+        Exact token count if the tokenizer is loaded (never blocks on loading)
+
+        Args:
+            text: Text to tokenize
+            model_name: HuggingFace model id
+
+        Returns:
+            Token count, or None (not loaded yet → background load started)
+        """
+        with self._lock:
+            tokenizer = self._tokenizers.get(model_name)
+            if tokenizer is not None:
+                self._tokenizers.move_to_end(model_name)
+        if tokenizer is None:
+            self.preload(model_name)
+            return None
+
+        try:
+            return len(tokenizer.encode(text, add_special_tokens=True))
+        except Exception as e:
+            log_message(f"⚠️ Tokenization failed: {e}")
+            return None
+
+    def is_loaded(self, model_name: str) -> bool:
+        with self._lock:
+            return model_name in self._tokenizers
+
+
+# Global service (process-wide, shared by all sessions)
+_service: Optional[TokenizerService] = None
+
+
+def get_tokenizer_service() -> TokenizerService:
+    """Get or create the global TokenizerService"""
+    global _service
+    if _service is None:
+        _service = TokenizerService()
+    return _service
+
+
+def preload_tokenizer(model_name: str):
+    """Background-load the tokenizer of a selected model (call at model selection)"""
+    get_tokenizer_service().preload(model_name)
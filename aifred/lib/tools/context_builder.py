@@ -5,15 +5,21 @@ Extracted from agent_tools.py for better modularity.
 """
 
 import logging
-from typing import Dict, List
+from typing import Dict, List, Optional
 
-from ..config import MAX_RAG_CONTEXT_TOKENS, MAX_WORDS_PER_SOURCE, CHARS_PER_TOKEN
+from ..config import MAX_RAG_CONTEXT_TOKENS, MAX_WORDS_PER_SOURCE
 from ..logging_utils import log_message
+from ..token_calibration import chars_per_token
 
 # Logging Setup
 logger = logging.getLogger(__name__)
 
-def build_context(user_text: str, tool_results: List[Dict], max_context_tokens: int = None) -> str:
+def build_context(
+    user_text: str,
+    tool_results: List[Dict],
+    max_context_tokens: int = None,
+    model_name: Optional[str] = None
+) -> str:
     """
     Baut strukturierten Kontext für AI aus Tool-Ergebnissen
 
@@ -26,6 +32,7 @@ def build_context(user_text: str, tool_results: List[Dict], max_context_tokens:
         user_text: User-Frage
         tool_results: Liste von Recherche-Ergebnissen
         max_context_tokens: Optional, falls None wird MAX_RAG_CONTEXT_TOKENS aus config.py verwendet
+        model_name: Optional, Haupt-LLM für kalibrierte Zeichen/Token-Ratio
     """
     if max_context_tokens is None:
         max_context_tokens = MAX_RAG_CONTEXT_TOKENS
@@ -89,8 +96,8 @@ def build_context(user_text: str, tool_results: List[Dict], max_context_tokens:
 
         source_text += "---\n\n"
 
-        # Token-Check - Ratio aus config.py
-        source_tokens = len(source_text) // CHARS_PER_TOKEN
+        # Token-Check - kalibrierte Ratio (Sprache pro Quelle, Fallback CHARS_PER_TOKEN)
+        source_tokens = int(len(source_text) / chars_per_token(model_name, source_text))
         if total_tokens + source_tokens > max_source_tokens:
             log_message(f"⚠️ Context-Limit erreicht bei Quelle {i}, stoppe hier")
             break
@@ -99,7 +106,7 @@ def build_context(user_text: str, tool_results: List[Dict], max_context_tokens:
         total_tokens += source_tokens
 
     context = context_header + ''.join(sources_text) + context_footer
-    estimated_tokens = len(context) // CHARS_PER_TOKEN
+    estimated_tokens = int(len(context) / chars_per_token(model_name, context))
     logger.info(f"Context gebaut: {len(context)} Zeichen (~{estimated_tokens} Tokens), {len(sources_text)} Quellen")
     log_message(f"📦 Context gebaut: {len(context)} Zeichen (~{estimated_tokens} Tokens), {len(sources_text)} Quellen")
 
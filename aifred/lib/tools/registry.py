@@ -59,13 +59,17 @@ def get_tool_registry() -> ToolRegistry:
 # CONVENIENCE FUNCTIONS
 # ============================================================
 
-def search_web(query: str) -> Dict:
+def search_web(query: str, cancel=None) -> Dict:
     """
     Convenience-Funktion für Web-Suche mit Multi-API Fallback
+
+    Args:
+        query: Suchanfrage
+        cancel: CancelToken des Requests (optional) - bricht das Sammeln ab
     """
     registry = get_tool_registry()
     search_tool = registry.get("Multi-API Search")
-    return search_tool.execute(query)
+    return search_tool.execute(query, cancel=cancel)
 
 
 def scrape_webpage(url: str) -> Dict:
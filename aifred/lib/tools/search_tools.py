@@ -346,13 +346,15 @@ class MultiAPISearchTool(BaseTool):
         self.apis.append(SearXNGSearchTool(searxng_url))
         logger.info("✅ SearXNG aktiviert (Last Resort)")
 
-    def execute(self, query: str, **kwargs) -> Dict:
+    def execute(self, query: str, cancel=None, **kwargs) -> Dict:
         """
         Führt Suche PARALLEL durch - sammelt URLs von ALLEN APIs!
 
         Parallel Execution: Alle APIs starten gleichzeitig.
         Collect All: Warte auf alle APIs, sammle alle URLs.
         Deduplizierung: Entferne doppelte URLs (www, trailing slash, etc.)
+        Abbruch: cancel (CancelToken) verwirft noch nicht gestartete API-Calls
+        und beendet das Sammeln sofort.
         """
         if not self.apis:
             logger.error("❌ Keine Search APIs konfiguriert!")
@@ -371,7 +373,11 @@ class MultiAPISearchTool(BaseTool):
         successful_apis = []
         failed_apis = []
 
-        with ThreadPoolExecutor(max_workers=len(self.apis)) as executor:
+        executor = ThreadPoolExecutor(max_workers=len(self.apis))
+        unregister = cancel.on_cancel(
+            lambda: executor.shutdown(wait=False, cancel_futures=True)
+        ) if cancel is not None else None
+        try:
             # Starte alle APIs parallel
             future_to_api = {
                 executor.submit(api.execute, query, **kwargs): api
@@ -380,6 +386,8 @@ class MultiAPISearchTool(BaseTool):
 
             # Sammle Ergebnisse von ALLEN APIs
             for future in as_completed(future_to_api):
+                if cancel is not None and cancel.cancelled:
+                    break
                 api = future_to_api[future]
                 try:
                     result = future.result(timeout=15)  # Max 15s pro API
@@ -401,6 +409,20 @@ class MultiAPISearchTool(BaseTool):
                 except Exception as e:
                     logger.error(f"❌ {api.name}: {e}")
                     failed_apis.append((api.name, str(e)))
+        finally:
+            if unregister is not None:
+                unregister()
+            executor.shutdown(wait=not (cancel is not None and cancel.cancelled), cancel_futures=True)
+
+        if cancel is not None and cancel.cancelled:
+            logger.info("⏹️ Multi-API Search abgebrochen")
+            return {
+                'success': False,
+                'source': 'Multi-API Search',
+                'query': query,
+                'related_urls': [],
+                'error': 'Abgebrochen'
+            }
 
         # Mindestens eine API erfolgreich?
         if not all_urls:
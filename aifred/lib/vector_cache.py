@@ -23,29 +23,128 @@ USAGE:
 
     cache = get_cache()
     result = await cache.query("What is the weather?")
+
+LOCAL BACKEND:
+    VECTOR_CACHE_BACKEND = "local" replaces the server with LocalVectorIndex
+    (local_vector_index.py): same collection API, in-process, lookups without
+    network hop or thread pool. scripts/migrate_vector_cache.py copies an
+    existing research_cache collection.
+
+EMBEDDINGS:
+    The embedding model runs in this process (chromadb embedding function).
+    Every user turn is embedded once (embed() → QueryEmbedding) and the vector
+    is passed as query_embeddings/embeddings to all cache operations of the
+    turn (direct-hit check, RAG candidates, duplicate check + add). Recent
+    texts are memoized, so callers without the handle don't re-embed either.
+
+ANSWERS:
+    Answers and source lists live in the AnswerStore (answer_store.py,
+    compressed, keyed by entry id), not in the vector metadata. Similarity
+    searches return ids, distances and small metadata; answers are loaded
+    only for a direct hit and for RAG candidates inside the distance range.
+
+EXPIRY & SIZE LIMIT:
+    add(volatility=...) sets expires_at from CACHE_VOLATILITY_TTL (the class
+    comes from the cache decision: permanent / daily / hourly). Expired
+    entries are filtered out of every query result and deleted by compact(),
+    which vector_cache_lifespan runs every VECTOR_CACHE_COMPACTION_INTERVAL.
+    Reads record last_hit/hit_count in the AnswerStore; beyond
+    VECTOR_CACHE_MAX_ENTRIES / VECTOR_CACHE_MAX_BYTES the least recently hit
+    entries are evicted.
 """
 
+import contextlib
 import time
+import threading
 import chromadb
 from chromadb.config import Settings
+from chromadb.utils import embedding_functions
 import asyncio
-from typing import Dict, List, Optional
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
 from .logging_utils import log_message
+from .local_vector_index import LocalVectorIndex
+from .answer_store import AnswerStore
 from .config import (
     CACHE_DISTANCE_HIGH,
     CACHE_DISTANCE_MEDIUM,
     CACHE_DISTANCE_DUPLICATE,
-    CACHE_DISTANCE_RAG
+    CACHE_DISTANCE_RAG,
+    VECTOR_CACHE_URL,
+    VECTOR_CACHE_EMBEDDING_MEMO,
+    VECTOR_CACHE_COUNT_RECONCILE_INTERVAL,
+    VECTOR_CACHE_BACKEND,
+    VECTOR_CACHE_LOCAL_PATH,
+    VECTOR_CACHE_ANSWER_STORE,
+    CACHE_VOLATILITY_TTL,
+    VECTOR_CACHE_MAX_ENTRIES,
+    VECTOR_CACHE_MAX_BYTES,
+    VECTOR_CACHE_COMPACTION_INTERVAL
 )
+from ..backends.transport import create_sync_client, needs_custom_transport
 from datetime import datetime
+from urllib.parse import urlparse
 import uuid
 
+T = TypeVar("T")
+
+try:
+    from chromadb.api.fastapi import FastAPI as _ChromaFastAPI
+except ImportError:
+    _ChromaFastAPI = None
+
+# Backend URL per Chroma server identity ("host:port", the key Chroma uses for its
+# shared System) - chroma_api_impl is instantiated by Chroma, so the URL of the
+# VectorCache that created the client is looked up here
+_TRANSPORT_URLS: Dict[str, str] = {}
+
+
+def _transport_key(host: Optional[str], port) -> str:
+    return f"{host}:{port}"
+
+
+if _ChromaFastAPI is not None:
+    class TransportFastAPI(_ChromaFastAPI):
+        """
+        ChromaDB HTTP API client on AIfred's transport (Unix socket / HTTP/2)
+
+        chromadb.HttpClient has no transport hook, so this API impl (selected via
+        Settings.chroma_api_impl) swaps its httpx session for one built by
+        backends/transport.py from the URL the VectorCache registered for this
+        server (see _TRANSPORT_URLS).
+        """
+
+        def __init__(self, system):
+            super().__init__(system)
+            import httpx
+            old_session = getattr(self, "_session", None)
+            if not isinstance(old_session, httpx.Client):
+                raise RuntimeError("chromadb >= 0.5 (httpx) needed for Unix socket / HTTP/2 transport")
+            settings = system.settings
+            key = _transport_key(settings.chroma_server_host, settings.chroma_server_http_port)
+            url = _TRANSPORT_URLS.get(key)
+            if url is None:
+                raise RuntimeError(f"No transport URL registered for ChromaDB server {key}")
+            session, _ = create_sync_client(url, timeout=None)
+            session.headers.update(old_session.headers)
+            old_session.close()
+            self._session = session
+
+
+@dataclass(frozen=True)
+class QueryEmbedding:
+    """Embedding of one user turn - compute once, pass to every cache operation"""
+    text: str
+    vector: List[float]
+
 
 class VectorCache:
     """
     Vector Cache using ChromaDB in Client-Server Mode
 
-    Connects to ChromaDB Docker container via HTTP.
+    Connects to ChromaDB Docker container via HTTP - or, with
+    VECTOR_CACHE_BACKEND = "local", uses the embedded LocalVectorIndex.
     All operations are thread-safe by design.
 
     Decision Thresholds (Cosine Distance):
@@ -54,110 +153,258 @@ class VectorCache:
     - > 0.85:    LOW confidence    → Web search required
     """
 
-    def __init__(self, host: str = "localhost", port: int = 8000):
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 8000,
+        url: Optional[str] = None,
+        backend: Optional[str] = None
+    ):
         """
-        Initialize Vector Cache with ChromaDB Server
+        Initialize Vector Cache with ChromaDB Server (or the local index)
 
         Args:
             host: ChromaDB server host (default: localhost for Docker)
             port: ChromaDB server port (default: 8000)
+            url: Server URL instead of host/port - http(s)://host:port or
+                unix:///path/chroma.sock (see backends/transport.py)
+            backend: "chroma" or "local" (None = VECTOR_CACHE_BACKEND)
 
         Raises:
             ConnectionError: If ChromaDB server is not running
         """
+        self.backend = backend or VECTOR_CACHE_BACKEND
+        self.url = url or f"http://{host}:{port}"
+        # Same model as the collection default (all-MiniLM-L6-v2), called
+        # explicitly so one vector serves all cache operations of a turn
+        self.embedding_function = embedding_functions.DefaultEmbeddingFunction()
+        self._embeddings: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._embed_lock = threading.Lock()
+        # Entry count kept locally (no count() round-trip per operation),
+        # reconciled with the server every VECTOR_CACHE_COUNT_RECONCILE_INTERVAL
+        self._count = 0
+        self._count_lock = threading.Lock()
+        self._count_synced_at = 0.0
+        # Answers + sources by entry id (fetched lazily, see _attach_answers)
+        self.answers = AnswerStore(VECTOR_CACHE_ANSWER_STORE)
+        # Writes running in the thread pool (updated on the event loop only, see _run)
+        self._writes_in_flight = 0
+
+        if self.is_local:
+            # Embedded index: same collection API, no server, no thread hop per lookup
+            self.client = None
+            self.collection = LocalVectorIndex(VECTOR_CACHE_LOCAL_PATH)
+            self.url = f"local://{VECTOR_CACHE_LOCAL_PATH}"
+            count = self._reconcile_count()
+            log_message(f"✅ Vector Cache: Local index {VECTOR_CACHE_LOCAL_PATH}: {count} entries")
+            return
+
         try:
-            # HttpClient is thread-safe and can be used from async code
-            self.client = chromadb.HttpClient(
-                host=host,
-                port=port,
-                settings=Settings(anonymized_telemetry=False)
-            )
+            if needs_custom_transport(self.url):
+                # Unix socket / HTTP/2: ChromaDB API client with AIfred's httpx transport
+                parsed = urlparse(self.url)
+                server_host = parsed.hostname or host
+                server_port = parsed.port or port
+                _TRANSPORT_URLS[_transport_key(server_host, server_port)] = self.url
+                self.client = chromadb.Client(Settings(
+                    chroma_api_impl="aifred.lib.vector_cache.TransportFastAPI",
+                    chroma_server_host=server_host,
+                    chroma_server_http_port=server_port,
+                    chroma_server_ssl_enabled=parsed.scheme == "https",
+                    anonymized_telemetry=False
+                ))
+            else:
+                # HttpClient is thread-safe and can be used from async code
+                self.client = chromadb.HttpClient(
+                    host=host,
+                    port=port,
+                    settings=Settings(anonymized_telemetry=False)
+                )
 
             # Test connection with heartbeat
             self.client.heartbeat()
 
             # Get or create collection
-            self.collection = self.client.get_or_create_collection(
-                name="research_cache",
-                metadata={"description": "AIfred web research results with semantic search"}
-            )
+            self.collection = self._get_collection()
 
-            count = self.collection.count()
+            count = self._reconcile_count()
             log_message(f"✅ Vector Cache connected to ChromaDB server: {count} entries")
 
         except Exception as e:
             log_message(f"❌ ChromaDB Server connection failed: {e}")
             log_message("💡 Hint: Start ChromaDB with: docker-compose up -d chromadb")
             raise ConnectionError(
-                f"Could not connect to ChromaDB server at {host}:{port}. "
+                f"Could not connect to ChromaDB server at {self.url}. "
                 "Make sure Docker container is running: docker-compose up -d chromadb"
             ) from e
 
-    async def query(self, user_query: str, n_results: int = 1) -> Dict:
-        """
-        Query cache with semantic similarity search
-
-        Args:
-            user_query: User's question
-            n_results: Number of similar results to retrieve (default: 1)
+    @property
+    def is_local(self) -> bool:
+        """True for the embedded LocalVectorIndex backend"""
+        return self.backend == "local"
 
-        Returns:
-            Dict with keys:
-            - source: 'CACHE' or 'CACHE_MISS'
-            - confidence: 'high', 'medium', or 'low'
-            - distance: Cosine distance score (0.0 = identical, 2.0 = opposite)
-            - answer: Cached answer (if found)
-            - metadata: Source metadata (if found)
-            - query_time_ms: Query execution time in milliseconds
+    async def _run(self, func: Callable[..., T], *args: Any, writes: bool = False) -> T:
         """
-        start_time = time.time()
-
-        # Run blocking HTTP call in thread pool
-        # HttpClient calls are fast (typically <50ms), so to_thread overhead is acceptable
-        result = await asyncio.to_thread(
-            self._query_sync,
-            user_query,
-            n_results
+        Run a storage operation: in the thread pool for Chroma HTTP; for the local
+        index lookups run inline (NumPy search + Answer Store SELECT on an
+        in-memory/page-cached file, embedding already resolved by _ensure_embedding).
+
+        Writes (log append, memmap flush, compaction, Answer Store commit) always
+        run in the thread pool. While one is in flight, lookups go to the thread
+        pool too - they would wait for its index/Answer Store lock and block the
+        event loop for the whole flush or compaction.
+        """
+        if self.is_local and not writes and not self._writes_in_flight:
+            return func(*args)
+        if not writes:
+            return await asyncio.to_thread(func, *args)
+        self._writes_in_flight += 1
+        try:
+            return await asyncio.to_thread(func, *args)
+        finally:
+            self._writes_in_flight -= 1
+
+    @property
+    def _chroma(self):
+        """ChromaDB client (not available with the local index)"""
+        if self.client is None:
+            raise RuntimeError("Vector Cache: no ChromaDB client (local backend)")
+        return self.client
+
+    def _get_collection(self):
+        """Get or create the research_cache collection (with our embedding function)"""
+        return self._chroma.get_or_create_collection(
+            name="research_cache",
+            metadata={"description": "AIfred web research results with semantic search"},
+            embedding_function=self.embedding_function
         )
 
-        result['query_time_ms'] = (time.time() - start_time) * 1000
-        return result
+    # ============================================================
+    # Entry count (local, reconciled periodically)
+    # ============================================================
+
+    def _reconcile_count(self) -> int:
+        """Sync the local entry count with the server (one count() round-trip)"""
+        count = self.collection.count()
+        with self._count_lock:
+            self._count = count
+            self._count_synced_at = time.time()
+        return count
+
+    def _maybe_reconcile_count(self):
+        """Reconcile if the last sync is older than VECTOR_CACHE_COUNT_RECONCILE_INTERVAL"""
+        if time.time() - self._count_synced_at >= VECTOR_CACHE_COUNT_RECONCILE_INTERVAL:
+            try:
+                self._reconcile_count()
+            except Exception as e:
+                log_message(f"⚠️ Vector Cache count reconcile failed: {e}")
+
+    def _adjust_count(self, delta: int) -> int:
+        with self._count_lock:
+            self._count = max(0, self._count + delta)
+            return self._count
+
+    # ============================================================
+    # Embeddings (once per turn)
+    # ============================================================
+
+    async def embed(self, text: str) -> QueryEmbedding:
+        """
+        Embed a user turn once - pass the handle to query/query_combined/query_for_rag/add
+
+        Args:
+            text: User's question
 
-    def _query_sync(self, user_query: str, n_results: int) -> Dict:
+        Returns:
+            QueryEmbedding (memoized for the last VECTOR_CACHE_EMBEDDING_MEMO texts)
         """
-        Synchronous query implementation (called in thread pool)
+        return await asyncio.to_thread(self._embed_sync, text)  # ONNX model: always off the loop
+
+    def _embed_sync(self, text: str) -> QueryEmbedding:
+        """Synchronous embedding (thread pool), memoized by text"""
+        with self._embed_lock:
+            vector = self._embeddings.get(text)
+            if vector is not None:
+                self._embeddings.move_to_end(text)
+                return QueryEmbedding(text=text, vector=vector)
+
+        vector = [float(x) for x in self.embedding_function([text])[0]]
+
+        with self._embed_lock:
+            self._embeddings[text] = vector
+            while len(self._embeddings) > VECTOR_CACHE_EMBEDDING_MEMO:
+                self._embeddings.popitem(last=False)
+        return QueryEmbedding(text=text, vector=vector)
+
+    async def _ensure_embedding(self, text: str, embedding: Optional[QueryEmbedding]) -> QueryEmbedding:
+        """Embedding for text without blocking the loop (handle → memo → embed())"""
+        if embedding is not None and embedding.text == text:
+            return embedding
+        with self._embed_lock:
+            vector = self._embeddings.get(text)
+        if vector is not None:
+            return QueryEmbedding(text=text, vector=vector)
+        return await self.embed(text)
+
+    def _resolve_embedding(self, text: str, embedding: Optional[QueryEmbedding]) -> QueryEmbedding:
+        """Use the caller's handle if it belongs to this text, else embed (memoized)"""
+        if embedding is not None and embedding.text == text:
+            return embedding
+        return self._embed_sync(text)
+
+    # ============================================================
+    # Queries
+    # ============================================================
+
+    @staticmethod
+    def _cache_miss() -> Dict:
+        return {
+            'source': 'CACHE_MISS',
+            'confidence': 'low',
+            'distance': 1.0
+        }
 
-        This method runs in asyncio's thread pool, not in event loop.
-        Safe to make blocking HTTP calls here.
+    def _attach_answers(self, entries: List[Dict]) -> List[Dict]:
         """
-        # Check if cache is empty
-        if self.collection.count() == 0:
-            log_message("💾 Vector Cache empty → Web search required")
-            return {
-                'source': 'CACHE_MISS',
-                'confidence': 'low',
-                'distance': 1.0
-            }
+        Load answer + sources for the given entries (one AnswerStore lookup)
 
-        # Perform semantic similarity search
-        results = self.collection.query(
-            query_texts=[user_query],
-            n_results=n_results,
-            include=['distances', 'documents', 'metadatas']
-        )
+        Args:
+            entries: Dicts with 'id' and 'metadata' - 'answer'/'sources' are set in place
 
-        # No results found
+        Returns:
+            The same entries
+        """
+        if not entries:
+            return entries
+        try:
+            stored = self.answers.get_many([entry['id'] for entry in entries])
+        except Exception as e:
+            log_message(f"⚠️ Answer Store lookup failed: {e}")
+            stored = {}
+
+        for entry in entries:
+            content = stored.get(entry['id'])
+            metadata = entry.get('metadata') or {}
+            if content is not None:
+                entry['answer'] = content['answer']
+                entry['sources'] = content['sources']
+            else:
+                # Entries from before the Answer Store: answer still in the metadata
+                entry['answer'] = metadata.get('answer', '')
+                entry['sources'] = [
+                    {'url': url} for url in metadata.get('source_urls', '').split(', ') if url
+                ]
+        return entries
+
+    def _direct_result(self, results: Dict) -> Dict:
+        """Direct-hit evaluation of the best match of a collection.query() result"""
+        # No results found (empty collection included - no count() pre-check)
         if not results['ids'][0]:
             log_message("❌ Vector Cache miss: No similar queries found")
-            return {
-                'source': 'CACHE_MISS',
-                'confidence': 'low',
-                'distance': 1.0
-            }
+            return self._cache_miss()
 
         # Get best match
         distance = results['distances'][0][0]
-        document = results['documents'][0][0]
         metadata = results['metadatas'][0][0]
 
         # Determine confidence based on distance thresholds (from config)
@@ -172,20 +419,226 @@ class VectorCache:
             source = 'CACHE_MISS'
             log_message(f"❌ Vector Cache miss: distance={distance:.3f} (>= {CACHE_DISTANCE_HIGH}) → Will check RAG")
 
-        # Extract answer from metadata (stored there to keep embedding focused on query)
+        # Answer only loaded for a hit (Answer Store, not part of the search result)
         answer = None
-        if source == 'CACHE' and metadata:
-            answer = metadata.get('answer')
+        sources = None
+        if source == 'CACHE':
+            hit = self._attach_answers([{'id': results['ids'][0][0], 'metadata': metadata}])[0]
+            answer, sources = hit['answer'], hit['sources']
 
         return {
+            'id': results['ids'][0][0] if source == 'CACHE' else None,
             'source': source,
             'confidence': confidence,
             'distance': distance,
             'answer': answer,
+            'sources': sources,
             'metadata': metadata if source == 'CACHE' else None
         }
 
-    async def query_newest(self, user_query: str, n_results: int = 5) -> Dict:
+    def _rag_candidates(self, results: Dict) -> List[Dict]:
+        """Entries of a collection.query() result in the RAG range"""
+        # No results found
+        if not results['ids'][0]:
+            return []
+
+        # Filter results in RAG range (CACHE_DISTANCE_HIGH to CACHE_DISTANCE_RAG)
+        # Start from CACHE_DISTANCE_HIGH because anything below that is a direct cache hit
+        rag_candidates = []
+
+        for entry_id, distance, document, metadata in zip(
+            results['ids'][0],
+            results['distances'][0],
+            results['documents'][0],
+            results['metadatas'][0]
+        ):
+            # Only include results in RAG range (not direct hits, but related)
+            if CACHE_DISTANCE_HIGH <= distance < CACHE_DISTANCE_RAG:
+                rag_candidates.append({
+                    'id': entry_id,
+                    'query': document,  # Original cached query
+                    'distance': distance,
+                    'metadata': metadata or {}
+                })
+
+        # Answers only for candidates in range (one batched lookup)
+        self._attach_answers(rag_candidates)
+
+        if rag_candidates:
+            log_message(f"🎯 Found {len(rag_candidates)} RAG candidates (d: {CACHE_DISTANCE_HIGH}-{CACHE_DISTANCE_RAG})")
+        else:
+            log_message(f"❌ No RAG candidates in range {CACHE_DISTANCE_HIGH}-{CACHE_DISTANCE_RAG}")
+
+        return rag_candidates
+
+    def _collection_query(
+        self,
+        embedding: QueryEmbedding,
+        n_results: int,
+        expired: Optional[List[Tuple[str, float]]] = None
+    ) -> Dict:
+        """
+        collection.query() with a precomputed query embedding (expired entries removed)
+
+        Expired entries stay in the index until compact(). If they take places in
+        the top-k, the search is repeated with a larger n_results, so the caller
+        still gets up to n_results live entries.
+
+        Args:
+            embedding: Query embedding
+            n_results: Live entries wanted
+            expired: Collects (id, distance) of the skipped expired entries (optional)
+        """
+        fetch = n_results
+        while True:
+            try:
+                results = self.collection.query(
+                    query_embeddings=[embedding.vector],
+                    n_results=fetch,
+                    include=['distances', 'documents', 'metadatas']
+                )
+            except Exception:
+                # Some chromadb versions raise on an empty collection (no index yet)
+                if self._count == 0:
+                    return {'ids': [[]], 'distances': [[]], 'documents': [[]], 'metadatas': [[]]}
+                raise
+            live, dropped = self._drop_expired(results)
+            # Enough live entries, or the index has no more rows to offer
+            next_fetch = min(fetch * 2, max(fetch, self._count))
+            if len(live['ids'][0]) >= n_results or len(results['ids'][0]) < fetch or next_fetch == fetch:
+                break
+            fetch = next_fetch
+
+        if expired is not None:
+            expired.extend(dropped)
+        if len(live['ids'][0]) <= n_results:
+            return live
+        return {key: [live[key][0][:n_results]] for key in ('ids', 'distances', 'documents', 'metadatas')}
+
+    @staticmethod
+    def _drop_expired(results: Dict) -> Tuple[Dict, List[Tuple[str, float]]]:
+        """
+        Remove entries past their expires_at (deleted later by compact())
+
+        Returns:
+            (results without expired entries, [(id, distance)] of the expired ones)
+        """
+        now = time.time()
+        keep = []
+        dropped = []
+        for i, metadata in enumerate(results['metadatas'][0]):
+            if metadata and metadata.get('expires_at') and metadata['expires_at'] <= now:
+                dropped.append((results['ids'][0][i], results['distances'][0][i]))
+            else:
+                keep.append(i)
+        if not dropped:
+            return results, dropped
+        return {
+            key: [[results[key][0][i] for i in keep]]
+            for key in ('ids', 'distances', 'documents', 'metadatas')
+        }, dropped
+
+    async def query(self, user_query: str, n_results: int = 1, embedding: Optional[QueryEmbedding] = None) -> Dict:
+        """
+        Query cache with semantic similarity search
+
+        Args:
+            user_query: User's question
+            n_results: Number of similar results to retrieve (default: 1)
+            embedding: Per-turn embedding from embed() (None = embed here)
+
+        Returns:
+            Dict with keys:
+            - id: Cache entry id (hit only)
+            - source: 'CACHE' or 'CACHE_MISS'
+            - confidence: 'high', 'medium', or 'low'
+            - distance: Cosine distance score (0.0 = identical, 2.0 = opposite)
+            - answer: Cached answer (if found, loaded from the Answer Store)
+            - sources: Cached source list (if found)
+            - metadata: Source metadata (if found)
+            - query_time_ms: Query execution time in milliseconds
+        """
+        start_time = time.time()
+        if self.is_local:
+            embedding = await self._ensure_embedding(user_query, embedding)
+
+        # Run blocking HTTP call in thread pool
+        # HttpClient calls are fast (typically <50ms), so to_thread overhead is acceptable
+        result = await self._run(
+            self._query_sync,
+            user_query,
+            n_results,
+            embedding
+        )
+        await self._record_direct_hit(result)
+
+        result['query_time_ms'] = (time.time() - start_time) * 1000
+        return result
+
+    def _query_sync(self, user_query: str, n_results: int, embedding: Optional[QueryEmbedding] = None) -> Dict:
+        """
+        Synchronous query implementation (called in thread pool)
+
+        This method runs in asyncio's thread pool, not in event loop.
+        Safe to make blocking HTTP calls here.
+        """
+        # Perform semantic similarity search
+        results = self._collection_query(self._resolve_embedding(user_query, embedding), n_results)
+        return self._direct_result(results)
+
+    async def query_combined(
+        self,
+        user_query: str,
+        n_rag: int = 5,
+        embedding: Optional[QueryEmbedding] = None
+    ) -> Dict:
+        """
+        Direct-hit check + RAG candidates with ONE similarity search
+
+        Same results as query(n_results=1) followed by query_for_rag(n_results=n_rag),
+        for the cost of one embedding and one server round-trip.
+
+        Args:
+            user_query: User's question
+            n_rag: Max number of RAG candidates
+            embedding: Per-turn embedding from embed() (None = embed here)
+
+        Returns:
+            Dict with keys:
+            - direct: query()-style result (source/confidence/distance/answer/metadata)
+            - rag_candidates: query_for_rag()-style list (empty on direct hit)
+            - query_time_ms: Query execution time in milliseconds
+        """
+        start_time = time.time()
+        if self.is_local:
+            embedding = await self._ensure_embedding(user_query, embedding)
+
+        result = await self._run(
+            self._query_combined_sync,
+            user_query,
+            n_rag,
+            embedding
+        )
+        await self._record_direct_hit(result['direct'])
+
+        result['query_time_ms'] = (time.time() - start_time) * 1000
+        result['direct']['query_time_ms'] = result['query_time_ms']
+        return result
+
+    def _query_combined_sync(self, user_query: str, n_rag: int, embedding: Optional[QueryEmbedding] = None) -> Dict:
+        """Synchronous combined query (called in thread pool)"""
+        results = self._collection_query(self._resolve_embedding(user_query, embedding), max(1, n_rag))
+        direct = self._direct_result(results)
+        # Direct hit answers the turn - RAG candidates are only needed on a miss
+        rag_candidates = [] if direct['source'] == 'CACHE' else self._rag_candidates(results)
+        return {'direct': direct, 'rag_candidates': rag_candidates}
+
+    async def query_newest(
+        self,
+        user_query: str,
+        n_results: int = 5,
+        embedding: Optional[QueryEmbedding] = None
+    ) -> Dict:
         """
         Query cache and return the NEWEST match (by timestamp)
 
@@ -195,6 +648,7 @@ class VectorCache:
         Args:
             user_query: User's question
             n_results: Number of similar results to check (default: 5)
+            embedding: Per-turn embedding from embed() (None = embed here)
 
         Returns:
             Dict with keys:
@@ -206,46 +660,45 @@ class VectorCache:
             - query_time_ms: Query execution time in milliseconds
         """
         start_time = time.time()
+        if self.is_local:
+            embedding = await self._ensure_embedding(user_query, embedding)
 
-        result = await asyncio.to_thread(
+        result = await self._run(
             self._query_newest_sync,
             user_query,
-            n_results
+            n_results,
+            embedding
         )
 
         result['query_time_ms'] = (time.time() - start_time) * 1000
         return result
 
-    def _query_newest_sync(self, user_query: str, n_results: int) -> Dict:
+    def _query_newest_sync(self, user_query: str, n_results: int, embedding: Optional[QueryEmbedding] = None) -> Dict:
         """
         Synchronous query_newest implementation (called in thread pool)
 
         Retrieves multiple similar results and returns the newest one (by timestamp).
+        Expired near-duplicates are listed in 'expired_duplicates' (deleted by add()).
         """
-        # Check if cache is empty
-        if self.collection.count() == 0:
-            log_message("💾 Vector Cache empty → Web search required")
-            return {
-                'source': 'CACHE_MISS',
-                'confidence': 'low',
-                'distance': 1.0
-            }
-
         # Perform semantic similarity search (get multiple results)
-        results = self.collection.query(
-            query_texts=[user_query],
-            n_results=min(n_results, self.collection.count()),
-            include=['distances', 'documents', 'metadatas']
+        expired: List[Tuple[str, float]] = []
+        results = self._collection_query(
+            self._resolve_embedding(user_query, embedding),
+            min(n_results, max(1, self._count)),  # Chroma warns if n_results > entries
+            expired
         )
+        result = self._newest_result(results)
+        result['expired_duplicates'] = [
+            entry_id for entry_id, distance in expired if distance < CACHE_DISTANCE_DUPLICATE
+        ]
+        return result
 
+    def _newest_result(self, results: Dict) -> Dict:
+        """query_newest() evaluation of a collection.query() result"""
         # No results found
         if not results['ids'][0]:
             log_message("❌ Vector Cache miss: No similar queries found")
-            return {
-                'source': 'CACHE_MISS',
-                'confidence': 'low',
-                'distance': 1.0
-            }
+            return self._cache_miss()
 
         # Find newest entry among matches with configured distance threshold
         from datetime import datetime
@@ -263,6 +716,7 @@ class VectorCache:
                     if newest_time is None or timestamp > newest_time:
                         newest_time = timestamp
                         newest_entry = {
+                            'id': results['ids'][0][i],
                             'distance': distance,
                             'document': results['documents'][0][i],
                             'metadata': metadata
@@ -287,14 +741,19 @@ class VectorCache:
                 source = 'CACHE_MISS'
                 log_message(f"❌ Vector Cache miss: distance={distance:.3f} (too high)")
 
-            # Extract answer from metadata
-            answer = metadata.get('answer') if source == 'CACHE' else None
+            # Answer from the Answer Store (only for a hit)
+            answer = None
+            sources = None
+            if source == 'CACHE':
+                self._attach_answers([newest_entry])
+                answer, sources = newest_entry['answer'], newest_entry['sources']
 
             return {
                 'source': source,
                 'confidence': confidence,
                 'distance': distance,
                 'answer': answer,
+                'sources': sources,
                 'metadata': metadata if source == 'CACHE' else None
             }
         else:
@@ -311,7 +770,9 @@ class VectorCache:
         query: str,
         answer: str,
         sources: List[Dict],
-        metadata: Optional[Dict] = None
+        metadata: Optional[Dict] = None,
+        embedding: Optional[QueryEmbedding] = None,
+        volatility: Optional[str] = None
     ) -> Dict:
         """
         Add new entry to cache (auto-learning from web search)
@@ -325,6 +786,9 @@ class VectorCache:
             answer: Generated answer (full text, no truncation)
             sources: List of scraped sources with 'url' keys
             metadata: Additional metadata (optional)
+            embedding: Per-turn embedding from embed() (None = embed here, memoized)
+            volatility: Class from the cache decision (CACHE_VOLATILITY_TTL key,
+                None = "permanent") - sets expires_at
 
         Returns:
             Dict with keys:
@@ -333,9 +797,25 @@ class VectorCache:
             - total_entries: Total cache entries after addition/update
             - error: Error message (if failed)
         """
+        # Lifetime from the volatility class (no expires_at = never expires)
+        volatility = volatility or 'permanent'
+        ttl = CACHE_VOLATILITY_TTL.get(volatility)
+        metadata = {**(metadata or {}), 'volatility': volatility}
+        if ttl:
+            metadata['expires_at'] = time.time() + ttl
+
+        # One embedding for duplicate check + stored vector
+        if embedding is None or embedding.text != query:
+            embedding = await self.embed(query)
+
         # Duplicate check: Query if very similar entry exists
         # Use query_newest to check for semantic duplicates (from config)
-        existing = await self.query_newest(query, n_results=5)
+        existing = await self.query_newest(query, n_results=5, embedding=embedding)
+
+        # Expired twins of this query would otherwise sit next to the new entry
+        # (and take its top-1 place) until the next compact()
+        if existing.get('expired_duplicates'):
+            await self._run(self._delete_expired_sync, existing['expired_duplicates'], writes=True)
 
         if existing['source'] == 'CACHE' and existing['distance'] < CACHE_DISTANCE_DUPLICATE:
             # Semantic duplicate found - ALWAYS update (replace old with new)
@@ -345,9 +825,10 @@ class VectorCache:
             old_id = existing['metadata'].get('id')
             if old_id:
                 # Delete old entry and save new one (ChromaDB has no "update" operation)
-                return await asyncio.to_thread(
+                return await self._run(
                     self._update_sync,
-                    old_id, query, answer, sources, metadata
+                    old_id, query, answer, sources, metadata, embedding,
+                    writes=True
                 )
             else:
                 # No ID found, fallback to save as new entry
@@ -355,9 +836,10 @@ class VectorCache:
                 # Fall through to normal save below
 
         # No duplicate, proceed with save
-        return await asyncio.to_thread(
+        return await self._run(
             self._add_sync,
-            query, answer, sources, metadata
+            query, answer, sources, metadata, embedding,
+            writes=True
         )
 
     def _add_sync(
@@ -365,13 +847,14 @@ class VectorCache:
         query: str,
         answer: str,
         sources: List[Dict],
-        metadata: Optional[Dict] = None
+        metadata: Optional[Dict] = None,
+        embedding: Optional[QueryEmbedding] = None
     ) -> Dict:
         """
         Synchronous add implementation (called in thread pool)
         """
         # Build metadata (ChromaDB only supports str, int, float, bool)
-        # Store answer in metadata since it can be large
+        # Small fields only - answer + sources go to the Answer Store
         source_urls = [s.get('url', 'N/A')[:100] for s in sources[:3]]  # Max 3 URLs
 
         # Generate unique ID
@@ -382,24 +865,30 @@ class VectorCache:
             'timestamp': datetime.now().isoformat(),
             'num_sources': len(sources),
             'source_urls': ', '.join(source_urls),
-            'answer': answer,  # Store full answer in metadata
             **(metadata or {})
         }
 
         # Store ONLY the query as document (for embedding/similarity search)
-        # The answer is stored in metadata and retrieved later
+        # The answer is stored in the Answer Store and retrieved lazily
         document = query
 
         try:
+            # Answer first: an entry visible in the index always has its answer
+            self.answers.put(entry_id, answer, sources, expires_at=cache_metadata.get('expires_at'))
+
             # Add to ChromaDB
             self.collection.add(
                 documents=[document],
+                embeddings=[self._resolve_embedding(query, embedding).vector],
                 metadatas=[cache_metadata],
                 ids=[entry_id]
             )
 
-            total = self.collection.count()
-            log_message(f"💾 Vector Cache: Added entry for '{query[:50]}...'")
+            self._adjust_count(+1)
+            self._maybe_reconcile_count()
+            log_message(f"💾 Vector Cache: Added entry for '{query[:50]}...' ({cache_metadata.get('volatility', 'permanent')})")
+            self._evict_sync()
+            total = self._count
             log_message(f"   Total entries: {total}")
 
             return {
@@ -409,6 +898,10 @@ class VectorCache:
 
         except Exception as e:
             log_message(f"⚠️  Vector Cache add failed: {e}")
+            try:
+                self.answers.delete([entry_id])
+            except Exception:
+                pass
             return {
                 'success': False,
                 'error': str(e)
@@ -420,7 +913,8 @@ class VectorCache:
         query: str,
         answer: str,
         sources: List[Dict],
-        metadata: Optional[Dict] = None
+        metadata: Optional[Dict] = None,
+        embedding: Optional[QueryEmbedding] = None
     ) -> Dict:
         """
         Update existing cache entry (delete old, add new with same query)
@@ -428,10 +922,12 @@ class VectorCache:
         try:
             # Delete old entry
             self.collection.delete(ids=[old_id])
+            self.answers.delete([old_id])
+            self._adjust_count(-1)
             log_message(f"🗑️ Deleted old cache entry (id={old_id})")
 
             # Add new entry with updated data
-            return self._add_sync(query, answer, sources, metadata)
+            return self._add_sync(query, answer, sources, metadata, embedding)
 
         except Exception as e:
             log_message(f"⚠️ Vector Cache update failed: {e}")
@@ -446,23 +942,102 @@ class VectorCache:
 
         Returns:
             Dict with keys:
-            - total_entries: Number of cached entries
+            - total_entries: Number of cached entries (local count, reconciled periodically)
+            - count_age_s: Seconds since the count was last synced with the server
+            - answer_store_entries: Entries in the Answer Store
+            - answer_store_bytes: Compressed size of all answers (VECTOR_CACHE_MAX_BYTES)
             - server_url: ChromaDB server URL
         """
-        return await asyncio.to_thread(self._get_stats_sync)
+        return await self._run(self._get_stats_sync)
 
     def _get_stats_sync(self) -> Dict:
         """Synchronous stats implementation"""
-        # Get settings via public API
-        settings = self.client.get_settings()
-        host = getattr(settings, 'chroma_server_host', 'localhost')
-        port = getattr(settings, 'chroma_server_http_port', 8000)
-
+        self._maybe_reconcile_count()
         return {
-            'total_entries': self.collection.count(),
-            'server_url': f"http://{host}:{port}"
+            'total_entries': self._count,
+            'count_age_s': time.time() - self._count_synced_at,
+            'answer_store_entries': self.answers.count(),
+            'answer_store_bytes': self.answers.total_bytes(),
+            'server_url': self.url
         }
 
+    # ============================================================
+    # Expiry, hit tracking, eviction
+    # ============================================================
+
+    async def record_hits(self, entry_ids: List[str]):
+        """
+        Mark entries as used (e.g. RAG context) - keeps them from LRU eviction
+
+        Args:
+            entry_ids: Cache entry ids
+        """
+        await self._run(self._record_hits_sync, entry_ids, writes=True)
+
+    async def _record_direct_hit(self, result: Dict):
+        """Hit tracking for a query()-style result (separate write, off the event loop)"""
+        if result['source'] == 'CACHE' and result.get('id'):
+            await self.record_hits([result['id']])
+
+    def _record_hits_sync(self, entry_ids: List[str]):
+        try:
+            self.answers.record_hits(entry_ids)
+        except Exception as e:
+            log_message(f"⚠️ Vector Cache hit tracking failed: {e}")
+
+    def _delete_entries(self, entry_ids: List[str]):
+        """Delete entries from index + Answer Store"""
+        self.collection.delete(ids=entry_ids)
+        self.answers.delete(entry_ids)
+        self._adjust_count(-len(entry_ids))
+
+    def _delete_expired_sync(self, entry_ids: List[str]):
+        """Delete expired entries right away (instead of waiting for compact())"""
+        try:
+            self._delete_entries(entry_ids)
+            log_message(f"⏰ Vector Cache: {len(entry_ids)} abgelaufene Duplikate gelöscht")
+        except Exception as e:
+            log_message(f"⚠️ Vector Cache: expired duplicates not deleted: {e}")
+
+    def _evict_sync(self) -> List[str]:
+        """Evict least recently hit entries beyond VECTOR_CACHE_MAX_ENTRIES / VECTOR_CACHE_MAX_BYTES"""
+        # Answer Store count, not self._count: legacy entries (answer in metadata) have no
+        # store row and can never be selected as LRU victims
+        try:
+            excess = self.answers.count() - VECTOR_CACHE_MAX_ENTRIES if VECTOR_CACHE_MAX_ENTRIES else 0
+            victims = self.answers.lru_victims(excess, VECTOR_CACHE_MAX_BYTES)
+            if victims:
+                self._delete_entries(victims)
+                log_message(f"🗑️ Vector Cache: {len(victims)} Einträge verdrängt (LRU, Limit erreicht)")
+            return victims
+        except Exception as e:
+            log_message(f"⚠️ Vector Cache eviction failed: {e}")
+            return []
+
+    async def compact(self) -> Dict:
+        """
+        Delete expired entries and enforce the size limits (background task)
+
+        Returns:
+            Dict with keys:
+            - expired: Deleted expired entries
+            - evicted: Entries evicted by the size limits
+            - total_entries: Entries afterwards
+        """
+        return await self._run(self._compact_sync, writes=True)
+
+    def _compact_sync(self) -> Dict:
+        """Synchronous compaction (thread pool)"""
+        expired = self.answers.expired_ids()
+        if expired:
+            self._delete_entries(expired)
+            log_message(f"⏰ Vector Cache: {len(expired)} abgelaufene Einträge gelöscht")
+        evicted = self._evict_sync()
+        if self.is_local and self.collection.dead_rows() > self.collection.count():
+            self.collection.compact()
+        total = self._reconcile_count()
+        return {'expired': len(expired), 'evicted': len(evicted), 'total_entries': total}
+
     async def clear(self) -> Dict:
         """
         Clear all cache entries
@@ -472,23 +1047,32 @@ class VectorCache:
             - success: True if cleared successfully
             - error: Error message (if failed)
         """
-        return await asyncio.to_thread(self._clear_sync)
+        return await self._run(self._clear_sync, writes=True)
 
     def _clear_sync(self) -> Dict:
         """Synchronous clear implementation"""
         try:
-            self.client.delete_collection("research_cache")
-            self.collection = self.client.get_or_create_collection(
-                name="research_cache",
-                metadata={"description": "AIfred web research results with semantic search"}
-            )
+            if self.is_local:
+                self.collection.clear()
+            else:
+                self._chroma.delete_collection("research_cache")
+                self.collection = self._get_collection()
+            self.answers.clear()
+            with self._count_lock:
+                self._count = 0
+                self._count_synced_at = time.time()
             log_message("🗑️  Vector Cache cleared")
             return {'success': True}
         except Exception as e:
             log_message(f"⚠️  Vector Cache clear failed: {e}")
             return {'success': False, 'error': str(e)}
 
-    async def query_for_rag(self, user_query: str, n_results: int = 5) -> List[Dict]:
+    async def query_for_rag(
+        self,
+        user_query: str,
+        n_results: int = 5,
+        embedding: Optional[QueryEmbedding] = None
+    ) -> List[Dict]:
         """
         Query cache for RAG (Retrieval-Augmented Generation) purposes.
         Returns multiple results in the RAG distance range (0.5 - 1.2) that might be
@@ -497,22 +1081,28 @@ class VectorCache:
         Args:
             user_query: User's current question
             n_results: Max number of potential context entries to return
+            embedding: Per-turn embedding from embed() (None = embed here)
 
         Returns:
             List of dicts with: {
+                'id': cache entry id,
                 'query': original cached query,
-                'answer': cached answer,
+                'answer': cached answer (loaded from the Answer Store),
+                'sources': cached source list ([{'url', 'title'}]),
                 'distance': semantic distance,
                 'metadata': cache metadata
             }
         """
         start_time = time.time()
+        if self.is_local:
+            embedding = await self._ensure_embedding(user_query, embedding)
 
         # Run in thread pool
-        results = await asyncio.to_thread(
+        results = await self._run(
             self._query_for_rag_sync,
             user_query,
-            n_results
+            n_results,
+            embedding
         )
 
         query_time_ms = (time.time() - start_time) * 1000
@@ -520,61 +1110,25 @@ class VectorCache:
 
         return results
 
-    def _query_for_rag_sync(self, user_query: str, n_results: int) -> List[Dict]:
+    def _query_for_rag_sync(self, user_query: str, n_results: int, embedding: Optional[QueryEmbedding] = None) -> List[Dict]:
         """
         Synchronous RAG query implementation (called in thread pool)
         """
-        # Check if cache is empty
-        if self.collection.count() == 0:
-            return []
-
-        # Perform semantic similarity search
-        results = self.collection.query(
-            query_texts=[user_query],
-            n_results=n_results,
-            include=['distances', 'documents', 'metadatas']
-        )
-
-        # No results found
-        if not results['ids'][0]:
-            return []
-
-        # Filter results in RAG range (CACHE_DISTANCE_HIGH to CACHE_DISTANCE_RAG)
-        # Start from CACHE_DISTANCE_HIGH because anything below that is a direct cache hit
-        rag_candidates = []
-
-        for i, (distance, document, metadata) in enumerate(zip(
-            results['distances'][0],
-            results['documents'][0],
-            results['metadatas'][0]
-        )):
-            # Only include results in RAG range (not direct hits, but related)
-            if CACHE_DISTANCE_HIGH <= distance < CACHE_DISTANCE_RAG:
-                rag_candidates.append({
-                    'query': document,  # Original cached query
-                    'answer': metadata.get('answer', ''),
-                    'distance': distance,
-                    'metadata': metadata
-                })
-
-        if rag_candidates:
-            log_message(f"🎯 Found {len(rag_candidates)} RAG candidates (d: {CACHE_DISTANCE_HIGH}-{CACHE_DISTANCE_RAG})")
-        else:
-            log_message(f"❌ No RAG candidates in range {CACHE_DISTANCE_HIGH}-{CACHE_DISTANCE_RAG}")
-
-        return rag_candidates
+        # Perform semantic similarity search (empty collection → no results)
+        results = self._collection_query(self._resolve_embedding(user_query, embedding), n_results)
+        return self._rag_candidates(results)
 
 
 # Global cache instance (singleton)
 _cache_instance: Optional[VectorCache] = None
 
 
-def get_cache(host: str = "localhost", port: int = 8000) -> VectorCache:
+def get_cache(host: Optional[str] = None, port: Optional[int] = None) -> VectorCache:
     """
     Get or create global cache instance (singleton pattern)
 
     Args:
-        host: ChromaDB server host
+        host: ChromaDB server host (None + port None = VECTOR_CACHE_URL)
         port: ChromaDB server port
 
     Returns:
@@ -586,11 +1140,43 @@ def get_cache(host: str = "localhost", port: int = 8000) -> VectorCache:
     global _cache_instance
 
     if _cache_instance is None:
-        _cache_instance = VectorCache(host=host, port=port)
+        if host is None and port is None:
+            _cache_instance = VectorCache(url=VECTOR_CACHE_URL)
+        else:
+            _cache_instance = VectorCache(host=host or "localhost", port=port or 8000)
 
     return _cache_instance
 
 
+async def _compaction_loop():
+    """Compact the cache every VECTOR_CACHE_COMPACTION_INTERVAL (only once it is connected)"""
+    while True:
+        await asyncio.sleep(VECTOR_CACHE_COMPACTION_INTERVAL)
+        if _cache_instance is None:
+            continue
+        try:
+            await _cache_instance.compact()
+        except Exception as e:
+            log_message(f"⚠️ Vector Cache compaction failed: {e}")
+
+
+@contextlib.asynccontextmanager
+async def vector_cache_lifespan():
+    """
+    App lifespan task: background compaction (expiry + size limits)
+
+    Usage (Reflex):
+        app.register_lifespan_task(vector_cache_lifespan)
+    """
+    task = asyncio.create_task(_compaction_loop())
+    try:
+        yield
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+
 def reset_cache_instance():
     """
     Reset global cache instance (for testing/restart)
@@ -19,8 +19,12 @@ from .lib import (
     set_language
 )
 from .lib.formatting import format_debug_message
+from .lib.cancellation import RequestCancelled, start_request, cancel_request, finish_request
+from .lib.tokenizer_service import preload_tokenizer
 from .lib import config
 from .lib.vllm_manager import vLLMProcessManager
+from .backends import invalidate_model_metadata
+from .backends.transport import curl_command
 
 # ============================================================
 # Module-Level Vector Cache (ChromaDB Server Mode)
@@ -107,6 +111,7 @@ class AIState(rx.State):
 
     # Qwen3 Thinking Mode (Chain-of-Thought Reasoning)
     enable_thinking: bool = True  # True = Thinking Mode (temp=0.6), False = Non-Thinking (temp=0.7)
+    thinking_budget: int = 0  # Max reasoning tokens per answer (0 = unlimited)
     thinking_mode_warning: str = ""  # Empty = no warning, otherwise show model name that doesn't support thinking
 
     # vLLM YaRN Settings (RoPE Scaling for Context Extension)
@@ -224,6 +229,7 @@ class AIState(rx.State):
 
                 self.temperature = saved_settings.get("temperature", self.temperature)
                 self.enable_thinking = saved_settings.get("enable_thinking", self.enable_thinking)
+                self.thinking_budget = saved_settings.get("thinking_budget", self.thinking_budget)
 
                 # Load vLLM YaRN & Context Settings
                 self.enable_yarn = saved_settings.get("enable_yarn", self.enable_yarn)
@@ -352,6 +358,9 @@ class AIState(rx.State):
             elif self.backend_type == "tabbyapi":
                 self.backend_url = "http://localhost:5000/v1"
 
+            # Fresh initialization: drop cached model metadata for this URL
+            invalidate_model_metadata(base_url=self.backend_url)
+
             # add_debug() already logs to file, so we only need one call
             self.add_debug(f"🔧 Creating backend: {self.backend_type}")
             # Detailed info only in log file (not in UI)
@@ -389,11 +398,9 @@ class AIState(rx.State):
 
                 else:
                     # Ollama: Query server API
-                    endpoint = f'{self.backend_url}/api/tags'
-
-                    # Synchronous curl call to get model list
+                    # Synchronous curl call to get model list (TCP or Unix socket)
                     result = subprocess.run(
-                        ['curl', '-s', endpoint],
+                        curl_command(self.backend_url, '/api/tags'),
                         capture_output=True,
                         text=True,
                         timeout=5.0
@@ -417,6 +424,10 @@ class AIState(rx.State):
 
                 self.backend_info = f"{self.backend_type} - {len(self.available_models)} models"
                 self.backend_healthy = True
+
+                # Local tokenizers load in the background (exact token counts later)
+                preload_tokenizer(self.selected_model)
+                preload_tokenizer(self.automatik_model)
                 self.add_debug(f"✅ {len(self.available_models)} Models vorhanden (Main: {self.selected_model}, Automatik: {self.automatik_model})")
 
             except Exception as e:
@@ -429,20 +440,19 @@ class AIState(rx.State):
             if self.backend_type == "vllm":
                 await self._start_vllm_server()
 
-            # Preload Automatik-LLM via curl in background (simple & non-blocking!)
+            # Preload Automatik-LLM in background (simple & non-blocking!)
             # Note: For vLLM, skip preload curl since server was just started with the model
             if self.automatik_model and self.backend_type != "vllm":
+                import shlex
                 import subprocess
                 try:
                     if self.backend_type == "ollama":
-                        # Ollama-specific preload
-                        preload_cmd = f'curl -s http://localhost:11434/api/chat -d \'{{"model":"{self.automatik_model}","messages":[{{"role":"user","content":"hi"}}],"stream":false,"options":{{"num_predict":1}}}}\' > /dev/null 2>&1 &'
-                        subprocess.Popen(preload_cmd, shell=True)
-                        log_message(f"🚀 Preloading {self.automatik_model} via curl (background)")
-                        self.add_debug(f"🚀 Preloading {self.automatik_model}...")
+                        # Ollama: Residency-Planer entscheidet keep_alive + Lade-Reihenfolge
+                        await self._plan_model_residency()
                     elif self.backend_type == "tabbyapi":
                         # OpenAI-compatible preload (TabbyAPI)
-                        preload_cmd = f'curl -s {self.backend_url}/chat/completions -H "Content-Type: application/json" -d \'{{"model":"{self.automatik_model}","messages":[{{"role":"user","content":"hi"}}],"max_tokens":1}}\' > /dev/null 2>&1 &'
+                        preload_body = json.dumps({"model": self.automatik_model, "messages": [{"role": "user", "content": "hi"}], "max_tokens": 1})
+                        preload_cmd = shlex.join(curl_command(self.backend_url, '/chat/completions') + ['-H', 'Content-Type: application/json', '-d', preload_body]) + ' > /dev/null 2>&1 &'
                         subprocess.Popen(preload_cmd, shell=True)
                         log_message(f"🚀 Preloading {self.automatik_model} via {self.backend_type} (background)")
                         self.add_debug(f"🚀 Preloading {self.automatik_model}...")
@@ -488,6 +498,7 @@ class AIState(rx.State):
             "research_mode": self.research_mode,
             "temperature": self.temperature,
             "enable_thinking": self.enable_thinking,
+            "thinking_budget": self.thinking_budget,
             "backend_models": backend_models,  # Merged: preserves all backends
             # vLLM YaRN & Context Settings
             "enable_yarn": self.enable_yarn,
@@ -692,6 +703,9 @@ class AIState(rx.State):
                 # Store in global state so it persists across page reloads
                 _global_backend_state["vllm_manager"] = self._vllm_manager
 
+                # New server process → max_model_len may have changed (YaRN, hardware limit)
+                invalidate_model_metadata(base_url=self.backend_url)
+
                 self.add_debug("✅ vLLM server ready on port 8001")
             else:
                 raise RuntimeError("vLLM failed to start with auto-detection")
@@ -723,10 +737,9 @@ class AIState(rx.State):
             # Unload all Ollama models from VRAM
             self.add_debug("🧹 Unloading Ollama models from VRAM...")
             try:
-                # Create Ollama backend instance to call unload_all_models
-                from .lib.llm_client import LLMClient
-                llm_client = LLMClient(backend_type="ollama", base_url="http://localhost:11434")
-                backend = llm_client._get_backend()
+                # Use pooled Ollama backend instance to call unload_all_models
+                from .backends import BackendRegistry
+                backend = BackendRegistry.get("ollama", base_url="http://localhost:11434")
 
                 if hasattr(backend, 'unload_all_models'):
                     count = await backend.unload_all_models()
@@ -778,6 +791,14 @@ class AIState(rx.State):
             except Exception as e:
                 self.add_debug(f"❌ Failed to stop TabbyAPI: {e}")
 
+        # Close pooled connections and drop cached model metadata of the old backend
+        try:
+            from .backends import BackendRegistry
+            await BackendRegistry.close_backend(old_backend)
+            invalidate_model_metadata(base_url=self.backend_url)
+        except Exception as e:
+            log_message(f"⚠️ Failed to close backend pool for {old_backend}: {e}")
+
     async def send_message(self):
         """
         Send message to LLM with optional web research
@@ -801,6 +822,10 @@ class AIState(rx.State):
         self.current_ai_response = ""
         yield  # Update UI sofort (Eingabefeld leeren + Spinner zeigen + Eingabe anzeigen)
 
+        # Request-scoped Cancel-Token: Stop-Button (stop_generation) + Deadline
+        cancel = start_request(self.session_id, timeout=config.REQUEST_DEADLINE_SECONDS)
+        temp_history_index = len(self.chat_history)
+
         # Debug message wird von agent_core.py geloggt, nicht hier!
 
         try:
@@ -822,7 +847,8 @@ class AIState(rx.State):
                 
                 # Build LLM options (include enable_thinking toggle)
                 llm_options = {
-                    'enable_thinking': self.enable_thinking
+                    'enable_thinking': self.enable_thinking,
+                    'thinking_budget': self.thinking_budget or None
                 }
 
                 # REAL STREAMING: Call async generator directly
@@ -837,7 +863,8 @@ class AIState(rx.State):
                     temperature=self.temperature,
                     llm_options=llm_options,
                     backend_type=self.backend_type,
-                    backend_url=self.backend_url
+                    backend_url=self.backend_url,
+                    cancel=cancel
                 ):
                     # Route messages based on type
                     if item["type"] == "debug":
@@ -900,7 +927,8 @@ class AIState(rx.State):
 
                 # Build LLM options (include enable_thinking toggle)
                 llm_options = {
-                    'enable_thinking': self.enable_thinking
+                    'enable_thinking': self.enable_thinking,
+                    'thinking_budget': self.thinking_budget or None
                 }
 
                 # REAL STREAMING: Call async generator directly
@@ -916,7 +944,8 @@ class AIState(rx.State):
                     temperature=self.temperature,
                     llm_options=llm_options,
                     backend_type=self.backend_type,
-                    backend_url=self.backend_url
+                    backend_url=self.backend_url,
+                    cancel=cancel
                 ):
                     # Route messages based on type
                     if item["type"] == "debug":
@@ -983,22 +1012,23 @@ class AIState(rx.State):
                 import time
                 preload_start = time.time()
 
+                # Minimal system prompt with timestamp (prefix-stable mode: timestamp behind the history)
+                from .lib.prompt_loader import load_system_prompt, detect_language
+                detected_language = detect_language(user_msg)
+                system_prompt_minimal, volatile_context = load_system_prompt('system_minimal', lang=detected_language)
+
                 # Build messages from history
                 from .lib.message_builder import build_messages_from_history
                 messages = build_messages_from_history(
                     history=self.chat_history[:-1],  # Exclude current temporary entry
-                    current_user_text=user_msg
+                    current_user_text=user_msg,
+                    system_prompt=system_prompt_minimal,
+                    volatile_context=volatile_context
                 )
 
-                # Inject minimal system prompt with timestamp (from load_prompt - automatically includes date/time)
-                from .lib.prompt_loader import load_prompt, detect_language
-                detected_language = detect_language(user_msg)
-                system_prompt_minimal = load_prompt('system_minimal', lang=detected_language)
-                messages.insert(0, {"role": "system", "content": system_prompt_minimal})
-
-                # Create backend instance
-                from .backends import BackendFactory, LLMOptions, LLMMessage
-                backend = BackendFactory.create(
+                # Get pooled backend instance (shared keep-alive connections)
+                from .backends import BackendRegistry, LLMOptions, LLMMessage
+                backend = BackendRegistry.get(
                     self.backend_type,
                     base_url=self.backend_url
                 )
@@ -1020,7 +1050,7 @@ class AIState(rx.State):
                     yield
 
                     # Preload via backend (measures actual model loading time)
-                    success, load_time = await backend.preload_model(self.selected_model)
+                    success, load_time = await cancel.run(backend.preload_model(self.selected_model))
 
                     if success:
                         self.add_debug(f"✅ Haupt-LLM vorgeladen ({load_time:.1f}s)")
@@ -1047,7 +1077,9 @@ class AIState(rx.State):
                 # Build LLM options
                 llm_options = LLMOptions(
                     temperature=self.temperature,
-                    enable_thinking=self.enable_thinking
+                    enable_thinking=self.enable_thinking,
+                    thinking_budget=self.thinking_budget or None,
+                    affinity_key=self.session_id  # Sticky endpoint (multi-endpoint pool)
                 )
 
                 # Convert to LLMMessage format
@@ -1064,12 +1096,13 @@ class AIState(rx.State):
                 ttft = None
                 first_token_received = False
                 tokens_generated = 0
+                metrics = {}
 
-                async for chunk in backend.chat_stream(
+                async for chunk in cancel.iterate(backend.scheduled_chat_stream(
                     model=self.selected_model,
                     messages=llm_messages,
                     options=llm_options
-                ):
+                )):
                     if chunk["type"] == "content":
                         # Measure TTFT (matching Automatik mode)
                         if not first_token_received:
@@ -1085,19 +1118,24 @@ class AIState(rx.State):
                         if temp_history_index < len(self.chat_history):
                             self.chat_history[temp_history_index] = (user_msg, self.current_ai_response)
                         yield  # Update UI
+                    elif chunk["type"] == "debug":
+                        self.add_debug(chunk["message"])
+                        yield
                     elif chunk["type"] == "done":
                         metrics = chunk.get("metrics", {})
                         tokens_generated = metrics.get("tokens_generated", 0)
 
                 inference_time = time.time() - inference_start
 
-                # Console: LLM finished (matching Automatik mode)
-                tokens_per_sec = tokens_generated / inference_time if inference_time > 0 else 0
-                self.add_debug(f"✅ Haupt-LLM fertig ({inference_time:.1f}s, {tokens_generated} tokens, {tokens_per_sec:.1f} tok/s)")
+                # Console: LLM finished (matching Automatik mode) - tok/s = decode rate (StreamMetrics)
+                tokens_per_sec = metrics.get("tokens_per_second", 0)
+                from .lib.formatting import format_thinking_process, format_thinking_timing, format_stream_metrics
+                if metrics:
+                    log_message(format_stream_metrics(metrics))
+                self.add_debug(f"✅ Haupt-LLM fertig ({inference_time:.1f}s, {tokens_generated} tokens, {tokens_per_sec:.1f} tok/s{format_thinking_timing(metrics)})")
                 yield
 
                 # Format <think> tags as collapsible (if present)
-                from .lib.formatting import format_thinking_process
                 formatted_response = format_thinking_process(
                     full_response,
                     model_name=self.selected_model,
@@ -1114,8 +1152,6 @@ class AIState(rx.State):
                 self.is_generating = False
                 yield  # Force UI update
 
-                await backend.close()
-
             # ============================================================
             # POST-RESPONSE: History Summarization Check (im Hintergrund)
             # ============================================================
@@ -1127,14 +1163,14 @@ class AIState(rx.State):
             try:
                 from .lib.context_manager import summarize_history_if_needed
                 from .lib.config import HISTORY_MIN_MESSAGES_BEFORE_COMPRESSION
-                from .backends import BackendFactory
+                from .backends import BackendRegistry
 
                 # Nur prüfen wenn History signifikant ist
                 if len(self.chat_history) >= HISTORY_MIN_MESSAGES_BEFORE_COMPRESSION:
                     self.add_debug(f"✅ Compression check passed: {len(self.chat_history)} >= {HISTORY_MIN_MESSAGES_BEFORE_COMPRESSION}")
                     yield
-                    # Backend für Summarization
-                    temp_backend = BackendFactory.create(
+                    # Backend für Summarization (pooled, nicht schließen)
+                    temp_backend = BackendRegistry.get(
                         self.backend_type,
                         base_url=self.backend_url
                     )
@@ -1170,8 +1206,6 @@ class AIState(rx.State):
                             self.set_progress(phase="compress")
                             yield
 
-                    await temp_backend.close()
-
                     # Progress clearen falls gesetzt
                     if self.progress_phase == "compress":
                         self.clear_progress()
@@ -1213,6 +1247,23 @@ class AIState(rx.State):
             # Debug-Zeile entfernt - User wollte das nicht sehen
             # self.add_debug(f"✅ Response complete ({len(full_response)} chars)")
 
+        except RequestCancelled as e:
+            # Stop-Button / Deadline: bisherige Teilantwort behalten
+            reason = "Deadline überschritten" if e.reason == "deadline" else "gestoppt"
+            from .lib.formatting import format_thinking_process, format_metadata
+            partial = self.current_ai_response
+            if "<think>" in partial and "</think>" not in partial:
+                partial += "</think>"  # Collapsible auch bei abgebrochenem Denkprozess
+            stopped_text = (format_thinking_process(partial, model_name=self.selected_model) if partial else "") \
+                + " " + format_metadata(f"(⏹️ Abgebrochen: {reason})")
+            # is_generating already False = answer was complete (cancel hit post-processing)
+            if self.is_generating and temp_history_index < len(self.chat_history):
+                self.chat_history[temp_history_index] = (user_msg, stopped_text)
+            self.current_ai_response = ""
+            self.current_user_message = ""
+            self.clear_progress()
+            self.add_debug(f"⏹️ Generierung abgebrochen ({reason})")
+
         except Exception as e:
             error_msg = f"Error: {str(e)}"
             self.current_ai_response = error_msg
@@ -1224,10 +1275,24 @@ class AIState(rx.State):
             self.add_debug(f"Traceback: {traceback.format_exc()}")
 
         finally:
+            finish_request(self.session_id, cancel)
             self.is_generating = False
             # Final debug sync
 
 
+    @rx.event(background=True)
+    async def stop_generation(self):
+        """
+        Stop the running request of this session (Stop button)
+
+        Background event: send_message holds the state lock while streaming,
+        so this handler must not wait for it - it only cancels the session's
+        CancelToken (session_id is read-only here). send_message then closes
+        the LLM stream, drops search/scrape futures and updates the UI.
+        """
+        if not cancel_request(self.session_id):
+            log_message("⏹️ Stop: kein laufender Request")
+
     def clear_chat(self):
         """Clear chat history"""
         self.chat_history = []
@@ -1261,6 +1326,9 @@ class AIState(rx.State):
             self.add_debug(f"🔄 Restarting {backend_name} service...")
             yield  # Update UI
 
+            # Restart may change context limits / loaded models → drop cached metadata
+            invalidate_model_metadata(base_url=self.backend_url)
+
             if self.backend_type == "ollama":
                 subprocess.run(["systemctl", "restart", "ollama"], check=True)
                 self.add_debug(f"✅ {backend_name} service restarted")
@@ -1275,9 +1343,8 @@ class AIState(rx.State):
 
                 for attempt in range(max_retries):
                     try:
-                        endpoint = f'{self.backend_url}/api/tags'
                         result = subprocess.run(
-                            ['curl', '-s', endpoint],
+                            curl_command(self.backend_url, '/api/tags'),
                             capture_output=True,
                             text=True,
                             timeout=2.0
@@ -1464,14 +1531,44 @@ class AIState(rx.State):
             self.add_debug(f"❌ AIfred service restart failed: {e}")
 
 
-    def set_selected_model(self, model: str):
+    async def _plan_model_residency(self):
+        """
+        Ollama: plan VRAM residency of main + Automatik model (keep_alive, load order)
+        and preload the planned models in the background
+        """
+        from .backends import BackendRegistry
+        from .lib.residency_planner import plan_residency, schedule_preload
+
+        try:
+            backend = BackendRegistry.get(self.backend_type, base_url=self.backend_url)
+            plan = await plan_residency(backend, self.selected_model, self.automatik_model)
+        except Exception as e:
+            log_message(f"⚠️ Residency planning failed: {e}")
+            return
+        if plan is None:
+            return
+
+        self.add_debug(plan.summary())
+        for warning in plan.warnings:
+            self.add_debug(warning)
+        if plan.preload:
+            self.add_debug(f"🚀 Preloading {', '.join(plan.preload)}...")
+            schedule_preload(backend, plan)
+
+    async def set_selected_model(self, model: str):
         """Set selected model"""
         self.selected_model = model
         # Clear thinking mode warning when model changes
         self.thinking_mode_warning = ""
+        # Model switch: re-query metadata on next use
+        invalidate_model_metadata(model=model)
+        preload_tokenizer(model)
         self.add_debug(f"📝 Model changed to: {model}")
         self._save_settings()
 
+        if self.backend_type == "ollama":
+            await self._plan_model_residency()
+
     def toggle_thinking_mode(self):
         """Toggle Qwen3 Thinking Mode"""
         self.enable_thinking = not self.enable_thinking
@@ -1480,6 +1577,24 @@ class AIState(rx.State):
         self.add_debug(f"🧠 {mode_name} aktiviert (temp={temp})")
         self._save_settings()
 
+    def set_thinking_budget(self, budget: str):
+        """Set reasoning token budget for Thinking Mode (0 = unlimited)"""
+        from .lib.config import THINKING_BUDGET_MAX
+        try:
+            budget_int = int(float(budget)) if budget not in ("", None) else 0
+        except ValueError:
+            self.add_debug(f"❌ Ungültiges Thinking-Budget: {budget}")
+            return
+        if not 0 <= budget_int <= THINKING_BUDGET_MAX:
+            self.add_debug(f"❌ Thinking-Budget muss zwischen 0 und {THINKING_BUDGET_MAX} liegen")
+            return
+        self.thinking_budget = budget_int
+        if budget_int:
+            self.add_debug(f"🧠 Thinking-Budget: {budget_int} Tokens")
+        else:
+            self.add_debug("🧠 Thinking-Budget: unbegrenzt")
+        self._save_settings()
+
     def toggle_yarn(self):
         """Toggle YaRN context extension"""
         self.enable_yarn = not self.enable_yarn
@@ -1528,23 +1643,21 @@ class AIState(rx.State):
         self.add_debug(f"🔍 Research mode: {self.research_mode}")
         self._save_settings()  # Persist research mode to settings.json
 
-    def set_automatik_model(self, model: str):
+    async def set_automatik_model(self, model: str):
         """Set automatik model for decision and query optimization"""
         self.automatik_model = model
         self.add_debug(f"⚡ Automatik model: {model}")
         self._save_settings()
 
-        # Preload new model in background (via curl)
-        import subprocess
-        preload_cmd = f'curl -s http://localhost:11434/api/chat -d \'{{"model":"{model}","messages":[{{"role":"user","content":"hi"}}],"stream":false,"options":{{"num_predict":1}}}}\' > /dev/null 2>&1 &'
-        try:
-            subprocess.Popen(preload_cmd, shell=True)
-            log_message(f"🚀 Preloading new Automatik-LLM: {model}")
-            self.add_debug(f"🚀 Preloading {model}...")
-        except Exception as e:
-            log_message(f"⚠️ Preload failed: {e}")
+        # Model switch + preload: re-query metadata on next use
+        invalidate_model_metadata(model=model)
+        preload_tokenizer(model)
+
+        # Ollama: re-plan residency (co-resident with main model?) and preload
+        if self.backend_type == "ollama":
+            await self._plan_model_residency()
 
-        # Note: Context limit will be queried on first use (fast ~30ms) and cached by httpx
+        # Note: Context limit will be queried on first use (fast ~30ms) and cached in the metadata cache
 
     def toggle_tts(self):
         """Toggle TTS on/off"""
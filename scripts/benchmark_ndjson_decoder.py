@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Micro-Benchmark: Ollama NDJSON stream decoding
+
+Compares the previous chat_stream() loop (aiter_lines + json.loads per line,
+one event dict per token) with NDJSONDecoder (raw byte chunks, orjson if
+installed, one coalesced content event per network chunk).
+
+The "recorded" stream is synthesized in the exact /api/chat format
+(thinking frames, content frames, final done frame) and split into
+network-sized chunks, so no Ollama server is needed.
+
+Usage:
+    ./venv/bin/python scripts/benchmark_ndjson_decoder.py
+    ./venv/bin/python scripts/benchmark_ndjson_decoder.py --tokens 4000 --chunk-size 512 --runs 50
+"""
+import argparse
+import importlib.util
+import json
+import time
+from pathlib import Path
+
+# Load decoder module directly (avoids importing the httpx-based backends package)
+_DECODER_PATH = Path(__file__).resolve().parent.parent / "aifred" / "backends" / "ndjson_decoder.py"
+_spec = importlib.util.spec_from_file_location("ndjson_decoder", _DECODER_PATH)
+ndjson_decoder = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(ndjson_decoder)
+
+
+def record_stream(tokens: int, thinking_tokens: int) -> bytes:
+    """Build an Ollama /api/chat NDJSON stream"""
+    lines = []
+    for i in range(thinking_tokens):
+        lines.append({"model": "qwen3:8b", "created_at": "2025-01-01T00:00:00Z",
+                      "message": {"role": "assistant", "content": "", "thinking": f" gedanke{i}"},
+                      "done": False})
+    for i in range(tokens):
+        lines.append({"model": "qwen3:8b", "created_at": "2025-01-01T00:00:00Z",
+                      "message": {"role": "assistant", "content": f" wort{i}"},
+                      "done": False})
+    lines.append({"model": "qwen3:8b", "created_at": "2025-01-01T00:00:00Z",
+                  "message": {"role": "assistant", "content": ""},
+                  "done": True, "done_reason": "stop",
+                  "eval_count": tokens, "eval_duration": 10**9, "prompt_eval_count": 100})
+    return b"".join(json.dumps(line).encode() + b"\n" for line in lines)
+
+
+def split_chunks(stream: bytes, chunk_size: int) -> list:
+    return [stream[i:i + chunk_size] for i in range(0, len(stream), chunk_size)]
+
+
+def old_loop(chunks: list) -> str:
+    """Previous implementation: decode to str, split lines, json.loads, one event per token"""
+    events = []
+    buffer = ""
+    thinking_started = False
+    for chunk in chunks:
+        buffer += chunk.decode("utf-8")
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            if not line.strip():
+                continue
+            data = json.loads(line)
+            message = data.get("message")
+            if message:
+                thinking = message.get("thinking")
+                content = message.get("content")
+                if thinking:
+                    if not thinking_started:
+                        events.append({"type": "content", "text": "<think>"})
+                        thinking_started = True
+                    events.append({"type": "content", "text": thinking})
+                if content:
+                    if thinking_started:
+                        events.append({"type": "content", "text": "</think>\n\n"})
+                        thinking_started = False
+                    events.append({"type": "content", "text": content})
+            if data.get("done", False):
+                events.append({"type": "done"})
+    return "".join(e["text"] for e in events if e["type"] == "content")
+
+
+def new_loop(chunks: list) -> str:
+    """New implementation: NDJSONDecoder + one coalesced event per chunk"""
+    events = []
+    decoder = ndjson_decoder.NDJSONDecoder()
+    thinking_started = False
+    for chunk in chunks:
+        parts = []
+        for data in decoder.feed(chunk):
+            message = data.get("message")
+            if message:
+                thinking = message.get("thinking")
+                content = message.get("content")
+                if thinking:
+                    if not thinking_started:
+                        parts.append("<think>")
+                        thinking_started = True
+                    parts.append(thinking)
+                if content:
+                    if thinking_started:
+                        parts.append("</think>\n\n")
+                        thinking_started = False
+                    parts.append(content)
+            if data.get("done", False):
+                events.append({"type": "done"})
+        if parts:
+            events.append({"type": "content", "text": "".join(parts)})
+    return "".join(e["text"] for e in events if e["type"] == "content")
+
+
+def bench(func, chunks: list, runs: int) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        func(chunks)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Ollama NDJSON stream decoding")
+    parser.add_argument("--tokens", type=int, default=2000, help="Content tokens (default: 2000)")
+    parser.add_argument("--thinking", type=int, default=500, help="Thinking tokens (default: 500)")
+    parser.add_argument("--chunk-size", type=int, default=1024, help="Network chunk size in bytes (default: 1024)")
+    parser.add_argument("--runs", type=int, default=30, help="Runs per variant, best is reported (default: 30)")
+    args = parser.parse_args()
+
+    stream = record_stream(args.tokens, args.thinking)
+    chunks = split_chunks(stream, args.chunk_size)
+
+    assert old_loop(chunks) == new_loop(chunks), "Decoded output differs!"
+
+    old = bench(old_loop, chunks, args.runs)
+    new = bench(new_loop, chunks, args.runs)
+
+    print(f"Stream: {len(stream) / 1024:.1f} KB, {args.tokens + args.thinking + 1} frames, {len(chunks)} chunks")
+    print(f"JSON library: {ndjson_decoder.JSON_LIBRARY}")
+    print(f"Old loop (aiter_lines + json.loads): {old * 1000:8.2f} ms")
+    print(f"NDJSONDecoder (coalesced):           {new * 1000:8.2f} ms")
+    print(f"Speedup: {old / new:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
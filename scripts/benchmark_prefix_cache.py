@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Prefill tokens with default vs. prefix-stable prompt layout
+
+Replays a multi-turn conversation against a stub of vLLM's Automatic Prefix
+Caching: prompts are rendered with a ChatML template, split into fixed-size
+token blocks and every block is cached by the hash of the full prefix up to
+and including it (like vLLM's block hashing). A request only has to prefill
+the tokens after the first uncached block.
+
+Compared layouts (see prompt_loader.load_system_prompt):
+- default:       timestamp (HH:MM:SS) at the start of the system prompt,
+                 research context inline in the system prompt
+- prefix-stable: static system prompt → history → timestamp + context → question
+
+No LLM server is needed. Token counts use a simple regex tokenizer, so the
+absolute numbers are approximate - the ratio is what matters.
+
+Usage:
+    ./venv/bin/python scripts/benchmark_prefix_cache.py
+    ./venv/bin/python scripts/benchmark_prefix_cache.py --turns 12 --research-every 3 --block-size 16
+"""
+import argparse
+import hashlib
+import importlib.util
+import re
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Load modules directly (avoids importing the aifred package with its app dependencies)
+_LIB_DIR = Path(__file__).resolve().parent.parent / "aifred" / "lib"
+
+
+def _load(name: str):
+    spec = importlib.util.spec_from_file_location(name, _LIB_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+prompt_loader = _load("prompt_loader")
+message_builder = _load("message_builder")
+
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]|\s+")
+
+
+class FakeClock(datetime):
+    """datetime replacement whose now() advances per turn"""
+    current = datetime(2025, 11, 15, 14, 30, 5)
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.current
+
+
+class PrefixCacheStub:
+    """Minimal model of vLLM Automatic Prefix Caching (unbounded cache)"""
+
+    def __init__(self, block_size: int):
+        self.block_size = block_size
+        self.blocks = set()
+
+    def prefill(self, tokens: list) -> int:
+        """Return number of tokens that have to be prefilled, cache full blocks"""
+        digest = hashlib.sha256()
+        cached_tokens = 0
+        hit = True
+        for start in range(0, len(tokens) - self.block_size + 1, self.block_size):
+            digest.update("\x00".join(tokens[start:start + self.block_size]).encode())
+            key = digest.copy().hexdigest()
+            if hit and key in self.blocks:
+                cached_tokens += self.block_size
+            else:
+                hit = False
+                self.blocks.add(key)
+        return len(tokens) - cached_tokens
+
+
+def render_chatml(messages: list) -> list:
+    """Render messages like Qwen's chat template and tokenize"""
+    text = "".join(f"<|im_start|>{m['role']}\n{m['content']}<|im_end|>\n" for m in messages)
+    text += "<|im_start|>assistant\n"
+    return TOKEN_PATTERN.findall(text)
+
+
+def synthetic_text(prefix: str, turn: int, words: int) -> str:
+    return " ".join(f"{prefix}{turn}_{i}" for i in range(words))
+
+
+def build_turn(turn: int, history: list, research: bool, prefix_stable: bool, context_words: int) -> list:
+    user_text = f"Frage {turn}: Was gibt es Neues zum Thema {turn}?"
+    if research:
+        system_prompt, volatile = prompt_loader.load_system_prompt(
+            "system_rag", lang="de", user_text=user_text,
+            context=synthetic_text("quelle", turn, context_words),
+            prefix_stable=prefix_stable, granularity="second"
+        )
+    else:
+        system_prompt, volatile = prompt_loader.load_system_prompt(
+            "system_minimal", lang="de", prefix_stable=prefix_stable, granularity="second"
+        )
+    return message_builder.build_messages_from_history(
+        history, user_text, system_prompt=system_prompt, volatile_context=volatile
+    ), user_text
+
+
+def run(prefix_stable: bool, args) -> tuple:
+    prompt_loader.datetime = FakeClock
+    FakeClock.current = datetime(2025, 11, 15, 14, 30, 5)
+    cache = PrefixCacheStub(args.block_size)
+    history = []
+    total = prefilled = 0
+
+    for turn in range(1, args.turns + 1):
+        research = args.research_every > 0 and turn % args.research_every == 0
+        messages, user_text = build_turn(turn, history, research, prefix_stable, args.context_words)
+        tokens = render_chatml(messages)
+        total += len(tokens)
+        prefilled += cache.prefill(tokens)
+
+        history.append((user_text, synthetic_text("antwort", turn, args.answer_words)))
+        FakeClock.current += timedelta(seconds=47)
+
+    return total, prefilled
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark prefill reduction of the prefix-stable prompt layout")
+    parser.add_argument("--turns", type=int, default=10, help="Conversation turns (default: 10)")
+    parser.add_argument("--research-every", type=int, default=3,
+                        help="Every N-th turn is a web research turn with RAG context (0 = never, default: 3)")
+    parser.add_argument("--context-words", type=int, default=1500, help="Words of research context (default: 1500)")
+    parser.add_argument("--answer-words", type=int, default=200, help="Words per assistant answer (default: 200)")
+    parser.add_argument("--block-size", type=int, default=16, help="KV cache block size in tokens (default: 16)")
+    args = parser.parse_args()
+
+    default_total, default_prefill = run(False, args)
+    stable_total, stable_prefill = run(True, args)
+
+    print(f"Conversation: {args.turns} turns, research every {args.research_every}. turn, "
+          f"block size {args.block_size}")
+    print(f"{'Layout':<16}{'Prompt tokens':>15}{'Prefilled':>12}{'Cache hit':>11}")
+    for name, total, prefill in (("default", default_total, default_prefill),
+                                 ("prefix-stable", stable_total, stable_prefill)):
+        print(f"{name:<16}{total:>15}{prefill:>12}{(1 - prefill / total) * 100:>10.1f}%")
+    print(f"Prefill reduction: {(1 - stable_prefill / default_prefill) * 100:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Per-request overhead of TCP vs. Unix socket transports
+
+Small Automatik calls (decision, intent, classify) are dominated by transport
+overhead, not by generation. This benchmark measures the client-side round
+trip of many small POST requests through the httpx clients AIfred builds
+(aifred/backends/transport.py):
+
+- tcp-new:        new client + TCP connection per request (old TabbyAPI metadata path)
+- tcp-keepalive:  pooled loopback TCP connection (default backend client)
+- unix-keepalive: pooled Unix domain socket connection (unix:// backend URL)
+- keepalive-http2: pooled HTTP/2 connection (--http2 with --url, needs `h2` + TLS server)
+
+Default target is a built-in stub server answering like Ollama's /api/chat
+(stream=false, tiny JSON), listening on TCP and on a Unix socket - so only
+transport costs are measured. With --url the requests go to real backends
+instead, e.g. Ollama on TCP and on its socket (tiny prompt, num_predict=1).
+
+Usage:
+    ./venv/bin/python scripts/benchmark_transport.py
+    ./venv/bin/python scripts/benchmark_transport.py --requests 2000 --concurrency 4
+    ./venv/bin/python scripts/benchmark_transport.py --model qwen2.5:3b \\
+        --url http://localhost:11434 --url unix:///run/ollama/ollama.sock
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+# Load transport.py directly (avoids importing the aifred package with its app dependencies)
+_TRANSPORT_PATH = Path(__file__).resolve().parent.parent / "aifred" / "backends" / "transport.py"
+_spec = importlib.util.spec_from_file_location("transport", _TRANSPORT_PATH)
+transport = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(transport)
+
+STUB_RESPONSE = json.dumps({
+    "model": "stub",
+    "message": {"role": "assistant", "content": "<search>no</search>"},
+    "done": True,
+    "eval_count": 4,
+    "prompt_eval_count": 180
+}).encode()
+
+
+async def _handle_stub(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """Minimal HTTP/1.1 keep-alive server: read request, answer with STUB_RESPONSE"""
+    try:
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            if length:
+                await reader.readexactly(length)
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                b"Content-Length: " + str(len(STUB_RESPONSE)).encode() + b"\r\n\r\n" + STUB_RESPONSE
+            )
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionResetError, asyncio.CancelledError):
+        pass
+    finally:
+        writer.close()
+
+
+def _payload(model: str) -> dict:
+    return {
+        "model": model,
+        "messages": [{"role": "user", "content": "Braucht diese Frage eine Web-Recherche? Wie spät ist es?"}],
+        "stream": False,
+        "options": {"temperature": 0.2, "num_predict": 1, "num_ctx": 2048}
+    }
+
+
+async def _run_variant(name: str, url: str, args, new_connection: bool = False, http2: bool = False) -> dict:
+    payload = _payload(args.model)
+    latencies = []
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(args.requests):
+        queue.put_nowait(None)
+
+    if new_connection:
+        client = None
+        target = transport.parse_backend_url(url)
+        http_url = target.http_url
+    else:
+        client, http_url = transport.create_async_client(url, timeout=30.0, http2=http2)
+
+    async def one_request():
+        if client is None:
+            fresh, _ = transport.create_async_client(url, timeout=30.0, http2=http2)
+            async with fresh:
+                response = await fresh.post(f"{http_url}/api/chat", json=payload)
+        else:
+            response = await client.post(f"{http_url}/api/chat", json=payload)
+        response.raise_for_status()
+
+    async def worker():
+        while not queue.empty():
+            queue.get_nowait()
+            start = time.perf_counter()
+            await one_request()
+            latencies.append(time.perf_counter() - start)
+
+    # Warmup (connection setup, model load for real backends)
+    for _ in range(args.warmup):
+        await one_request()
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    wall = time.perf_counter() - wall_start
+    if client is not None:
+        await client.aclose()
+
+    latencies.sort()
+    return {
+        "name": name,
+        "requests": len(latencies),
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        "rps": len(latencies) / wall
+    }
+
+
+def _print_results(results: list):
+    baseline = results[0]["mean_ms"]
+    print(f"{'Variante':<22} {'Requests':>8} {'Ø ms':>8} {'p50 ms':>8} {'p99 ms':>8} {'req/s':>9} {'vs. 1.':>7}")
+    for r in results:
+        print(f"{r['name']:<22} {r['requests']:>8} {r['mean_ms']:>8.3f} {r['p50_ms']:>8.3f} "
+              f"{r['p99_ms']:>8.3f} {r['rps']:>9.0f} {baseline / r['mean_ms']:>6.2f}×")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per variant")
+    parser.add_argument("--concurrency", type=int, default=1, help="Parallel requests")
+    parser.add_argument("--warmup", type=int, default=20, help="Warmup requests per variant")
+    parser.add_argument("--http2", action="store_true", help="Also run HTTP/2 variants (needs h2)")
+    parser.add_argument("--url", action="append", help="Real backend URL(s) instead of the stub server")
+    parser.add_argument("--model", default="stub", help="Model for real backends")
+    args = parser.parse_args()
+
+    results = []
+    if args.url:
+        for url in args.url:
+            results.append(await _run_variant(f"{'unix' if transport.is_unix_url(url) else 'tcp'}-keepalive", url, args))
+            if args.http2:
+                results.append(await _run_variant("keepalive-http2", url, args, http2=True))
+        _print_results(results)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        socket_path = os.path.join(tmp, "stub.sock")
+        tcp_server = await asyncio.start_server(_handle_stub, "127.0.0.1", 0)
+        unix_server = await asyncio.start_unix_server(_handle_stub, socket_path)
+        port = tcp_server.sockets[0].getsockname()[1]
+        tcp_url = f"http://127.0.0.1:{port}"
+        unix_url = f"unix://{socket_path}"
+
+        try:
+            results.append(await _run_variant("tcp-new", tcp_url, args, new_connection=True))
+            results.append(await _run_variant("tcp-keepalive", tcp_url, args))
+            results.append(await _run_variant("unix-keepalive", unix_url, args))
+            if args.http2:
+                print("Hinweis: Der Stub spricht nur HTTP/1.1 - HTTP/2 wird ohne TLS nicht ausgehandelt")
+        finally:
+            tcp_server.close()
+            unix_server.close()
+
+    print(f"Stub-Server, {args.requests} Requests/Variante, Concurrency {args.concurrency}")
+    _print_results(results)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -8,27 +8,74 @@ Funktionen:
 - Cache-Stats anzeigen
 - Alte Einträge löschen (älter als X Tage)
 - Gesamte Datenbank leeren
+- Antworten alter Einträge aus den Metadaten in den Answer Store verschieben
+
+Gelöschte Einträge werden auch aus dem Answer Store (aifred/lib/answer_store.py) entfernt.
+
+Backend: VECTOR_CACHE_BACKEND aus aifred/lib/config.py (überschreibbar mit --backend).
+"chroma" verbindet zum ChromaDB-Server, "local" öffnet den Local Vector Index
+(VECTOR_CACHE_LOCAL_PATH) direkt - ändernde Aktionen (--execute) dann nur bei
+gestopptem AIfred ausführen, der Index wird vom laufenden Prozess im Speicher gehalten.
 """
 
-import chromadb
+import sys
+from pathlib import Path
+
 from datetime import datetime, timedelta
 from collections import defaultdict
 import argparse
 
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+# Gewähltes Backend ("chroma" / "local"), gesetzt in main()
+BACKEND = None
+# Local Vector Index: eine Instanz pro Lauf (mehrere Instanzen auf denselben Dateien vermeiden)
+_local_index = None
+
+
+def get_backend():
+    if BACKEND:
+        return BACKEND
+    from aifred.lib.config import VECTOR_CACHE_BACKEND
+    return VECTOR_CACHE_BACKEND
+
 
 def get_collection():
-    """Verbinde zu ChromaDB und hole Collection"""
+    """
+    Hole die Collection des Vector Cache
+
+    Returns:
+        (client, collection) - client ist None beim Local Vector Index
+    """
+    global _local_index
+    if get_backend() == "local":
+        if _local_index is None:
+            from aifred.lib.config import VECTOR_CACHE_LOCAL_PATH
+            from aifred.lib.local_vector_index import LocalVectorIndex
+            _local_index = LocalVectorIndex(VECTOR_CACHE_LOCAL_PATH)
+        return None, _local_index
+
+    import chromadb
     client = chromadb.HttpClient(host='localhost', port=8000)
     return client, client.get_collection('research_cache')
 
 
+def get_answer_store():
+    """Answer Store des Vector Cache (Antworten + Quellen pro Eintrags-ID)"""
+    from aifred.lib.answer_store import AnswerStore
+    from aifred.lib.config import VECTOR_CACHE_ANSWER_STORE
+    return AnswerStore(VECTOR_CACHE_ANSWER_STORE)
+
+
 def show_stats():
     """Zeige Datenbank-Statistiken"""
     _, collection = get_collection()
     count = collection.count()
 
     print(f"\n{'='*60}")
-    print(f"📊 ChromaDB Stats")
+    print(f"📊 Vector Cache Stats ({get_backend()})")
     print(f"{'='*60}")
     print(f"Total Einträge: {count}")
 
@@ -144,6 +191,7 @@ def remove_duplicates(dry_run=True):
     else:
         print(f"\n🗑️  Lösche {len(to_delete)} Duplikate...")
         collection.delete(ids=to_delete)
+        get_answer_store().delete(to_delete)
         print(f"✅ {len(to_delete)} Einträge gelöscht")
 
         # Zeige neue Stats
@@ -182,6 +230,7 @@ def remove_old_entries(days=30, dry_run=True):
             print(f"💡 Zum Ausführen: --remove-old {days} --execute")
         else:
             collection.delete(ids=to_delete)
+            get_answer_store().delete(to_delete)
             print(f"✅ {len(to_delete)} alte Einträge gelöscht")
     else:
         print(f"✅ Keine Einträge älter als {days} Tage")
@@ -202,11 +251,57 @@ def clear_all(confirm=False):
         return
 
     print(f"🗑️  Lösche {count} Einträge...")
-    client.delete_collection('research_cache')
-    client.get_or_create_collection('research_cache')
+    if client is None:
+        collection.clear()
+    else:
+        client.delete_collection('research_cache')
+        client.get_or_create_collection('research_cache')
+    get_answer_store().clear()
     print("✅ Datenbank geleert")
 
 
+def migrate_answers(dry_run=True):
+    """
+    Verschiebe Antworten alter Einträge aus den Metadaten in den Answer Store
+
+    Einträge von vor dem Answer Store tragen die volle Antwort in metadata['answer'] -
+    jede Similarity-Suche liefert sie mit. Der Eintrag wird mit seinem gespeicherten
+    Embedding neu geschrieben (ohne 'answer'). Zusätzlich werden verwaiste Antworten
+    (Eintrag nicht mehr in der Collection) entfernt.
+
+    Args:
+        dry_run: Wenn True, nur simulieren
+    """
+    _, collection = get_collection()
+    answers = get_answer_store()
+    count = collection.count()
+
+    results = collection.get(limit=max(count, 1), include=['metadatas', 'documents', 'embeddings'])
+    legacy = [
+        (id_, doc, emb, meta)
+        for id_, doc, emb, meta in zip(results['ids'], results['documents'], results['embeddings'], results['metadatas'])
+        if meta and 'answer' in meta
+    ]
+    orphans = list(set(answers.ids()) - set(results['ids']))
+
+    print(f"\n📦 {len(legacy)} Einträge mit Antwort in den Metadaten, {len(orphans)} verwaiste Antworten")
+    if dry_run:
+        if legacy or orphans:
+            print("💡 Zum Ausführen: --migrate-answers --execute")
+        return
+
+    for id_, doc, emb, meta in legacy:
+        meta = dict(meta)
+        answer = meta.pop('answer')
+        sources = [{'url': url} for url in meta.get('source_urls', '').split(', ') if url]
+        answers.put(id_, answer, sources)
+        # Chroma merges metadata on update → delete + add with the stored embedding
+        collection.delete(ids=[id_])
+        collection.add(ids=[id_], documents=[doc], embeddings=[[float(x) for x in emb]], metadatas=[meta])
+    answers.delete(orphans)
+    print(f"✅ {len(legacy)} Antworten verschoben, {len(orphans)} verwaiste entfernt")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='ChromaDB Maintenance Tool für AIfred Intelligence',
@@ -230,6 +325,12 @@ Beispiele:
 
   # Leere gesamte Datenbank
   python3 chroma_maintenance.py --clear --execute
+
+  # Antworten alter Einträge in den Answer Store verschieben
+  python3 chroma_maintenance.py --migrate-answers --execute
+
+  # Local Vector Index statt ChromaDB-Server (AIfred vorher stoppen)
+  python3 chroma_maintenance.py --backend local --remove-old 30 --execute
         """
     )
 
@@ -243,14 +344,21 @@ Beispiele:
                         help='Lösche Einträge älter als X Tage')
     parser.add_argument('--clear', action='store_true',
                         help='Leere gesamte Datenbank')
+    parser.add_argument('--migrate-answers', action='store_true',
+                        help='Antworten aus Metadaten in den Answer Store verschieben')
     parser.add_argument('--execute', action='store_true',
                         help='Führe Änderungen aus (sonst Dry-Run)')
+    parser.add_argument('--backend', choices=['chroma', 'local'],
+                        help='Vector-Cache-Backend (Standard: VECTOR_CACHE_BACKEND)')
 
     args = parser.parse_args()
 
+    global BACKEND
+    BACKEND = args.backend
+
     # Wenn keine Argumente, zeige Stats
     if not any([args.stats, args.find_duplicates, args.remove_duplicates,
-                args.remove_old, args.clear]):
+                args.remove_old, args.clear, args.migrate_answers]):
         show_stats()
         return
 
@@ -270,9 +378,13 @@ Beispiele:
         if args.clear:
             clear_all(confirm=args.execute)
 
+        if args.migrate_answers:
+            migrate_answers(dry_run=not args.execute)
+
     except Exception as e:
         print(f"\n❌ Fehler: {e}")
-        print("💡 Stelle sicher, dass ChromaDB läuft: docker-compose up -d chromadb")
+        if get_backend() != "local":
+            print("💡 Stelle sicher, dass ChromaDB läuft: docker-compose up -d chromadb")
 
 
 if __name__ == '__main__':
@@ -1,16 +1,19 @@
 #!/usr/bin/env python3
 """
-List all entries in ChromaDB Vector Cache
+List all entries in the Vector Cache (ChromaDB server or local index)
 
 Usage:
     ./venv/bin/python scripts/list_cache.py
     ./venv/bin/python scripts/list_cache.py --detailed
+    ./venv/bin/python scripts/list_cache.py --backend local
 """
 import sys
 import argparse
 from datetime import datetime
-import chromadb
-from chromadb.config import Settings
+from pathlib import Path
+
+# Add parent directory to path for imports (Answer Store)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 def format_time_ago(timestamp_str):
     """Convert ISO timestamp to human-readable 'X ago' format"""
@@ -36,32 +39,46 @@ def main():
                        help='Show detailed answer preview')
     parser.add_argument('--limit', '-l', type=int, default=None,
                        help='Limit number of entries to show')
+    parser.add_argument('--backend', choices=['chroma', 'local'],
+                       help='Vector Cache backend (default: VECTOR_CACHE_BACKEND)')
     args = parser.parse_args()
 
-    # Connect to ChromaDB
-    try:
-        client = chromadb.HttpClient(
-            host="localhost",
-            port=8000,
-            settings=Settings(anonymized_telemetry=False)
-        )
-        client.heartbeat()  # Test connection
-    except Exception as e:
-        print(f"❌ Could not connect to ChromaDB: {e}")
-        print("   Make sure ChromaDB is running: cd docker && docker-compose up -d chromadb")
-        sys.exit(1)
-
-    # Get collection
-    try:
-        collection = client.get_collection("research_cache")
-    except Exception as e:
-        print(f"❌ Collection 'research_cache' not found: {e}")
-        sys.exit(1)
+    from aifred.lib.config import VECTOR_CACHE_BACKEND
+    backend = args.backend or VECTOR_CACHE_BACKEND
+
+    if backend == "local":
+        # Embedded index: read the files directly (no server)
+        from aifred.lib.config import VECTOR_CACHE_LOCAL_PATH
+        from aifred.lib.local_vector_index import LocalVectorIndex
+        collection = LocalVectorIndex(VECTOR_CACHE_LOCAL_PATH)
+    else:
+        import chromadb
+        from chromadb.config import Settings
+
+        # Connect to ChromaDB
+        try:
+            client = chromadb.HttpClient(
+                host="localhost",
+                port=8000,
+                settings=Settings(anonymized_telemetry=False)
+            )
+            client.heartbeat()  # Test connection
+        except Exception as e:
+            print(f"❌ Could not connect to ChromaDB: {e}")
+            print("   Make sure ChromaDB is running: cd docker && docker-compose up -d chromadb")
+            sys.exit(1)
+
+        # Get collection
+        try:
+            collection = client.get_collection("research_cache")
+        except Exception as e:
+            print(f"❌ Collection 'research_cache' not found: {e}")
+            sys.exit(1)
 
     # Get all entries
     count = collection.count()
     print(f"\n{'='*80}")
-    print(f"📊 ChromaDB Vector Cache - {count} entries")
+    print(f"📊 Vector Cache ({backend}) - {count} entries")
     print(f"{'='*80}\n")
 
     if count == 0:
@@ -73,10 +90,17 @@ def main():
 
     # Limit if specified
     limit = args.limit if args.limit else count
-    entries = list(zip(all_data['documents'], all_data['metadatas']))[:limit]
+    entries = list(zip(all_data['ids'], all_data['documents'], all_data['metadatas']))[:limit]
+
+    # Answers live in the Answer Store (older entries: in the metadata)
+    stored = {}
+    if args.detailed:
+        from aifred.lib.answer_store import AnswerStore
+        from aifred.lib.config import VECTOR_CACHE_ANSWER_STORE
+        stored = AnswerStore(VECTOR_CACHE_ANSWER_STORE).get_many([entry[0] for entry in entries])
 
     # Print each entry
-    for i, (doc, meta) in enumerate(entries, 1):
+    for i, (entry_id, doc, meta) in enumerate(entries, 1):
         timestamp = meta.get('timestamp', 'N/A')
         time_ago = format_time_ago(timestamp) if timestamp != 'N/A' else 'N/A'
         num_sources = meta.get('num_sources', 0)
@@ -87,7 +111,7 @@ def main():
         print(f"    Query: {doc[:100]}{'...' if len(doc) > 100 else ''}")
 
         if args.detailed:
-            answer = meta.get('answer', '')
+            answer = stored[entry_id]['answer'] if entry_id in stored else meta.get('answer', '')
             answer_preview = answer[:200] + "..." if len(answer) > 200 else answer
             print(f"    Answer: {answer_preview}")
 
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Migrate the ChromaDB research_cache collection into the local vector index
+
+Copies ids, query documents, metadata and the stored embeddings (no
+re-embedding) from the ChromaDB server into LocalVectorIndex, the embedded
+backend used with VECTOR_CACHE_BACKEND = "local" (aifred/lib/config.py).
+Entries already present in the local index are skipped, so the script can
+be re-run after the server received more entries.
+
+Usage:
+    ./venv/bin/python scripts/migrate_vector_cache.py
+    ./venv/bin/python scripts/migrate_vector_cache.py --host localhost --port 8000 --clear
+    ./venv/bin/python scripts/migrate_vector_cache.py --path /data/aifred_vector_index
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ChromaDB research_cache → local vector index")
+    parser.add_argument("--host", default="localhost", help="ChromaDB server host (default: localhost)")
+    parser.add_argument("--port", type=int, default=8000, help="ChromaDB server port (default: 8000)")
+    parser.add_argument("--path", help="Local index directory (default: VECTOR_CACHE_LOCAL_PATH)")
+    parser.add_argument("--batch-size", type=int, default=500, help="Entries per request (default: 500)")
+    parser.add_argument("--clear", action="store_true", help="Empty the local index before migrating")
+    args = parser.parse_args()
+
+    # Import after argument parsing
+    import chromadb
+    from chromadb.config import Settings
+    from aifred.lib.config import VECTOR_CACHE_LOCAL_PATH
+    from aifred.lib.local_vector_index import LocalVectorIndex
+
+    client = chromadb.HttpClient(host=args.host, port=args.port, settings=Settings(anonymized_telemetry=False))
+    collection = client.get_collection("research_cache")
+    total = collection.count()
+
+    index = LocalVectorIndex(args.path or VECTOR_CACHE_LOCAL_PATH)
+    if args.clear:
+        index.clear()
+    existing = set(index.get(include=[])['ids'])
+
+    print(f"\n{'='*60}")
+    print(f"📦 Migration: ChromaDB {args.host}:{args.port} → {index.path}")
+    print(f"{'='*60}")
+    print(f"Server: {total} Einträge, lokal: {len(existing)} Einträge")
+
+    migrated = skipped = 0
+    for offset in range(0, total, args.batch_size):
+        batch = collection.get(
+            limit=args.batch_size,
+            offset=offset,
+            include=['embeddings', 'documents', 'metadatas']
+        )
+        rows = [
+            (entry_id, document, embedding, metadata)
+            for entry_id, document, embedding, metadata in zip(
+                batch['ids'], batch['documents'], batch['embeddings'], batch['metadatas']
+            )
+            if entry_id not in existing
+        ]
+        skipped += len(batch['ids']) - len(rows)
+        if rows:
+            index.add(
+                ids=[row[0] for row in rows],
+                documents=[row[1] for row in rows],
+                embeddings=[[float(x) for x in row[2]] for row in rows],
+                metadatas=[row[3] or {} for row in rows]
+            )
+            migrated += len(rows)
+        print(f"  {min(offset + args.batch_size, total)}/{total}")
+
+    print(f"\n✅ {migrated} Einträge migriert, {skipped} bereits vorhanden")
+    print(f"Lokaler Index: {index.count()} Einträge")
+    print("💡 Aktivieren: VECTOR_CACHE_BACKEND = \"local\" in aifred/lib/config.py\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 """
-Search ChromaDB Vector Cache by semantic similarity
+Search the Vector Cache by semantic similarity
+
+Uses the configured backend (VECTOR_CACHE_BACKEND: ChromaDB server or local index).
 
 Usage:
     ./venv/bin/python scripts/search_cache.py "Python libraries"
@@ -9,10 +11,11 @@ Usage:
 import sys
 import argparse
 from datetime import datetime
+from pathlib import Path
 import asyncio
 
 # Add parent directory to path for imports
-sys.path.insert(0, '/home/mp/Projekte/AIfred-Intelligence')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 async def main():
     parser = argparse.ArgumentParser(description='Search ChromaDB cache by similarity')
@@ -41,26 +44,21 @@ async def main():
             print("   Try a different query or increase --limit\n")
             return
 
-        # Get multiple results
-        import chromadb
-        from chromadb.config import Settings
-
-        client = chromadb.HttpClient(
-            host="localhost",
-            port=8000,
-            settings=Settings(anonymized_telemetry=False)
-        )
-        collection = client.get_collection("research_cache")
-
-        # Query with multiple results
-        results = collection.query(
-            query_texts=[args.query],
+        # Multiple results from the cache's own collection (Chroma or local index),
+        # same embedding as the cache lookup
+        embedding = await cache.embed(args.query)
+        results = cache.collection.query(
+            query_embeddings=[embedding.vector],
             n_results=args.limit,
             include=['distances', 'documents', 'metadatas']
         )
 
+        # Answers live in the Answer Store (older entries: in the metadata)
+        stored = cache.answers.get_many(results['ids'][0]) if args.detailed else {}
+
         # Display results
-        for i, (distance, doc, meta) in enumerate(zip(
+        for i, (entry_id, distance, doc, meta) in enumerate(zip(
+            results['ids'][0],
             results['distances'][0],
             results['documents'][0],
             results['metadatas'][0]
@@ -87,7 +85,7 @@ async def main():
             print(f"    Query: {doc[:100]}{'...' if len(doc) > 100 else ''}")
 
             if args.detailed:
-                answer = meta.get('answer', '')
+                answer = stored[entry_id]['answer'] if entry_id in stored else meta.get('answer', '')
                 answer_preview = answer[:300] + "..." if len(answer) > 300 else answer
                 print(f"    Answer: {answer_preview}")
 
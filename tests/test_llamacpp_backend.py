@@ -0,0 +1,210 @@
+"""
+Tests for the llama.cpp backend (llama-server HTTP API)
+
+llama-server is replaced by an httpx.MockTransport that records every request
+payload, so slot pinning and prompt caching can be checked without a server.
+"""
+
+import asyncio
+import json
+from typing import Dict, List, Optional
+
+import httpx
+
+from aifred.backends.base import LLMMessage, LLMOptions
+from aifred.backends import llamacpp
+from aifred.backends.llamacpp import AUTO_SLOT, LlamaCppBackend, SlotPinner
+
+MESSAGES = [LLMMessage(role="user", content="Hallo")]
+
+
+class FakeLlamaServer:
+    """Minimal llama-server: /props, /v1/chat/completions (JSON + SSE), /completion"""
+
+    def __init__(
+        self,
+        total_slots: Optional[int] = 3,
+        sse_chunks: Optional[List[Dict]] = None,
+        props_loading: int = 0
+    ):
+        self.total_slots = total_slots
+        self.props_loading = props_loading  # Number of 503 answers (model still loading)
+        self.props_calls = 0
+        self.sse_chunks = sse_chunks or [
+            {"choices": [{"delta": {"content": "Hi"}}]},
+            {"choices": [], "usage": {"prompt_tokens": 12, "completion_tokens": 1}},
+        ]
+        self.payloads: List[Dict] = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/props":
+            self.props_calls += 1
+            if self.props_calls <= self.props_loading:
+                return httpx.Response(503, json={"error": {"message": "Loading model"}})
+            if self.total_slots is None:
+                return httpx.Response(404)
+            return httpx.Response(200, json={"total_slots": self.total_slots})
+
+        payload = json.loads(request.content)
+        self.payloads.append(payload)
+
+        if request.url.path == "/completion":
+            return httpx.Response(200, json={"content": "ok", "tokens_predicted": 1, "tokens_evaluated": 1})
+        if payload.get("stream"):
+            body = "".join(f"data: {json.dumps(chunk)}\n\n" for chunk in self.sse_chunks) + "data: [DONE]\n\n"
+            return httpx.Response(200, content=body.encode(), headers={"content-type": "text/event-stream"})
+        return httpx.Response(200, json={
+            "choices": [{"message": {"content": "ok"}}],
+            "usage": {"prompt_tokens": 5, "completion_tokens": 1},
+        })
+
+    @property
+    def slots(self) -> List[int]:
+        return [payload["id_slot"] for payload in self.payloads]
+
+
+def make_backend(server: FakeLlamaServer) -> LlamaCppBackend:
+    backend = LlamaCppBackend("http://llama:8080")
+    backend.client = httpx.AsyncClient(transport=httpx.MockTransport(server.handler))
+    return backend
+
+
+async def collect(backend: LlamaCppBackend, options: LLMOptions) -> List[Dict]:
+    return [chunk async for chunk in backend.chat_stream("model", MESSAGES, options)]
+
+
+def test_cache_prompt_on_every_request():
+    server = FakeLlamaServer()
+    backend = make_backend(server)
+
+    async def run():
+        await backend.chat("model", MESSAGES, LLMOptions())
+        await collect(backend, LLMOptions(affinity_key="session-a"))
+        await collect(backend, LLMOptions(choices=["ja", "nein"]))
+        await backend.complete("hi")
+        await backend.close()
+
+    asyncio.run(run())
+
+    assert len(server.payloads) == 4
+    assert all(payload["cache_prompt"] is True for payload in server.payloads)
+
+
+def test_session_slot_is_stable_and_lru_reassigned():
+    server = FakeLlamaServer(total_slots=3)  # Session slots 0, 1 + scratch slot 2
+    backend = make_backend(server)
+
+    async def run():
+        for session in ["a", "b", "a", "c", "b"]:
+            await collect(backend, LLMOptions(affinity_key=session))
+        await backend.close()
+
+    asyncio.run(run())
+
+    # a→0, b→1, a stays 0, c evicts b (least recently used), b evicts a
+    assert server.slots == [0, 1, 0, 1, 0]
+
+
+def test_utility_calls_use_scratch_slot():
+    server = FakeLlamaServer(total_slots=3)
+    backend = make_backend(server)
+
+    async def run():
+        await backend.chat("model", MESSAGES, LLMOptions(affinity_key="a"))
+        await collect(backend, LLMOptions(affinity_key="a", choices=["ja", "nein"]))
+        await collect(backend, LLMOptions(affinity_key="a", json_schema={"type": "object"}))
+        await backend.complete("hi")
+        await collect(backend, LLMOptions(affinity_key="a"))
+        await backend.close()
+
+    asyncio.run(run())
+
+    assert server.slots == [2, 2, 2, 2, 0]
+
+
+def test_single_slot_and_missing_props():
+    single = FakeLlamaServer(total_slots=1)
+    no_props = FakeLlamaServer(total_slots=None)
+
+    async def run():
+        for server in (single, no_props):
+            backend = make_backend(server)
+            await collect(backend, LLMOptions(affinity_key="a"))
+            await backend.chat("model", MESSAGES, LLMOptions())
+            await backend.close()
+
+    asyncio.run(run())
+
+    assert single.slots == [0, 0]
+    assert no_props.slots == [AUTO_SLOT, AUTO_SLOT]
+
+
+def test_props_503_while_loading_is_retried():
+    server = FakeLlamaServer(total_slots=3, props_loading=1)
+    backend = make_backend(server)
+
+    async def run():
+        await collect(backend, LLMOptions(affinity_key="a"))  # /props 503 → unpinned, retry scheduled
+        await collect(backend, LLMOptions(affinity_key="a"))  # Still inside the backoff window
+        backend._props_retry_at = 0.0  # Backoff elapsed
+        await collect(backend, LLMOptions(affinity_key="a"))
+        await collect(backend, LLMOptions(affinity_key="b"))
+        await backend.close()
+
+    asyncio.run(run())
+
+    assert server.props_calls == 2
+    assert server.slots == [AUTO_SLOT, AUTO_SLOT, 0, 1]
+    assert backend._props_backoff == 2 * llamacpp.PROPS_RETRY_INITIAL_S
+
+
+def test_slot_pinner_layout():
+    pinner = SlotPinner(4)
+    assert (pinner.session_slots, pinner.scratch_slot) == (3, 3)
+    assert [pinner.slot_for_session(key) for key in "abcda"] == [0, 1, 2, 0, 1]
+
+
+def test_sse_reasoning_content_becomes_think_block():
+    server = FakeLlamaServer(sse_chunks=[
+        {"choices": [{"delta": {"reasoning_content": "Hmm"}}]},
+        {"choices": [{"delta": {"reasoning_content": ", ok"}}]},
+        {"choices": [{"delta": {"content": "Hallo"}}]},
+        {"choices": [{"delta": {"content": " Welt"}}]},
+        {"choices": [], "usage": {"prompt_tokens": 42, "completion_tokens": 7},
+         "timings": {"cache_n": 30, "prompt_n": 12}},
+    ])
+    backend = make_backend(server)
+
+    async def run():
+        chunks = await collect(backend, LLMOptions(affinity_key="a"))
+        await backend.close()
+        return chunks
+
+    chunks = asyncio.run(run())
+
+    text = "".join(chunk["text"] for chunk in chunks if chunk["type"] == "content")
+    assert text == "<think>Hmm, ok</think>\n\nHallo Welt"
+    assert chunks[-1]["type"] == "done"
+    assert chunks[-1]["metrics"]["tokens_prompt"] == 42
+    assert chunks[-1]["metrics"]["tokens_prompt_total"] == 42  # prompt_n + cache_n (calibration)
+    assert chunks[-1]["metrics"]["tokens_generated"] == 7
+    assert chunks[-1]["metrics"]["tokens_estimated"] is False
+
+
+def test_sse_reasoning_only_stream_closes_think_block():
+    server = FakeLlamaServer(sse_chunks=[
+        {"choices": [{"delta": {"reasoning_content": "nur denken"}}]},
+    ])
+    backend = make_backend(server)
+
+    async def run():
+        chunks = await collect(backend, LLMOptions())
+        await backend.close()
+        return chunks
+
+    chunks = asyncio.run(run())
+
+    text = "".join(chunk["text"] for chunk in chunks if chunk["type"] == "content")
+    assert text == "<think>nur denken</think>\n\n"
+    assert chunks[-1]["metrics"]["tokens_estimated"] is True
+    assert chunks[-1]["metrics"]["tokens_prompt_total"] is None